@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import sqlite3
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from api.auth import bootstrap_admin_from_env, router as auth_router
+from api.auth import bootstrap_admin_from_env, get_session_cache, router as auth_router
 from api.routes.audit import router as audit_router
 from api.routes.commands import router as commands_router
 from api.routes.exports import router as exports_router
@@ -14,6 +16,7 @@ from api.routes.status import router as status_router
 from api.routes.strategy_params import router as strategy_params_router
 from api.routes.trades import router as trades_router
 from storage.db import connect, init_db, ping
+from storage.pool import close_all_pools, get_pool
 
 app = FastAPI(title="Scalp Bot API", version="phase-d7")
 
@@ -48,17 +51,22 @@ def _startup() -> None:
     finally:
         conn.close()
 
+    get_session_cache().clear()
     bootstrap_admin_from_env()
 
 
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    close_all_pools()
+
 
 @app.get("/healthz")
 def healthz() -> dict[str, object]:
-    conn = connect()
     try:
-        db_ok = ping(conn)
-    finally:
-        conn.close()
+        with get_pool().reader() as conn:
+            db_ok = ping(conn)
+    except sqlite3.Error:
+        db_ok = False
     return {
         "ok": db_ok,
         "db": "ok" if db_ok else "error",
@@ -7,6 +7,9 @@ import hmac
 import json
 import secrets
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
@@ -23,8 +26,11 @@ from config.settings import (
     API_JWT_ALG,
     API_JWT_EXPIRES_MIN,
     API_JWT_SECRET,
+    API_SESSION_CACHE_MAX,
+    API_SESSION_CACHE_TTL_SEC,
 )
 from storage.db import connect, utc_now_iso
+from storage.pool import get_pool
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -46,6 +52,78 @@ class AuthenticatedUser:
     role: str
 
 
+class SessionCache:
+    """Bounded LRU+TTL cache of verified tokens -> AuthenticatedUser.
+
+    Entries expire at the earlier of the cache TTL and the token's own `exp`, so a
+    cached session never outlives its JWT. The TTL also bounds how long a role change
+    made by another process (direct SQL, another worker) can go unnoticed; in-process
+    role changes call `invalidate_user` immediately.
+    """
+
+    def __init__(self, *, max_entries: int = API_SESSION_CACHE_MAX, ttl_s: float = API_SESSION_CACHE_TTL_SEC) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[AuthenticatedUser, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str, *, now: float | None = None) -> AuthenticatedUser | None:
+        if self.max_entries <= 0:
+            return None
+        ref_now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if ref_now >= expires_at:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user: AuthenticatedUser, *, token_exp: float, now: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        ref_now = time.time() if now is None else now
+        expires_at = min(ref_now + self.ttl_s, float(token_exp))
+        if expires_at <= ref_now:
+            return
+        with self._lock:
+            self._entries[token] = (user, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str) -> None:
+        with self._lock:
+            stale = [token for token, (user, _) in self._entries.items() if user.username == username]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_SESSION_CACHE = SessionCache()
+
+
+def get_session_cache() -> SessionCache:
+    return _SESSION_CACHE
+
+
 def _b64url(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
 
@@ -115,6 +193,12 @@ def decode_jwt(token: str) -> dict[str, object]:
 def get_current_user_from_cookie(cookie_value: str | None, conn: sqlite3.Connection) -> AuthenticatedUser:
     if not cookie_value:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+    cache = get_session_cache()
+    cached = cache.get(cookie_value)
+    if cached is not None:
+        return cached
+
     payload = decode_jwt(cookie_value)
     username = str(payload.get("sub") or "")
     if not username:
@@ -122,7 +206,9 @@ def get_current_user_from_cookie(cookie_value: str | None, conn: sqlite3.Connect
     row = conn.execute("SELECT id, username, role FROM users WHERE username = ?", (username,)).fetchone()
     if row is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return AuthenticatedUser(id=int(row[0]), username=str(row[1]), role=str(row[2]))
+    user = AuthenticatedUser(id=int(row[0]), username=str(row[1]), role=str(row[2]))
+    cache.put(cookie_value, user, token_exp=float(payload.get("exp", 0)))
+    return user
 
 
 def _cookie_domain() -> str | None:
@@ -162,14 +248,11 @@ def clear_auth_cookie(response: Response) -> None:
 
 @router.post("/login", response_model=LoginResponse)
 def login(payload: LoginRequest, response: Response) -> LoginResponse:
-    conn = connect()
-    try:
+    with get_pool().reader() as conn:
         row = conn.execute(
             "SELECT username, password_hash, role FROM users WHERE username = ?",
             (payload.username,),
         ).fetchone()
-    finally:
-        conn.close()
 
     if row is None or not verify_password(payload.password, str(row[1])):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
@@ -196,6 +279,22 @@ def ensure_user(conn: sqlite3.Connection, *, username: str, password: str, role:
     conn.commit()
 
 
+def update_user_role(conn: sqlite3.Connection, *, username: str, role: str) -> None:
+    """Change `username`'s role and drop this process's cached sessions for them.
+
+    Change roles only through this function. Nothing else invalidates the session cache, so a
+    role changed with direct SQL, or by another API worker process, takes effect only once the
+    cached sessions expire (`API_SESSION_CACHE_TTL_SEC`).
+    """
+    if role not in {"viewer", "admin"}:
+        raise ValueError(f"Unsupported role: {role}")
+    cur = conn.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+    if cur.rowcount == 0:
+        raise KeyError(username)
+    conn.commit()
+    get_session_cache().invalidate_user(username)
+
+
 def bootstrap_admin_from_env() -> None:
     if not ADMIN_BOOTSTRAP_USER or not ADMIN_BOOTSTRAP_PASS:
         return
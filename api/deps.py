@@ -8,19 +8,22 @@ from fastapi import Cookie, Depends, HTTPException, status
 
 from api.auth import AuthenticatedUser, get_current_user_from_cookie
 from config.settings import API_COOKIE_NAME
-from storage.db import connect
+from storage.pool import get_pool
 
 
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    conn = connect()
-    try:
+def get_read_db() -> Generator[sqlite3.Connection, None, None]:
+    """Borrow a pooled read-only connection for GET handlers."""
+    with get_pool().reader() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
+def get_write_db() -> Generator[sqlite3.Connection, None, None]:
+    """Borrow the pooled writer; SQLite allows one writer at a time anyway."""
+    with get_pool().writer() as conn:
+        yield conn
+
 def get_current_user(
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     cookie_value: str | None = Cookie(default=None, alias=API_COOKIE_NAME),
 ) -> AuthenticatedUser:
     if not cookie_value:
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query
 
-from api.deps import get_db, require_viewer
+from api.deps import get_read_db, require_viewer
 
 router = APIRouter(tags=["audit"])
 
@@ -16,7 +16,7 @@ def list_audit(
     actor: str | None = None,
     action: str | None = None,
     since_ts_utc: str | None = None,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     _=Depends(require_viewer),
 ) -> list[dict[str, object]]:
     where: list[str] = []
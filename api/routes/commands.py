@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from api.auth import AuthenticatedUser
-from api.deps import get_db, require_admin
+from api.deps import get_write_db, require_admin
 from storage.commands import ALLOWED_COMMAND_TYPES, enqueue_command
 
 router = APIRouter(tags=["commands"])
@@ -21,7 +21,7 @@ class CommandCreateRequest(BaseModel):
 @router.post("/commands")
 def post_command(
     payload: CommandCreateRequest,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_write_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, object]:
     if payload.type not in ALLOWED_COMMAND_TYPES:
@@ -1,18 +1,159 @@
 from __future__ import annotations
 
-from io import BytesIO
-import sqlite3
+import csv
+import io
+import tempfile
+from collections.abc import Iterator
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font
 
-from api.deps import get_db, require_viewer
-from api.routes.trades import _query_trades
+from api.deps import require_viewer
+from api.routes.trades import TRADE_COLUMNS, iter_trade_chunks
+from storage.pool import get_pool
 
 router = APIRouter(prefix="/exports", tags=["exports"])
 
+EXPORT_CHUNK_ROWS = 1000
+_FILE_READ_BYTES = 64 * 1024
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_HEADERS = [column for column in TRADE_COLUMNS if column != "position_id"]
+
+
+def _iter_export_chunks(filters: dict[str, object]) -> Iterator[list[dict[str, object]]]:
+    # Streaming bodies outlive the request dependencies, so the generator borrows its own reader.
+    with get_pool().reader() as conn:
+        yield from iter_trade_chunks(conn, chunk_size=EXPORT_CHUNK_ROWS, **filters)
+
+
+def _stream_csv(filters: dict[str, object]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for chunk in _iter_export_chunks(filters):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows([item.get(key) for key in EXPORT_HEADERS] for item in chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _stream_xlsx(filters: dict[str, object]) -> Iterator[bytes]:
+    """Build a write-only workbook on disk and stream the file back in blocks.
+
+    Write-only worksheets serialize rows as they are appended, so memory stays flat
+    regardless of row count. The xlsx zip container can only be finalized once every
+    row is written, so the first bytes flow after the DB cursor is exhausted; use the
+    CSV export when an immediate download start matters.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="trades")
+    header_font = Font(bold=True)
+    header: list[WriteOnlyCell] = []
+    for key in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=key)
+        cell.font = header_font
+        header.append(cell)
+    ws.append(header)
+
+    for chunk in _iter_export_chunks(filters):
+        for item in chunk:
+            ws.append([item.get(key) for key in EXPORT_HEADERS])
+
+    with tempfile.TemporaryFile(suffix=".xlsx") as handle:
+        wb.save(handle)
+        handle.seek(0)
+        while True:
+            block = handle.read(_FILE_READ_BYTES)
+            if not block:
+                return
+            yield block
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be drained between writes."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def _stream_parquet(filters: dict[str, object]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("opened_ts_utc", pa.string()),
+            ("closed_ts_utc", pa.string()),
+            ("pair", pa.string()),
+            ("side", pa.string()),
+            ("units", pa.float64()),
+            ("entry_price", pa.float64()),
+            ("exit_price", pa.float64()),
+            ("result", pa.string()),
+            ("mode", pa.string()),
+            ("command_id", pa.int64()),
+        ]
+    )
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in _iter_export_chunks(filters):
+            columns = {key: [item.get(key) for item in chunk] for key in EXPORT_HEADERS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _filters(
+    *,
+    pair: str | None,
+    from_ts: str | None,
+    to_ts: str | None,
+    side: str | None,
+    mode: str | None,
+    command_id: int | None,
+    limit: int | None,
+) -> dict[str, object]:
+    return {
+        "pair": pair,
+        "from_ts": from_ts,
+        "to_ts": to_ts,
+        "side": side,
+        "mode": mode,
+        "command_id": command_id,
+        "limit": limit,
+    }
+
 
 @router.get("/trades.xlsx")
 def export_trades_xlsx(
@@ -22,37 +163,55 @@ def export_trades_xlsx(
     side: str | None = None,
     mode: str | None = None,
     command_id: int | None = None,
-    limit: int = Query(default=500, ge=1, le=500),
-    conn: sqlite3.Connection = Depends(get_db),
+    limit: int | None = Query(default=None, ge=1),
     _=Depends(require_viewer),
 ) -> StreamingResponse:
-    items, _ = _query_trades(
-        conn,
-        pair=pair,
-        from_ts=from_ts,
-        to_ts=to_ts,
-        side=side,
-        mode=mode,
-        command_id=command_id,
-        limit=limit,
-        cursor=None,
+    filters = _filters(pair=pair, from_ts=from_ts, to_ts=to_ts, side=side, mode=mode, command_id=command_id, limit=limit)
+    return StreamingResponse(
+        _stream_xlsx(filters),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="trades.xlsx"'},
     )
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "trades"
-    headers = ["id", "opened_ts_utc", "closed_ts_utc", "pair", "side", "units", "entry_price", "exit_price", "result", "mode", "command_id"]
-    ws.append(headers)
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-    for item in items:
-        ws.append([item.get(key) for key in headers])
-
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+
+@router.get("/trades.csv")
+def export_trades_csv(
+    pair: str | None = None,
+    from_ts: str | None = None,
+    to_ts: str | None = None,
+    side: str | None = None,
+    mode: str | None = None,
+    command_id: int | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    _=Depends(require_viewer),
+) -> StreamingResponse:
+    filters = _filters(pair=pair, from_ts=from_ts, to_ts=to_ts, side=side, mode=mode, command_id=command_id, limit=limit)
     return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": 'attachment; filename="trades.xlsx"'},
+        _stream_csv(filters),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="trades.csv"'},
+    )
+
+
+@router.get("/trades.parquet")
+def export_trades_parquet(
+    pair: str | None = None,
+    from_ts: str | None = None,
+    to_ts: str | None = None,
+    side: str | None = None,
+    mode: str | None = None,
+    command_id: int | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    _=Depends(require_viewer),
+) -> StreamingResponse:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow") from exc
+
+    filters = _filters(pair=pair, from_ts=from_ts, to_ts=to_ts, side=side, mode=mode, command_id=command_id, limit=limit)
+    return StreamingResponse(
+        _stream_parquet(filters),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": 'attachment; filename="trades.parquet"'},
     )
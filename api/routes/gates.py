@@ -5,7 +5,7 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, Query
 
-from api.deps import get_db, require_viewer
+from api.deps import get_read_db, require_viewer
 
 router = APIRouter(tags=["gates"])
 
@@ -14,7 +14,7 @@ router = APIRouter(tags=["gates"])
 def list_gates(
     pair: str | None = None,
     limit: int = Query(default=50, ge=1, le=500),
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     _=Depends(require_viewer),
 ) -> list[dict[str, object]]:
     params: list[object]
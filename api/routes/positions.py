@@ -4,7 +4,7 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, Query
 
-from api.deps import get_db, require_viewer
+from api.deps import get_read_db, require_viewer
 
 router = APIRouter(tags=["positions"])
 
@@ -13,7 +13,7 @@ router = APIRouter(tags=["positions"])
 def list_positions(
     status: str = Query(default="OPEN"),
     pair: str | None = None,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     _=Depends(require_viewer),
 ) -> list[dict[str, object]]:
     normalized = status.upper()
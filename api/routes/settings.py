@@ -7,14 +7,14 @@ from typing import Any
 from fastapi import APIRouter, Depends
 
 from api.auth import AuthenticatedUser
-from api.deps import get_db, require_admin
+from api.deps import get_read_db, get_write_db, require_admin
 from storage.db import utc_now_iso
 
 router = APIRouter(tags=["settings"])
 
 
 @router.get("/settings")
-def get_settings(conn: sqlite3.Connection = Depends(get_db), user: AuthenticatedUser = Depends(require_admin)) -> dict[str, object]:
+def get_settings(conn: sqlite3.Connection = Depends(get_read_db), user: AuthenticatedUser = Depends(require_admin)) -> dict[str, object]:
     rows = conn.execute("SELECT key, value_json FROM app_settings ORDER BY key").fetchall()
     return {row[0]: json.loads(row[1]) for row in rows}
 
@@ -22,7 +22,7 @@ def get_settings(conn: sqlite3.Connection = Depends(get_db), user: Authenticated
 @router.put("/settings")
 def put_settings(
     payload: dict[str, Any],
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_write_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, object]:
     for key, value in payload.items():
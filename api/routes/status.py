@@ -5,7 +5,7 @@ import sqlite3
 
 from fastapi import APIRouter, Depends
 
-from api.deps import get_db, require_viewer
+from api.deps import get_read_db, require_viewer
 from config.settings import LIVE_TRADING_ENABLED
 from execution.runtime_ops import is_heartbeat_stale, stale_threshold_seconds
 
@@ -13,7 +13,7 @@ router = APIRouter(tags=["status"])
 
 
 @router.get("/status")
-def get_status(conn: sqlite3.Connection = Depends(get_db), _=Depends(require_viewer)) -> dict[str, object]:
+def get_status(conn: sqlite3.Connection = Depends(get_read_db), _=Depends(require_viewer)) -> dict[str, object]:
     heartbeat = conn.execute(
         "SELECT mode, last_cycle_ts_utc, meta_json FROM bot_status ORDER BY id DESC LIMIT 1"
     ).fetchone()
@@ -55,7 +55,7 @@ def get_status(conn: sqlite3.Connection = Depends(get_db), _=Depends(require_vie
 
 
 @router.get("/bot/status")
-def get_bot_status(conn: sqlite3.Connection = Depends(get_db), _=Depends(require_viewer)) -> dict[str, object]:
+def get_bot_status(conn: sqlite3.Connection = Depends(get_read_db), _=Depends(require_viewer)) -> dict[str, object]:
     runtime = conn.execute(
         "SELECT last_heartbeat_at, last_restart_at, startup_time_utc, version FROM bot_runtime WHERE id=1"
     ).fetchone()
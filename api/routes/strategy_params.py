@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from api.auth import AuthenticatedUser
-from api.deps import get_db, require_admin
+from api.deps import get_read_db, get_write_db, require_admin
 from api.strategy_params_validation import validate_params, validate_strategy_and_profile
 from storage.commands import enqueue_command
 from storage.strategy_params import PROFILES, list_strategy_params, set_active_profile, upsert_profile_params
@@ -26,7 +26,7 @@ class StrategyProfileSwitchRequest(BaseModel):
 @router.get("/strategy-params/{strategy_name}")
 def get_strategy_params(
     strategy_name: str,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, Any]:
     try:
@@ -40,7 +40,7 @@ def put_strategy_params(
     strategy_name: str,
     profile: str,
     payload: StrategyParamsUpdateRequest,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_write_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, Any]:
     errors = validate_strategy_and_profile(strategy_name, profile)
@@ -69,7 +69,7 @@ def put_strategy_params(
 def post_strategy_params_active_profile(
     strategy_name: str,
     payload: StrategyProfileSwitchRequest,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_write_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, Any]:
     errors = validate_strategy_and_profile(strategy_name, payload.profile)
@@ -91,7 +91,7 @@ def post_strategy_params_active_profile(
 
 @router.post("/strategy-params/reload")
 def post_strategy_params_reload(
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_write_db),
     user: AuthenticatedUser = Depends(require_admin),
 ) -> dict[str, Any]:
     command_id = enqueue_command(conn, actor=user.username, type="RELOAD_PARAMS")
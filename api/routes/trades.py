@@ -2,16 +2,31 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from collections.abc import Iterator
 
 from fastapi import APIRouter, Depends, Query
 
-from api.deps import get_db, require_viewer
+from api.deps import get_read_db, require_viewer
 
 router = APIRouter(tags=["trades"])
 
-
-def _query_trades(
-    conn: sqlite3.Connection,
+TRADE_COLUMNS = [
+    "id",
+    "opened_ts_utc",
+    "closed_ts_utc",
+    "pair",
+    "side",
+    "units",
+    "entry_price",
+    "exit_price",
+    "result",
+    "mode",
+    "position_id",
+    "command_id",
+]
+
+
+def _trades_where(
     *,
     pair: str | None,
     from_ts: str | None,
@@ -19,9 +34,8 @@ def _query_trades(
     side: str | None,
     mode: str | None,
     command_id: int | None,
-    limit: int,
     cursor: int | None,
-) -> tuple[list[dict[str, object]], int | None]:
+) -> tuple[str, list[object]]:
     where: list[str] = []
     params: list[object] = []
 
@@ -29,27 +43,26 @@ def _query_trades(
         where.append("pair = ?")
         params.append(pair)
 
-    # Your schema uses ts_utc as the trade timestamp
+    # TradeStore schema: time_open_utc is the trade timestamp
     if from_ts:
-        where.append("ts_utc >= ?")
+        where.append("time_open_utc >= ?")
         params.append(from_ts)
     if to_ts:
-        where.append("ts_utc <= ?")
+        where.append("time_open_utc <= ?")
         params.append(to_ts)
 
-    # Your schema uses side (not direction)
+    # TradeStore schema uses direction (not side)
     if side:
-        where.append("side = ?")
+        where.append("direction = ?")
         params.append(side.upper())
 
-    # Your schema has a dedicated mode column
+    # mode/command_id live in meta_json
     if mode:
-        where.append("mode = ?")
+        where.append("UPPER(COALESCE(json_extract(meta_json, '$.mode'), 'PAPER')) = ?")
         params.append(mode.upper())
 
-    # Your schema has a dedicated command_id column
     if command_id is not None:
-        where.append("command_id = ?")
+        where.append("json_extract(meta_json, '$.command_id') = ?")
         params.append(command_id)
 
     if cursor is not None:
@@ -57,55 +70,148 @@ def _query_trades(
         params.append(cursor)
 
     where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+    return where_clause, params
+
+
+def _trade_row_to_item(row: sqlite3.Row | tuple) -> dict[str, object]:
+    meta = json.loads(row[9]) if row[9] else {}
+    command_id = meta.get("command_id")
+    return {
+        "id": int(row[0]),
+        "opened_ts_utc": row[1],
+        "closed_ts_utc": row[2],
+        "pair": row[3],
+        "side": row[4],
+        "units": float(row[5]) if row[5] is not None else None,
+        "entry_price": float(row[6]) if row[6] is not None else None,
+        "exit_price": float(row[7]) if row[7] is not None else None,
+        "result": row[8],
+        "mode": str(meta.get("mode") or "PAPER").upper(),
+        "position_id": None,  # this schema doesn't link trades to position rows
+        "command_id": int(command_id) if command_id is not None else None,
+    }
+
+
+def _execute_trades_query(
+    conn: sqlite3.Connection,
+    *,
+    pair: str | None,
+    from_ts: str | None,
+    to_ts: str | None,
+    side: str | None,
+    mode: str | None,
+    command_id: int | None,
+    limit: int | None,
+    cursor: int | None,
+) -> sqlite3.Cursor:
+    where_clause, params = _trades_where(
+        pair=pair,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        side=side,
+        mode=mode,
+        command_id=command_id,
+        cursor=cursor,
+    )
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ?"
+        params.append(limit)
 
-    rows = conn.execute(
+    return conn.execute(
         f"""
         SELECT
             id,
-            ts_utc,
+            time_open_utc,
+            time_close_utc,
             pair,
-            side,
+            direction,
             units,
-            price,
-            mode,
-            position_id,
-            command_id,
+            entry_price,
+            exit_price,
+            result,
             meta_json
         FROM trades
         {where_clause}
         ORDER BY id DESC
-        LIMIT ?
+        {limit_clause}
         """,
-        tuple([*params, limit]),
-    ).fetchall()
+        tuple(params),
+    )
 
-    items: list[dict[str, object]] = []
-    next_cursor: int | None = None
 
-    for row in rows:
-        meta = json.loads(row[9]) if row[9] else {}
-        items.append(
-            {
-                "id": int(row[0]),
-                "opened_ts_utc": row[1],  # keep API stable; maps to ts_utc
-                "closed_ts_utc": None,  # this schema doesn't store close time
-                "pair": row[2],
-                "side": row[3],
-                "units": float(row[4]) if row[4] is not None else None,
-                "entry_price": float(row[5]) if row[5] is not None else None,  # maps to price
-                "exit_price": None,
-                "result": None,
-                "mode": (row[6] or meta.get("mode") or "PAPER"),
-                "position_id": int(row[7]) if row[7] is not None else None,
-                "command_id": int(row[8]) if row[8] is not None else meta.get("command_id"),
-            }
-        )
+def _query_trades(
+    conn: sqlite3.Connection,
+    *,
+    pair: str | None,
+    from_ts: str | None,
+    to_ts: str | None,
+    side: str | None,
+    mode: str | None,
+    command_id: int | None,
+    limit: int,
+    cursor: int | None,
+) -> tuple[list[dict[str, object]], int | None]:
+    rows = _execute_trades_query(
+        conn,
+        pair=pair,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        side=side,
+        mode=mode,
+        command_id=command_id,
+        limit=limit,
+        cursor=cursor,
+    ).fetchall()
 
+    items = [_trade_row_to_item(row) for row in rows]
+    next_cursor: int | None = None
     if items:
         next_cursor = int(items[-1]["id"])
     return items, next_cursor
 
 
+def iter_trade_chunks(
+    conn: sqlite3.Connection,
+    *,
+    pair: str | None,
+    from_ts: str | None,
+    to_ts: str | None,
+    side: str | None,
+    mode: str | None,
+    command_id: int | None,
+    limit: int | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[list[dict[str, object]]]:
+    """Yield trade items in chunks straight off one DB cursor.
+
+    Only `chunk_size` rows are materialized at a time, so callers can stream
+    arbitrarily large result sets with flat memory.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    cur = _execute_trades_query(
+        conn,
+        pair=pair,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        side=side,
+        mode=mode,
+        command_id=command_id,
+        limit=limit,
+        cursor=None,
+    )
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [_trade_row_to_item(row) for row in rows]
+    finally:
+        cur.close()
+
+
 @router.get("/trades")
 def list_trades(
     pair: str | None = None,
@@ -116,7 +222,7 @@ def list_trades(
     command_id: int | None = None,
     limit: int = Query(default=100, ge=1, le=500),
     cursor: int | None = None,
-    conn: sqlite3.Connection = Depends(get_db),
+    conn: sqlite3.Connection = Depends(get_read_db),
     _=Depends(require_viewer),
 ) -> dict[str, object]:
     items, next_cursor = _query_trades(
@@ -3,28 +3,28 @@
 from __future__ import annotations
 
 import random
-from typing import Literal
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Literal
 
+import numpy as np
 import pandas as pd
 
+from backtest.cache import BacktestCache, cache_key, code_digest, frame_digest
+from backtest.trade_log import TradeLog, write_trade_log
+from config.instruments import get_registry
+from data.fetcher import has_bid_ask, quote_side
+from data.intrabar import IntrabarResolver
+from data.ohlcv_store import OhlcvArrays
 from execution.risk_manager import calculate_sl_tp
-from indicators.adx import calculate_adx
-from indicators.atr import calculate_atr
-from indicators.bollinger import calculate_bollinger
-from indicators.ema import calculate_ema
-from indicators.rsi import calculate_rsi
-from indicators.vwap import calculate_vwap
-
-TRADE_COSTS: dict[str, dict[str, float]] = {
-    "EUR_USD": {"spread": 0.3, "max_slip": 0.5},
-    "GBP_USD": {"spread": 0.8, "max_slip": 1.0},
-    "USD_JPY": {"spread": 0.5, "max_slip": 0.7},
-}
+from indicators.plan import FULL_PLAN, FeaturePlan, resolve_plan
+
 
 
 def pip_size(pair: str) -> float:
     """Return instrument pip size."""
-    return 0.01 if pair.endswith("JPY") else 0.0001
+    return get_registry().spec(pair).pip_size
 
 
 def simulate_trade(
@@ -35,39 +35,69 @@ def simulate_trade(
     tp: float,
     pair: str,
     rng: random.Random | None = None,
+    intrabar: IntrabarResolver | None = None,
 ) -> tuple[str, float, float]:
-    """Simulate an SL/TP trade on future bars with spread/slippage costs."""
+    """Simulate an SL/TP trade on future bars with spread/slippage costs.
+
+    A bar reaching both SL and TP counts as a loss unless `intrabar` (the pair's
+    lower-timeframe bars, see `data.intrabar`) shows TP was touched first.
+
+    With bid/ask candles (`data.fetcher.BID_ASK_COLUMNS`) `raw_entry` is the quote the order
+    fills at, so no synthetic spread is added, and SL/TP are checked on the quote the
+    position closes at (bid for BUY, ask for SELL).
+    """
+    result, pnl_pips, entry, _, _ = _simulate_exit(future_df, direction, raw_entry, sl, tp, pair, rng, intrabar)
+    return result, pnl_pips, entry
+
+
+def _simulate_exit(
+    future_df: pd.DataFrame,
+    direction: Literal["BUY", "SELL"],
+    raw_entry: float,
+    sl: float,
+    tp: float,
+    pair: str,
+    rng: random.Random | None = None,
+    intrabar: IntrabarResolver | None = None,
+) -> tuple[str, float, float, int, str]:
+    """`simulate_trade` plus the exit bar's position in `future_df` and the exit reason."""
     if direction not in {"BUY", "SELL"}:
         raise ValueError("direction must be BUY or SELL")
     if future_df.empty:
         raise ValueError("future_df must not be empty")
 
-    cfg = TRADE_COSTS.get(pair, {"spread": 0.5, "max_slip": 1.0})
-    pip = pip_size(pair)
+    spec = get_registry().spec(pair)
+    pip = spec.pip_size
     rand = rng if rng is not None else random.Random()
 
-    slip = rand.uniform(0, cfg["max_slip"]) * pip
-    spread = (cfg["spread"] * pip) / 2.0
+    slip = rand.uniform(0, spec.max_slip_pips) * pip
+    quoted = has_bid_ask(future_df)
+    spread = 0.0 if quoted else (spec.spread_cost_pips * pip) / 2.0
+    side = quote_side(direction, closing=True) if quoted else ""
+    high = future_df[f"{side}high"].to_numpy(dtype=np.float64)
+    low = future_df[f"{side}low"].to_numpy(dtype=np.float64)
 
     if direction == "BUY":
         entry = raw_entry + spread + slip
-        for _, row in future_df.iterrows():
-            if float(row["low"]) <= sl:
-                return "LOSS", (sl - entry) / pip, entry
-            if float(row["high"]) >= tp:
-                return "WIN", (tp - entry) / pip, entry
-        last_close = float(future_df.iloc[-1]["close"])
-        return "TIMEOUT", (last_close - entry) / pip, entry
+        sl_hit, tp_hit = low <= sl, high >= tp
+        sign = 1.0
+    else:
+        entry = raw_entry - spread - slip
+        sl_hit, tp_hit = high >= sl, low <= tp
+        sign = -1.0
 
-    entry = raw_entry - spread - slip
-    for _, row in future_df.iterrows():
-        if float(row["high"]) >= sl:
-            return "LOSS", (entry - sl) / pip, entry
-        if float(row["low"]) <= tp:
-            return "WIN", (entry - tp) / pip, entry
+    hit = sl_hit | tp_hit
+    if hit.any():
+        first = int(hit.argmax())
+        if sl_hit[first] and tp_hit[first] and intrabar is not None:
+            if intrabar.tp_first(future_df["time"].iloc[first], sign, sl, tp)[0]:
+                return "WIN", sign * (tp - entry) / pip, entry, first, "TP"
+        if sl_hit[first]:
+            return "LOSS", sign * (sl - entry) / pip, entry, first, "SL"
+        return "WIN", sign * (tp - entry) / pip, entry, first, "TP"
 
-    last_close = float(future_df.iloc[-1]["close"])
-    return "TIMEOUT", (entry - last_close) / pip, entry
+    last_close = float(future_df[f"{side}close"].iloc[-1])
+    return "TIMEOUT", sign * (last_close - entry) / pip, entry, len(future_df) - 1, "TIMEOUT"
 
 
 def walk_forward_split(df: pd.DataFrame, train_pct: float = 0.7) -> tuple[pd.DataFrame, pd.DataFrame]:
@@ -79,75 +109,204 @@ def walk_forward_split(df: pd.DataFrame, train_pct: float = 0.7) -> tuple[pd.Dat
     return df.iloc[:split_idx].copy(), df.iloc[split_idx:].copy()
 
 
+_EMPTY_METRICS: dict[str, float] = {
+    "total_trades": 0,
+    "win_rate": 0.0,
+    "profit_factor": 0.0,
+    "gross_win_pips": 0.0,
+    "gross_loss_pips": 0.0,
+    "max_drawdown": 0.0,
+    "sharpe": 0.0,
+    "avg_pips_per_trade": 0.0,
+}
+
+
 def compute_metrics(trades_df: pd.DataFrame) -> dict[str, float]:
     """Compute backtest performance metrics in pips."""
     if trades_df.empty:
-        return {
-            "total_trades": 0,
-            "win_rate": 0.0,
-            "profit_factor": 0.0,
-            "gross_win_pips": 0.0,
-            "gross_loss_pips": 0.0,
-            "max_drawdown": 0.0,
-            "sharpe": 0.0,
-            "avg_pips_per_trade": 0.0,
-        }
+        return dict(_EMPTY_METRICS)
 
-    pnl = trades_df["pnl_pips"].astype(float)
-    wins = pnl[pnl > 0]
-    losses = pnl[pnl < 0]
+    pnl = trades_df["pnl_pips"].to_numpy(dtype=np.float64)
+    gross_win = float(pnl[pnl > 0].sum())
+    gross_loss = float((-pnl[pnl < 0]).sum())
+    equity_curve = np.cumsum(pnl)
+    drawdowns = np.maximum.accumulate(equity_curve) - equity_curve
 
-    gross_win = float(wins.sum())
-    gross_loss = float(losses.abs().sum())
-    equity_curve = pnl.cumsum()
-    peaks = equity_curve.cummax()
-    drawdowns = peaks - equity_curve
-
-    mean = float(pnl.mean())
-    std = float(pnl.std(ddof=0))
+    mean = float(pnl.sum() / len(pnl))
+    std = float(np.sqrt(((pnl - mean) * (pnl - mean)).sum() / len(pnl)))
 
     return {
-        "total_trades": int(len(trades_df)),
-        "win_rate": float((pnl > 0).mean()),
+        "total_trades": int(len(pnl)),
+        "win_rate": float(np.count_nonzero(pnl > 0) / len(pnl)),
         "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else float("inf"),
         "gross_win_pips": gross_win,
         "gross_loss_pips": gross_loss,
-        "max_drawdown": float(drawdowns.max()) if not drawdowns.empty else 0.0,
+        "max_drawdown": float(drawdowns.max()),
         "sharpe": float(mean / std) if std > 0 else 0.0,
         "avg_pips_per_trade": mean,
     }
 
 
-def _prepare_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(out["time"]):
-        out["time"] = pd.to_datetime(out["time"], utc=True)
-    out = calculate_atr(out)
-    out = calculate_adx(out)
-    out = calculate_ema(out)
-    out = calculate_vwap(out)
-    out = calculate_rsi(out)
-    out = calculate_bollinger(out)
-    return out
+def pack_pnl(sets: Iterable[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate pnl arrays (or trade frames with `pnl_pips`) into values and offsets.
+
+    Set k's values are `values[offsets[k]:offsets[k + 1]]`.
+    """
+    arrays = [
+        np.asarray(item.get("pnl_pips", []) if isinstance(item, pd.DataFrame) else item, dtype=np.float64).ravel()
+        for item in sets
+    ]
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(a) for a in arrays], out=offsets[1:])
+    values = np.concatenate(arrays) if arrays else np.empty(0)
+    return values, offsets
+
+
+def _by_length(offsets: np.ndarray) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """(set positions, gather index matrix) for each distinct non-zero set length."""
+    lengths = np.diff(offsets)
+    for length in np.unique(lengths[lengths > 0]):
+        rows = np.flatnonzero(lengths == length)
+        yield rows, offsets[rows][:, None] + np.arange(length)
+
+
+def _segment_sums(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # Row sums of an equal-length matrix take NumPy's pairwise path exactly like a 1-D sum,
+    # so each set sums bit-identically to `np.sum` of that set alone.
+    sums = np.zeros(len(offsets) - 1)
+    for rows, index in _by_length(offsets):
+        sums[rows] = values[index].sum(axis=1)
+    return sums
+
+
+def compute_metrics_batch(values: np.ndarray, offsets: np.ndarray) -> dict[str, np.ndarray]:
+    """`compute_metrics` for many trade sets at once, packed as values plus offsets (`pack_pnl`).
+
+    Returns one array per metric, indexed by set; each entry is exactly what `compute_metrics`
+    returns for that set alone. Sets are reduced together per distinct length.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    sets = len(lengths)
+    filled = lengths > 0
+
+    def counts(mask: np.ndarray) -> np.ndarray:
+        running = np.concatenate([[0], np.cumsum(mask, dtype=np.int64)])
+        return running[offsets[1:]] - running[offsets[:-1]]
+
+    win, loss = values > 0, values < 0
+    win_count, loss_count = counts(win), counts(loss)
+    gross_win = _segment_sums(values[win], np.concatenate([[0], np.cumsum(win_count)]))
+    gross_loss = _segment_sums(-values[loss], np.concatenate([[0], np.cumsum(loss_count)]))
+
+    safe_lengths = np.maximum(lengths, 1)
+    mean = _segment_sums(values, offsets) / safe_lengths
+    deviation = values - np.repeat(mean, lengths)
+    std = np.sqrt(_segment_sums(deviation * deviation, offsets) / safe_lengths)
+
+    drawdown = np.zeros(sets)
+    for rows, index in _by_length(offsets):
+        curve = np.cumsum(values[index], axis=1)
+        drawdown[rows] = (np.maximum.accumulate(curve, axis=1) - curve).max(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_factor = np.where(gross_loss > 0, gross_win / gross_loss, np.where(filled, np.inf, 0.0))
+        sharpe = np.where(std > 0, mean / std, 0.0)
+    return {
+        "total_trades": lengths,
+        "win_rate": win_count / safe_lengths,
+        "profit_factor": profit_factor,
+        "gross_win_pips": gross_win,
+        "gross_loss_pips": gross_loss,
+        "max_drawdown": drawdown,
+        "sharpe": sharpe,
+        "avg_pips_per_trade": mean,
+    }
 
 
-def _run_segment(
+def metrics_rows(batch: dict[str, np.ndarray]) -> list[dict[str, float]]:
+    """Split `compute_metrics_batch` output into one `compute_metrics`-style dict per set."""
+    return [
+        {name: int(values[k]) if name == "total_trades" else float(values[k]) for name, values in batch.items()}
+        for k in range(len(batch["total_trades"]))
+    ]
+
+
+def _prepare_indicators(
+    df: pd.DataFrame, state: dict[str, dict] | None = None, plan: FeaturePlan | None = None
+) -> pd.DataFrame:
+    """Indicator columns for `df`: those of `plan` (default: every indicator).
+
+    With `state` (updated in place), consecutive chunks of one series produce exactly the
+    columns of a single pass; chunks must start at a UTC day boundary, where VWAP resets.
+    """
+    return (plan or FULL_PLAN).apply(df, state)
+
+
+def _strategy_plan(strategy_module, params: dict[str, float] | None = None) -> FeaturePlan | None:
+    """The strategy's declared features (`indicators.plan`); None when it declares none."""
+    if not hasattr(strategy_module, "required_features"):
+        return None
+    return resolve_plan(strategy_module, params=params)
+
+
+def _indicator_modules() -> list:
+    # Every loaded indicators.* module, so shared helpers (e.g. Wilder smoothing) are hashed too.
+    return [sys.modules[name] for name in sorted(sys.modules) if name.startswith("indicators.")]
+
+
+def _cached_indicators(
+    df: pd.DataFrame, cache: BacktestCache, data_digest: str, plan: FeaturePlan | None = None
+) -> pd.DataFrame:
+    """`_prepare_indicators` through the cache, keyed by the bars, the plan and the indicator code."""
+    key = cache_key(
+        kind="indicators",
+        data=data_digest,
+        code=code_digest(sys.modules[__name__], *_indicator_modules()),
+        features=None if plan is None else [[f.name, dict(f.params)] for f in plan.features],
+    )
+    prepared = cache.get_frame(key)
+    if prepared is None:
+        prepared = _prepare_indicators(df) if plan is None else _prepare_indicators(df, plan=plan)
+        cache.put_frame(key, prepared)
+    return prepared
+
+
+def _scan_segment(
     df: pd.DataFrame,
     pair: str,
     strategy_module,
-    warmup: int,
+    start: int,
     lookahead: int,
     mode: Literal["sl_tp", "time_exit"],
     hold_bars: int,
     rng: random.Random,
-) -> pd.DataFrame:
-    trades: list[dict[str, float | str | int]] = []
-    i = warmup
+    params: dict[str, float] | None = None,
+    intrabar: IntrabarResolver | None = None,
+    *,
+    stop: int | None = None,
+    context: int | None = None,
+) -> tuple[TradeLog, int]:
+    """Trades for signals at bars `start` <= i < `stop` (default: the end of `df`).
+
+    Returns the trade log (bar indices into `df`) and the next bar to scan. With `context`,
+    strategies see at most that many trailing bars.
+    """
+    i = start
     n = len(df)
-
-    while i < n - 1:
-        window = df.iloc[: i + 1]
-        signal = strategy_module.generate_signal_from_df(window)
+    stop = n - 1 if stop is None else stop
+    horizon = lookahead if mode == "sl_tp" else hold_bars + 1
+    trades = TradeLog(max(stop - start, 0) // max(horizon, 1) + 1)
+    spec = get_registry().spec(pair)
+    quoted = has_bid_ask(df)
+
+    while i < stop:
+        window = df.iloc[: i + 1] if context is None else df.iloc[max(0, i + 1 - context) : i + 1]
+        if params is None:
+            signal = strategy_module.generate_signal_from_df(window)
+        else:
+            signal = strategy_module.generate_signal_from_df(window, params=params)
         if signal not in {"BUY", "SELL"}:
             i += 1
             continue
@@ -159,32 +318,55 @@ def _run_segment(
             if atr_val <= 0:
                 i += 1
                 continue
-            entry = float(df.iloc[i]["close"])
+            # With bid/ask candles the order fills at the bar's ask (BUY) / bid (SELL) close.
+            entry = float(df.iloc[i][f"{quote_side(signal)}close" if quoted else "close"])
             sl, tp = calculate_sl_tp(entry, signal, atr_val)
             future = df.iloc[i + 1 : i + 1 + lookahead]
-            result, pnl_pips, eff_entry = simulate_trade(future, signal, entry, sl, tp, pair, rng=rng)
-            trades.append({"idx": i, "direction": signal, "result": result, "pnl_pips": pnl_pips, "entry": eff_entry})
+            result, pnl_pips, eff_entry, exit_at, reason = _simulate_exit(
+                future, signal, entry, sl, tp, pair, rng=rng, intrabar=intrabar
+            )
+            slip_pips = abs(eff_entry - entry) / spec.pip_size - (0.0 if quoted else spec.spread_cost_pips / 2.0)
+            trades.append(i, i, i + 1 + exit_at, signal, result, reason, pnl_pips, eff_entry, max(slip_pips, 0.0))
             i += lookahead
             continue
 
         exit_idx = i + 1 + hold_bars
         if exit_idx >= n:
             break
-        pip = pip_size(pair)
-        entry = float(df.iloc[i + 1]["open"])
-        exit_price = float(df.iloc[exit_idx]["close"])
+        pip = spec.pip_size
+        entry = float(df.iloc[i + 1][f"{quote_side(signal)}open" if quoted else "open"])
+        exit_price = float(df.iloc[exit_idx][f"{quote_side(signal, closing=True)}close" if quoted else "close"])
         pnl_pips = (exit_price - entry) / pip if signal == "BUY" else (entry - exit_price) / pip
         result = "WIN" if pnl_pips > 0 else "LOSS" if pnl_pips < 0 else "TIMEOUT"
-        trades.append({"idx": i, "direction": signal, "result": result, "pnl_pips": pnl_pips, "entry": entry})
+        trades.append(i, i + 1, exit_idx, signal, result, "TIME_EXIT", pnl_pips, entry, 0.0)
         i = exit_idx
 
-    return pd.DataFrame(trades)
+    return trades, i
 
 
-def backtest_strategy(
+def _run_segment(
     df: pd.DataFrame,
     pair: str,
     strategy_module,
+    warmup: int,
+    lookahead: int,
+    mode: Literal["sl_tp", "time_exit"],
+    hold_bars: int,
+    rng: random.Random,
+    params: dict[str, float] | None = None,
+    intrabar: IntrabarResolver | None = None,
+    context: int | None = None,
+) -> pd.DataFrame:
+    trades, _ = _scan_segment(
+        df, pair, strategy_module, warmup, lookahead, mode, hold_bars, rng, params, intrabar, context=context
+    )
+    return trades.to_frame(df, pair)
+
+
+def backtest_strategy(
+    df: pd.DataFrame | OhlcvArrays,
+    pair: str,
+    strategy_module,
     warmup: int = 60,
     lookahead: int = 50,
     train_pct: float = 0.7,
@@ -192,26 +374,113 @@ def backtest_strategy(
     mode: Literal["sl_tp", "time_exit"] = "sl_tp",
     hold_bars: int = 5,
     min_trades: int = 30,  # ✅ NEW
+    return_trades: bool = False,
+    params: dict[str, float] | None = None,
+    cache: BacktestCache | None = None,
+    intrabar: IntrabarResolver | None = None,
+    trade_log: str | Path | None = None,
+    run_id: str | None = None,
 ) -> dict[str, object]:
-    """Run walk-forward backtest and return train/validation metrics."""
+    """Run walk-forward backtest and return train/validation metrics.
+
+    `df` may be an OHLCV DataFrame or memory-mapped `OhlcvArrays` (see `data.ohlcv_store`).
+    `OhlcvArrays` are materialized into a DataFrame in full (and indicator preparation copies
+    it again), so the mapping only saves the load; for histories that should not sit in
+    memory at once, use `backtest.stream.backtest_strategy_stream`, which pages them in by chunk.
+    With `return_trades` the per-trade frames are included as `train_trades` and
+    `validation_trades` (e.g. for `backtest.monte_carlo`).
+
+    With a `cache`, prepared indicators and metrics are looked up by a hash of the bars,
+    engine/indicator/strategy source, effective params, instrument spec and run settings;
+    results with `return_trades` are computed fresh (only the indicators come from cache).
+
+    `intrabar` resolves bars that reach both SL and TP from lower-timeframe data
+    (`data.intrabar.IntrabarResolver`); without it such bars count as losses.
+
+    With `trade_log` (a root directory) both segments' trades are stored as one columnar run
+    (`backtest.trade_log.write_trade_log`) under `run_id` (default: pair, strategy, mode and
+    UTC time); its path is returned as `trade_log`. Such runs skip the result cache.
+    """
     if mode not in {"sl_tp", "time_exit"}:
         raise ValueError("mode must be 'sl_tp' or 'time_exit'")
-
-    prepared = _prepare_indicators(df)
+    if isinstance(df, OhlcvArrays):
+        df = df.to_frame()
+
+    # Only the indicators the strategy declares, and strategies see just the rows they read.
+    plan = _strategy_plan(strategy_module, params)
+    context = None if plan is None else plan.rows
+    result_key = None
+    if cache is None:
+        prepared = _prepare_indicators(df) if plan is None else _prepare_indicators(df, plan=plan)
+    else:
+        data_digest = frame_digest(df)
+        if not return_trades and trade_log is None:
+            effective = params
+            if effective is None and hasattr(strategy_module, "get_effective_params"):
+                effective = strategy_module.get_effective_params()
+            result_key = cache_key(
+                kind="backtest",
+                data=data_digest,
+                code=code_digest(sys.modules[__name__], sys.modules[calculate_sl_tp.__module__], *_indicator_modules()),
+                strategy=code_digest(strategy_module),
+                params=effective,
+                instrument=asdict(get_registry().spec(pair)),
+                pair=pair,
+                warmup=warmup,
+                lookahead=lookahead,
+                train_pct=train_pct,
+                seed=seed,
+                mode=mode,
+                hold_bars=hold_bars,
+                min_trades=min_trades,
+                intrabar=intrabar.digest() if intrabar is not None else None,
+            )
+            cached = cache.get_result(result_key)
+            if cached is not None:
+                return cached
+        prepared = _cached_indicators(df, cache, data_digest, plan)
     train_df, validation_df = walk_forward_split(prepared, train_pct=train_pct)
 
     rng_train = random.Random(seed)
     rng_val = random.Random(seed + 1)
 
     train_trades = _run_segment(
-        train_df, pair, strategy_module, warmup, lookahead, mode, hold_bars, rng_train
+        train_df, pair, strategy_module, warmup, lookahead, mode, hold_bars, rng_train, params, intrabar, context
     )
     validation_trades = _run_segment(
-        validation_df, pair, strategy_module, warmup, lookahead, mode, hold_bars, rng_val
+        validation_df, pair, strategy_module, warmup, lookahead, mode, hold_bars, rng_val, params, intrabar, context
     )
 
-    train_metrics = compute_metrics(train_trades)
-    validation_metrics = compute_metrics(validation_trades)
+    result = _split_report(compute_metrics(train_trades), compute_metrics(validation_trades), min_trades)
+    if return_trades:
+        result["train_trades"] = train_trades
+        result["validation_trades"] = validation_trades
+    if trade_log is not None:
+        strategy = getattr(strategy_module, "__name__", str(strategy_module)).rsplit(".", 1)[-1]
+        run_id = run_id or f"{pair}_{strategy}_{mode}_{pd.Timestamp.now(tz='UTC'):%Y%m%dT%H%M%S%f}"
+        meta = {
+            "pair": pair,
+            "strategy": strategy,
+            "mode": mode,
+            "warmup": warmup,
+            "lookahead": lookahead,
+            "hold_bars": hold_bars,
+            "train_pct": train_pct,
+            "seed": seed,
+            "params": params,
+            "first_bar": prepared["time"].iloc[0] if len(prepared) else None,
+            "last_bar": prepared["time"].iloc[-1] if len(prepared) else None,
+            "metrics": {"train": result["train"], "validation": result["validation"]},
+        }
+        path = write_trade_log({"train": train_trades, "validation": validation_trades}, run_id, root=trade_log, meta=meta)
+        result["trade_log"] = str(path)
+    if result_key is not None:
+        cache.put_result(result_key, result)
+    return result
+
+
+def _split_report(train_metrics: dict[str, float], validation_metrics: dict[str, float], min_trades: int) -> dict[str, object]:
+    """Train/validation metrics with the win-rate gap and overfit verdict."""
     gap = abs(float(train_metrics["win_rate"]) - float(validation_metrics["win_rate"]))
 
     train_n = int(train_metrics.get("total_trades", 0))
@@ -0,0 +1,158 @@
+"""Content-addressed on-disk cache for prepared indicator frames and backtest results.
+
+Entries are addressed by a hash of everything that determines them: the bar data, the
+source of the code that computes them (engine, indicators, strategy module), parameters
+and run settings. Changing any input yields a new key, so entries never need
+invalidation; old ones age out by LRU once the cache exceeds its size budget::
+
+    <root>/frames/<key[:2]>/<key>.pkl    prepared indicator frames
+    <root>/results/<key[:2]>/<key>.json  backtest metrics
+
+Hits touch the file's mtime, which is the LRU clock used by eviction.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from config.settings import BACKTEST_CACHE_DIR, BACKTEST_CACHE_MAX_MB
+
+_KINDS = {"frames": ".pkl", "results": ".json"}
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Hash of a frame's column names, dtypes and values (time hashed as int64 ns)."""
+    h = hashlib.blake2b(digest_size=20)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = pd.DatetimeIndex(series).as_unit("ns").asi8
+        else:
+            values = series.to_numpy()
+        if values.dtype == object:
+            values = np.asarray(values.astype(str), dtype="U")
+        h.update(f"{column}:{values.dtype.str}:{len(values)};".encode())
+        h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+
+def code_digest(*modules: ModuleType) -> str:
+    """Hash of the modules' source files (plus any declared `__version__`)."""
+    h = hashlib.blake2b(digest_size=20)
+    for module in modules:
+        h.update(getattr(module, "__name__", type(module).__qualname__).encode())
+        h.update(str(getattr(module, "__version__", "")).encode())
+        path = getattr(module, "__file__", None)
+        if path:
+            h.update(Path(path).read_bytes())
+    return h.hexdigest()
+
+
+def cache_key(**parts: Any) -> str:
+    """Stable hash of JSON-serializable key parts (order-independent)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class BacktestCache:
+    """Size-bounded LRU store of prepared frames and result dicts."""
+
+    def __init__(self, root: str | Path = BACKTEST_CACHE_DIR, max_bytes: int = BACKTEST_CACHE_MAX_MB * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.root / kind / key[:2] / f"{key}{_KINDS[kind]}"
+
+    def _hit(self, path: Path) -> bool:
+        if not path.exists():
+            self.misses += 1
+            return False
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # evicted by a concurrent writer
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def _write(self, path: Path, write) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.evict()
+
+    def get_frame(self, key: str) -> pd.DataFrame | None:
+        path = self._path("frames", key)
+        if not self._hit(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except (OSError, EOFError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put_frame(self, key: str, df: pd.DataFrame) -> None:
+        self._write(self._path("frames", key), lambda tmp: df.to_pickle(tmp))
+
+    def get_result(self, key: str) -> dict[str, Any] | None:
+        path = self._path("results", key)
+        if not self._hit(path):
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put_result(self, key: str, result: dict[str, Any]) -> None:
+        payload = json.dumps(result, sort_keys=True)
+        self._write(self._path("results", key), lambda tmp: Path(tmp).write_text(payload, encoding="utf-8"))
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for kind, suffix in _KINDS.items():
+            for path in (self.root / kind).glob(f"*/*{suffix}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits `max_bytes`; return how many."""
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,278 @@
+"""Successive-halving and Hyperband search over strategy parameters.
+
+A full grid over `vwap_rsi`'s four parameters or `bb_breakout`'s three is expensive. Instead,
+many random configurations are scored on short windows and only the best survive to longer
+ones:
+
+    rung 0: n configs       on the last  bars / eta**K bars
+    rung 1: n / eta configs on the last  bars / eta**(K-1) bars
+    ...
+    rung K: the survivors   on the full history
+
+Every evaluation is one `backtest_strategy` call (70/30 split inside the window), scored on
+the validation segment's `metric`. Configurations with fewer validation trades than the
+window's share of `min_trades` score -inf. A rung's configurations run in a process pool;
+each worker receives the bars once, through the pool initializer.
+
+`hyperband` runs several successive-halving brackets, from many configs on tiny windows to a
+few configs on the full history. `save_profile` writes the winner as a named strategy
+params profile (`storage.strategy_params.upsert_profile_params`).
+"""
+
+from __future__ import annotations
+
+import importlib
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Literal
+
+import pandas as pd
+
+from backtest.backtest import backtest_strategy
+from data.ohlcv_store import OhlcvArrays
+
+OPTIMIZED_PROFILE = "optimized"
+
+# (low, high, integer) per parameter; narrower than the API's accepted ranges.
+SEARCH_SPACES: dict[str, dict[str, tuple[float, float, bool]]] = {
+    "ema_vwap": {
+        "vwap_atr_tolerance": (0.0, 0.6, False),
+    },
+    "vwap_rsi": {
+        "rsi_buy_max": (10.0, 40.0, False),
+        "rsi_sell_min": (60.0, 90.0, False),
+        "vwap_atr_tolerance": (0.0, 0.5, False),
+        "rsi_period": (2.0, 14.0, True),
+    },
+    "bb_breakout": {
+        "volume_spike_mult": (0.8, 2.0, False),
+        "squeeze_percentile": (10.0, 60.0, False),
+        "squeeze_expand_mult": (0.95, 1.2, False),
+    },
+}
+
+_BARS: pd.DataFrame | None = None
+
+
+def strategy_name(strategy_module) -> str:
+    return strategy_module.__name__.rsplit(".", 1)[-1]
+
+
+def sample_configs(strategy: str, count: int, rng: random.Random) -> list[dict[str, float]]:
+    """`count` configurations drawn uniformly from `SEARCH_SPACES[strategy]`."""
+    space = SEARCH_SPACES.get(strategy)
+    if space is None:
+        raise ValueError(f"no search space for strategy '{strategy}'")
+    configs = []
+    for _ in range(count):
+        config = {}
+        for name, (low, high, integer) in space.items():
+            value = rng.uniform(low, high)
+            config[name] = float(round(value)) if integer else round(value, 4)
+        configs.append(config)
+    return configs
+
+
+def _init_worker(bars: pd.DataFrame) -> None:
+    global _BARS
+    _BARS = bars
+
+
+def _evaluate(job: tuple[Any, ...]) -> dict[str, Any]:
+    lo, hi, pair, module_name, params, settings = job
+    module = importlib.import_module(module_name)
+    result = backtest_strategy(_BARS.iloc[lo:hi].reset_index(drop=True), pair, module, params=params, **settings)
+    return {"train": result["train"], "validation": result["validation"]}
+
+
+def _score(metrics: dict[str, float], metric: str, required_trades: int) -> float:
+    if int(metrics["total_trades"]) < required_trades:
+        return float("-inf")
+    value = float(metrics[metric])
+    return -value if metric == "max_drawdown" else value
+
+
+def _run_jobs(jobs: list[tuple[Any, ...]], bars: pd.DataFrame, workers: int | None) -> list[dict[str, Any]]:
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(bars)
+        return [_evaluate(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bars,)) as pool:
+        return list(pool.map(_evaluate, jobs))
+
+
+def successive_halving(
+    df: pd.DataFrame | OhlcvArrays,
+    pair: str,
+    strategy_module,
+    *,
+    configs: list[dict[str, float]] | None = None,
+    n_configs: int = 27,
+    eta: int = 3,
+    min_bars: int = 2_000,
+    metric: str = "sharpe",
+    min_trades: int = 30,
+    mode: Literal["sl_tp", "time_exit"] = "sl_tp",
+    lookahead: int = 50,
+    hold_bars: int = 5,
+    seed: int = 123,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Keep the best 1/`eta` of the configurations per rung while the window grows by `eta`.
+
+    The number of rungs is the smaller of log_eta(n_configs) + 1 and the number of times the
+    history can be divided by `eta` without the shortest window dropping below `min_bars`.
+    `strategy_module` must be importable by name in worker processes.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    bars = df.to_frame() if isinstance(df, OhlcvArrays) else df.reset_index(drop=True)
+    configs = configs or sample_configs(strategy_name(strategy_module), n_configs, random.Random(seed))
+    rungs = 1 + min(
+        int(math.floor(math.log(len(configs), eta) + 1e-9)) if len(configs) > 1 else 0,
+        max(int(math.floor(math.log(max(len(bars), 1) / max(min_bars, 1), eta) + 1e-9)), 0),
+    )
+    return _halving(bars, pair, strategy_module, configs, rungs, eta, metric, min_trades, mode, lookahead, hold_bars, seed, workers)
+
+
+def _halving(
+    bars: pd.DataFrame,
+    pair: str,
+    strategy_module,
+    configs: list[dict[str, float]],
+    rungs: int,
+    eta: int,
+    metric: str,
+    min_trades: int,
+    mode: str,
+    lookahead: int,
+    hold_bars: int,
+    seed: int,
+    workers: int | None,
+) -> dict[str, Any]:
+    n = len(bars)
+    settings = {"mode": mode, "lookahead": lookahead, "hold_bars": hold_bars, "seed": seed, "min_trades": min_trades}
+    survivors = list(range(len(configs)))
+    history: list[dict[str, Any]] = []
+    evaluations = bar_evaluations = 0
+    scored: list[tuple[float, int, dict[str, Any]]] = []
+
+    for rung in range(rungs):
+        window = n if rung == rungs - 1 else max(n // eta ** (rungs - 1 - rung), 1)
+        required = max(1, math.ceil(min_trades * window / n))
+        jobs = [(n - window, n, pair, strategy_module.__name__, configs[c], settings) for c in survivors]
+        outcomes = _run_jobs(jobs, bars, workers)
+        evaluations += len(jobs)
+        bar_evaluations += len(jobs) * window
+
+        scored = [
+            (_score(outcome["validation"], metric, required), c, outcome) for c, outcome in zip(survivors, outcomes)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        keep = len(scored) if rung == rungs - 1 else max(1, len(scored) // eta)
+        history.append(
+            {
+                "rung": rung,
+                "bars": window,
+                "required_trades": required,
+                "results": [
+                    {"config": c, "params": configs[c], "score": score, "validation": outcome["validation"]}
+                    for score, c, outcome in scored
+                ],
+                "promoted": [c for _, c, _ in scored[:keep]],
+            }
+        )
+        survivors = [c for _, c, _ in scored[:keep]]
+
+    best_score, best_config, best_outcome = scored[0]
+    return {
+        "best": {
+            "params": configs[best_config],
+            "score": best_score,
+            "train": best_outcome["train"],
+            "validation": best_outcome["validation"],
+        },
+        "metric": metric,
+        "rungs": history,
+        "evaluations": evaluations,
+        "bar_evaluations": bar_evaluations,
+    }
+
+
+def hyperband(
+    df: pd.DataFrame | OhlcvArrays,
+    pair: str,
+    strategy_module,
+    *,
+    eta: int = 3,
+    min_bars: int = 2_000,
+    metric: str = "sharpe",
+    min_trades: int = 30,
+    mode: Literal["sl_tp", "time_exit"] = "sl_tp",
+    lookahead: int = 50,
+    hold_bars: int = 5,
+    seed: int = 123,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Hyperband: successive-halving brackets trading configuration count against window length.
+
+    Bracket s starts ceil((s_max + 1) / (s + 1) * eta**s) fresh configurations on windows of
+    history / eta**s bars; every bracket ends on the full history, so winners compare directly.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    bars = df.to_frame() if isinstance(df, OhlcvArrays) else df.reset_index(drop=True)
+    s_max = max(int(math.floor(math.log(max(len(bars), 1) / max(min_bars, 1), eta) + 1e-9)), 0)
+    rng = random.Random(seed)
+    name = strategy_name(strategy_module)
+
+    brackets = []
+    for s in range(s_max, -1, -1):
+        count = int(math.ceil((s_max + 1) / (s + 1) * eta**s))
+        configs = sample_configs(name, count, rng)
+        result = _halving(bars, pair, strategy_module, configs, s + 1, eta, metric, min_trades, mode, lookahead, hold_bars, seed, workers)
+        brackets.append({"bracket": s, "configs": count, **result})
+
+    winner = max(brackets, key=lambda bracket: bracket["best"]["score"])
+    return {
+        "best": winner["best"],
+        "metric": metric,
+        "brackets": brackets,
+        "evaluations": sum(bracket["evaluations"] for bracket in brackets),
+        "bar_evaluations": sum(bracket["bar_evaluations"] for bracket in brackets),
+    }
+
+
+def save_profile(
+    strategy: str,
+    params: dict[str, float],
+    *,
+    profile: str = OPTIMIZED_PROFILE,
+    db_path: str | Path | None = None,
+    activate: bool = False,
+    updated_by: str = "optimizer",
+) -> None:
+    """Write `params` as `profile` of `strategy`; with `activate`, also switch the bot to it.
+
+    Raises ValueError when the strategy, profile name or params fail the dashboard API's validation.
+    """
+    from api.strategy_params_validation import validate_params, validate_strategy_and_profile
+    from storage.commands import enqueue_command
+    from storage.db import connect, init_db
+    from storage.strategy_params import set_active_profile, upsert_profile_params
+
+    errors = validate_strategy_and_profile(strategy, profile) or validate_params(strategy, params)
+    if errors:
+        raise ValueError(f"invalid params for {strategy}: {errors}")
+    conn = connect(Path(db_path) if db_path is not None else None)
+    try:
+        init_db(conn)
+        upsert_profile_params(
+            conn, strategy_name=strategy, profile=profile, params={k: float(v) for k, v in params.items()}, updated_by=updated_by
+        )
+        if activate:
+            set_active_profile(conn, strategy_name=strategy, profile=profile, updated_by=updated_by)
+            enqueue_command(conn, actor=updated_by, type="RELOAD_PARAMS")
+    finally:
+        conn.close()
@@ -0,0 +1,336 @@
+"""Multi-pair portfolio backtest with shared equity and the live risk limits.
+
+Each pair's indicators and per-bar signals are computed up front (in parallel processes),
+then all pairs are replayed on one merged time axis against a single account:
+
+- at most `MAX_OPEN_POSITIONS_TOTAL` open positions, one per pair (as `can_open_new_position`);
+- no new entries for the rest of the UTC day once equity is `MAX_DAILY_LOSS` below the day's
+  start (as `is_within_daily_limit`);
+- units sized from the realized balance with `RISK_PER_TRADE` (as `calculate_position_size`,
+  including its no-currency-conversion simplification: a stop-out loses the risk amount).
+
+Entries, SL/TP levels, spread and slippage follow the single-pair `sl_tp` mode, including its
+use of the historical per-bar spread when the bars are bid/ask candles.
+"""
+
+from __future__ import annotations
+
+import importlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest import _prepare_indicators, _strategy_plan
+from config.instruments import get_registry
+from data.fetcher import has_bid_ask, quote_side
+from data.ohlcv_store import OhlcvArrays
+from execution.risk_manager import MAX_DAILY_LOSS, MAX_OPEN_POSITIONS_TOTAL, RISK_PER_TRADE, calculate_sl_tp
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+@dataclass
+class PairFeatures:
+    """Per-bar arrays for one pair; `signal` is +1 BUY, -1 SELL, 0 HOLD at each bar close."""
+
+    pair: str
+    time: np.ndarray  # int64 ns, ascending
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray
+    signal: np.ndarray
+    quotes: dict[str, np.ndarray] = field(default_factory=dict)  # bid_/ask_ high, low, close for bid/ask bars
+
+
+def _strategy_module(name: str):
+    return importlib.import_module(name if "." in name else f"strategies.{name}")
+
+
+def pair_signals(
+    prepared: pd.DataFrame,
+    strategy_name: str,
+    warmup: int = 60,
+    params: dict[str, float] | None = None,
+) -> np.ndarray:
+    """Per-bar signal codes (+1 BUY, -1 SELL, 0 HOLD) for an indicator-prepared frame.
+
+    Uses the strategy's vectorized `generate_signals` when it has one; otherwise calls
+    `generate_signal_from_df` bar by bar on at most the strategy's `LOOKBACK` trailing rows.
+    """
+    module = _strategy_module(strategy_name)
+    if hasattr(module, "generate_signals"):
+        return module.generate_signals(prepared, params=params, warmup=warmup)
+    n = len(prepared)
+    context = getattr(module, "LOOKBACK", n)
+    signal = np.zeros(n, dtype=np.int8)
+    for i in range(warmup, n):
+        decision = module.generate_signal_from_df(prepared.iloc[max(0, i + 1 - context) : i + 1], params=params)
+        signal[i] = 1 if decision == "BUY" else -1 if decision == "SELL" else 0
+    return signal
+
+
+def compute_pair_features(
+    pair: str,
+    strategy_name: str,
+    df: pd.DataFrame,
+    warmup: int = 60,
+    params: dict[str, float] | None = None,
+) -> PairFeatures:
+    """Indicators plus the strategy's signal at every bar (evaluated on the history up to it)."""
+    prepared = _prepare_indicators(df, plan=_strategy_plan(_strategy_module(strategy_name), params))
+    signal = pair_signals(prepared, strategy_name, warmup, params)
+    quotes = {}
+    if has_bid_ask(prepared):
+        quotes = {
+            f"{side}{name}": prepared[f"{side}{name}"].to_numpy(dtype=np.float64)
+            for side in ("bid_", "ask_")
+            for name in ("high", "low", "close")
+        }
+    return PairFeatures(
+        pair=pair,
+        time=pd.DatetimeIndex(prepared["time"]).as_unit("ns").asi8,
+        high=prepared["high"].to_numpy(dtype=np.float64),
+        low=prepared["low"].to_numpy(dtype=np.float64),
+        close=prepared["close"].to_numpy(dtype=np.float64),
+        atr=prepared["atr"].to_numpy(dtype=np.float64),
+        signal=signal,
+        quotes=quotes,
+    )
+
+
+def _features_job(args: tuple[Any, ...]) -> PairFeatures:
+    return compute_pair_features(*args)
+
+
+@dataclass
+class _Position:
+    pair: str
+    direction: int
+    entry: float
+    sl: float
+    tp: float
+    units: int
+    entry_time: int
+    bars_held: int = 0
+
+
+@dataclass
+class PortfolioResult:
+    trades: pd.DataFrame
+    equity: pd.DataFrame
+    metrics: dict[str, float]
+    skipped: dict[str, int] = field(default_factory=dict)
+
+
+def position_units(balance: float, entry: float, sl: float, risk_per_trade: float = RISK_PER_TRADE) -> int:
+    """Units risking `risk_per_trade` of `balance` between entry and SL (minimum 1)."""
+    distance = abs(entry - sl)
+    if balance <= 0 or distance == 0:
+        return 1
+    return max(int(balance * risk_per_trade / distance), 1)
+
+
+def simulate_portfolio(
+    features: list[PairFeatures],
+    *,
+    initial_equity: float = 10_000.0,
+    lookahead: int = 50,
+    max_open_positions: int = MAX_OPEN_POSITIONS_TOTAL,
+    risk_per_trade: float = RISK_PER_TRADE,
+    max_daily_loss: float = MAX_DAILY_LOSS,
+    seed: int = 123,
+) -> PortfolioResult:
+    """Replay precomputed pair features on one time axis against a shared account."""
+    registry = get_registry()
+    rng = random.Random(seed)
+    axis = np.unique(np.concatenate([f.time for f in features])) if features else np.array([], dtype=np.int64)
+    # Row of each pair at every axis step (-1 where the pair has no bar).
+    rows = []
+    for f in features:
+        row = np.full(len(axis), -1, dtype=np.int64)
+        row[np.searchsorted(axis, f.time)] = np.arange(len(f.time))
+        rows.append(row)
+
+    balance = initial_equity
+    day = None
+    day_start_equity = initial_equity
+    halted = False
+    open_positions: dict[str, _Position] = {}
+    last_close: dict[str, float] = {}
+    trades: list[dict[str, Any]] = []
+    curve_equity = np.empty(len(axis), dtype=np.float64)
+    curve_balance = np.empty(len(axis), dtype=np.float64)
+    curve_open = np.empty(len(axis), dtype=np.int64)
+    curve_halted = np.zeros(len(axis), dtype=bool)
+    skipped = {"position_limit": 0, "daily_halt": 0, "pair_open": 0}
+    halted_days = 0
+
+    def _close(pos: _Position, price: float, when: int, result: str) -> None:
+        nonlocal balance
+        pnl = pos.direction * (price - pos.entry) * pos.units
+        balance += pnl
+        trades.append(
+            {
+                "pair": pos.pair,
+                "direction": "BUY" if pos.direction > 0 else "SELL",
+                "entry_time": pos.entry_time,
+                "exit_time": when,
+                "entry": pos.entry,
+                "exit": price,
+                "units": pos.units,
+                "result": result,
+                "pnl": pnl,
+                "balance": balance,
+            }
+        )
+        del open_positions[pos.pair]
+
+    def _equity() -> float:
+        return balance + sum(p.direction * (last_close[p.pair] - p.entry) * p.units for p in open_positions.values())
+
+    for step, now in enumerate(axis):
+        today = int(now) // _NS_PER_DAY
+        if today != day:
+            day = today
+            day_start_equity = _equity()
+            halted = False
+
+        # 1) Exits for open positions that have a bar now (SL checked first, like simulate_trade).
+        for k, f in enumerate(features):
+            i = rows[k][step]
+            if i < 0:
+                continue
+            last_close[f.pair] = float(f.close[i])
+            pos = open_positions.get(f.pair)
+            if pos is None or pos.entry_time == int(now):
+                continue
+            pos.bars_held += 1
+            side = quote_side("BUY" if pos.direction > 0 else "SELL", closing=True) if f.quotes else ""
+            high = float(f.quotes[f"{side}high"][i] if side else f.high[i])
+            low = float(f.quotes[f"{side}low"][i] if side else f.low[i])
+            if pos.direction > 0:
+                if low <= pos.sl:
+                    _close(pos, pos.sl, int(now), "LOSS")
+                elif high >= pos.tp:
+                    _close(pos, pos.tp, int(now), "WIN")
+            else:
+                if high >= pos.sl:
+                    _close(pos, pos.sl, int(now), "LOSS")
+                elif low <= pos.tp:
+                    _close(pos, pos.tp, int(now), "WIN")
+            if f.pair in open_positions and pos.bars_held >= lookahead:
+                _close(pos, float(f.quotes[f"{side}close"][i] if side else f.close[i]), int(now), "TIMEOUT")
+
+        # 2) Daily loss halt on marked-to-market equity.
+        equity = _equity()
+        if not halted and day_start_equity > 0 and (day_start_equity - equity) / day_start_equity >= max_daily_loss:
+            halted = True
+            halted_days += 1
+
+        # 3) Entries at this bar's close, in pair order.
+        for k, f in enumerate(features):
+            i = rows[k][step]
+            if i < 0 or f.signal[i] == 0:
+                continue
+            if f.pair in open_positions:
+                skipped["pair_open"] += 1
+                continue
+            if halted:
+                skipped["daily_halt"] += 1
+                continue
+            if len(open_positions) >= max_open_positions:
+                skipped["position_limit"] += 1
+                continue
+            atr = float(f.atr[i])
+            if not atr > 0:
+                continue
+            spec = registry.spec(f.pair)
+            direction = int(f.signal[i])
+            signal = "BUY" if direction > 0 else "SELL"
+            raw_entry = float(f.quotes[f"{quote_side(signal)}close"][i] if f.quotes else f.close[i])
+            sl, tp = calculate_sl_tp(raw_entry, signal, atr)
+            spread = 0.0 if f.quotes else (spec.spread_cost_pips * spec.pip_size) / 2.0
+            cost = spread + rng.uniform(0, spec.max_slip_pips) * spec.pip_size
+            entry = raw_entry + direction * cost
+            units = position_units(balance, entry, sl, risk_per_trade)
+            open_positions[f.pair] = _Position(f.pair, direction, entry, sl, tp, units, int(now))
+
+        curve_equity[step] = _equity()
+        curve_balance[step] = balance
+        curve_open[step] = len(open_positions)
+        curve_halted[step] = halted
+
+    times = pd.DatetimeIndex(axis.view("datetime64[ns]")).tz_localize("UTC")
+    equity_df = pd.DataFrame(
+        {"time": times, "equity": curve_equity, "balance": curve_balance, "open_positions": curve_open, "halted": curve_halted}
+    )
+    trades_df = pd.DataFrame(
+        trades, columns=["pair", "direction", "entry_time", "exit_time", "entry", "exit", "units", "result", "pnl", "balance"]
+    )
+    for column in ("entry_time", "exit_time"):
+        trades_df[column] = pd.to_datetime(trades_df[column].astype("int64"), utc=True)
+    return PortfolioResult(trades_df, equity_df, _portfolio_metrics(trades_df, equity_df, initial_equity, halted_days), skipped)
+
+
+def _portfolio_metrics(trades: pd.DataFrame, equity: pd.DataFrame, initial_equity: float, halted_days: int) -> dict[str, float]:
+    curve = equity["equity"] if not equity.empty else pd.Series([initial_equity])
+    peaks = curve.cummax()
+    drawdown = ((peaks - curve) / peaks).max() if not curve.empty else 0.0
+    pnl = trades["pnl"].astype(float) if not trades.empty else pd.Series(dtype=float)
+    gross_win = float(pnl[pnl > 0].sum())
+    gross_loss = float(-pnl[pnl < 0].sum())
+    return {
+        "total_trades": int(len(trades)),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else (float("inf") if gross_win > 0 else 0.0),
+        "final_equity": float(curve.iloc[-1]),
+        "return_pct": float(curve.iloc[-1] / initial_equity - 1.0),
+        "max_drawdown_pct": float(drawdown),
+        "halted_days": int(halted_days),
+        "max_concurrent_positions": int(equity["open_positions"].max()) if not equity.empty else 0,
+    }
+
+
+def active_params(strategy_names: set[str]) -> dict[str, dict[str, float]]:
+    """Active strategy-params profile for each strategy, resolved once for a whole run."""
+    from storage.db import get_db_path
+    from storage.strategy_params import get_strategy_params_service
+
+    service = get_strategy_params_service(get_db_path())
+    return {name: dict(service.get(name).params) for name in strategy_names}
+
+
+def backtest_portfolio(
+    data: dict[str, pd.DataFrame | OhlcvArrays],
+    strategy_map: dict[str, str] | None = None,
+    *,
+    warmup: int = 60,
+    workers: int | None = None,
+    params: dict[str, dict[str, float]] | None = None,
+    **simulate_kwargs: Any,
+) -> PortfolioResult:
+    """Compute every pair's features (in parallel when `workers` != 1) and simulate the portfolio.
+
+    `strategy_map` defaults to the registry's; `params` maps strategy name -> parameters and
+    defaults to the active strategy-params profile, resolved once here rather than per bar.
+    """
+    strategy_map = strategy_map or get_registry().strategy_map()
+    if params is None:
+        params = active_params({strategy_map[p] for p in data})
+
+    jobs = []
+    for pair, bars in data.items():
+        frame = bars.to_frame() if isinstance(bars, OhlcvArrays) else bars
+        jobs.append((pair, strategy_map[pair], frame, warmup, params.get(strategy_map[pair])))
+
+    if workers == 1 or len(jobs) <= 1:
+        features = [_features_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            features = list(pool.map(_features_job, jobs))
+    return simulate_portfolio(features, **simulate_kwargs)
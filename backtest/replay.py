@@ -0,0 +1,304 @@
+"""Event-driven replay of historical bars through the paper execution path.
+
+Where `backtest.backtest` prices trades with `simulate_trade`, the replay drives the real
+`PaperBroker`, the shared entry gates (`execution.gates.evaluate_gates`) and the daily loss
+halt against an `InMemoryTradeStore`, so research results can be checked for parity with
+paper execution on long histories.
+
+Only the strategy's declared indicators are prepared, and signals are precomputed per bar
+(`backtest.portfolio.pair_signals`, vectorized for the bundled strategies); the replay only visits
+events, in the order `paper_run` processes a bar (entry at the close, then SL/TP update):
+
+- an entry event at every bar with a BUY/SELL signal;
+- for each opened position, an exit event at the first bar whose range reaches SL or TP,
+  found with a vectorized forward scan. Every bar before it would leave the position
+  untouched in `update_positions_from_bar`, so skipping them changes nothing.
+
+Quotes are the bar's bid/ask close when the frames carry bid/ask candles (so the spread gate
+sees the historical spread and exits are checked on the closing quote), otherwise they are
+synthesized from the close and the instrument's `spread_cost_pips`. Once realized losses
+reach `max_daily_loss` of the day's starting balance, all positions are closed at the last
+quote (`DAILY_LOSS_HALT`) and entries stay blocked until the next UTC day.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest import _prepare_indicators, _strategy_plan, compute_metrics
+from backtest.portfolio import _strategy_module, active_params, pair_signals, position_units
+from config.instruments import get_registry
+from data.fetcher import has_bid_ask, quote_side
+from data.intrabar import IntrabarResolver
+from data.ohlcv_store import OhlcvArrays
+from execution.alerts import AlertService
+from execution.gates import evaluate_gates
+from execution.paper_broker import PaperBroker
+from execution.risk_manager import MAX_DAILY_LOSS, calculate_sl_tp
+from execution.trade_store import InMemoryTradeStore
+from filters.market_state import market_states
+from filters.spread_filter import calculate_spread_pips
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+_ENTRY, _EXIT = 0, 1
+
+
+@dataclass
+class ReplayResult:
+    trades: pd.DataFrame
+    signals: pd.DataFrame
+    daily: pd.DataFrame
+    metrics: dict[str, float]
+
+
+def first_touch(high: np.ndarray, low: np.ndarray, start: int, direction: int, sl: float, tp: float, chunk: int = 64) -> int:
+    """Index of the first bar >= `start` whose range reaches SL or TP, or -1 if none does.
+
+    Scans forward in doubling chunks, so short trades cost one small slice and long ones
+    O(log n) NumPy calls.
+    """
+    n = len(high)
+    lo = start
+    while lo < n:
+        hi = min(n, lo + chunk)
+        if direction > 0:
+            hit = (low[lo:hi] <= sl) | (high[lo:hi] >= tp)
+        else:
+            hit = (high[lo:hi] >= sl) | (low[lo:hi] <= tp)
+        if hit.any():
+            return lo + int(hit.argmax())
+        lo = hi
+        chunk *= 2
+    return -1
+
+
+def _quote_columns(frame: pd.DataFrame, spec) -> dict[str, np.ndarray]:
+    """Bid/ask high/low/close arrays: the frame's own quotes, or built from mid bars.
+
+    For mid bars only the entry quotes (`bid_close`/`ask_close`) carry half the spread cost.
+    """
+    names = ("high", "low", "close")
+    if has_bid_ask(frame):
+        return {f"{side}{name}": frame[f"{side}{name}"].to_numpy(dtype=np.float64) for side in ("bid_", "ask_") for name in names}
+    half = spec.spread_cost_pips * spec.pip_size / 2.0
+    mid = {name: frame[name].to_numpy(dtype=np.float64) for name in names}
+    # Mid bars keep exits on the mid range and halt closes at the mid close; only entries pay the spread.
+    out = {f"{side}{name}": mid[name] for side in ("bid_", "ask_") for name in ("high", "low")}
+    out.update({"bid_close": mid["close"] - half, "ask_close": mid["close"] + half, "close": mid["close"]})
+    return out
+
+
+def _iso(ns: int) -> str:
+    return pd.Timestamp(int(ns), tz="UTC").isoformat()
+
+
+def replay(
+    frames: dict[str, pd.DataFrame],
+    signals: dict[str, np.ndarray],
+    strategy_map: dict[str, str] | None = None,
+    *,
+    initial_balance: float = 10_000.0,
+    max_daily_loss: float = MAX_DAILY_LOSS,
+    news_events: list[dict[str, Any]] | None = None,
+    store: InMemoryTradeStore | None = None,
+    intrabar: dict[str, IntrabarResolver] | None = None,
+) -> ReplayResult:
+    """Replay indicator-prepared `frames` and their per-bar `signals` through `PaperBroker`.
+
+    `news_events` is the calendar the news gate checks (default: none, so the gate is open).
+    `intrabar` holds per-pair lower-timeframe data that decides exit bars reaching both SL
+    and TP (see `data.intrabar`); without it the stop wins.
+    """
+    started = time.perf_counter()
+    registry = get_registry()
+    strategy_map = strategy_map or registry.strategy_map()
+    store = store if store is not None else InMemoryTradeStore()
+    broker = PaperBroker(store, alert_service=AlertService([], environment="replay"), intrabar=intrabar)
+    events = list(news_events or [])
+
+    pairs = list(frames)
+    times = [pd.DatetimeIndex(frames[p]["time"]).as_unit("ns").asi8 for p in pairs]
+    quotes = [_quote_columns(frames[p], registry.spec(p)) for p in pairs]
+    atrs = [frames[p]["atr"].to_numpy(dtype=np.float64) for p in pairs]
+    # Market state of every bar in one vectorized pass; the enemy gate then only looks it up.
+    states = [market_states(frames[p]) for p in pairs]
+
+    heap: list[tuple[int, int, int, int, int]] = []
+    for k, pair in enumerate(pairs):
+        for i in np.flatnonzero(signals[pair]):
+            heap.append((int(times[k][i]), k, _ENTRY, int(i), 0))
+    heapq.heapify(heap)
+
+    tokens: dict[str, int] = {}
+    counter = itertools.count(1)
+    balance = float(initial_balance)
+    day = None
+    date_utc = ""
+    start_balance = balance
+    realized = 0.0
+    halted = False
+    halted_days = 0
+
+    def _book(closed: list[dict[str, Any]]) -> bool:
+        nonlocal balance, realized
+        pnl = sum(float(trade["pnl_quote"]) for trade in closed)
+        balance += pnl
+        realized += pnl
+        drawdown = (start_balance - balance) / start_balance if start_balance > 0 else 0.0
+        store.upsert_daily_stats(date_utc, start_balance, balance, realized, halted or drawdown >= max_daily_loss)
+        return drawdown >= max_daily_loss
+
+    def _last_closes(now: int) -> dict[str, float]:
+        # Each open position exits at its closing quote (bid for BUY, ask for SELL).
+        prices = {}
+        for position in store.list_open_positions():
+            pair = str(position["pair"])
+            k = pairs.index(pair)
+            i = int(np.searchsorted(times[k], now, side="right")) - 1
+            if i >= 0:
+                side = quote_side(str(position["direction"]), closing=True) if "close" not in quotes[k] else ""
+                prices[pair] = float(quotes[k][f"{side}close"][i])
+        return prices
+
+    while heap:
+        now, k, phase, i, token = heapq.heappop(heap)
+        if now // _NS_PER_DAY != day:
+            day = now // _NS_PER_DAY
+            date_utc = pd.Timestamp(day * _NS_PER_DAY, tz="UTC").date().isoformat()
+            start_balance, realized, halted = balance, 0.0, False
+            store.upsert_daily_stats(date_utc, balance, balance, 0.0, False)
+        pair = pairs[k]
+
+        if phase == _EXIT:
+            if tokens.get(pair) != token:
+                continue  # closed meanwhile by a halt
+            del tokens[pair]
+            bar = {column: float(values[i]) for column, values in quotes[k].items() if column.endswith(("high", "low"))}
+            bar["time"] = now
+            closed = broker.update_positions_from_bar(pair, bar, time_utc=_iso(now))
+            if closed and _book(closed) and not halted:
+                halted = True
+                halted_days += 1
+                tokens.clear()
+                _book(broker.close_all_positions(_last_closes(now), reason="DAILY_LOSS_HALT", time_utc=_iso(now)))
+            continue
+
+        atr = float(atrs[k][i])
+        if not atr > 0:
+            continue
+        strategy = strategy_map[pair]
+        direction = "BUY" if signals[pair][i] > 0 else "SELL"
+        bid, ask = float(quotes[k]["bid_close"][i]), float(quotes[k]["ask_close"][i])
+        stamp = pd.Timestamp(now, tz="UTC")
+        state = states[k][i]
+        gates = evaluate_gates(
+            pair,
+            strategy,
+            frames[pair].iloc[: i + 1] if state is None else frames[pair],
+            bid,
+            ask,
+            broker,
+            halted,
+            now_utc=stamp.to_pydatetime(),
+            news_events=events,
+            market_state=state,
+        )
+        decision = "EXECUTE" if all(gates.values()) else "BLOCK"
+        store.insert_signal(
+            time_utc=stamp.isoformat(),
+            pair=pair,
+            strategy=strategy,
+            signal=direction,
+            decision=decision,
+            meta_json={"spread_pips": calculate_spread_pips(pair, bid, ask)},
+            **gates,
+        )
+        if decision != "EXECUTE":
+            continue
+
+        entry = ask if direction == "BUY" else bid
+        sl, tp = calculate_sl_tp(entry, direction, atr)
+        broker.place_market_order(
+            pair=pair,
+            strategy=strategy,
+            direction=direction,
+            units=position_units(balance, entry, sl),
+            bid=bid,
+            ask=ask,
+            sl_price=sl,
+            tp_price=tp,
+            meta_json={"source": "replay"},
+            time_utc=stamp.isoformat(),
+        )
+        tokens[pair] = token = next(counter)
+        side = quote_side(direction, closing=True)
+        sign = 1 if direction == "BUY" else -1
+        exit_bar = first_touch(quotes[k][f"{side}high"], quotes[k][f"{side}low"], i, sign, sl, tp)
+        if exit_bar >= 0:
+            heapq.heappush(heap, (int(times[k][exit_bar]), k, _EXIT, exit_bar, token))
+
+    # Positions never reaching SL/TP are closed at their pair's last bar.
+    last = max((int(t[-1]) for t in times if len(t)), default=0)
+    if tokens:
+        _book(broker.close_all_positions(_last_closes(last), reason="END_OF_DATA", time_utc=_iso(last)))
+
+    trades = pd.DataFrame(store.trades)
+    signals_df = pd.DataFrame(store.signals)
+    daily = pd.DataFrame(store.list_daily_stats())
+    bars = int(sum(len(t) for t in times))
+    elapsed = time.perf_counter() - started
+    metrics: dict[str, float] = dict(compute_metrics(trades))
+    metrics.update(
+        {
+            "final_balance": balance,
+            "return_pct": balance / initial_balance - 1.0 if initial_balance else 0.0,
+            "halted_days": halted_days,
+            "signals": int(len(signals_df)),
+            "bars": bars,
+            "elapsed_s": elapsed,
+            "bars_per_second": bars / elapsed if elapsed > 0 else float("inf"),
+        }
+    )
+    return ReplayResult(trades, signals_df, daily, metrics)
+
+
+def _signals_job(args: tuple[Any, ...]) -> np.ndarray:
+    return pair_signals(*args)
+
+
+def replay_backtest(
+    data: dict[str, pd.DataFrame | OhlcvArrays],
+    strategy_map: dict[str, str] | None = None,
+    *,
+    warmup: int = 60,
+    params: dict[str, dict[str, float]] | None = None,
+    workers: int | None = None,
+    **replay_kwargs: Any,
+) -> ReplayResult:
+    """Prepare indicators, compute per-bar signals (in parallel when `workers` != 1) and replay."""
+    strategy_map = strategy_map or get_registry().strategy_map()
+    if params is None:
+        params = active_params({strategy_map[p] for p in data})
+
+    frames = {
+        pair: _prepare_indicators(
+            bars.to_frame() if isinstance(bars, OhlcvArrays) else bars,
+            plan=_strategy_plan(_strategy_module(strategy_map[pair]), params.get(strategy_map[pair])),
+        )
+        for pair, bars in data.items()
+    }
+    jobs = [(frames[pair], strategy_map[pair], warmup, params.get(strategy_map[pair])) for pair in frames]
+    if workers == 1 or len(jobs) <= 1:
+        computed = [_signals_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(_signals_job, jobs))
+    return replay(frames, dict(zip(frames, computed)), strategy_map, **replay_kwargs)
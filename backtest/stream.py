@@ -0,0 +1,201 @@
+"""Chunked streaming backtest for histories larger than memory.
+
+`backtest_strategy_stream` gives the same metrics and trades as `backtest_strategy`, but
+never holds more than about one chunk of bars:
+
+- bars are read in chunks of about `chunk_bars` (memory-mapped `OhlcvArrays` are only paged
+  in chunk by chunk). Chunk edges fall on UTC day boundaries, where VWAP resets;
+- indicator state (EMA and Wilder recursions, previous bar, the Bollinger window) carries
+  from chunk to chunk through `_prepare_indicators(..., state)`, so the prepared columns
+  equal a single pass exactly. Only the strategy's declared features are computed;
+- each walk-forward segment (train, validation) is scanned from a rolling buffer. The buffer
+  holds the last `context_bars` prepared bars, which become each signal's strategy window, and
+  the bars still needed ahead for an open trade. A signal is only evaluated once all
+  `lookahead` (or `hold_bars + 1`) bars after it are buffered, or at the segment end;
+- trades are appended to one CSV per segment as each chunk completes.
+
+Identical results need `context_bars` to cover the history any strategy reads: the bundled
+strategies declare 200 trailing bars (the enemy gate's ATR median, `MARKET_STATE_LOOKBACK`).
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any, Iterator, Literal
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest import _prepare_indicators, _scan_segment, _split_report, _strategy_plan, compute_metrics
+from backtest.trade_log import TRADE_LOG_COLUMNS
+from data.intrabar import IntrabarResolver
+from data.ohlcv_store import OhlcvArrays
+
+DEFAULT_CHUNK_BARS = 50_000
+DEFAULT_CONTEXT_BARS = 200
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+def day_chunks(time_ns: np.ndarray, chunk_bars: int) -> Iterator[tuple[int, int]]:
+    """[lo, hi) row ranges of about `chunk_bars` bars, each starting at a UTC day boundary.
+
+    A chunk is cut back to the start of the day its `chunk_bars`-th bar falls in; a single
+    day longer than `chunk_bars` becomes one chunk.
+    """
+    if chunk_bars <= 0:
+        raise ValueError("chunk_bars must be positive")
+    n = len(time_ns)
+    lo = 0
+    while lo < n:
+        target = lo + chunk_bars
+        if target >= n:
+            yield lo, n
+            return
+        hi = int(np.searchsorted(time_ns, int(time_ns[target]) // _NS_PER_DAY * _NS_PER_DAY, side="left"))
+        if hi <= lo:
+            hi = int(np.searchsorted(time_ns, (int(time_ns[lo]) // _NS_PER_DAY + 1) * _NS_PER_DAY, side="left"))
+        yield lo, hi
+        lo = hi
+
+
+class _SegmentScanner:
+    """Scans one walk-forward segment as its prepared bars arrive, writing trades to `path`."""
+
+    def __init__(self, length: int, path: Path, rng: random.Random, run: dict[str, Any]) -> None:
+        self.length = length
+        self.path = path
+        self.rng = rng
+        self.run = run
+        horizon = run["lookahead"] if run["mode"] == "sl_tp" else run["hold_bars"] + 1
+        self.horizon = horizon
+        self.buffer = pd.DataFrame()
+        self.buffer_start = 0  # segment position of buffer row 0
+        self.next_bar = run["warmup"]
+        self.received = 0
+        self.pnl: list[float] = []
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(columns=TRADE_LOG_COLUMNS).to_csv(path, index=False)
+
+    def feed(self, rows: pd.DataFrame) -> None:
+        if rows.empty:
+            return
+        self.buffer = pd.concat([self.buffer, rows], ignore_index=True) if len(self.buffer) else rows.reset_index(drop=True)
+        self.received += len(rows)
+        final = self.received == self.length
+        n = len(self.buffer)
+        stop = None if final else n - self.horizon
+        start = self.next_bar - self.buffer_start
+        if final or start < stop:
+            run = self.run
+            trades, next_bar = _scan_segment(
+                self.buffer,
+                run["pair"],
+                run["strategy_module"],
+                start,
+                run["lookahead"],
+                run["mode"],
+                run["hold_bars"],
+                self.rng,
+                run["params"],
+                run["intrabar"],
+                stop=stop,
+                context=run["context_bars"],
+            )
+            self.next_bar = self.buffer_start + next_bar
+            if len(trades):
+                frame = trades.to_frame(self.buffer, run["pair"], offset=self.buffer_start)
+                frame.to_csv(self.path, mode="a", header=False, index=False)
+                self.pnl.extend(frame["pnl_pips"].tolist())
+        # Keep only the strategy window of the next bar to scan and the bars after it.
+        keep_from = max(0, min(self.next_bar - self.buffer_start + 1 - self.run["context_bars"], n))
+        if keep_from:
+            self.buffer = self.buffer.iloc[keep_from:].reset_index(drop=True)
+            self.buffer_start += keep_from
+
+    def metrics(self) -> dict[str, float]:
+        return compute_metrics(pd.DataFrame({"pnl_pips": self.pnl}) if self.pnl else pd.DataFrame())
+
+
+def _time_ns(bars: pd.DataFrame | OhlcvArrays) -> np.ndarray:
+    if isinstance(bars, OhlcvArrays):
+        return np.asarray(bars.time)
+    return pd.DatetimeIndex(pd.to_datetime(bars["time"], utc=True)).as_unit("ns").asi8
+
+
+def _chunk_frame(bars: pd.DataFrame | OhlcvArrays, lo: int, hi: int) -> pd.DataFrame:
+    if isinstance(bars, OhlcvArrays):
+        return bars.rows(lo, hi).to_frame()
+    return bars.iloc[lo:hi].reset_index(drop=True)
+
+
+def backtest_strategy_stream(
+    bars: pd.DataFrame | OhlcvArrays,
+    pair: str,
+    strategy_module,
+    out_dir: str | Path,
+    *,
+    chunk_bars: int = DEFAULT_CHUNK_BARS,
+    context_bars: int = DEFAULT_CONTEXT_BARS,
+    warmup: int = 60,
+    lookahead: int = 50,
+    train_pct: float = 0.7,
+    seed: int = 123,
+    mode: Literal["sl_tp", "time_exit"] = "sl_tp",
+    hold_bars: int = 5,
+    min_trades: int = 30,
+    params: dict[str, float] | None = None,
+    intrabar: IntrabarResolver | None = None,
+) -> dict[str, object]:
+    """`backtest_strategy` in bounded memory; trades go to `<out_dir>/<pair>_{train,validation}_trades.csv`.
+
+    Returns the same report as `backtest_strategy` plus `trade_files` (segment -> CSV path).
+    """
+    if mode not in {"sl_tp", "time_exit"}:
+        raise ValueError("mode must be 'sl_tp' or 'time_exit'")
+    if not 0 < train_pct < 1:
+        raise ValueError("train_pct must be between 0 and 1")
+    if context_bars <= warmup:
+        raise ValueError("context_bars must exceed warmup")
+    if context_bars < getattr(strategy_module, "LOOKBACK", 0):
+        raise ValueError(f"context_bars must cover the strategy's LOOKBACK ({strategy_module.LOOKBACK})")
+
+    time_ns = _time_ns(bars)
+    n = len(time_ns)
+    split = int(n * train_pct)
+    out = Path(out_dir)
+    run = {
+        "pair": pair,
+        "strategy_module": strategy_module,
+        "lookahead": lookahead,
+        "mode": mode,
+        "hold_bars": hold_bars,
+        "params": params,
+        "intrabar": intrabar,
+        "warmup": warmup,
+        "context_bars": context_bars,
+    }
+    segments = {
+        "train": _SegmentScanner(split, out / f"{pair}_train_trades.csv", random.Random(seed), run),
+        "validation": _SegmentScanner(n - split, out / f"{pair}_validation_trades.csv", random.Random(seed + 1), run),
+    }
+
+    plan = _strategy_plan(strategy_module, params)
+    state: dict[str, dict] = {}
+    for lo, hi in day_chunks(time_ns, chunk_bars):
+        prepared = _prepare_indicators(_chunk_frame(bars, lo, hi), state, plan)
+        cut = min(max(split - lo, 0), hi - lo)
+        segments["train"].feed(prepared.iloc[:cut])
+        segments["validation"].feed(prepared.iloc[cut:])
+
+    result = _split_report(segments["train"].metrics(), segments["validation"].metrics(), min_trades)
+    result["trade_files"] = {name: str(scanner.path) for name, scanner in segments.items()}
+    return result
+
+
+def load_stream_trades(path: str | Path) -> pd.DataFrame:
+    """Read a segment's trade CSV back with exact floats and UTC entry/exit times."""
+    trades = pd.read_csv(path, float_precision="round_trip")
+    for column in ("entry_time", "exit_time"):
+        trades[column] = pd.DatetimeIndex(pd.to_datetime(trades[column], utc=True)).as_unit("ns")
+    return trades
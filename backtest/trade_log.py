@@ -0,0 +1,263 @@
+"""Columnar per-trade logs for backtest runs.
+
+`TradeLog` collects trades into preallocated typed arrays while a segment is scanned;
+`TradeLog.to_frame(bars)` adds bar times and the maximum adverse/favourable excursion
+(MAE/MFE, pips), reduced over each trade's bars in one vectorized pass.
+
+`write_trade_log` stores one run as fixed-width column files, like `data.ohlcv_store`::
+
+    <root>/<run_id>/<column>.npy   one file per TRADE_LOG_COLUMNS entry (+ segment)
+    <root>/<run_id>/meta.json      pair, strategy, settings, metrics, label vocabularies
+
+Text columns (direction, result, exit reason, segment) are stored as int8 codes. `load_trade_log`
+maps a run back into a DataFrame, and `load_runs` / `compare_runs` compare stored runs
+without re-running any backtest.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from config.instruments import get_registry
+from config.settings import TRADE_LOG_DIR
+from data.fetcher import has_bid_ask
+
+DIRECTIONS: tuple[str, ...] = ("BUY", "SELL")
+RESULTS: tuple[str, ...] = ("WIN", "LOSS", "TIMEOUT")
+EXIT_REASONS: tuple[str, ...] = ("TP", "SL", "TIMEOUT", "TIME_EXIT")
+SEGMENTS: tuple[str, ...] = ("train", "validation")
+LABELS: dict[str, tuple[str, ...]] = {
+    "direction": DIRECTIONS,
+    "result": RESULTS,
+    "exit_reason": EXIT_REASONS,
+    "segment": SEGMENTS,
+}
+TRADE_LOG_COLUMNS: list[str] = [
+    "idx",
+    "direction",
+    "result",
+    "pnl_pips",
+    "entry",
+    "slip_pips",
+    "entry_idx",
+    "exit_idx",
+    "entry_time",
+    "exit_time",
+    "bars_held",
+    "exit_reason",
+    "mae_pips",
+    "mfe_pips",
+]
+_TIME_COLUMNS = ("entry_time", "exit_time")
+
+
+class TradeLog:
+    """Typed arrays filled one trade at a time; `capacity` is the expected upper bound."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._columns: dict[str, np.ndarray] = {
+            "idx": np.empty(capacity, dtype=np.int64),
+            "entry_idx": np.empty(capacity, dtype=np.int64),
+            "exit_idx": np.empty(capacity, dtype=np.int64),
+            "direction": np.empty(capacity, dtype=np.int8),
+            "result": np.empty(capacity, dtype=np.int8),
+            "exit_reason": np.empty(capacity, dtype=np.int8),
+            "pnl_pips": np.empty(capacity, dtype=np.float64),
+            "entry": np.empty(capacity, dtype=np.float64),
+            "slip_pips": np.empty(capacity, dtype=np.float64),
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        idx: int,
+        entry_idx: int,
+        exit_idx: int,
+        direction: str,
+        result: str,
+        exit_reason: str,
+        pnl_pips: float,
+        entry: float,
+        slip_pips: float,
+    ) -> None:
+        if self._size == len(self._columns["idx"]):
+            for name, values in self._columns.items():
+                self._columns[name] = np.resize(values, 2 * len(values))
+        row = self._size
+        columns = self._columns
+        columns["idx"][row] = idx
+        columns["entry_idx"][row] = entry_idx
+        columns["exit_idx"][row] = exit_idx
+        columns["direction"][row] = DIRECTIONS.index(direction)
+        columns["result"][row] = RESULTS.index(result)
+        columns["exit_reason"][row] = EXIT_REASONS.index(exit_reason)
+        columns["pnl_pips"][row] = pnl_pips
+        columns["entry"][row] = entry
+        columns["slip_pips"][row] = slip_pips
+        self._size += 1
+
+    def to_frame(self, bars: pd.DataFrame, pair: str, *, offset: int = 0) -> pd.DataFrame:
+        """Trades as a DataFrame (`TRADE_LOG_COLUMNS`), with times and MAE/MFE read from `bars`.
+
+        Bar indices in the log refer to `bars`; the frame's index columns are shifted by `offset`.
+        """
+        cols = {name: values[: self._size] for name, values in self._columns.items()}
+        time_ns = pd.DatetimeIndex(pd.to_datetime(bars["time"], utc=True)).as_unit("ns").asi8
+        mae, mfe = _excursions(bars, pair, cols["idx"], cols["exit_idx"], cols["direction"], cols["entry"])
+        frame = pd.DataFrame(
+            {
+                "idx": cols["idx"] + offset,
+                "direction": _decode(cols["direction"], DIRECTIONS),
+                "result": _decode(cols["result"], RESULTS),
+                "pnl_pips": cols["pnl_pips"],
+                "entry": cols["entry"],
+                "slip_pips": cols["slip_pips"],
+                "entry_idx": cols["entry_idx"] + offset,
+                "exit_idx": cols["exit_idx"] + offset,
+                "entry_time": pd.to_datetime(time_ns[cols["entry_idx"]], utc=True),
+                "exit_time": pd.to_datetime(time_ns[cols["exit_idx"]], utc=True),
+                "bars_held": cols["exit_idx"] - cols["entry_idx"],
+                "exit_reason": _decode(cols["exit_reason"], EXIT_REASONS),
+                "mae_pips": mae,
+                "mfe_pips": mfe,
+            },
+            columns=TRADE_LOG_COLUMNS,
+        )
+        return frame
+
+
+def _decode(codes: np.ndarray, labels: tuple[str, ...]) -> np.ndarray:
+    return np.asarray(labels, dtype=object)[codes]
+
+
+def _excursions(
+    bars: pd.DataFrame, pair: str, idx: np.ndarray, exit_idx: np.ndarray, direction: np.ndarray, entry: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Worst and best move (pips, >= 0) against each entry over bars idx+1..exit_idx.
+
+    Highs/lows are those of the quote the position closes at when `bars` carry bid/ask.
+    """
+    if not len(idx):
+        return np.empty(0), np.empty(0)
+    buy = direction == DIRECTIONS.index("BUY")
+    lengths = exit_idx - idx
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    rows = np.repeat(idx + 1 - starts, lengths) + np.arange(int(lengths.sum()))
+    row_buy = np.repeat(buy, lengths)
+    if has_bid_ask(bars):
+        high = np.where(row_buy, bars["bid_high"].to_numpy(np.float64)[rows], bars["ask_high"].to_numpy(np.float64)[rows])
+        low = np.where(row_buy, bars["bid_low"].to_numpy(np.float64)[rows], bars["ask_low"].to_numpy(np.float64)[rows])
+    else:
+        high = bars["high"].to_numpy(np.float64)[rows]
+        low = bars["low"].to_numpy(np.float64)[rows]
+    highest = np.maximum.reduceat(high, starts)
+    lowest = np.minimum.reduceat(low, starts)
+    pip = get_registry().spec(pair).pip_size
+    mae = np.where(buy, entry - lowest, highest - entry) / pip
+    mfe = np.where(buy, highest - entry, entry - lowest) / pip
+    return np.maximum(mae, 0.0), np.maximum(mfe, 0.0)
+
+
+def write_trade_log(
+    segments: dict[str, pd.DataFrame],
+    run_id: str,
+    *,
+    root: str | Path = TRADE_LOG_DIR,
+    meta: dict[str, Any] | None = None,
+) -> Path:
+    """Store `{segment: trades frame}` as one run's column files, replacing any previous set."""
+    frames = []
+    for segment, trades in segments.items():
+        frame = trades.reindex(columns=TRADE_LOG_COLUMNS)
+        frames.append(frame.assign(segment=segment))
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[*TRADE_LOG_COLUMNS, "segment"])
+
+    target = Path(root) / run_id
+    staging = target.with_name(f".{target.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for column in (*TRADE_LOG_COLUMNS, "segment"):
+        values = frame[column]
+        if column in LABELS:
+            data = pd.Categorical(values, categories=LABELS[column]).codes.astype(np.int8)
+        elif column in _TIME_COLUMNS:
+            data = pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit("ns").asi8
+        elif column.endswith("idx") or column == "bars_held":
+            data = values.to_numpy(dtype=np.int64)
+        else:
+            data = values.to_numpy(dtype=np.float64)
+        np.save(staging / f"{column}.npy", np.ascontiguousarray(data))
+    info = {"run_id": run_id, "rows": int(len(frame)), "labels": {k: list(v) for k, v in LABELS.items()}, **(meta or {})}
+    (staging / "meta.json").write_text(json.dumps(info, indent=2, default=str), encoding="utf-8")
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return target
+
+
+def read_meta(path: str | Path) -> dict[str, Any]:
+    return json.loads((Path(path) / "meta.json").read_text(encoding="utf-8"))
+
+
+def load_trade_log(path: str | Path, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """One stored run as a DataFrame (all columns, or just `columns`, memory-mapped on read)."""
+    directory = Path(path)
+    meta = read_meta(directory)
+    labels = {name: tuple(values) for name, values in meta.get("labels", LABELS).items()}
+    names = list(columns) if columns is not None else [*TRADE_LOG_COLUMNS, "segment"]
+    data: dict[str, Any] = {}
+    for column in names:
+        values = np.load(directory / f"{column}.npy", mmap_mode="r")
+        if column in labels:
+            data[column] = _decode(np.asarray(values), labels[column])
+        elif column in _TIME_COLUMNS:
+            data[column] = pd.to_datetime(np.asarray(values), utc=True)
+        else:
+            data[column] = np.asarray(values)
+    return pd.DataFrame(data, columns=names)
+
+
+def list_runs(root: str | Path = TRADE_LOG_DIR) -> list[str]:
+    base = Path(root)
+    if not base.exists():
+        return []
+    return sorted(p.name for p in base.iterdir() if p.is_dir() and (p / "meta.json").exists())
+
+
+def load_runs(
+    root: str | Path = TRADE_LOG_DIR, runs: Iterable[str] | None = None, columns: Iterable[str] | None = None
+) -> pd.DataFrame:
+    """Trades of several stored runs stacked, with a leading `run` column."""
+    names = list(runs) if runs is not None else list_runs(root)
+    frames = [load_trade_log(Path(root) / run, columns).assign(run=run) for run in names]
+    if not frames:
+        return pd.DataFrame(columns=["run", *(columns or [*TRADE_LOG_COLUMNS, "segment"])])
+    frame = pd.concat(frames, ignore_index=True)
+    return frame[["run", *frame.columns[:-1]]]
+
+
+def compare_runs(root: str | Path = TRADE_LOG_DIR, runs: Iterable[str] | None = None) -> pd.DataFrame:
+    """Per run and segment: trade count, win rate, total/mean pips, mean MAE/MFE and bars held."""
+    trades = load_runs(root, runs, columns=["segment", "pnl_pips", "mae_pips", "mfe_pips", "bars_held"])
+    grouped = trades.groupby(["run", "segment"], sort=True)
+    summary = grouped.agg(
+        trades=("pnl_pips", "size"),
+        total_pips=("pnl_pips", "sum"),
+        mean_pips=("pnl_pips", "mean"),
+        mean_mae_pips=("mae_pips", "mean"),
+        mean_mfe_pips=("mfe_pips", "mean"),
+        mean_bars_held=("bars_held", "mean"),
+    )
+    summary.insert(1, "win_rate", grouped["pnl_pips"].apply(lambda pnl: float((pnl > 0).mean())))
+    return summary.reset_index()
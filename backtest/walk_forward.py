@@ -0,0 +1,202 @@
+"""Rolling and anchored walk-forward validation with purged, parallel folds.
+
+Indicators (those the strategy declares for `params`, see `indicators.plan`) are computed
+once on the full series. Each fold then runs the existing
+single-pair simulation on slices of the prepared frame. A slice carries up to
+max(`warmup`, the strategy's LOOKBACK) bars of context before the fold start, so signals
+begin exactly at the fold boundary without a second warm-up. Trades never read bars past
+the fold end.
+
+Fold layout (bar indices, `purge` bars dropped between train and test so train trades,
+which look `lookahead` bars ahead, cannot overlap the test window)::
+
+    rolling : [start, start+train) purge [.., +test)   start += step
+    anchored: [first, start+train) purge [.., +test)   start += step  (train grows)
+"""
+
+from __future__ import annotations
+
+import importlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest import (
+    _prepare_indicators,
+    _run_segment,
+    _strategy_plan,
+    compute_metrics_batch,
+    metrics_rows,
+    pack_pnl,
+)
+
+Scheme = Literal["rolling", "anchored"]
+SUMMARY_METRICS = ("win_rate", "profit_factor", "sharpe", "max_drawdown", "avg_pips_per_trade", "total_trades")
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(
+    n_bars: int,
+    *,
+    train_bars: int,
+    test_bars: int,
+    step_bars: int | None = None,
+    purge_bars: int = 0,
+    first_bar: int = 0,
+    scheme: Scheme = "rolling",
+) -> list[Fold]:
+    """Fold boundaries (end-exclusive bar indices) covering [first_bar, n_bars)."""
+    if scheme not in {"rolling", "anchored"}:
+        raise ValueError("scheme must be 'rolling' or 'anchored'")
+    if train_bars <= 0 or test_bars <= 0 or purge_bars < 0:
+        raise ValueError("train_bars and test_bars must be positive, purge_bars non-negative")
+    step = step_bars or test_bars
+
+    folds: list[Fold] = []
+    start = first_bar
+    while start + train_bars + purge_bars + test_bars <= n_bars:
+        train_start = first_bar if scheme == "anchored" else start
+        train_end = start + train_bars
+        test_start = train_end + purge_bars
+        folds.append(Fold(len(folds), train_start, train_end, test_start, test_start + test_bars))
+        start += step
+    return folds
+
+
+def _segment(
+    prepared: pd.DataFrame, start: int, end: int, warmup: int, rows: int | None = None
+) -> tuple[pd.DataFrame, int]:
+    # Without declared `rows` strategies read the whole prefix, so the fold gets all of it.
+    context = min(start if rows is None else max(warmup, rows), start)
+    return prepared.iloc[start - context : end].reset_index(drop=True), context
+
+
+def _fold_job(args: tuple[Any, ...]) -> dict[str, Any]:
+    (fold, train, train_ctx, test, test_ctx, pair, module_name, lookahead, mode, hold_bars, seed, params, rows) = args
+    module = importlib.import_module(module_name)
+    rng_train = random.Random(seed + 2 * fold.index)
+    rng_test = random.Random(seed + 2 * fold.index + 1)
+    train_trades = _run_segment(
+        train, pair, module, train_ctx, lookahead, mode, hold_bars, rng_train, params, context=rows
+    )
+    test_trades = _run_segment(test, pair, module, test_ctx, lookahead, mode, hold_bars, rng_test, params, context=rows)
+    return {"fold": asdict(fold), "train": train_trades, "test": test_trades}
+
+
+def _dispersion(values: list[float]) -> dict[str, float]:
+    arr = np.array([v for v in values if np.isfinite(v)], dtype=float)
+    if arr.size == 0:
+        return {"mean": 0.0, "std": 0.0, "min": 0.0, "median": 0.0, "max": 0.0}
+    return {
+        "mean": float(arr.mean()),
+        "std": float(arr.std(ddof=1)) if arr.size > 1 else 0.0,
+        "min": float(arr.min()),
+        "median": float(np.median(arr)),
+        "max": float(arr.max()),
+    }
+
+
+def summarize_folds(folds: list[dict[str, Any]], min_trades: int = 30, gap_threshold: float = 0.15) -> dict[str, Any]:
+    """Aggregate out-of-sample metrics across folds with dispersion statistics.
+
+    Non-finite values (profit factor with no losing trades) are left out of the statistics.
+    """
+    summary: dict[str, Any] = {"folds": len(folds)}
+    for metric in SUMMARY_METRICS:
+        summary[metric] = _dispersion([float(f["test"][metric]) for f in folds])
+
+    gaps = [
+        abs(float(f["train"]["win_rate"]) - float(f["test"]["win_rate"]))
+        for f in folds
+        if f["train"]["total_trades"] >= min_trades and f["test"]["total_trades"] >= min_trades
+    ]
+    summary["win_rate_gap"] = _dispersion(gaps)
+    summary["folds_with_enough_trades"] = len(gaps)
+    summary["overfit_fold_share"] = float(np.mean([g > gap_threshold for g in gaps])) if gaps else 0.0
+    summary["profitable_fold_share"] = (
+        float(np.mean([f["test"]["avg_pips_per_trade"] > 0 for f in folds])) if folds else 0.0
+    )
+    return summary
+
+
+def walk_forward(
+    df: pd.DataFrame,
+    pair: str,
+    strategy_module,
+    *,
+    scheme: Scheme = "rolling",
+    train_bars: int = 2000,
+    test_bars: int = 500,
+    step_bars: int | None = None,
+    purge_bars: int | None = None,
+    warmup: int = 60,
+    lookahead: int = 50,
+    mode: Literal["sl_tp", "time_exit"] = "sl_tp",
+    hold_bars: int = 5,
+    seed: int = 123,
+    min_trades: int = 30,
+    params: dict[str, float] | None = None,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Run walk-forward folds (in a process pool unless `workers` == 1).
+
+    `purge_bars` defaults to the trade horizon (`lookahead`, or `hold_bars + 1` in
+    time_exit mode). `strategy_module` must be importable by name in worker processes.
+    """
+    if mode not in {"sl_tp", "time_exit"}:
+        raise ValueError("mode must be 'sl_tp' or 'time_exit'")
+    if purge_bars is None:
+        purge_bars = lookahead if mode == "sl_tp" else hold_bars + 1
+
+    plan = _strategy_plan(strategy_module, params)
+    rows = None if plan is None else plan.rows
+    prepared = _prepare_indicators(df) if plan is None else _prepare_indicators(df, plan=plan)
+    folds = make_folds(
+        len(prepared),
+        train_bars=train_bars,
+        test_bars=test_bars,
+        step_bars=step_bars,
+        purge_bars=purge_bars,
+        first_bar=warmup,
+        scheme=scheme,
+    )
+    module_name = strategy_module.__name__
+
+    jobs = []
+    for fold in folds:
+        train, train_ctx = _segment(prepared, fold.train_start, fold.train_end, warmup, rows)
+        test, test_ctx = _segment(prepared, fold.test_start, fold.test_end, warmup, rows)
+        jobs.append(
+            (fold, train, train_ctx, test, test_ctx, pair, module_name, lookahead, mode, hold_bars, seed, params, rows)
+        )
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_fold_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fold_job, jobs))
+
+    # Metrics for every fold's train and test trades in one batched pass.
+    metrics = metrics_rows(compute_metrics_batch(*pack_pnl(r[part] for r in results for part in ("train", "test"))))
+    results = [
+        {"fold": r["fold"], "train": metrics[2 * k], "test": metrics[2 * k + 1]} for k, r in enumerate(results)
+    ]
+
+    return {
+        "scheme": scheme,
+        "purge_bars": purge_bars,
+        "folds": results,
+        "summary": summarize_folds(results, min_trades=min_trades),
+    }
@@ -0,0 +1,190 @@
+"""Instrument registry: one place describing every tradable instrument.
+
+Pip location, trading session, spread cap, currencies (news gate), backtest costs and
+strategy assignment used to live in separate per-module dicts. They are now loaded from:
+
+1. the built-in defaults below,
+2. an optional JSON file (`INSTRUMENTS_FILE`), and
+3. an optional `app_settings` row with key `instruments` (same JSON shape),
+
+later sources overriding earlier ones by instrument name. JSON shape::
+
+    [{"name": "EUR_USD", "pip_location": -4, "session": [8, 17], "max_spread_pips": 1.5,
+      "currencies": ["EUR", "USD"], "spread_cost_pips": 0.3, "max_slip_pips": 0.5,
+      "strategy": "ema_vwap"}]
+
+`"session": null` means tradable around the clock; `"strategy": null` keeps an instrument
+known (data, pricing, pip maths) but out of the trading cycle.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from config.settings import INSTRUMENTS_FILE
+
+SETTINGS_KEY = "instruments"
+
+
+@dataclass(frozen=True)
+class Instrument:
+    name: str
+    pip_location: int
+    session: tuple[int, int] | None = None
+    max_spread_pips: float | None = None
+    currencies: tuple[str, ...] = ()
+    spread_cost_pips: float = 0.5
+    max_slip_pips: float = 1.0
+    strategy: str | None = None
+
+    @property
+    def pip_size(self) -> float:
+        return 10.0**self.pip_location
+
+    @property
+    def price_precision(self) -> int:
+        """Quote decimals (one more than the pip position, e.g. 5 for EUR_USD, 3 for USD_JPY)."""
+        return -self.pip_location + 1
+
+
+def default_pip_location(name: str) -> int:
+    return -2 if name.endswith("JPY") else -4
+
+
+def fallback_instrument(name: str) -> Instrument:
+    """Spec for an instrument the registry does not know: derived pip maths, no session, no cap."""
+    return Instrument(name=name, pip_location=default_pip_location(name))
+
+
+DEFAULT_INSTRUMENTS: tuple[Instrument, ...] = (
+    Instrument("EUR_USD", -4, (8, 17), 1.5, ("EUR", "USD"), 0.3, 0.5, "ema_vwap"),
+    Instrument("GBP_USD", -4, (8, 13), 2.5, ("GBP", "USD"), 0.8, 1.0, "bb_breakout"),
+    Instrument("USD_JPY", -2, (0, 9), 2.0, ("USD", "JPY"), 0.5, 0.7, "vwap_rsi"),
+)
+
+
+def instrument_from_dict(raw: dict[str, Any], base: Instrument | None = None) -> Instrument:
+    """Parse one JSON entry; fields missing from `raw` keep the values from `base`."""
+    name = str(raw["name"])
+    current = base or Instrument(
+        name=name,
+        pip_location=default_pip_location(name),
+        currencies=tuple(name.split("_")) if name.count("_") == 1 else (),
+    )
+    updates: dict[str, Any] = {}
+    if "pip_location" in raw:
+        updates["pip_location"] = int(raw["pip_location"])
+    if "session" in raw:
+        session = raw["session"]
+        if session is not None:
+            start, end = (int(v) for v in session)
+            if not (0 <= start <= 24 and 0 <= end <= 24):
+                raise ValueError(f"{name}: session hours must be within 0..24")
+            session = (start, end)
+        updates["session"] = session
+    if "max_spread_pips" in raw:
+        updates["max_spread_pips"] = None if raw["max_spread_pips"] is None else float(raw["max_spread_pips"])
+    if "currencies" in raw:
+        updates["currencies"] = tuple(str(c) for c in raw["currencies"])
+    for key in ("spread_cost_pips", "max_slip_pips"):
+        if key in raw:
+            updates[key] = float(raw[key])
+    if "strategy" in raw:
+        updates["strategy"] = None if raw["strategy"] is None else str(raw["strategy"])
+    return replace(current, **updates)
+
+
+@dataclass
+class InstrumentRegistry:
+    instruments: dict[str, Instrument] = field(default_factory=dict)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.instruments
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def names(self) -> list[str]:
+        return list(self.instruments)
+
+    def get(self, name: str) -> Instrument:
+        """Return the registered spec; raise KeyError for unknown instruments."""
+        return self.instruments[name]
+
+    def spec(self, name: str) -> Instrument:
+        """Return the registered spec, or a derived fallback for unknown instruments."""
+        return self.instruments.get(name) or fallback_instrument(name)
+
+    def strategy_map(self) -> dict[str, str]:
+        """Instrument -> strategy for every instrument assigned to the trading cycle."""
+        return {name: inst.strategy for name, inst in self.instruments.items() if inst.strategy}
+
+    def merged(self, entries: list[dict[str, Any]]) -> "InstrumentRegistry":
+        out = dict(self.instruments)
+        for raw in entries:
+            inst = instrument_from_dict(raw, out.get(str(raw["name"])))
+            out[inst.name] = inst
+        return InstrumentRegistry(out)
+
+
+def _entries_from_json(text: str, source: str) -> list[dict[str, Any]]:
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("instruments", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{source}: expected a list of instrument objects")
+    return data
+
+
+def load_registry(path: str | Path | None = INSTRUMENTS_FILE, conn: sqlite3.Connection | None = None) -> InstrumentRegistry:
+    """Build a registry from defaults, then the JSON file, then the DB override."""
+    registry = InstrumentRegistry({inst.name: inst for inst in DEFAULT_INSTRUMENTS})
+    if path:
+        registry = registry.merged(_entries_from_json(Path(path).read_text(encoding="utf-8"), str(path)))
+    if conn is not None:
+        try:
+            row = conn.execute("SELECT value_json FROM app_settings WHERE key = ?", (SETTINGS_KEY,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is not None:
+            registry = registry.merged(_entries_from_json(str(row[0]), f"app_settings.{SETTINGS_KEY}"))
+    return registry
+
+
+_REGISTRY: InstrumentRegistry | None = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> InstrumentRegistry:
+    """Return the process-wide registry, loading defaults + `INSTRUMENTS_FILE` on first use."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = load_registry()
+    return _REGISTRY
+
+
+def set_registry(registry: InstrumentRegistry) -> InstrumentRegistry:
+    """Install `registry` process-wide and return the previous one (tools, tests)."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        previous = _REGISTRY if _REGISTRY is not None else load_registry()
+        _REGISTRY = registry
+    return previous
+
+
+def reload_registry(conn: sqlite3.Connection | None = None) -> InstrumentRegistry:
+    """Reload from file (and DB when `conn` is given) and install the result."""
+    registry = load_registry(conn=conn)
+    set_registry(registry)
+    return registry
+
+
+def pip_size(name: str) -> float:
+    return get_registry().spec(name).pip_size
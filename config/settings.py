@@ -24,20 +24,54 @@ OANDA_API_KEY: str | None = os.getenv("OANDA_API_KEY")
 OANDA_ACCOUNT_ID: str | None = os.getenv("OANDA_ACCOUNT_ID")
 OANDA_ENV: str = os.getenv("OANDA_ENV", "practice").strip().lower()
 
+# Optional base-URL overrides (e.g. a local v20 stand-in); empty means the OANDA_ENV hosts.
+OANDA_API_URL: str = os.getenv("OANDA_API_URL", "").strip().rstrip("/")
+OANDA_STREAM_URL: str = os.getenv("OANDA_STREAM_URL", "").strip().rstrip("/")
+OANDA_HTTP_POOL_SIZE: int = int(os.getenv("OANDA_HTTP_POOL_SIZE", "10"))
+OANDA_CONNECT_TIMEOUT_S: float = float(os.getenv("OANDA_CONNECT_TIMEOUT_S", "3.05"))
+OANDA_READ_TIMEOUT_S: float = float(os.getenv("OANDA_READ_TIMEOUT_S", "10"))
+OANDA_CANDLES_READ_TIMEOUT_S: float = float(os.getenv("OANDA_CANDLES_READ_TIMEOUT_S", "30"))
+OANDA_STREAM_READ_TIMEOUT_S: float = float(os.getenv("OANDA_STREAM_READ_TIMEOUT_S", "30"))
+OANDA_RATE_LIMIT_PER_S: float = float(os.getenv("OANDA_RATE_LIMIT_PER_S", "100"))
+OANDA_RATE_LIMIT_BURST: int = int(os.getenv("OANDA_RATE_LIMIT_BURST", "20"))
+OANDA_CYCLE_MEMO_TTL_S: float = float(os.getenv("OANDA_CYCLE_MEMO_TTL_S", "1.0"))
+OANDA_CYCLE_MEMO_MAX_ENTRIES: int = int(os.getenv("OANDA_CYCLE_MEMO_MAX_ENTRIES", "256"))
+
 TIMEFRAME: Final[str] = "M5"
 RISK_PER_TRADE: Final[float] = 0.01
 DAILY_MAX_LOSS: Final[float] = 0.03
 DEFAULT_CANDLE_COUNT: Final[int] = 200
+INSTRUMENTS_FILE: str | None = os.getenv("INSTRUMENTS_FILE") or None
+HISTORY_DIR: str = os.getenv("HISTORY_DIR", "history")
+HISTORY_DOWNLOAD_WORKERS: int = int(os.getenv("HISTORY_DOWNLOAD_WORKERS", "4"))
+OHLCV_DIR: str = os.getenv("OHLCV_DIR", "ohlcv")
+BACKTEST_CACHE_DIR: str = os.getenv("BACKTEST_CACHE_DIR", "backtest_cache")
+BACKTEST_CACHE_MAX_MB: int = int(os.getenv("BACKTEST_CACHE_MAX_MB", "512"))
+TRADE_LOG_DIR: str = os.getenv("TRADE_LOG_DIR", "trade_logs")
 
 DRY_RUN: bool = _env_bool("DRY_RUN", True)
 LIVE_TRADING_ENABLED: bool = _env_bool("LIVE_TRADING_ENABLED", False)
 COMMAND_POLL_INTERVAL_SEC: float = float(os.getenv("COMMAND_POLL_INTERVAL_SEC", "1.0"))
 COMMAND_RUNNING_TIMEOUT_SEC: float = float(os.getenv("COMMAND_RUNNING_TIMEOUT_SEC", "300"))
 
+SQLITE_POOL_READERS: int = int(os.getenv("SQLITE_POOL_READERS", "8"))
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KIB: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "20000"))
+SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+RETENTION_RAW_DAYS: float = float(os.getenv("RETENTION_RAW_DAYS", "7"))
+RETENTION_HOURLY_DAYS: float = float(os.getenv("RETENTION_HOURLY_DAYS", "90"))
+RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "2000"))
+RETENTION_INTERVAL_SEC: float = float(os.getenv("RETENTION_INTERVAL_SEC", "3600"))
+RETENTION_VACUUM_PAGES: int = int(os.getenv("RETENTION_VACUUM_PAGES", "1000"))
+
 API_JWT_SECRET: str = os.getenv("API_JWT_SECRET", "dev-insecure-secret")
 API_JWT_ALG: str = os.getenv("API_JWT_ALG", "HS256")
 API_JWT_EXPIRES_MIN: int = int(os.getenv("API_JWT_EXPIRES_MIN", str(60 * 24)))
 
+API_SESSION_CACHE_TTL_SEC: float = float(os.getenv("API_SESSION_CACHE_TTL_SEC", "30"))
+API_SESSION_CACHE_MAX: int = int(os.getenv("API_SESSION_CACHE_MAX", "1024"))
+
 API_COOKIE_NAME: str = os.getenv("API_COOKIE_NAME", "sb_auth")
 API_COOKIE_SECURE: bool = _env_bool("API_COOKIE_SECURE", False)
 API_COOKIE_SAMESITE: str = os.getenv("API_COOKIE_SAMESITE", "lax")
@@ -0,0 +1,221 @@
+"""Rate-limited, coalescing gateway in front of the OANDA client.
+
+Strategy wrappers and `main.execute_cycle` ask for the same pricing, position and account
+data several times per pair within one second. The gateway sits where the bot already
+passes `client` around and exposes the same `request(endpoint)` call, adding:
+
+- a token bucket so bursts across many pairs stay under the broker's per-connection limit,
+- single-flight coalescing: identical in-flight GETs (same path and params) share one response,
+- a short per-cycle memo for GETs, cleared on `new_cycle()`, on any write (orders), or after a TTL;
+  expired entries are purged on insert and the memo holds at most `memo_max_entries` responses,
+- counters for calls issued versus saved.
+
+Responses handed out from a shared call are the same dict for every caller; treat them as read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from config.settings import (
+    OANDA_CYCLE_MEMO_MAX_ENTRIES,
+    OANDA_CYCLE_MEMO_TTL_S,
+    OANDA_RATE_LIMIT_BURST,
+    OANDA_RATE_LIMIT_PER_S,
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire()` blocks until a token is available."""
+
+    def __init__(self, rate_per_s: float, burst: int, *, clock=time.monotonic, sleep=time.sleep) -> None:
+        if rate_per_s <= 0 or burst <= 0:
+            raise ValueError("rate_per_s and burst must be positive")
+        self.rate_per_s = float(rate_per_s)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, returning the seconds spent waiting for it."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait_s = (1.0 - self._tokens) / self.rate_per_s
+            self._sleep(wait_s)
+            waited += wait_s
+
+
+@dataclass
+class GatewayStats:
+    issued: int = 0
+    coalesced: int = 0
+    memo_hits: int = 0
+    passthrough: int = 0
+    throttled_s: float = 0.0
+
+    @property
+    def saved(self) -> int:
+        return self.coalesced + self.memo_hits
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "issued": self.issued,
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "saved": self.saved,
+            "passthrough": self.passthrough,
+            "throttled_s": round(self.throttled_s, 6),
+        }
+
+
+class _Flight:
+    __slots__ = ("done", "response", "status_code", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: Any = None
+        self.status_code: int | None = None
+        self.error: BaseException | None = None
+
+
+def _request_key(endpoint) -> tuple[str, str, str] | None:
+    """Return a coalescing key for cacheable GETs, or None for writes and streams."""
+    if getattr(endpoint, "STREAM", False) or getattr(endpoint, "method", "GET") != "GET":
+        return None
+    params = getattr(endpoint, "params", None) or {}
+    return ("GET", str(endpoint), json.dumps(params, sort_keys=True, default=str))
+
+
+class BrokerGateway:
+    """Drop-in wrapper for an `oandapyV20.API` client (same `request(endpoint)` contract)."""
+
+    def __init__(
+        self,
+        client,
+        *,
+        rate_per_s: float = OANDA_RATE_LIMIT_PER_S,
+        burst: int = OANDA_RATE_LIMIT_BURST,
+        memo_ttl_s: float = OANDA_CYCLE_MEMO_TTL_S,
+        memo_max_entries: int = OANDA_CYCLE_MEMO_MAX_ENTRIES,
+        clock=time.monotonic,
+    ) -> None:
+        self.client = client
+        self.bucket = TokenBucket(rate_per_s, burst, clock=clock)
+        self.memo_ttl_s = memo_ttl_s
+        self.memo_max_entries = max(int(memo_max_entries), 1)
+        self.stats = GatewayStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, str, str], _Flight] = {}
+        self._memo: dict[tuple[str, str, str], tuple[float, Any, int | None]] = {}
+
+    def new_cycle(self) -> None:
+        """Drop memoized responses; call at the start of every trading cycle."""
+        with self._lock:
+            self._memo.clear()
+
+    def _remember(self, key: tuple[str, str, str], response: Any, status_code: int | None) -> None:
+        # Called under the lock. The memo is kept in insertion (= time) order, so expired
+        # entries and, past the size cap, the oldest ones are all at the front.
+        now = self._clock()
+        self._memo.pop(key, None)
+        while self._memo:
+            oldest = next(iter(self._memo))
+            if now - self._memo[oldest][0] <= self.memo_ttl_s and len(self._memo) < self.memo_max_entries:
+                break
+            del self._memo[oldest]
+        self._memo[key] = (now, response, status_code)
+
+    def close(self) -> None:
+        self.client.close()
+
+    def _issue(self, endpoint) -> Any:
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.stats.issued += 1
+            self.stats.throttled_s += waited
+        return self.client.request(endpoint)
+
+    @staticmethod
+    def _share(endpoint, response: Any, status_code: int | None) -> Any:
+        # Order/position helpers read `endpoint.response` rather than the return value.
+        endpoint.response = response
+        if status_code is not None:
+            endpoint.status_code = status_code
+        return response
+
+    def request(self, endpoint) -> Any:
+        key = _request_key(endpoint)
+        if key is None:
+            with self._lock:
+                self.stats.passthrough += 1
+                if not getattr(endpoint, "STREAM", False):
+                    # A write (e.g. OrderCreate) can change positions/account state.
+                    self._memo.clear()
+            return self._issue(endpoint)
+
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None and self._clock() - cached[0] <= self.memo_ttl_s:
+                self.stats.memo_hits += 1
+                memo_hit = cached
+            else:
+                memo_hit = None
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._in_flight[key] = flight
+                else:
+                    self.stats.coalesced += 1
+        if memo_hit is not None:
+            return self._share(endpoint, memo_hit[1], memo_hit[2])
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._share(endpoint, flight.response, flight.status_code)
+
+        try:
+            flight.response = self._issue(endpoint)
+            flight.status_code = endpoint.status_code
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if flight.error is None and self.memo_ttl_s > 0:
+                    self._remember(key, flight.response, flight.status_code)
+            flight.done.set()
+        return flight.response
+
+
+def begin_cycle(client) -> None:
+    """Start a new memo window when `client` is a gateway (plain clients are left alone)."""
+    if isinstance(client, BrokerGateway):
+        client.new_cycle()
+
+
+def gateway_stats(client) -> dict[str, float] | None:
+    """Return call counters when `client` is a gateway, else None."""
+    if isinstance(client, BrokerGateway):
+        return client.stats.as_dict()
+    return None
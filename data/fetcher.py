@@ -6,12 +6,17 @@ import time
 from collections.abc import Iterator
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from config.settings import DEFAULT_CANDLE_COUNT, OANDA_ACCOUNT_ID, OANDA_API_KEY, OANDA_ENV, validate_settings
+from config.instruments import get_registry
+from data.oanda_client import get_shared_client
 
-SUPPORTED_PAIRS: set[str] = {"EUR_USD", "GBP_USD", "USD_JPY"}
 SUPPORTED_GRANULARITIES: set[str] = {
+    "M1",
+    "M2",
+    "M4",
     "M5",
     "M10",
     "M15",
@@ -30,17 +35,19 @@ SUPPORTED_GRANULARITIES: set[str] = {
 
 
 def get_oanda_client():
-    """Return an authenticated OANDA API client using values from settings."""
-    import oandapyV20
+    """Return the process-wide authenticated OANDA API client.
 
-    validate_settings()
-    return oandapyV20.API(access_token=OANDA_API_KEY, environment=OANDA_ENV)
+    Settings are validated when the client is first built; later calls reuse the same
+    pooled HTTP session so connections stay alive across candle fetches.
+    """
+    return get_shared_client(OANDA_API_KEY, OANDA_ENV, validate=validate_settings)
 
 
-def _validate_candle_request(pair: str, timeframe: str, count: int) -> None:
+def _validate_candle_request(pair: str, timeframe: str, count: int, price: str = "M") -> None:
     """Validate candle request inputs."""
-    if pair not in SUPPORTED_PAIRS:
-        raise ValueError(f"Unsupported pair '{pair}'. Allowed: {sorted(SUPPORTED_PAIRS)}")
+    registry = get_registry()
+    if pair not in registry:
+        raise ValueError(f"Unsupported pair '{pair}'. Allowed: {sorted(registry.names())}")
 
     if timeframe not in SUPPORTED_GRANULARITIES:
         raise ValueError(
@@ -50,48 +57,85 @@ def _validate_candle_request(pair: str, timeframe: str, count: int) -> None:
     if not 10 <= count <= 5000:
         raise ValueError("count must be between 10 and 5000")
 
+    if price not in PRICE_COMPONENTS:
+        raise ValueError(f"price must be one of {sorted(PRICE_COMPONENTS)}")
+
+
+OHLCV_COLUMNS: list[str] = ["time", "open", "high", "low", "close", "volume"]
+BID_ASK_COLUMNS: list[str] = [f"{side}_{field}" for side in ("bid", "ask") for field in ("open", "high", "low", "close")]
+PRICE_COMPONENTS: set[str] = {"M", "BA", "MBA"}
+_PRICE_FIELDS: tuple[tuple[str, str], ...] = (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c"))
+
+
+def has_bid_ask(df: pd.DataFrame) -> bool:
+    """True when a candle frame carries the normalized bid/ask OHLC columns."""
+    return all(column in df.columns for column in BID_ASK_COLUMNS)
 
-def _normalize_oanda_candles(candles: list[dict[str, Any]]) -> pd.DataFrame:
-    """Normalize OANDA candle payload to a typed OHLCV DataFrame.
 
-    Incomplete candles are removed and output rows are sorted by time ascending.
+def quote_side(direction: str, closing: bool = False) -> str:
+    """Column prefix of the quote a BUY/SELL opens at (ask/bid) or, with `closing`, exits at."""
+    return "bid_" if (direction == "BUY") == closing else "ask_"
+
+
+def _parse_oanda_times(times: list[Any]) -> pd.DatetimeIndex:
+    """Parse OANDA RFC3339 timestamps (``...000000000Z``) to a UTC nanosecond index.
+
+    The common all-``Z`` payload is parsed in one vectorized NumPy call; anything else
+    (offsets, missing values) goes through `pd.to_datetime`.
     """
-    records: list[dict[str, Any]] = []
-    for candle in candles:
-        if not candle.get("complete", False):
-            continue
-
-        mid: dict[str, str] = candle.get("mid", {})
-        records.append(
-            {
-                "time": candle.get("time"),
-                "open": float(mid.get("o", 0.0)),
-                "high": float(mid.get("h", 0.0)),
-                "low": float(mid.get("l", 0.0)),
-                "close": float(mid.get("c", 0.0)),
-                "volume": int(candle.get("volume", 0)),
-            }
-        )
+    try:
+        stripped = [value[:-1] for value in times if value[-1:] == "Z"]
+        if len(stripped) == len(times):
+            return pd.DatetimeIndex(np.array(stripped, dtype="datetime64[ns]")).tz_localize("UTC")
+    except (TypeError, ValueError):
+        pass
+    return pd.DatetimeIndex(pd.to_datetime(times, utc=True)).as_unit("ns")
 
-    df = pd.DataFrame(records, columns=["time", "open", "high", "low", "close", "volume"])
-    if df.empty:
-        return df
 
-    df["time"] = pd.to_datetime(df["time"], utc=True)
-    df = df.astype(
-        {
-            "open": "float64",
-            "high": "float64",
-            "low": "float64",
-            "close": "float64",
-            "volume": "int64",
-        }
-    )
-    return df.sort_values("time").reset_index(drop=True)
+def _price_block(complete: list[dict[str, Any]], component: str) -> dict[str, np.ndarray]:
+    quotes = [candle.get(component, {}) for candle in complete]
+    return {column: np.array([q.get(key, 0.0) for q in quotes], dtype=np.float64) for column, key in _PRICE_FIELDS}
 
 
-def get_candles(pair: str, timeframe: str = "M5", count: int = DEFAULT_CANDLE_COUNT) -> pd.DataFrame:
-    """Fetch complete OANDA candles and return normalized OHLCV data.
+def _normalize_oanda_candles(candles: list[dict[str, Any]], price: str = "M") -> pd.DataFrame:
+    """Normalize OANDA candle payload to a typed OHLCV DataFrame.
+
+    Incomplete candles are removed and output rows are sorted by time ascending. Columns are
+    built directly as typed arrays; the sort is skipped when the payload is already in order,
+    which is how OANDA returns it.
+
+    With bid/ask candles (`price` "BA" or "MBA") the frame also carries `BID_ASK_COLUMNS`;
+    without mid prices, open/high/low/close are the bid/ask midpoints.
+    """
+    if price not in PRICE_COMPONENTS:
+        raise ValueError(f"price must be one of {sorted(PRICE_COMPONENTS)}")
+    output_columns = OHLCV_COLUMNS + (BID_ASK_COLUMNS if "B" in price else [])
+    complete = [candle for candle in candles if candle.get("complete", False)]
+    if not complete:
+        return pd.DataFrame(columns=output_columns)
+
+    columns: dict[str, Any] = {"time": _parse_oanda_times([candle.get("time") for candle in complete])}
+    if "B" in price:
+        bid = _price_block(complete, "bid")
+        ask = _price_block(complete, "ask")
+        for column, _ in _PRICE_FIELDS:
+            columns[f"bid_{column}"] = bid[column]
+            columns[f"ask_{column}"] = ask[column]
+    if "M" in price:
+        columns.update(_price_block(complete, "mid"))
+    else:
+        for column, _ in _PRICE_FIELDS:
+            columns[column] = (bid[column] + ask[column]) / 2.0
+    columns["volume"] = np.array([candle.get("volume", 0) for candle in complete], dtype=np.int64)
+
+    df = pd.DataFrame(columns, columns=output_columns)
+    if not columns["time"].is_monotonic_increasing:
+        df = df.sort_values("time").reset_index(drop=True)
+    return df
+
+
+def _request_candles(pair: str, params: dict[str, Any]) -> pd.DataFrame:
+    """Request one candles page and normalize it.
 
     Retries transient request failures using exponential backoff with up to 3 attempts.
     """
@@ -99,10 +143,7 @@ def get_candles(pair: str, timeframe: str = "M5", count: int = DEFAULT_CANDLE_CO
     import oandapyV20.endpoints.instruments as instruments
     from oandapyV20.exceptions import V20Error
 
-    _validate_candle_request(pair=pair, timeframe=timeframe, count=count)
-
     client = get_oanda_client()
-    params: dict[str, Any] = {"granularity": timeframe, "count": count, "price": "M"}
     endpoint = instruments.InstrumentsCandles(instrument=pair, params=params)
 
     delay_seconds = 0.5
@@ -111,14 +152,40 @@ def get_candles(pair: str, timeframe: str = "M5", count: int = DEFAULT_CANDLE_CO
         try:
             response: dict[str, Any] = client.request(endpoint)
             candles: list[dict[str, Any]] = response.get("candles", [])
-            return _normalize_oanda_candles(candles)
+            return _normalize_oanda_candles(candles, price=params.get("price", "M"))
         except (requests.exceptions.RequestException, TimeoutError, ConnectionError, V20Error):
             if attempt == max_retries:
                 raise
             time.sleep(delay_seconds)
             delay_seconds *= 2
 
-    return pd.DataFrame(columns=["time", "open", "high", "low", "close", "volume"])
+    return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+
+def get_candles(pair: str, timeframe: str = "M5", count: int = DEFAULT_CANDLE_COUNT, price: str = "M") -> pd.DataFrame:
+    """Fetch complete OANDA candles and return normalized OHLCV data.
+
+    `price="BA"` (or "MBA") adds per-bar bid/ask OHLC columns. Retries transient request
+    failures using exponential backoff with up to 3 attempts.
+    """
+    _validate_candle_request(pair=pair, timeframe=timeframe, count=count, price=price)
+    return _request_candles(pair, {"granularity": timeframe, "count": count, "price": price})
+
+
+def get_candles_from(
+    pair: str, timeframe: str, start: pd.Timestamp, count: int = 5000, price: str = "M"
+) -> pd.DataFrame:
+    """Fetch up to `count` complete candles starting at `start` (inclusive), for history paging."""
+    _validate_candle_request(pair=pair, timeframe=timeframe, count=count, price=price)
+    start_utc = pd.Timestamp(start)
+    start_utc = start_utc.tz_localize("UTC") if start_utc.tzinfo is None else start_utc.tz_convert("UTC")
+    params = {
+        "granularity": timeframe,
+        "count": count,
+        "price": price,
+        "from": start_utc.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+    }
+    return _request_candles(pair, params)
 
 
 def stream_price_tick(pair: str) -> dict[str, Any] | None:
@@ -130,7 +197,11 @@ def stream_price_tick(pair: str) -> dict[str, Any] | None:
     endpoint = pricing.PricingStream(accountID=OANDA_ACCOUNT_ID, params=params)
 
     stream: Iterator[dict[str, Any]] = client.request(endpoint)
-    for message in stream:
-        if message.get("type") == "PRICE":
-            return message
-    return None
+    try:
+        for message in stream:
+            if message.get("type") == "PRICE":
+                return message
+        return None
+    finally:
+        # Release the streaming response so the shared session does not hold it open.
+        stream.close()
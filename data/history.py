@@ -0,0 +1,279 @@
+"""Bulk historical candles: paginated download into a per-pair, per-month local store.
+
+Layout under `root` (default `HISTORY_DIR`)::
+
+    <root>/<PAIR>/<GRANULARITY>/2024-01.csv
+    <root>/<PAIR>/<GRANULARITY>/manifest.json
+
+A month partition is written atomically once all of its pages are fetched. The manifest
+records which months are closed (entirely in the past), so an interrupted download
+resumes with the first missing month. The still-open current month is fetched again
+on every run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from config.settings import HISTORY_DIR, HISTORY_DOWNLOAD_WORKERS
+from data.fetcher import OHLCV_COLUMNS, get_candles_from
+
+PAGE_SIZE = 5000  # OANDA's per-request candle cap
+
+GRANULARITY_SECONDS: dict[str, int] = {
+    "M1": 60, "M2": 120, "M4": 240, "M5": 300, "M10": 600, "M15": 900, "M30": 1800,
+    "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400, "H6": 21600, "H8": 28800, "H12": 43200,
+    "D": 86400,
+}
+
+PageFetcher = Callable[[str, str, pd.Timestamp, int], pd.DataFrame]
+
+
+def _utc(value: Any) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def month_starts(start: pd.Timestamp, end: pd.Timestamp) -> list[pd.Timestamp]:
+    """Month starts (UTC) of every month overlapping [start, end)."""
+    start, end = _utc(start), _utc(end)
+    if start >= end:
+        return []
+    first = start.normalize().replace(day=1)
+    return list(pd.date_range(first, end, freq="MS", inclusive="left"))
+
+
+def _is_market_close(gap_start: pd.Timestamp, gap_end: pd.Timestamp) -> bool:
+    """True for the weekly FX close (Friday evening to Sunday evening UTC)."""
+    return gap_start.weekday() == 4 and gap_end.weekday() == 6 and (gap_end - gap_start) <= pd.Timedelta(days=3)
+
+
+def find_gaps(df: pd.DataFrame, granularity: str, max_gap: pd.Timedelta | None = None) -> list[dict[str, Any]]:
+    """Return missing-bar gaps longer than `max_gap` (default 6 bars), weekend closes excluded.
+
+    Quiet markets skip an odd bar (no ticks, no candle), so only runs of missing bars count.
+    """
+    if len(df) < 2:
+        return []
+    step = pd.Timedelta(seconds=GRANULARITY_SECONDS[granularity])
+    limit = max_gap if max_gap is not None else step * 6
+    times = pd.DatetimeIndex(df["time"])
+    deltas = times[1:] - times[:-1]
+    gaps: list[dict[str, Any]] = []
+    for index in (deltas > limit).nonzero()[0]:
+        gap_start, gap_end = times[index], times[index + 1]
+        if _is_market_close(gap_start, gap_end):
+            continue
+        gaps.append(
+            {
+                "after": gap_start.isoformat(),
+                "before": gap_end.isoformat(),
+                "missing_bars": int((gap_end - gap_start) / step) - 1,
+            }
+        )
+    return gaps
+
+
+class HistoryStore:
+    """Partitioned CSV store for downloaded candles (one file per pair/granularity/month)."""
+
+    def __init__(self, root: str | Path = HISTORY_DIR) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _dir(self, pair: str, granularity: str) -> Path:
+        return self.root / pair / granularity
+
+    def partition_path(self, pair: str, granularity: str, month: pd.Timestamp) -> Path:
+        return self._dir(pair, granularity) / f"{month:%Y-%m}.csv"
+
+    def manifest(self, pair: str, granularity: str) -> dict[str, Any]:
+        path = self._dir(pair, granularity) / "manifest.json"
+        if not path.exists():
+            return {"pair": pair, "granularity": granularity, "months": {}}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def closed_months(self, pair: str, granularity: str) -> set[str]:
+        months = self.manifest(pair, granularity)["months"]
+        return {
+            key
+            for key, meta in months.items()
+            if meta.get("closed") and self.partition_path(pair, granularity, pd.Timestamp(f"{key}-01")).exists()
+        }
+
+    def write_month(
+        self,
+        pair: str,
+        granularity: str,
+        month: pd.Timestamp,
+        df: pd.DataFrame,
+        *,
+        closed: bool,
+        gaps: list[dict[str, Any]],
+    ) -> Path:
+        directory = self._dir(pair, granularity)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = self.partition_path(pair, granularity, month)
+        tmp = path.with_suffix(".csv.tmp")
+        df.to_csv(tmp, index=False, date_format="%Y-%m-%dT%H:%M:%SZ")
+        os.replace(tmp, path)
+
+        with self._lock:
+            manifest = self.manifest(pair, granularity)
+            manifest["months"][f"{month:%Y-%m}"] = {
+                "rows": int(len(df)),
+                "first": None if df.empty else df["time"].iloc[0].isoformat(),
+                "last": None if df.empty else df["time"].iloc[-1].isoformat(),
+                "closed": closed,
+                "gaps": gaps,
+            }
+            manifest_path = directory / "manifest.json"
+            manifest_tmp = manifest_path.with_suffix(".json.tmp")
+            manifest_tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(manifest_tmp, manifest_path)
+        return path
+
+    def load(
+        self,
+        pair: str,
+        granularity: str = "M5",
+        start: Any | None = None,
+        end: Any | None = None,
+    ) -> pd.DataFrame:
+        """Concatenate stored partitions for [start, end) into one sorted OHLCV frame."""
+        files = sorted(self._dir(pair, granularity).glob("????-??.csv"))
+        if start is not None:
+            first_key = f"{_utc(start):%Y-%m}"
+            files = [f for f in files if f.stem >= first_key]
+        if end is not None:
+            last_key = f"{_utc(end):%Y-%m}"
+            files = [f for f in files if f.stem <= last_key]
+        if not files:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        df = pd.concat([pd.read_csv(f) for f in files], ignore_index=True)
+        df["time"] = pd.to_datetime(df["time"], utc=True, format="ISO8601").dt.as_unit("ns")
+        if start is not None:
+            df = df[df["time"] >= _utc(start)]
+        if end is not None:
+            df = df[df["time"] < _utc(end)]
+        return df.reset_index(drop=True)
+
+
+def fetch_range(
+    pair: str,
+    granularity: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    *,
+    fetch_page: PageFetcher | None = None,
+    page_size: int = PAGE_SIZE,
+    price: str = "M",
+) -> pd.DataFrame:
+    """Page through complete candles in [start, end) with `from`+`count` requests.
+
+    `price="BA"` keeps per-bar bid/ask columns (see `data.fetcher.BID_ASK_COLUMNS`).
+    """
+    fetch_page = fetch_page or partial(get_candles_from, price=price)
+    step = pd.Timedelta(seconds=GRANULARITY_SECONDS[granularity])
+    cursor, end = _utc(start), _utc(end)
+    pages: list[pd.DataFrame] = []
+    while cursor < end:
+        page = fetch_page(pair, granularity, cursor, page_size)
+        if page.empty:
+            break
+        pages.append(page[page["time"] < end])
+        last = page["time"].iloc[-1]
+        # A short page means the broker has nothing newer (or the latest bar is still forming).
+        if last >= end or len(page) < page_size:
+            break
+        cursor = last + step
+    if not pages:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    df = pd.concat(pages, ignore_index=True)
+    return df.drop_duplicates("time").reset_index(drop=True)
+
+
+@dataclass
+class DownloadReport:
+    pair: str
+    months_fetched: int = 0
+    months_skipped: int = 0
+    rows: int = 0
+    gaps: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+
+
+def download_pair(
+    store: HistoryStore,
+    pair: str,
+    granularity: str,
+    start: Any,
+    end: Any | None = None,
+    *,
+    force: bool = False,
+    fetch_page: PageFetcher | None = None,
+    now: pd.Timestamp | None = None,
+    price: str = "M",
+) -> DownloadReport:
+    """Download [start, end) for one pair month by month, skipping closed months already stored."""
+    if granularity not in GRANULARITY_SECONDS:
+        raise ValueError(f"Unsupported history granularity '{granularity}'. Allowed: {sorted(GRANULARITY_SECONDS)}")
+    now_utc = _utc(now if now is not None else pd.Timestamp.now(tz="UTC"))
+    end_utc = min(_utc(end), now_utc) if end is not None else now_utc
+    report = DownloadReport(pair=pair)
+    done = set() if force else store.closed_months(pair, granularity)
+
+    for month in month_starts(_utc(start), end_utc):
+        if f"{month:%Y-%m}" in done:
+            report.months_skipped += 1
+            continue
+        month_end = month + pd.offsets.MonthBegin(1)
+        window_start = max(month, _utc(start))
+        df = fetch_range(pair, granularity, window_start, min(month_end, end_utc), fetch_page=fetch_page, price=price)
+        gaps = find_gaps(df, granularity)
+        # Closed only when the whole month is in the past and was requested in full.
+        closed = month_end <= now_utc and window_start == month and month_end <= end_utc
+        store.write_month(pair, granularity, month, df, closed=closed, gaps=gaps)
+        report.months_fetched += 1
+        report.rows += len(df)
+        report.gaps.extend(gaps)
+    return report
+
+
+def download_history(
+    pairs: list[str],
+    granularity: str,
+    start: Any,
+    end: Any | None = None,
+    *,
+    store: HistoryStore | None = None,
+    workers: int = HISTORY_DOWNLOAD_WORKERS,
+    force: bool = False,
+    fetch_page: PageFetcher | None = None,
+    price: str = "M",
+) -> list[DownloadReport]:
+    """Download several pairs concurrently.
+
+    Requests share the process-wide broker client, so its token bucket paces all workers
+    together. A failing pair is reported and does not stop the others.
+    """
+    store = store or HistoryStore()
+
+    def _one(pair: str) -> DownloadReport:
+        try:
+            return download_pair(store, pair, granularity, start, end, force=force, fetch_page=fetch_page, price=price)
+        except Exception as exc:  # noqa: BLE001 - surfaced in the report, other pairs continue
+            return DownloadReport(pair=pair, error=f"{type(exc).__name__}: {exc}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="history") as pool:
+        return list(pool.map(_one, pairs))
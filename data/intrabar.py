@@ -0,0 +1,163 @@
+"""Intrabar SL/TP resolution from lower-timeframe bars.
+
+When one signal-timeframe bar (M5) reaches both the stop and the target, its OHLC cannot say
+which came first. `backtest.backtest.simulate_trade` and
+`PaperBroker.update_positions_from_bar` assume the stop. An `IntrabarResolver` holds the
+lower-timeframe (e.g. M1) high/low arrays of one pair and checks only those ambiguous bars:
+
+- the fine rows of a bar opening at `t` are the rows in `[t, t + bar width)`. Two
+  `searchsorted` calls per ambiguous bar find them, so no per-bar index is built or stored,
+  and memory-mapped arrays (`data.ohlcv_store`) are only paged in where they are read;
+- all ambiguous bars of a call are checked in one vectorized pass over their rows.
+
+Ticks work too: a frame with one price column (`price`, `mid` or `close`) uses it as both
+high and low. Bid/ask bars are checked on the quote a position closes at (bid for long, ask
+for short), like the bid/ask path of `simulate_trade`. The stop-first assumption stays in two cases: the fine data is missing, or a
+single fine row also spans both levels.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from config.settings import OHLCV_DIR
+from data.fetcher import has_bid_ask
+from data.history import GRANULARITY_SECONDS
+from data.ohlcv_store import OhlcvArrays, open_ohlcv
+
+_TICK_COLUMNS: tuple[str, ...] = ("price", "mid", "close")
+_QUOTE_COLUMNS: tuple[str, ...] = ("bid_high", "bid_low", "ask_high", "ask_low")
+
+
+def _to_ns(values: Any) -> np.ndarray:
+    arr = np.atleast_1d(np.asarray(values))
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int64, copy=False)
+    return pd.to_datetime(arr, utc=True).as_unit("ns").asi8
+
+
+class IntrabarResolver:
+    """First-touch lookup for ambiguous bars, backed by one pair's lower-timeframe bars."""
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        *,
+        bar_seconds: int = 300,
+        quotes: dict[str, np.ndarray] | None = None,
+    ) -> None:
+        if not len(time) == len(high) == len(low):
+            raise ValueError("time, high and low must have the same length")
+        self.time = np.asarray(time, dtype=np.int64)
+        self.high = high
+        self.low = low
+        # bid_high/bid_low/ask_high/ask_low when the fine bars are bid/ask candles.
+        self.quotes = {column: quotes[column] for column in _QUOTE_COLUMNS} if quotes else {}
+        self.bar_ns = int(bar_seconds) * 1_000_000_000
+        self.lookups = 0  # ambiguous bars checked
+        self.tp_first_count = 0  # ... that the fine data resolved to the target
+        self._digest: str | None = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, *, bar_seconds: int = 300) -> "IntrabarResolver":
+        """Build from an OHLC frame (M1 bars) or a tick frame with a single price column."""
+        time = pd.DatetimeIndex(pd.to_datetime(df["time"], utc=True)).as_unit("ns").asi8
+        if "high" in df and "low" in df:
+            quotes = {column: df[column].to_numpy(dtype=np.float64) for column in _QUOTE_COLUMNS} if has_bid_ask(df) else None
+            high, low = df["high"].to_numpy(dtype=np.float64), df["low"].to_numpy(dtype=np.float64)
+            return cls(time, high, low, bar_seconds=bar_seconds, quotes=quotes)
+        column = next((c for c in _TICK_COLUMNS if c in df), None)
+        if column is None:
+            raise ValueError(f"frame needs high/low or one of {list(_TICK_COLUMNS)}")
+        price = df[column].to_numpy(dtype=np.float64)
+        return cls(time, price, price, bar_seconds=bar_seconds)
+
+    @classmethod
+    def from_ohlcv(cls, arrays: OhlcvArrays, *, bar_seconds: int = 300) -> "IntrabarResolver":
+        """Build on memory-mapped store arrays without copying them."""
+        return cls(arrays.time, arrays.high, arrays.low, bar_seconds=bar_seconds, quotes=arrays.bid_ask or None)
+
+    @classmethod
+    def open(
+        cls,
+        pair: str,
+        granularity: str = "M1",
+        *,
+        bar_granularity: str = "M5",
+        root: str | Path = OHLCV_DIR,
+        start: Any | None = None,
+        end: Any | None = None,
+    ) -> "IntrabarResolver":
+        """Map `pair`'s `granularity` bars from the OHLCV store (raises FileNotFoundError if absent)."""
+        if GRANULARITY_SECONDS[granularity] >= GRANULARITY_SECONDS[bar_granularity]:
+            raise ValueError(f"{granularity} is not finer than {bar_granularity}")
+        arrays = open_ohlcv(pair, granularity, root=root).slice(start, end)
+        return cls.from_ohlcv(arrays, bar_seconds=GRANULARITY_SECONDS[bar_granularity])
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def digest(self) -> str:
+        """Hash of the fine data and bar width, for cache keys (computed once)."""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            h.update(str(self.bar_ns).encode())
+            h.update(np.ascontiguousarray(self.time).tobytes())
+            for values in (self.high, self.low, *self.quotes.values()):
+                h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def tp_first(self, bar_time: Any, direction: Any, sl: Any, tp: Any) -> np.ndarray:
+        """For each bar opening at `bar_time`, True if the fine data reaches `tp` before `sl`.
+
+        `direction` is > 0 for long and < 0 for short positions. All arguments broadcast, so
+        many ambiguous bars (or trades) resolve in one call.
+        """
+        times, direction, sl, tp = np.broadcast_arrays(
+            _to_ns(bar_time), np.asarray(direction), np.asarray(sl, dtype=np.float64), np.asarray(tp, dtype=np.float64)
+        )
+        k = times.shape[0]
+        result = np.zeros(k, dtype=bool)
+        if k == 0 or len(self) == 0:
+            return result
+
+        lo = np.searchsorted(self.time, times, side="left")
+        counts = np.searchsorted(self.time, times + self.bar_ns, side="left") - lo
+        total = int(counts.sum())
+        self.lookups += k
+        if total == 0:
+            return result
+
+        # Rows of every bar back to back: segment id per row and the row's fine index.
+        seg = np.repeat(np.arange(k), counts)
+        rows = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+        buy = direction[seg] > 0
+        if self.quotes:
+            high = np.where(buy, self.quotes["bid_high"][rows], self.quotes["ask_high"][rows])
+            low = np.where(buy, self.quotes["bid_low"][rows], self.quotes["ask_low"][rows])
+        else:
+            high = np.asarray(self.high[rows], dtype=np.float64)
+            low = np.asarray(self.low[rows], dtype=np.float64)
+        sl_rows, tp_rows = sl[seg], tp[seg]
+        sl_hit = np.where(buy, low <= sl_rows, high >= sl_rows)
+        tp_hit = np.where(buy, high >= tp_rows, low <= tp_rows)
+
+        position = np.arange(total)
+        first_sl = np.full(k, total)
+        first_tp = np.full(k, total)
+        hit_seg, first = np.unique(seg[sl_hit], return_index=True)
+        first_sl[hit_seg] = position[sl_hit][first]
+        hit_seg, first = np.unique(seg[tp_hit], return_index=True)
+        first_tp[hit_seg] = position[tp_hit][first]
+
+        result = first_tp < first_sl  # a fine row touching both stays stop-first
+        self.tp_first_count += int(result.sum())
+        return result
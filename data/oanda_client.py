@@ -0,0 +1,122 @@
+"""Process-wide OANDA v20 client with a pooled, keep-alive HTTP session.
+
+`oandapyV20.API` wraps a `requests.Session`, but building a new client per call throws
+the session (and its TCP/TLS connections) away every time. Clients built here are cached
+per (token, environment, base URLs), so candle polling, pricing, order and account calls
+all reuse the same connection pool.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+from urllib.parse import urlsplit
+
+from config.settings import (
+    OANDA_API_URL,
+    OANDA_CANDLES_READ_TIMEOUT_S,
+    OANDA_CONNECT_TIMEOUT_S,
+    OANDA_HTTP_POOL_SIZE,
+    OANDA_READ_TIMEOUT_S,
+    OANDA_STREAM_READ_TIMEOUT_S,
+    OANDA_STREAM_URL,
+)
+
+_CLIENTS: dict[tuple[str | None, str, str, str], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def endpoint_timeout(url: str, *, stream: bool = False) -> tuple[float, float]:
+    """Return the (connect, read) timeout for an OANDA URL.
+
+    Candle downloads can be large, streams idle between heartbeats, everything else
+    (pricing, orders, positions, account) is expected to answer quickly.
+    """
+    path = urlsplit(url).path
+    if stream or path.endswith("/stream"):
+        return OANDA_CONNECT_TIMEOUT_S, OANDA_STREAM_READ_TIMEOUT_S
+    if path.endswith("/candles"):
+        return OANDA_CONNECT_TIMEOUT_S, OANDA_CANDLES_READ_TIMEOUT_S
+    return OANDA_CONNECT_TIMEOUT_S, OANDA_READ_TIMEOUT_S
+
+
+def _make_adapter(pool_size: int):
+    from requests.adapters import HTTPAdapter
+
+    class _TimeoutAdapter(HTTPAdapter):
+        """Connection-pooling adapter that applies per-endpoint timeouts."""
+
+        def send(self, request, stream=False, timeout=None, **kwargs):  # type: ignore[override]
+            if timeout is None:
+                timeout = endpoint_timeout(request.url, stream=stream)
+            return super().send(request, stream=stream, timeout=timeout, **kwargs)
+
+    # Retries stay in the callers (e.g. get_candles backoff) so order placement is never replayed.
+    return _TimeoutAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+
+def _environment_name(environment: str, api_url: str, stream_url: str) -> str:
+    if not api_url and not stream_url:
+        return environment
+
+    from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+
+    # oandapyV20 resolves hosts from this table, so a URL override is registered as its own environment.
+    name = f"{environment}@{api_url or '-'}|{stream_url or '-'}"
+    defaults = TRADING_ENVIRONMENTS[environment]
+    TRADING_ENVIRONMENTS[name] = {
+        "api": api_url or defaults["api"],
+        "stream": stream_url or defaults["stream"],
+    }
+    return name
+
+
+def build_oanda_client(
+    access_token: str | None,
+    environment: str,
+    *,
+    api_url: str = OANDA_API_URL,
+    stream_url: str = OANDA_STREAM_URL,
+    pool_size: int = OANDA_HTTP_POOL_SIZE,
+):
+    """Build a new `oandapyV20.API` whose session keeps connections alive in a sized pool."""
+    import oandapyV20
+
+    client = oandapyV20.API(
+        access_token=access_token,
+        environment=_environment_name(environment, api_url, stream_url),
+        headers={"Connection": "keep-alive"},
+    )
+    adapter = _make_adapter(max(1, int(pool_size)))
+    client.client.mount("https://", adapter)
+    client.client.mount("http://", adapter)
+    return client
+
+
+def get_shared_client(access_token: str | None, environment: str, *, validate=None):
+    """Return the cached gateway-wrapped client for these credentials, building (and validating) it once."""
+    key = (access_token, environment, OANDA_API_URL, OANDA_STREAM_URL)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            if validate is not None:
+                validate()
+            from data.broker_gateway import BrokerGateway
+
+            client = BrokerGateway(
+                build_oanda_client(access_token, environment, api_url=OANDA_API_URL, stream_url=OANDA_STREAM_URL)
+            )
+            _CLIENTS[key] = client
+        return client
+
+
+def close_shared_clients() -> None:
+    """Close every cached client session (process shutdown, tests)."""
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        client.close()
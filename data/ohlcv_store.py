@@ -0,0 +1,186 @@
+"""Memory-mapped binary OHLCV store for large backtests.
+
+One directory per pair and granularity holds fixed-width column files::
+
+    <root>/<PAIR>/<GRANULARITY>/time.npy     int64 ns since epoch (UTC), ascending
+    <root>/<PAIR>/<GRANULARITY>/open.npy     float64 or float32
+    ... high.npy low.npy close.npy
+    <root>/<PAIR>/<GRANULARITY>/volume.npy   int64
+    <root>/<PAIR>/<GRANULARITY>/bid_open.npy ... ask_close.npy   only for bid/ask candles
+    <root>/<PAIR>/<GRANULARITY>/meta.json    rows, dtype, first/last bar, bid_ask
+
+Opening maps the files read-only (`np.load(mmap_mode="r")`), so load time does not grow with
+history length and time-range slices are views into the mapping.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from config.settings import OHLCV_DIR
+from data.fetcher import BID_ASK_COLUMNS, OHLCV_COLUMNS, has_bid_ask
+
+PRICE_COLUMNS: tuple[str, ...] = ("open", "high", "low", "close")
+PRICE_DTYPES = {"float64": np.float64, "float32": np.float32}
+
+
+def _ns(value: Any) -> int:
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return int(ts.as_unit("ns").value)
+
+
+@dataclass(frozen=True)
+class OhlcvArrays:
+    """Column arrays for one pair/granularity; usually read-only memmaps.
+
+    `bid_ask` maps `BID_ASK_COLUMNS` to arrays when the store holds bid/ask candles.
+    """
+
+    pair: str
+    granularity: str
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    bid_ask: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def slice(self, start: Any | None = None, end: Any | None = None) -> "OhlcvArrays":
+        """Bars in [start, end) as views (no copy)."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, _ns(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, _ns(end), side="left"))
+        return self.rows(lo, hi)
+
+    def rows(self, lo: int, hi: int) -> "OhlcvArrays":
+        """Bars at positions [lo, hi) as views (no copy)."""
+        return OhlcvArrays(
+            self.pair,
+            self.granularity,
+            *(getattr(self, column)[lo:hi] for column in OHLCV_COLUMNS),
+            bid_ask={column: values[lo:hi] for column, values in self.bid_ask.items()},
+        )
+
+    def times(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(np.asarray(self.time).view("datetime64[ns]")).tz_localize("UTC")
+
+    def to_frame(self) -> pd.DataFrame:
+        """OHLCV DataFrame in the fetcher's layout (time as datetime64[ns, UTC])."""
+        data: dict[str, Any] = {"time": self.times()}
+        for column in (*PRICE_COLUMNS, "volume"):
+            data[column] = np.asarray(getattr(self, column))
+        for column, values in self.bid_ask.items():
+            data[column] = np.asarray(values)
+        return pd.DataFrame(data, columns=OHLCV_COLUMNS + list(self.bid_ask))
+
+
+def _dir(root: str | Path, pair: str, granularity: str) -> Path:
+    return Path(root) / pair / granularity
+
+
+def write_ohlcv(
+    df: pd.DataFrame,
+    pair: str,
+    granularity: str = "M5",
+    *,
+    root: str | Path = OHLCV_DIR,
+    dtype: str = "float64",
+) -> Path:
+    """Write an OHLCV frame as column files, replacing any existing set atomically.
+
+    Bid/ask OHLC columns are stored too when the frame has all of them.
+    """
+    if dtype not in PRICE_DTYPES:
+        raise ValueError(f"dtype must be one of {sorted(PRICE_DTYPES)}")
+    missing = [column for column in OHLCV_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"missing OHLCV columns: {missing}")
+
+    times = pd.to_datetime(df["time"], utc=True)
+    order = np.argsort(times.to_numpy(dtype="datetime64[ns]").view("int64"), kind="stable")
+    frame = df.iloc[order]
+    time_ns = pd.DatetimeIndex(times.iloc[order]).as_unit("ns").asi8
+    if len(time_ns) > 1 and not (np.diff(time_ns) > 0).all():
+        raise ValueError("duplicate bar timestamps")
+
+    target = _dir(root, pair, granularity)
+    staging = target.with_name(f".{target.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    np.save(staging / "time.npy", np.ascontiguousarray(time_ns, dtype=np.int64))
+    for column in PRICE_COLUMNS:
+        np.save(staging / f"{column}.npy", frame[column].to_numpy(dtype=PRICE_DTYPES[dtype]))
+    np.save(staging / "volume.npy", frame["volume"].to_numpy(dtype=np.int64))
+    bid_ask = has_bid_ask(frame)
+    if bid_ask:
+        for column in BID_ASK_COLUMNS:
+            np.save(staging / f"{column}.npy", frame[column].to_numpy(dtype=PRICE_DTYPES[dtype]))
+    meta = {
+        "pair": pair,
+        "granularity": granularity,
+        "rows": int(len(time_ns)),
+        "dtype": dtype,
+        "bid_ask": bid_ask,
+        "first": None if not len(time_ns) else pd.Timestamp(time_ns[0], tz="UTC").isoformat(),
+        "last": None if not len(time_ns) else pd.Timestamp(time_ns[-1], tz="UTC").isoformat(),
+    }
+    (staging / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    previous = target.with_name(f".{target.name}.old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if target.exists():
+        os.replace(target, previous)
+    os.replace(staging, target)
+    shutil.rmtree(previous, ignore_errors=True)
+    return target
+
+
+def open_ohlcv(pair: str, granularity: str = "M5", *, root: str | Path = OHLCV_DIR) -> OhlcvArrays:
+    """Map a stored pair/granularity read-only. Raises FileNotFoundError when absent."""
+    directory = _dir(root, pair, granularity)
+    if not (directory / "meta.json").exists():
+        raise FileNotFoundError(f"no OHLCV store for {pair} {granularity} under {root}")
+    columns = {column: np.load(directory / f"{column}.npy", mmap_mode="r") for column in OHLCV_COLUMNS}
+    meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+    bid_ask = (
+        {column: np.load(directory / f"{column}.npy", mmap_mode="r") for column in BID_ASK_COLUMNS}
+        if meta.get("bid_ask")
+        else {}
+    )
+    return OhlcvArrays(pair, granularity, **columns, bid_ask=bid_ask)
+
+
+def csv_to_ohlcv(csv_path: str | Path, pair: str, granularity: str = "M5", **kwargs: Any) -> Path:
+    """Convert a CSV with `time,open,high,low,close,volume` columns."""
+    df = pd.read_csv(csv_path)
+    return write_ohlcv(df, pair, granularity, **kwargs)
+
+
+def history_to_ohlcv(history_root: str | Path, pair: str, granularity: str = "M5", **kwargs: Any) -> Path:
+    """Convert the monthly CSV partitions written by `data.history` for one pair."""
+    from data.history import HistoryStore
+
+    return write_ohlcv(HistoryStore(history_root).load(pair, granularity), pair, granularity, **kwargs)
+
+
+def fetch_to_ohlcv(
+    pair: str, granularity: str, start: Any, end: Any | None = None, *, price: str = "M", **kwargs: Any
+) -> Path:
+    """Page candles straight from the broker (see `data.history.fetch_range`) into the store."""
+    from data.history import fetch_range
+
+    end_ts = pd.Timestamp.now(tz="UTC") if end is None else end
+    df = fetch_range(pair, granularity, pd.Timestamp(start), pd.Timestamp(end_ts), price=price)
+    return write_ohlcv(df, pair, granularity, **kwargs)
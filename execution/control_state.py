@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from config.pairs import PAIR_STRATEGY_MAP
+from config.instruments import get_registry
 
 
 PAUSE_COMMANDS = {"PAUSE_PAIR", "RESUME_PAIR", "PAUSE_ALL", "RESUME_ALL"}
@@ -29,7 +29,7 @@ def apply_pause_command(paused_pairs: set[str], cmd: dict[str, Any]) -> set[str]
         return updated
 
     if command_type == "PAUSE_ALL":
-        return set(PAIR_STRATEGY_MAP.keys())
+        return set(get_registry().strategy_map())
 
     if command_type == "RESUME_ALL":
         return set()
@@ -0,0 +1,45 @@
+"""Pre-trade gates shared by the paper runner and the replay engine."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+
+from execution.paper_broker import PaperBroker
+from filters.market_state import is_strategy_allowed, strategy_allowed_in_state
+from filters.news_filter import is_news_clear
+from filters.session_filter import is_session_active
+from filters.spread_filter import is_spread_acceptable
+
+
+def evaluate_gates(
+    pair: str,
+    strategy_name: str,
+    df: pd.DataFrame,
+    bid: float,
+    ask: float,
+    broker: PaperBroker,
+    halted: bool,
+    now_utc: datetime | None = None,
+    news_events: list[dict[str, Any]] | None = None,
+    market_state: str | None = None,
+) -> dict[str, bool]:
+    """Evaluate every entry gate; a trade executes only when all are True.
+
+    `news_events` is passed to `is_news_clear`; None fetches the live calendar. A precomputed
+    `market_state` (see `filters.market_state.market_states`) replaces classifying `df`.
+    """
+    if market_state is None:
+        enemy_gate = is_strategy_allowed(strategy_name, df)
+    else:
+        enemy_gate = strategy_allowed_in_state(strategy_name, market_state)
+    return {
+        "session_gate": is_session_active(pair, now_utc=now_utc),
+        "spread_gate": is_spread_acceptable(pair, bid, ask),
+        "news_gate": is_news_clear(pair, now_utc=now_utc, events=news_events),
+        "open_pos_gate": not broker.has_open_position(pair),
+        "daily_loss_gate": not halted,
+        "enemy_gate": enemy_gate,
+    }
@@ -5,20 +5,31 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
+from config.instruments import pip_size
+from data.fetcher import quote_side
+from data.intrabar import IntrabarResolver
 from execution.alerting import get_alert_service
-from execution.alerts import AlertEvent
+from execution.alerts import AlertEvent, AlertService
 from execution.trade_store import TradeStore
 
 
 class PaperBroker:
-    def __init__(self, store: TradeStore, export_csv: bool = False) -> None:
+    def __init__(
+        self,
+        store: TradeStore,
+        export_csv: bool = False,
+        alert_service: AlertService | None = None,
+        intrabar: dict[str, IntrabarResolver] | None = None,
+    ) -> None:
         self.store = store
         self.export_csv = export_csv
-        self.alert_service = get_alert_service()
+        self.alert_service = alert_service or get_alert_service()
+        # Per-pair lower-timeframe data deciding bars that reach both SL and TP (default: SL).
+        self.intrabar = intrabar or {}
 
     @staticmethod
     def _pip_size(pair: str) -> float:
-        return 0.01 if pair.endswith("JPY") else 0.0001
+        return pip_size(pair)
 
     def has_open_position(self, pair: str) -> bool:
         return self.store.get_open_position(pair) is not None
@@ -34,6 +45,7 @@ class PaperBroker:
         sl_price: float,
         tp_price: float,
         meta_json: dict[str, Any] | None = None,
+        time_utc: str | None = None,
     ) -> dict[str, Any]:
         if direction not in {"BUY", "SELL"}:
             raise ValueError("direction must be BUY or SELL")
@@ -47,7 +59,7 @@ class PaperBroker:
             "entry_price": float(entry_price),
             "sl_price": float(sl_price),
             "tp_price": float(tp_price),
-            "time_open_utc": datetime.now(timezone.utc).isoformat(),
+            "time_open_utc": time_utc or datetime.now(timezone.utc).isoformat(),
             "meta_json": meta_json or {},
         }
         self.store.open_position(**opened, export_csv=self.export_csv)
@@ -89,34 +101,48 @@ class PaperBroker:
             "pnl_quote": pnl_quote,
         }
 
-    def update_positions_from_bar(self, pair: str, bar: dict[str, float], time_utc: str | None = None) -> list[dict[str, Any]]:
+    def update_positions_from_bar(self, pair: str, bar: dict[str, Any], time_utc: str | None = None) -> list[dict[str, Any]]:
         position = self.store.get_open_position(pair)
         if position is None:
             return []
 
-        high = float(bar["high"])
-        low = float(bar["low"])
         direction = str(position["direction"])
+        # Bid/ask bars: a long closes at the bid, a short at the ask.
+        side = quote_side(direction, closing=True)
+        side = side if f"{side}high" in bar else ""
+        high = float(bar[f"{side}high"])
+        low = float(bar[f"{side}low"])
         sl = float(position["sl_price"])
         tp = float(position["tp_price"])
         close_time = time_utc or datetime.now(timezone.utc).isoformat()
 
         if direction == "BUY":
-            if low <= sl:
-                return [self._close_position(position, sl, "SL", close_time, {"reason": "sl_hit"})]
-            if high >= tp:
-                return [self._close_position(position, tp, "TP", close_time, {"reason": "tp_hit"})]
+            sl_hit, tp_hit = low <= sl, high >= tp
         else:
-            if high >= sl:
-                return [self._close_position(position, sl, "SL", close_time, {"reason": "sl_hit"})]
-            if low <= tp:
-                return [self._close_position(position, tp, "TP", close_time, {"reason": "tp_hit"})]
-
+            sl_hit, tp_hit = high >= sl, low <= tp
+
+        if sl_hit and tp_hit and self._tp_first(pair, bar, direction, sl, tp):
+            sl_hit = False
+        if sl_hit:
+            return [self._close_position(position, sl, "SL", close_time, {"reason": "sl_hit"})]
+        if tp_hit:
+            return [self._close_position(position, tp, "TP", close_time, {"reason": "tp_hit"})]
         return []
 
-    def close_all_positions(self, exit_prices: dict[str, float] | None = None, reason: str = "KILL_SWITCH") -> list[dict[str, Any]]:
+    def _tp_first(self, pair: str, bar: dict[str, Any], direction: str, sl: float, tp: float) -> bool:
+        resolver = self.intrabar.get(pair)
+        if resolver is None or bar.get("time") is None:
+            return False
+        return bool(resolver.tp_first(bar["time"], 1 if direction == "BUY" else -1, sl, tp)[0])
+
+    def close_all_positions(
+        self,
+        exit_prices: dict[str, float] | None = None,
+        reason: str = "KILL_SWITCH",
+        time_utc: str | None = None,
+    ) -> list[dict[str, Any]]:
         closed: list[dict[str, Any]] = []
-        close_time = datetime.now(timezone.utc).isoformat()
+        close_time = time_utc or datetime.now(timezone.utc).isoformat()
         for position in self.store.list_open_positions():
             pair = str(position["pair"])
             fallback = float(position["entry_price"])
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+from config.instruments import get_registry
+
 RISK_PER_TRADE = 0.01
 MAX_DAILY_LOSS = 0.03
 SL_ATR_MULT = 1.5
@@ -16,7 +18,7 @@ _INSTRUMENT_SPECS_CACHE: dict[str, tuple[float, dict[str, int]]] = {}
 
 def _fallback_specs(pair: str) -> dict[str, int]:
     return {
-        "pip_location": -2 if pair.endswith("JPY") else -4,
+        "pip_location": get_registry().spec(pair).pip_location,
         "min_units": 1,
         "trade_units_precision": 0,
     }
@@ -109,13 +111,13 @@ def calculate_position_size(
 
 
 def pip_size(pair: str) -> float:
-    """Return instrument pip size (JPY pairs use 0.01, others 0.0001)."""
-    return 0.01 if pair.endswith("JPY") else 0.0001
+    """Return instrument pip size from the registry (JPY pairs use 0.01, others 0.0001)."""
+    return get_registry().spec(pair).pip_size
 
 
 def round_price(pair: str, price: float) -> float:
     """Round price to broker-friendly precision (JPY=3 decimals, others=5)."""
-    return round(price, 3 if pair.endswith("JPY") else 5)
+    return round(price, get_registry().spec(pair).price_precision)
 
 
 def compute_sl_tp_prices(
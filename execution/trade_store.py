@@ -10,6 +10,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from storage.db import init_db
+
 DB_ENV_VAR = "SCALP_BOT_DB_PATH"
 DEFAULT_DB_PATH = Path("data/paper_trading.db")
 SIGNALS_CSV_PATH = Path("data/signals_log.csv")
@@ -28,64 +30,9 @@ class TradeStore:
         return sqlite3.connect(self.db_path)
 
     def init_db(self) -> None:
+        # Schema (including the shared positions table) is owned by storage.migrations.
         with self._connect() as conn:
-            conn.executescript(
-                """
-                CREATE TABLE IF NOT EXISTS signals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    time_utc TEXT NOT NULL,
-                    pair TEXT NOT NULL,
-                    strategy TEXT NOT NULL,
-                    session_gate INTEGER NOT NULL,
-                    spread_gate INTEGER NOT NULL,
-                    news_gate INTEGER NOT NULL,
-                    open_pos_gate INTEGER NOT NULL,
-                    daily_loss_gate INTEGER NOT NULL,
-                    enemy_gate INTEGER NOT NULL,
-                    signal TEXT NOT NULL,
-                    decision TEXT NOT NULL,
-                    meta_json TEXT
-                );
-
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    time_open_utc TEXT NOT NULL,
-                    time_close_utc TEXT,
-                    pair TEXT NOT NULL,
-                    strategy TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    units INTEGER NOT NULL,
-                    entry_price REAL NOT NULL,
-                    exit_price REAL,
-                    sl_price REAL NOT NULL,
-                    tp_price REAL NOT NULL,
-                    result TEXT,
-                    pnl_pips REAL,
-                    pnl_quote REAL,
-                    meta_json TEXT
-                );
-
-                CREATE TABLE IF NOT EXISTS positions (
-                    pair TEXT PRIMARY KEY,
-                    strategy TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    units INTEGER NOT NULL,
-                    entry_price REAL NOT NULL,
-                    sl_price REAL NOT NULL,
-                    tp_price REAL NOT NULL,
-                    time_open_utc TEXT NOT NULL,
-                    is_open INTEGER NOT NULL
-                );
-
-                CREATE TABLE IF NOT EXISTS daily_stats (
-                    date_utc TEXT PRIMARY KEY,
-                    start_balance REAL NOT NULL,
-                    current_balance REAL NOT NULL,
-                    realized_pnl REAL NOT NULL,
-                    halted INTEGER NOT NULL
-                );
-                """
-            )
+            init_db(conn)
 
     @staticmethod
     def _to_json(meta: dict[str, Any] | None) -> str:
@@ -323,3 +270,108 @@ class TradeStore:
             realized_pnl=float(existing["realized_pnl"]),
             halted=halted,
         )
+
+
+class InMemoryTradeStore(TradeStore):
+    """TradeStore with the same interface kept in process memory (no SQLite, no CSV).
+
+    Used by the replay engine so long histories run through the real `PaperBroker`
+    without database round trips. `signals` and `trades` hold the rows the SQLite
+    backend would have written.
+    """
+
+    def __init__(self) -> None:
+        self.db_path = None
+        self.signals: list[dict[str, Any]] = []
+        self.trades: list[dict[str, Any]] = []
+        self._open: dict[str, dict[str, Any]] = {}
+        self._open_trade: dict[str, int] = {}
+        self._daily: dict[str, dict[str, Any]] = {}
+
+    def init_db(self) -> None:
+        return None
+
+    def insert_signal(self, **kwargs: Any) -> int | None:
+        kwargs.pop("export_csv", None)
+        row = {
+            "time_utc": kwargs.get("time_utc") or self._utc_now(),
+            "pair": kwargs["pair"],
+            "strategy": kwargs["strategy"],
+            "signal": kwargs.get("signal", "HOLD"),
+            "decision": kwargs.get("decision", "BLOCK"),
+            "meta_json": kwargs.get("meta_json") or {},
+        }
+        for gate in ("session_gate", "spread_gate", "news_gate", "open_pos_gate", "daily_loss_gate", "enemy_gate"):
+            row[gate] = int(bool(kwargs.get(gate, False)))
+        self.signals.append(row)
+        return len(self.signals)
+
+    def open_position(self, **kwargs: Any) -> int | None:
+        kwargs.pop("export_csv", None)
+        row = {
+            "time_open_utc": kwargs.get("time_open_utc") or self._utc_now(),
+            "time_close_utc": None,
+            "pair": kwargs["pair"],
+            "strategy": kwargs["strategy"],
+            "direction": kwargs["direction"],
+            "units": int(kwargs["units"]),
+            "entry_price": float(kwargs["entry_price"]),
+            "exit_price": None,
+            "sl_price": float(kwargs["sl_price"]),
+            "tp_price": float(kwargs["tp_price"]),
+            "result": None,
+            "pnl_pips": None,
+            "pnl_quote": None,
+            "meta_json": kwargs.get("meta_json") or {},
+        }
+        self.trades.append(row)
+        self._open_trade[row["pair"]] = len(self.trades) - 1
+        self._open[row["pair"]] = {
+            key: row[key]
+            for key in ("pair", "strategy", "direction", "units", "entry_price", "sl_price", "tp_price", "time_open_utc")
+        } | {"is_open": 1}
+        return len(self.trades)
+
+    def close_position(self, pair: str, **kwargs: Any) -> None:
+        index = self._open_trade.pop(pair, None)
+        if index is None:
+            return
+        self._open.pop(pair, None)
+        self.trades[index].update(
+            time_close_utc=kwargs.get("time_close_utc") or self._utc_now(),
+            exit_price=float(kwargs["exit_price"]),
+            result=kwargs.get("result", "CLOSED"),
+            pnl_pips=float(kwargs.get("pnl_pips", 0.0)),
+            pnl_quote=float(kwargs.get("pnl_quote", 0.0)),
+            meta_json=kwargs.get("meta_json") or {},
+        )
+
+    def get_open_position(self, pair: str) -> dict[str, Any] | None:
+        position = self._open.get(pair)
+        return dict(position) if position is not None else None
+
+    def list_open_positions(self) -> list[dict[str, Any]]:
+        return [dict(p) for p in sorted(self._open.values(), key=lambda p: p["time_open_utc"])]
+
+    def upsert_daily_stats(
+        self,
+        date_utc: str,
+        start_balance: float,
+        current_balance: float,
+        realized_pnl: float,
+        halted: bool,
+    ) -> None:
+        self._daily[date_utc] = {
+            "date_utc": date_utc,
+            "start_balance": float(start_balance),
+            "current_balance": float(current_balance),
+            "realized_pnl": float(realized_pnl),
+            "halted": bool(halted),
+        }
+
+    def get_daily_stats(self, date_utc: str) -> dict[str, Any] | None:
+        stats = self._daily.get(date_utc)
+        return dict(stats) if stats is not None else None
+
+    def list_daily_stats(self) -> list[dict[str, Any]]:
+        return [dict(self._daily[day]) for day in sorted(self._daily)]
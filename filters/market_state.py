@@ -6,25 +6,30 @@ import numpy as np
 import pandas as pd
 
 VALID_STATES: set[str] = {"trending", "weak_trend", "ranging", "volatile"}
+# ATR values the volatility median spans.
+MARKET_STATE_LOOKBACK = 200
 
 
-def get_market_state(df: pd.DataFrame, lookback: int = 200) -> str:
+def get_market_state(df: pd.DataFrame, lookback: int = MARKET_STATE_LOOKBACK) -> str:
     """Classify market state from pre-computed ADX and ATR columns."""
     required_columns = {"adx", "atr"}
     missing = required_columns.difference(df.columns)
     if missing:
         raise ValueError(f"Missing required columns: {sorted(missing)}")
 
-    atr_series = df["atr"].dropna()
-    adx_series = df["adx"].dropna()
-    if atr_series.empty or adx_series.empty:
+    # Plain arrays: this runs on every gated signal, and Series dropna/tail dominate its cost.
+    atr_values = df["atr"].to_numpy(dtype=np.float64)
+    adx_values = df["adx"].to_numpy(dtype=np.float64)
+    atr_values = atr_values[~np.isnan(atr_values)]
+    adx_values = adx_values[~np.isnan(adx_values)]
+    if atr_values.size == 0 or adx_values.size == 0:
         raise ValueError("ADX and ATR data must contain at least one non-NaN value")
 
-    atr_window = atr_series.tail(lookback)
-    atr_median = float(np.percentile(atr_window.to_numpy(), 50))
-    atr_last = float(atr_series.iloc[-1])
-    adx_last = float(adx_series.iloc[-1])
+    atr_median = float(np.percentile(atr_values[-lookback:], 50))
+    return _classify(float(atr_values[-1]), atr_median, float(adx_values[-1]))
 
+
+def _classify(atr_last: float, atr_median: float, adx_last: float) -> str:
     low_vol = atr_last < atr_median * 0.7
     high_vol = atr_last > atr_median * 1.3
 
@@ -41,9 +46,43 @@ def get_market_state(df: pd.DataFrame, lookback: int = 200) -> str:
     return "ranging"
 
 
-def is_strategy_allowed(strategy_name: str, df: pd.DataFrame) -> bool:
-    """Return whether a strategy is allowed in the current market state."""
-    state = get_market_state(df)
+def market_states(df: pd.DataFrame, lookback: int = MARKET_STATE_LOOKBACK) -> np.ndarray:
+    """`get_market_state` of every prefix ``df.iloc[: i + 1]`` in one pass (None where undefined).
+
+    Uses a rolling median over the non-NaN ATR values, so a long history is classified in
+    O(n log lookback) instead of one percentile per bar.
+    """
+    atr = df["atr"].to_numpy(dtype=np.float64)
+    adx = df["adx"].to_numpy(dtype=np.float64)
+    atr_valid = ~np.isnan(atr)
+    adx_valid = ~np.isnan(adx)
+    atr_clean = atr[atr_valid]
+    adx_clean = adx[adx_valid]
+    medians = pd.Series(atr_clean).rolling(lookback, min_periods=1).median().to_numpy()
+
+    # Position of the latest non-NaN value at or before each bar (-1 if none yet).
+    atr_pos = np.cumsum(atr_valid) - 1
+    adx_pos = np.cumsum(adx_valid) - 1
+    defined = (atr_pos >= 0) & (adx_pos >= 0)
+    states = np.full(len(df), None, dtype=object)
+    if not defined.any():
+        return states
+
+    atr_last = atr_clean[atr_pos[defined]]
+    atr_median = medians[atr_pos[defined]]
+    adx_last = adx_clean[adx_pos[defined]]
+    low_vol = atr_last < atr_median * 0.7
+    high_vol = atr_last > atr_median * 1.3
+    states[defined] = np.select(
+        [high_vol & (adx_last < 20), low_vol, adx_last >= 30, adx_last >= 25],
+        ["volatile", "ranging", "trending", "weak_trend"],
+        default="ranging",
+    ).astype(object)
+    return states
+
+
+def strategy_allowed_in_state(strategy_name: str, state: str) -> bool:
+    """Return whether a strategy may trade in the given market state."""
     if state == "volatile":
         return False
 
@@ -54,3 +93,8 @@ def is_strategy_allowed(strategy_name: str, df: pd.DataFrame) -> bool:
     if strategy_name == "bb_breakout":
         return True
     return False
+
+
+def is_strategy_allowed(strategy_name: str, df: pd.DataFrame) -> bool:
+    """Return whether a strategy is allowed in the current market state."""
+    return strategy_allowed_in_state(strategy_name, get_market_state(df))
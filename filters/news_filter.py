@@ -5,11 +5,8 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Any, Final
 
-PAIR_CURRENCIES: Final[dict[str, list[str]]] = {
-    "EUR_USD": ["EUR", "USD"],
-    "GBP_USD": ["GBP", "USD"],
-    "USD_JPY": ["USD", "JPY"],
-}
+from config.instruments import get_registry
+
 BLOCK_IMPACTS: Final[set[str]] = {"High"}
 
 
@@ -31,7 +28,8 @@ def get_blocking_news_event(
     if events is None:
         return None
 
-    currencies = PAIR_CURRENCIES.get(pair)
+    registry = get_registry()
+    currencies = registry.get(pair).currencies if pair in registry else ()
     if not currencies:
         return None
 
@@ -4,23 +4,22 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-SESSIONS: dict[str, dict[str, int]] = {
-    "EUR_USD": {"start": 8, "end": 17},
-    "GBP_USD": {"start": 8, "end": 13},
-    "USD_JPY": {"start": 0, "end": 9},
-}
+from config.instruments import get_registry
 
 
 def is_session_active(pair: str, now_utc: datetime | None = None) -> bool:
     """Return True when the pair is tradable in its configured UTC session.
 
     Session boundaries are start-inclusive and end-exclusive.
-    Unknown pairs are treated as inactive.
+    Unknown pairs are treated as inactive; registered pairs without a session trade all day.
     """
-    if pair not in SESSIONS:
+    registry = get_registry()
+    if pair not in registry:
         return False
+    session = registry.get(pair).session
+    if session is None:
+        return True
 
     current_time = now_utc or datetime.now(timezone.utc)
-    hour = current_time.hour
-    session = SESSIONS[pair]
-    return session["start"] <= hour < session["end"]
+    start, end = session
+    return start <= current_time.hour < end
@@ -2,15 +2,7 @@
 
 from __future__ import annotations
 
-MAX_SPREAD_PIPS: dict[str, float] = {
-    "EUR_USD": 1.5,
-    "GBP_USD": 2.5,
-    "USD_JPY": 2.0,
-}
-
-
-def _pip_size(pair: str) -> float:
-    return 0.01 if pair.endswith("JPY") else 0.0001
+from config.instruments import get_registry, pip_size
 
 
 def calculate_spread_pips(pair: str, bid: float, ask: float) -> float:
@@ -20,7 +12,7 @@ def calculate_spread_pips(pair: str, bid: float, ask: float) -> float:
     if ask <= bid:
         raise ValueError("ask must be greater than bid")
 
-    return (ask - bid) / _pip_size(pair)
+    return (ask - bid) / pip_size(pair)
 
 
 def is_spread_acceptable(
@@ -30,7 +22,10 @@ def is_spread_acceptable(
     max_spread_override: float | None = None,
 ) -> bool:
     """Return True when spread is below configured or overridden maximum."""
-    max_spread = max_spread_override if max_spread_override is not None else MAX_SPREAD_PIPS.get(pair)
+    if max_spread_override is not None:
+        max_spread = max_spread_override
+    else:
+        max_spread = get_registry().spec(pair).max_spread_pips
     if max_spread is None:
         return False
 
@@ -38,6 +33,14 @@ def is_spread_acceptable(
     return spread_pips <= max_spread
 
 
+def _parse_price(price: dict) -> tuple[float, float]:
+    bids = price.get("bids", [])
+    asks = price.get("asks", [])
+    if not bids or not asks:
+        raise ValueError("Pricing payload missing bids/asks")
+    return float(bids[0]["price"]), float(asks[0]["price"])
+
+
 def get_live_bid_ask(pair: str, client, account_id: str) -> tuple[float, float]:
     """Fetch best bid/ask from OANDA pricing endpoint."""
     from oandapyV20.endpoints.pricing import PricingInfo
@@ -49,18 +52,46 @@ def get_live_bid_ask(pair: str, client, account_id: str) -> tuple[float, float]:
     if not prices:
         raise ValueError("No pricing data returned from OANDA")
 
-    price = prices[0]
-    bids = price.get("bids", [])
-    asks = price.get("asks", [])
-    if not bids or not asks:
-        raise ValueError("Pricing payload missing bids/asks")
+    return _parse_price(prices[0])
+
+
+def get_live_bid_ask_many(pairs, client, account_id: str) -> dict[str, tuple[float, float, str]]:
+    """Fetch best bid/ask/time for every pair with one pricing request.
+
+    Pairs missing from the response (or returned without bids/asks) are left out of the
+    result; callers fall back to `get_live_bid_ask` for those.
+    """
+    from oandapyV20.endpoints.pricing import PricingInfo
 
-    bid = float(bids[0]["price"])
-    ask = float(asks[0]["price"])
-    return bid, ask
+    names = list(dict.fromkeys(pairs))
+    if not names:
+        return {}
+
+    endpoint = PricingInfo(accountID=account_id, params={"instruments": ",".join(names)})
+    response = client.request(endpoint)
+
+    quotes: dict[str, tuple[float, float, str]] = {}
+    for price in response.get("prices", []):
+        instrument = price.get("instrument")
+        if instrument not in names:
+            continue
+        try:
+            bid, ask = _parse_price(price)
+        except ValueError:
+            continue
+        quotes[instrument] = (bid, ask, str(price.get("time", "")))
+    return quotes
 
 
-def is_spread_acceptable_live(pair: str, client, account_id: str) -> bool:
-    """Return spread gate decision using live OANDA pricing."""
-    bid, ask = get_live_bid_ask(pair=pair, client=client, account_id=account_id)
+def is_spread_acceptable_live(
+    pair: str,
+    client,
+    account_id: str,
+    quote: tuple[float, float, str] | None = None,
+) -> bool:
+    """Return spread gate decision using live OANDA pricing (or a pre-fetched cycle quote)."""
+    if quote is None:
+        bid, ask = get_live_bid_ask(pair=pair, client=client, account_id=account_id)
+    else:
+        bid, ask = quote[0], quote[1]
     return is_spread_acceptable(pair=pair, bid=bid, ask=ask)
@@ -2,35 +2,58 @@
 
 from __future__ import annotations
 
+from typing import Any
+
+import numpy as np
 import pandas as pd
 
 
-def wilder_rma(series: pd.Series, period: int) -> pd.Series:
+def wilder_rma(series: pd.Series, period: int, state: dict[str, Any] | None = None) -> pd.Series:
     """Return Wilder's RMA for a series with optional warmup NaNs.
 
     The seed is the arithmetic mean of the first `period` non-NaN values.
     Values before the seed index are NaN.
+
+    With `state`, the series continues a previous call's (the last value, or the values
+    collected toward the seed) and the state is updated in place for the next chunk.
     """
     if period <= 0:
         raise ValueError("period must be a positive integer")
 
-    values = series.astype("float64")
-    result = pd.Series(index=values.index, dtype="float64")
-
-    valid_positions = [i for i, value in enumerate(values.tolist()) if pd.notna(value)]
-    if len(valid_positions) < period:
-        return result
-
-    seed_position = valid_positions[period - 1]
-    seed_window = [values.iloc[i] for i in valid_positions[:period]]
-    result.iloc[seed_position] = sum(seed_window) / period
-
-    for idx in range(seed_position + 1, len(values)):
-        current = values.iloc[idx]
-        prev = result.iloc[idx - 1]
-        if pd.isna(current):
-            result.iloc[idx] = prev
-        else:
-            result.iloc[idx] = ((period - 1) * prev + current) / period
-
-    return result
+    values = series.to_numpy(dtype="float64")
+    result = np.full(len(values), np.nan)
+    prev = state.get("prev", np.nan) if state else np.nan
+    seed = list(state.get("seed", [])) if state else []
+
+    for idx, current in enumerate(values.tolist()):
+        if prev != prev:  # not seeded yet
+            if current == current:
+                seed.append(current)
+                if len(seed) == period:
+                    prev = sum(seed) / period
+                    result[idx] = prev
+                    seed = []
+            continue
+        if current == current:
+            prev = ((period - 1) * prev + current) / period
+        result[idx] = prev
+
+    if state is not None:
+        state["prev"], state["seed"] = prev, seed
+    return pd.Series(result, index=series.index, dtype="float64")
+
+
+def carried_shift(series: pd.Series, state: dict[str, Any] | None, key: str) -> pd.Series:
+    """`series.shift(1)` whose first value is the previous chunk's last (kept in `state[key]`)."""
+    shifted = series.shift(1)
+    if state is not None:
+        if key in state and len(series):
+            shifted.iloc[0] = state[key]
+        if len(series):
+            state[key] = float(series.iloc[-1])
+    return shifted
+
+
+def substate(state: dict[str, Any] | None, key: str) -> dict[str, Any] | None:
+    """The nested state of one smoothed series (None when not streaming)."""
+    return None if state is None else state.setdefault(key, {})
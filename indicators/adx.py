@@ -2,21 +2,26 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import numpy as np
 import pandas as pd
 
-from indicators._wilder import wilder_rma
+from indicators._wilder import carried_shift, substate, wilder_rma
+
 
+def calculate_adx(df: pd.DataFrame, period: int = 14, state: dict[str, Any] | None = None) -> pd.DataFrame:
+    """Return DataFrame with ADX, +DI, and -DI columns.
 
-def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-    """Return DataFrame with ADX, +DI, and -DI columns."""
+    `state` (updated in place) carries the calculation across consecutive chunks of one series.
+    """
     if period <= 0:
         raise ValueError("period must be positive")
 
     out = df.copy()
 
-    up_move = out["high"].diff()
-    down_move = -out["low"].diff()
+    up_move = out["high"] - carried_shift(out["high"], state, "high")
+    down_move = -(out["low"] - carried_shift(out["low"], state, "low"))
 
     plus_dm = pd.Series(
         np.where((up_move > down_move) & (up_move > 0), up_move, 0.0),
@@ -29,7 +34,7 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         dtype="float64",
     )
 
-    prev_close = out["close"].shift(1)
+    prev_close = carried_shift(out["close"], state, "close")
     tr = pd.concat(
         [
             out["high"] - out["low"],
@@ -39,14 +44,14 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         axis=1,
     ).max(axis=1)
 
-    atr = wilder_rma(tr.fillna(0.0), period)
-    plus_dm_smoothed = wilder_rma(plus_dm, period)
-    minus_dm_smoothed = wilder_rma(minus_dm, period)
+    atr = wilder_rma(tr.fillna(0.0), period, substate(state, "tr"))
+    plus_dm_smoothed = wilder_rma(plus_dm, period, substate(state, "plus_dm"))
+    minus_dm_smoothed = wilder_rma(minus_dm, period, substate(state, "minus_dm"))
 
     out["plus_di"] = 100 * (plus_dm_smoothed / atr.replace(0.0, np.nan))
     out["minus_di"] = 100 * (minus_dm_smoothed / atr.replace(0.0, np.nan))
 
     di_sum = out["plus_di"] + out["minus_di"]
     dx = 100 * (out["plus_di"] - out["minus_di"]).abs() / di_sum.replace(0.0, np.nan)
-    out["adx"] = wilder_rma(dx, period)
+    out["adx"] = wilder_rma(dx, period, substate(state, "dx"))
     return out
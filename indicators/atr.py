@@ -2,18 +2,23 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import pandas as pd
 
-from indicators._wilder import wilder_rma
+from indicators._wilder import carried_shift, substate, wilder_rma
+
 
+def calculate_atr(df: pd.DataFrame, period: int = 14, state: dict[str, Any] | None = None) -> pd.DataFrame:
+    """Return DataFrame with ATR column.
 
-def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-    """Return DataFrame with ATR column."""
+    `state` (updated in place) carries the calculation across consecutive chunks of one series.
+    """
     if period <= 0:
         raise ValueError("period must be positive")
 
     out = df.copy()
-    prev_close = out["close"].shift(1)
+    prev_close = carried_shift(out["close"], state, "close")
     tr_components = pd.concat(
         [
             out["high"] - out["low"],
@@ -23,5 +28,5 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         axis=1,
     )
     tr = tr_components.max(axis=1)
-    out["atr"] = wilder_rma(tr.fillna(0.0), period)
+    out["atr"] = wilder_rma(tr.fillna(0.0), period, substate(state, "tr"))
     return out
@@ -2,20 +2,58 @@
 
 from __future__ import annotations
 
+from typing import Any
+
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _window_mean_std(close: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and population std of each full trailing window (NaN before the first).
+
+    Every window is summed in the same fixed order, so a value depends only on its own
+    `period` closes and chunked runs reproduce a single pass exactly.
+    """
+    mean = np.full(len(close), np.nan)
+    std = np.full(len(close), np.nan)
+    if len(close) < period:
+        return mean, std
+    windows = sliding_window_view(close, period)
+    total = windows[:, 0].copy()
+    for k in range(1, period):
+        total += windows[:, k]
+    mu = total / period
+    squares = np.zeros_like(mu)
+    for k in range(period):
+        deviation = windows[:, k] - mu
+        squares += deviation * deviation
+    mean[period - 1 :] = mu
+    std[period - 1 :] = np.sqrt(squares / period)
+    return mean, std
 
 
-def calculate_bollinger(df: pd.DataFrame, period: int = 20, std_mult: float = 2.0) -> pd.DataFrame:
+def calculate_bollinger(
+    df: pd.DataFrame, period: int = 20, std_mult: float = 2.0, state: dict[str, Any] | None = None
+) -> pd.DataFrame:
     """Return DataFrame with Bollinger Band columns.
 
     `bb_width` is defined as normalized width: `(bb_upper - bb_lower) / bb_mid`.
+    `state` (updated in place) keeps the last `period - 1` closes for the next chunk.
     """
     if period <= 0:
         raise ValueError("period must be positive")
 
     out = df.copy()
-    out["bb_mid"] = out["close"].rolling(window=period, min_periods=period).mean()
-    std = out["close"].rolling(window=period, min_periods=period).std(ddof=0)
+    close = out["close"].to_numpy(dtype=np.float64)
+    carried = np.asarray(state.get("closes", ()), dtype=np.float64) if state else np.empty(0)
+    series = np.concatenate([carried, close])
+    mean, std = _window_mean_std(series, period)
+    if state is not None:
+        state["closes"] = series[len(series) - (period - 1) :].tolist() if period > 1 else []
+
+    out["bb_mid"] = mean[len(carried) :]
+    std = std[len(carried) :]
     out["bb_upper"] = out["bb_mid"] + std_mult * std
     out["bb_lower"] = out["bb_mid"] - std_mult * std
     out["bb_width"] = (out["bb_upper"] - out["bb_lower"]) / out["bb_mid"]
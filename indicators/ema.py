@@ -2,20 +2,36 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import pandas as pd
 
+from indicators._wilder import carried_shift
+
+
+def _ewm(close: pd.Series, span: int, prev: float | None) -> pd.Series:
+    if prev is None:
+        return close.ewm(span=span, adjust=False).mean()
+    # Seeding the recursion with the previous chunk's last value continues it exactly.
+    seeded = pd.concat([pd.Series([prev]), close], ignore_index=True).ewm(span=span, adjust=False).mean()
+    return pd.Series(seeded.to_numpy()[1:], index=close.index)
+
+
+def calculate_ema(df: pd.DataFrame, fast: int = 9, slow: int = 21, state: dict[str, Any] | None = None) -> pd.DataFrame:
+    """Return EMA crossover columns using close prices.
 
-def calculate_ema(df: pd.DataFrame, fast: int = 9, slow: int = 21) -> pd.DataFrame:
-    """Return EMA crossover columns using close prices."""
+    `state` (updated in place) carries the calculation across consecutive chunks of one series.
+    """
     if fast <= 0 or slow <= 0:
         raise ValueError("fast and slow periods must be positive")
 
     out = df.copy()
-    out["ema_fast"] = out["close"].ewm(span=fast, adjust=False).mean()
-    out["ema_slow"] = out["close"].ewm(span=slow, adjust=False).mean()
+    state_in = state or {}
+    out["ema_fast"] = _ewm(out["close"], fast, state_in.get("ema_fast"))
+    out["ema_slow"] = _ewm(out["close"], slow, state_in.get("ema_slow"))
 
-    prev_fast = out["ema_fast"].shift(1)
-    prev_slow = out["ema_slow"].shift(1)
+    prev_fast = carried_shift(out["ema_fast"], state, "ema_fast")
+    prev_slow = carried_shift(out["ema_slow"], state, "ema_slow")
 
     out["cross_up"] = (out["ema_fast"] > out["ema_slow"]) & (prev_fast <= prev_slow)
     out["cross_down"] = (out["ema_fast"] < out["ema_slow"]) & (prev_fast >= prev_slow)
@@ -0,0 +1,162 @@
+"""Feature plans: the indicator columns a strategy needs and how many bars they take.
+
+Each strategy module declares what it reads::
+
+    LOOKBACK = 200                        # trailing rows get_signal's gate and signal logic read
+
+    def required_features(params=None):   # indicators get_signal computes
+        return [feature("atr"), feature("adx"), feature("rsi", period=3), feature("vwap")]
+
+`resolve_plan` merges the declarations of one or more strategies into a `FeaturePlan`: the
+deduplicated indicators, in a fixed order; `rows`, the strategy's LOOKBACK; and `lookback`,
+the candles to fetch so that each of those rows carries settled indicator values
+(rows + the longest warmup - 1). Backtests compute only the planned columns
+(`FeaturePlan.apply`) over the full history; live code fetches `FeaturePlan.fetch_count()`
+candles, which sizes the VWAP share from the time of day and is at most `lookback` + 1.
+
+Warmup per indicator: a Wilder series (ATR, RSI, ADX's smoothing) is seeded after `period`
+bars and then needs SETTLE_PERIODS more periods before the seed's weight, (1 - 1/period) per
+bar, is below 0.1%; ADX seeds twice. An EMA settles over SETTLE_PERIODS slow spans and
+Bollinger bands need one full window. VWAP accumulates from the first bar of the UTC day it
+is given, so it needs the bars back to the session start of the oldest row read: a full day
+of bars at TIMEFRAME in the worst case (`lookback`), fewer later in the day (`fetch_count`).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from config.settings import TIMEFRAME
+from data.history import GRANULARITY_SECONDS
+from indicators.adx import calculate_adx
+from indicators.atr import calculate_atr
+from indicators.bollinger import calculate_bollinger
+from indicators.ema import calculate_ema
+from indicators.rsi import calculate_rsi
+from indicators.vwap import calculate_vwap
+
+SETTLE_PERIODS = 7
+SESSION_BARS = 86_400 // GRANULARITY_SECONDS[TIMEFRAME]
+
+
+@dataclass(frozen=True)
+class _Indicator:
+    calculate: Callable[..., pd.DataFrame]
+    defaults: dict[str, Any]
+    warmup: Callable[..., int]
+    stateful: bool = True
+    daily: bool = False  # resets at the UTC day start; `warmup` is the worst case
+
+
+# Application order; a plan over every indicator yields the columns of `calculate_*` run in this order.
+INDICATORS: dict[str, _Indicator] = {
+    "atr": _Indicator(calculate_atr, {"period": 14}, lambda period: (SETTLE_PERIODS + 1) * period),
+    "adx": _Indicator(calculate_adx, {"period": 14}, lambda period: (SETTLE_PERIODS + 2) * period),
+    "ema": _Indicator(calculate_ema, {"fast": 9, "slow": 21}, lambda fast, slow: SETTLE_PERIODS * max(fast, slow)),
+    "vwap": _Indicator(calculate_vwap, {}, lambda: SESSION_BARS, stateful=False, daily=True),
+    "rsi": _Indicator(calculate_rsi, {"period": 3}, lambda period: (SETTLE_PERIODS + 1) * period),
+    "bollinger": _Indicator(calculate_bollinger, {"period": 20, "std_mult": 2.0}, lambda period, std_mult: period),
+}
+
+
+@dataclass(frozen=True)
+class Feature:
+    """One indicator with its full parameter set (defaults filled in)."""
+
+    name: str
+    params: tuple[tuple[str, Any], ...] = ()
+
+    @property
+    def warmup(self) -> int:
+        """Bars before a value matches the full-history one (to within the settle tolerance)."""
+        return int(INDICATORS[self.name].warmup(**dict(self.params)))
+
+
+def feature(name: str, **params: Any) -> Feature:
+    """`Feature` for indicator `name`; unspecified parameters take the calculator's defaults."""
+    indicator = INDICATORS.get(name)
+    if indicator is None:
+        raise ValueError(f"unknown indicator '{name}'")
+    unknown = set(params).difference(indicator.defaults)
+    if unknown:
+        raise ValueError(f"unknown parameters for {name}: {sorted(unknown)}")
+    return Feature(name, tuple(sorted({**indicator.defaults, **params}.items())))
+
+
+@dataclass(frozen=True)
+class FeaturePlan:
+    features: tuple[Feature, ...]
+    rows: int
+    lookback: int
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(f.name for f in self.features)
+
+    def apply(self, df: pd.DataFrame, state: dict[str, dict] | None = None) -> pd.DataFrame:
+        """`df` with the planned indicator columns.
+
+        With `state` (updated in place, one entry per indicator), consecutive chunks of one
+        series produce exactly the columns of a single pass; chunks must start at a UTC day
+        boundary, where VWAP resets.
+        """
+        out = df.copy()
+        if not pd.api.types.is_datetime64_any_dtype(out["time"]):
+            out["time"] = pd.to_datetime(out["time"], utc=True)
+        for spec in self.features:
+            indicator = INDICATORS[spec.name]
+            kwargs = dict(spec.params)
+            if indicator.stateful and state is not None:
+                kwargs["state"] = state.setdefault(spec.name, {})
+            out = indicator.calculate(out, **kwargs)
+        return out
+
+    def fetch_count(self, now: pd.Timestamp | None = None) -> int:
+        """Candles to request from `data.fetcher.get_candles` at wall-clock `now` (default: now).
+
+        The count covers the in-progress candle, which the fetcher drops, and `rows` settled
+        complete bars. A daily indicator only needs the bars since the UTC day start of the
+        oldest of those rows, so its share shrinks as the day goes on.
+        """
+        fixed = max([1, *(spec.warmup for spec in self.features if not INDICATORS[spec.name].daily)])
+        needed = self.rows + fixed - 1
+        if any(INDICATORS[spec.name].daily for spec in self.features):
+            now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+            now = now.tz_localize("UTC") if now.tzinfo is None else now.tz_convert("UTC")
+            bar = pd.Timedelta(seconds=86_400 // SESSION_BARS)
+            newest = now.floor(bar) - bar
+            index = (newest - newest.normalize()) // bar  # position of the newest complete bar in its day
+            needed = max(needed, self.rows + (index + 1 - self.rows) % SESSION_BARS)
+        return needed + 1
+
+
+def build_plan(features: Iterable[Feature], rows: int = 1) -> FeaturePlan:
+    """Plan over `features` whose last `rows` rows all carry settled values.
+
+    Raises ValueError when one indicator is requested with two parameter sets (they would
+    write the same columns).
+    """
+    chosen: dict[str, Feature] = {}
+    for spec in features:
+        previous = chosen.setdefault(spec.name, spec)
+        if previous != spec:
+            raise ValueError(f"conflicting parameters for {spec.name}: {dict(previous.params)} vs {dict(spec.params)}")
+    ordered = tuple(chosen[name] for name in INDICATORS if name in chosen)
+    rows = max(int(rows), 1)
+    return FeaturePlan(ordered, rows, rows + max([1, *(spec.warmup for spec in ordered)]) - 1)
+
+
+def resolve_plan(*strategies, params: dict[str, float] | None = None) -> FeaturePlan:
+    """Merged plan of strategy modules declaring `LOOKBACK` and `required_features(params)`."""
+    features: list[Feature] = []
+    rows = 1
+    for module in strategies:
+        features.extend(module.required_features(params))
+        rows = max(rows, int(module.LOOKBACK))
+    return build_plan(features, rows)
+
+
+FULL_PLAN = build_plan(feature(name) for name in INDICATORS)
@@ -2,24 +2,29 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import numpy as np
 import pandas as pd
 
-from indicators._wilder import wilder_rma
+from indicators._wilder import carried_shift, substate, wilder_rma
+
 
+def calculate_rsi(df: pd.DataFrame, period: int = 3, state: dict[str, Any] | None = None) -> pd.DataFrame:
+    """Return DataFrame with RSI values in [0, 100].
 
-def calculate_rsi(df: pd.DataFrame, period: int = 3) -> pd.DataFrame:
-    """Return DataFrame with RSI values in [0, 100]."""
+    `state` (updated in place) carries the calculation across consecutive chunks of one series.
+    """
     if period <= 0:
         raise ValueError("period must be positive")
 
     out = df.copy()
-    delta = out["close"].diff()
+    delta = out["close"] - carried_shift(out["close"], state, "close")
     gains = delta.clip(lower=0.0)
     losses = (-delta).clip(lower=0.0)
 
-    avg_gain = wilder_rma(gains.fillna(0.0), period)
-    avg_loss = wilder_rma(losses.fillna(0.0), period)
+    avg_gain = wilder_rma(gains.fillna(0.0), period, substate(state, "gain"))
+    avg_loss = wilder_rma(losses.fillna(0.0), period, substate(state, "loss"))
 
     rs = avg_gain / avg_loss.replace(0.0, np.nan)
     out["rsi"] = 100 - (100 / (1 + rs))
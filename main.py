@@ -2,17 +2,20 @@
 
 from __future__ import annotations
 
+import sqlite3
 import time
 from datetime import datetime, timezone
 
-from config.pairs import PAIR_STRATEGY_MAP
+from config.instruments import get_registry, reload_registry
 from config.settings import (
     DRY_RUN,
     OANDA_ACCOUNT_ID,
     TIMEFRAME,
     validate_settings,
 )
+from data.broker_gateway import begin_cycle, gateway_stats
 from data.fetcher import get_candles, get_oanda_client
+from data.oanda_client import close_shared_clients
 from execution.order_manager import can_open_new_position, place_market_order
 from execution.risk_manager import (
     MAX_OPEN_POSITIONS_TOTAL,
@@ -21,9 +24,11 @@ from execution.risk_manager import (
     get_instrument_specs,
     is_within_daily_limit,
 )
-from filters.spread_filter import get_live_bid_ask
+from filters.spread_filter import get_live_bid_ask, get_live_bid_ask_many
 from indicators.atr import calculate_atr
 from execution.logging_utils import setup_rotating_logger
+from storage.pool import get_pool
+from storage.retention import maybe_run_retention
 from strategies import bb_breakout, ema_vwap, vwap_rsi
 
 STRATEGY_FN = {
@@ -52,9 +57,13 @@ def seconds_until_next_candle(timeframe_minutes: int = 5) -> float:
 
 def execute_cycle(client, account_id: str, logger: logging.Logger) -> None:
     """Execute one scan-trade cycle across configured pairs."""
-    for pair, strategy_name in PAIR_STRATEGY_MAP.items():
+    begin_cycle(client)
+    pair_map = get_registry().strategy_map()
+    quotes = get_live_bid_ask_many(pair_map, client, account_id)
+    for pair, strategy_name in pair_map.items():
         signal_fn = STRATEGY_FN[strategy_name]
-        direction = signal_fn(client, account_id)
+        quote = quotes.get(pair)
+        direction = signal_fn(client, account_id, pair=pair, quote=quote)
         if direction == "HOLD":
             continue
 
@@ -68,7 +77,7 @@ def execute_cycle(client, account_id: str, logger: logging.Logger) -> None:
             logger.info("SKIP %s %s: daily loss limit reached", pair, strategy_name)
             continue
 
-        bid, ask = get_live_bid_ask(pair, client, account_id)
+        bid, ask = quote[:2] if quote is not None else get_live_bid_ask(pair, client, account_id)
         entry_price = ask if direction == "BUY" else bid
 
         df = get_candles(pair, TIMEFRAME, count=150)
@@ -114,20 +123,42 @@ def execute_cycle(client, account_id: str, logger: logging.Logger) -> None:
         )
         logger.info("ORDER %s %s placed: %s", pair, direction, response)
 
+    stats = gateway_stats(client)
+    if stats is not None:
+        logger.info("BROKER_CALLS %s", stats)
+
+
+def run_due_retention(logger: logging.Logger) -> None:
+    """Roll up and prune old telemetry, at most once per `RETENTION_INTERVAL_SEC`."""
+    try:
+        with get_pool().writer() as conn:
+            result = maybe_run_retention(conn)
+    except sqlite3.Error:
+        logger.exception("RETENTION failed; retrying after the next interval")
+        return
+    if result is not None:
+        logger.info("RETENTION %s", result)
+
 
 def run() -> None:
     """Run a candle-synced execution loop."""
     logger = setup_logging()
     validate_settings()
     client = get_oanda_client()
-
-    logger.info("Phase 5 engine started. DRY_RUN=%s", DRY_RUN)
-
-    while True:
-        wait_seconds = seconds_until_next_candle(timeframe_minutes=5)
-        logger.info("Waiting %.1f seconds for next candle close.", wait_seconds)
-        time.sleep(wait_seconds)
-        execute_cycle(client, OANDA_ACCOUNT_ID, logger)
+    with get_pool().reader() as conn:
+        registry = reload_registry(conn)
+
+    logger.info("Phase 5 engine started. DRY_RUN=%s instruments=%s", DRY_RUN, registry.names())
+
+    try:
+        while True:
+            wait_seconds = seconds_until_next_candle(timeframe_minutes=5)
+            logger.info("Waiting %.1f seconds for next candle close.", wait_seconds)
+            time.sleep(wait_seconds)
+            execute_cycle(client, OANDA_ACCOUNT_ID, logger)
+            run_due_retention(logger)
+    finally:
+        close_shared_clients()
 
 
 if __name__ == "__main__":
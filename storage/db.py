@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from storage.migrations import migrate
+
 DB_ENV_VAR = "SCALP_BOT_DB_PATH"
 DEFAULT_DB_PATH = Path("storage/scalp_bot.sqlite")
 
@@ -43,225 +45,14 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
-    return {str(row[1]) for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
-
-
-def _ensure_table(conn: sqlite3.Connection, name: str, ddl: str) -> None:
-    conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({ddl})")
-
-
-def _ensure_column(conn: sqlite3.Connection, table: str, column_ddl: str) -> None:
-    """
-    Add a column if missing.
-
-    Notes:
-    - SQLite supports ADD COLUMN with limited constraint support.
-    - Avoid adding NOT NULL without DEFAULT to existing tables.
-    """
-    col_name = column_ddl.strip().split()[0]
-    cols = _table_columns(conn, table)
-    if col_name not in cols:
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_ddl}")
-
-
 def init_db(conn: sqlite3.Connection) -> None:
     """
-    Create storage tables and indexes if they do not already exist.
+    Bring the schema up to date via versioned migrations (see storage/migrations.py).
 
-    IMPORTANT:
-    - Migrations must run BEFORE creating indexes that reference new columns.
-    - This function is safe to call repeatedly.
+    A database already at the latest version costs a single `PRAGMA user_version` read.
+    This function is safe to call repeatedly.
     """
-    # --- Core tables (no indexes that depend on future migrations) ---
-    conn.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS bot_status (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            mode TEXT NOT NULL,
-            version TEXT,
-            uptime_s INTEGER,
-            last_cycle_ts_utc TEXT,
-            paused_pairs_json TEXT,
-            meta_json TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS bot_runtime (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            last_heartbeat_at TEXT,
-            last_restart_at TEXT,
-            startup_time_utc TEXT,
-            handled_by TEXT,
-            version TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS gate_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            pair TEXT NOT NULL,
-            strategy TEXT NOT NULL,
-            session_ok INTEGER NOT NULL,
-            spread_ok INTEGER NOT NULL,
-            news_ok INTEGER NOT NULL,
-            open_pos_ok INTEGER NOT NULL,
-            daily_ok INTEGER NOT NULL,
-            enemy_ok INTEGER NOT NULL,
-            final_signal TEXT NOT NULL,
-            reason TEXT,
-            details_json TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS errors (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            component TEXT NOT NULL,
-            message TEXT NOT NULL,
-            details_json TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS commands (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_ts_utc TEXT NOT NULL,
-            actor TEXT NOT NULL,
-            type TEXT NOT NULL,
-            payload_json TEXT,
-            idempotency_key TEXT,
-            status TEXT NOT NULL,
-            started_ts_utc TEXT,
-            finished_ts_utc TEXT,
-            result_json TEXT,
-            handled_by TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS audit_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            actor TEXT NOT NULL,
-            action TEXT NOT NULL,
-            command_id INTEGER,
-            details_json TEXT
-        );
-
-        -- Positions table: create if missing (schema aligned to api/routes/positions.py)
-        CREATE TABLE IF NOT EXISTS positions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pair TEXT NOT NULL,
-            strategy TEXT,
-            direction TEXT,
-            units REAL,
-            entry_price REAL,
-            sl_price REAL,
-            tp_price REAL,
-            time_open_utc TEXT,
-            is_open INTEGER NOT NULL DEFAULT 1,
-            meta_json TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL,
-            created_ts_utc TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS app_settings (
-            key TEXT PRIMARY KEY,
-            value_json TEXT NOT NULL,
-            updated_ts_utc TEXT NOT NULL,
-            updated_by TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS strategy_params (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            strategy_name TEXT NOT NULL,
-            profile TEXT NOT NULL,
-            params_json TEXT NOT NULL,
-            is_active INTEGER NOT NULL DEFAULT 0,
-            updated_ts_utc TEXT NOT NULL,
-            updated_by TEXT NOT NULL,
-            UNIQUE(strategy_name, profile)
-        );
-        """
-    )
-
-    # --- Migrations (add missing columns safely) ---
-    _ensure_column(conn, "commands", "handled_by TEXT")
-
-    # positions columns required by /positions route
-    _ensure_column(conn, "positions", "direction TEXT")
-    _ensure_column(conn, "positions", "strategy TEXT")
-    _ensure_column(conn, "positions", "sl_price REAL")
-    _ensure_column(conn, "positions", "tp_price REAL")
-    _ensure_column(conn, "positions", "units REAL")
-    _ensure_column(conn, "positions", "entry_price REAL")
-    _ensure_column(conn, "positions", "time_open_utc TEXT")
-    _ensure_column(conn, "positions", "is_open INTEGER NOT NULL DEFAULT 1")
-    _ensure_column(conn, "positions", "meta_json TEXT")
-
-    conn.commit()
-
-    from storage.strategy_params import seed_defaults
-
-    seed_defaults(conn)
-
-    # --- Indexes (safe after migrations) ---
-    conn.executescript(
-        """
-        CREATE INDEX IF NOT EXISTS idx_gate_snapshots_ts_utc
-        ON gate_snapshots(ts_utc);
-
-        CREATE INDEX IF NOT EXISTS idx_gate_snapshots_pair_ts_utc
-        ON gate_snapshots(pair, ts_utc);
-
-        CREATE INDEX IF NOT EXISTS idx_bot_status_ts_utc
-        ON bot_status(ts_utc);
-
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_commands_idempotency_key
-        ON commands(idempotency_key)
-        WHERE idempotency_key IS NOT NULL;
-
-        CREATE INDEX IF NOT EXISTS idx_commands_status_created_ts
-        ON commands(status, created_ts_utc);
-
-        CREATE INDEX IF NOT EXISTS idx_audit_log_ts_utc
-        ON audit_log(ts_utc);
-
-        CREATE INDEX IF NOT EXISTS idx_audit_log_command_id
-        ON audit_log(command_id);
-
-        CREATE INDEX IF NOT EXISTS idx_users_username
-        ON users(username);
-
-        CREATE INDEX IF NOT EXISTS idx_strategy_params_strategy
-        ON strategy_params(strategy_name);
-
-        CREATE INDEX IF NOT EXISTS idx_strategy_params_active
-        ON strategy_params(strategy_name, is_active);
-        """
-    )
-
-    # Positions indexes: only create those whose columns exist (defensive)
-    pos_cols = _table_columns(conn, "positions")
-
-    if "time_open_utc" in pos_cols:
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_positions_time_open_utc ON positions(time_open_utc)"
-        )
-
-    if "pair" in pos_cols and "time_open_utc" in pos_cols:
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_positions_pair_time_open_utc ON positions(pair, time_open_utc)"
-        )
-
-    if "is_open" in pos_cols and "time_open_utc" in pos_cols:
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_positions_is_open_time_open_utc ON positions(is_open, time_open_utc)"
-        )
-
-    conn.commit()
-
+    migrate(conn)
 
 
 def ping(conn: sqlite3.Connection) -> bool:
@@ -0,0 +1,432 @@
+"""
+Versioned, idempotent schema migrations keyed on `PRAGMA user_version`.
+
+A warm database costs a single PRAGMA read at startup. Each step runs in its own
+IMMEDIATE transaction together with the `user_version` bump, so concurrent starters
+(API + bot) serialize on the write lock and never apply a step twice.
+
+Rules for new steps:
+- Append only; never edit or reorder a step that has shipped.
+- Steps must be idempotent (`IF NOT EXISTS`, column probes) because databases created
+  before versioning existed start at version 0 with most objects already present.
+- Use `conn.execute` only. `executescript` commits implicitly and would break atomicity.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {str(row[1]) for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column_ddl: str) -> None:
+    """
+    Add a column if missing.
+
+    Notes:
+    - SQLite supports ADD COLUMN with limited constraint support.
+    - Avoid adding NOT NULL without DEFAULT to existing tables.
+    """
+    col_name = column_ddl.strip().split()[0]
+    if col_name not in _table_columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_ddl}")
+
+
+def _run_all(conn: sqlite3.Connection, statements: list[str]) -> None:
+    for statement in statements:
+        conn.execute(statement)
+
+
+# Single source of truth for the open-positions table shared by the dashboard API
+# (`/positions`) and `execution.trade_store.TradeStore` (one row per open pair).
+POSITIONS_DDL = """
+CREATE TABLE IF NOT EXISTS positions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pair TEXT NOT NULL UNIQUE,
+    strategy TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    entry_price REAL NOT NULL,
+    sl_price REAL NOT NULL,
+    tp_price REAL NOT NULL,
+    time_open_utc TEXT NOT NULL,
+    is_open INTEGER NOT NULL DEFAULT 1,
+    meta_json TEXT
+)
+"""
+
+
+TRADES_DDL = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time_open_utc TEXT NOT NULL,
+    time_close_utc TEXT,
+    pair TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL,
+    sl_price REAL NOT NULL,
+    tp_price REAL NOT NULL,
+    result TEXT,
+    pnl_pips REAL,
+    pnl_quote REAL,
+    meta_json TEXT
+)
+"""
+
+
+def _m001_core_tables(conn: sqlite3.Connection) -> None:
+    _run_all(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS bot_status (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                version TEXT,
+                uptime_s INTEGER,
+                last_cycle_ts_utc TEXT,
+                paused_pairs_json TEXT,
+                meta_json TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bot_runtime (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_heartbeat_at TEXT,
+                last_restart_at TEXT,
+                startup_time_utc TEXT,
+                handled_by TEXT,
+                version TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS gate_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                pair TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                session_ok INTEGER NOT NULL,
+                spread_ok INTEGER NOT NULL,
+                news_ok INTEGER NOT NULL,
+                open_pos_ok INTEGER NOT NULL,
+                daily_ok INTEGER NOT NULL,
+                enemy_ok INTEGER NOT NULL,
+                final_signal TEXT NOT NULL,
+                reason TEXT,
+                details_json TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS errors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                component TEXT NOT NULL,
+                message TEXT NOT NULL,
+                details_json TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS commands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_ts_utc TEXT NOT NULL,
+                actor TEXT NOT NULL,
+                type TEXT NOT NULL,
+                payload_json TEXT,
+                idempotency_key TEXT,
+                status TEXT NOT NULL,
+                started_ts_utc TEXT,
+                finished_ts_utc TEXT,
+                result_json TEXT,
+                handled_by TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                actor TEXT NOT NULL,
+                action TEXT NOT NULL,
+                command_id INTEGER,
+                details_json TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                role TEXT NOT NULL,
+                created_ts_utc TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS app_settings (
+                key TEXT PRIMARY KEY,
+                value_json TEXT NOT NULL,
+                updated_ts_utc TEXT NOT NULL,
+                updated_by TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS strategy_params (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                strategy_name TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                params_json TEXT NOT NULL,
+                is_active INTEGER NOT NULL DEFAULT 0,
+                updated_ts_utc TEXT NOT NULL,
+                updated_by TEXT NOT NULL,
+                UNIQUE(strategy_name, profile)
+            )
+            """,
+        ],
+    )
+    # Pre-versioning databases may predate this column.
+    _ensure_column(conn, "commands", "handled_by TEXT")
+
+    _run_all(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_gate_snapshots_ts_utc ON gate_snapshots(ts_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_gate_snapshots_pair_ts_utc ON gate_snapshots(pair, ts_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_bot_status_ts_utc ON bot_status(ts_utc)",
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_commands_idempotency_key
+            ON commands(idempotency_key)
+            WHERE idempotency_key IS NOT NULL
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_commands_status_created_ts ON commands(status, created_ts_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_audit_log_ts_utc ON audit_log(ts_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_audit_log_command_id ON audit_log(command_id)",
+            "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
+            "CREATE INDEX IF NOT EXISTS idx_strategy_params_strategy ON strategy_params(strategy_name)",
+            "CREATE INDEX IF NOT EXISTS idx_strategy_params_active ON strategy_params(strategy_name, is_active)",
+        ],
+    )
+
+
+def _rebuild_legacy_trades(conn: sqlite3.Connection) -> None:
+    """Convert the early dashboard trades shape (ts_utc/side/price) into the TradeStore shape."""
+    conn.execute("ALTER TABLE trades RENAME TO trades_legacy")
+    conn.execute(TRADES_DDL)
+    conn.execute(
+        """
+        INSERT INTO trades (
+            id, time_open_utc, pair, strategy, direction, units, entry_price, sl_price, tp_price, meta_json
+        )
+        SELECT
+            id,
+            ts_utc,
+            pair,
+            '',
+            COALESCE(UPPER(side), ''),
+            CAST(COALESCE(units, 0) AS INTEGER),
+            COALESCE(price, 0.0),
+            0.0,
+            0.0,
+            json_patch(
+                COALESCE(meta_json, '{}'),
+                json_object('mode', mode, 'command_id', command_id, 'position_id', position_id)
+            )
+        FROM trades_legacy
+        """
+    )
+    conn.execute("DROP TABLE trades_legacy")
+
+
+def _m002_paper_trading_tables(conn: sqlite3.Connection) -> None:
+    trade_columns = _table_columns(conn, "trades")
+    if trade_columns and "time_open_utc" not in trade_columns:
+        _rebuild_legacy_trades(conn)
+
+    _run_all(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS signals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                time_utc TEXT NOT NULL,
+                pair TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                session_gate INTEGER NOT NULL,
+                spread_gate INTEGER NOT NULL,
+                news_gate INTEGER NOT NULL,
+                open_pos_gate INTEGER NOT NULL,
+                daily_loss_gate INTEGER NOT NULL,
+                enemy_gate INTEGER NOT NULL,
+                signal TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                meta_json TEXT
+            )
+            """,
+            TRADES_DDL,
+            """
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                date_utc TEXT PRIMARY KEY,
+                start_balance REAL NOT NULL,
+                current_balance REAL NOT NULL,
+                realized_pnl REAL NOT NULL,
+                halted INTEGER NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_trades_pair_open ON trades(pair, time_close_utc)",
+        ],
+    )
+
+
+def _m003_unify_positions(conn: sqlite3.Connection) -> None:
+    """
+    Rebuild `positions` into the shared schema.
+
+    Older files carry either the dashboard shape (autoincrement id, nullable columns,
+    duplicates per pair possible) or the TradeStore shape (pair primary key, no id or
+    meta_json). Both are copied into the canonical table keeping the newest row per pair.
+    """
+    existing = _table_columns(conn, "positions")
+    if not existing:
+        conn.execute(POSITIONS_DDL)
+    else:
+        def col(name: str, fallback: str) -> str:
+            return name if name in existing else fallback
+
+        conn.execute(POSITIONS_DDL.replace("IF NOT EXISTS positions", "positions_unified"))
+        conn.execute(
+            f"""
+            INSERT INTO positions_unified (
+                pair, strategy, direction, units, entry_price, sl_price, tp_price,
+                time_open_utc, is_open, meta_json
+            )
+            SELECT
+                pair,
+                COALESCE({col('strategy', 'NULL')}, ''),
+                COALESCE({col('direction', 'NULL')}, ''),
+                COALESCE({col('units', 'NULL')}, 0),
+                COALESCE({col('entry_price', 'NULL')}, 0.0),
+                COALESCE({col('sl_price', 'NULL')}, 0.0),
+                COALESCE({col('tp_price', 'NULL')}, 0.0),
+                COALESCE({col('time_open_utc', 'NULL')}, ''),
+                COALESCE({col('is_open', 'NULL')}, 1),
+                {col('meta_json', 'NULL')}
+            FROM positions
+            WHERE pair IS NOT NULL
+              AND rowid IN (SELECT MAX(rowid) FROM positions GROUP BY pair)
+            """
+        )
+        conn.execute("DROP TABLE positions")
+        conn.execute("ALTER TABLE positions_unified RENAME TO positions")
+
+    _run_all(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_positions_time_open_utc ON positions(time_open_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_positions_is_open_time_open_utc ON positions(is_open, time_open_utc)",
+        ],
+    )
+
+
+def _m004_seed_strategy_params(conn: sqlite3.Connection) -> None:
+    from storage.strategy_params import seed_defaults
+
+    seed_defaults(conn, commit=False)
+
+
+def _m005_telemetry_rollups(conn: sqlite3.Connection) -> None:
+    # Retention rollups: hourly/daily aggregates of pruned raw telemetry (storage/retention.py)
+    _run_all(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS gate_snapshot_rollups (
+                granularity TEXT NOT NULL,
+                bucket_ts_utc TEXT NOT NULL,
+                pair TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                samples INTEGER NOT NULL,
+                session_ok_count INTEGER NOT NULL,
+                spread_ok_count INTEGER NOT NULL,
+                news_ok_count INTEGER NOT NULL,
+                open_pos_ok_count INTEGER NOT NULL,
+                daily_ok_count INTEGER NOT NULL,
+                enemy_ok_count INTEGER NOT NULL,
+                all_ok_count INTEGER NOT NULL,
+                buy_count INTEGER NOT NULL,
+                sell_count INTEGER NOT NULL,
+                hold_count INTEGER NOT NULL,
+                PRIMARY KEY (granularity, bucket_ts_utc, pair, strategy)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bot_status_rollups (
+                granularity TEXT NOT NULL,
+                bucket_ts_utc TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                heartbeats INTEGER NOT NULL,
+                first_ts_utc TEXT NOT NULL,
+                last_ts_utc TEXT NOT NULL,
+                max_uptime_s INTEGER,
+                PRIMARY KEY (granularity, bucket_ts_utc, mode)
+            )
+            """,
+        ],
+    )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "core_tables", _m001_core_tables),
+    Migration(2, "paper_trading_tables", _m002_paper_trading_tables),
+    Migration(3, "unify_positions", _m003_unify_positions),
+    Migration(4, "seed_strategy_params", _m004_seed_strategy_params),
+    Migration(5, "telemetry_rollups", _m005_telemetry_rollups),
+)
+
+LATEST_VERSION: int = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection, *, target: int = LATEST_VERSION) -> int:
+    """Apply pending migrations up to `target` and return the resulting schema version."""
+    current = get_schema_version(conn)
+    if current >= target:
+        return current
+
+    conn.commit()
+    if current == 0:
+        # Only takes effect on a brand-new file; existing DBs opt in via
+        # storage.retention.enable_incremental_vacuum (requires a one-off VACUUM).
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another process may have migrated meanwhile.
+            if get_schema_version(conn) >= migration.version:
+                conn.rollback()
+                continue
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return get_schema_version(conn)
@@ -0,0 +1,142 @@
+"""
+Process-wide SQLite connection pool: many read-only handles plus one serialized writer.
+
+Every handle is opened and tuned once (WAL, synchronous=NORMAL, cache/mmap sizing,
+busy_timeout) instead of per request. In WAL mode readers never wait on the writer,
+so dashboard reads keep flowing while the bot process writes telemetry.
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from config.settings import (
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KIB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_POOL_READERS,
+)
+from storage.db import get_db_path
+
+
+def _configure(conn: sqlite3.Connection, *, read_only: bool) -> sqlite3.Connection:
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = {-int(SQLITE_CACHE_SIZE_KIB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool bound to one database file."""
+
+    def __init__(self, db_path: Path, *, max_readers: int = SQLITE_POOL_READERS) -> None:
+        if max_readers <= 0:
+            raise ValueError("max_readers must be positive")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_readers = max_readers
+        self._timeout_s = SQLITE_BUSY_TIMEOUT_MS / 1000.0
+
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created_readers = 0
+        self._readers_lock = threading.Lock()
+        self._all_readers: list[sqlite3.Connection] = []
+
+        # A plain Lock (not RLock): FastAPI may enter and exit a dependency in different threads.
+        self._writer_lock = threading.Lock()
+        self._writer = _configure(self._open(), read_only=False)
+        # journal_mode is persistent in the file; set it once from the writer.
+        self._writer.execute("PRAGMA journal_mode = WAL").fetchone()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._readers_lock:
+            if self._created_readers < self.max_readers:
+                conn = _configure(self._open(), read_only=True)
+                self._created_readers += 1
+                self._all_readers.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self._timeout_s)
+        except queue.Empty as exc:
+            raise sqlite3.OperationalError("timed out waiting for a pooled read connection") from exc
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection (`PRAGMA query_only`)."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the single writer connection; uncommitted work is rolled back on release."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+        if not self._writer_lock.acquire(timeout=self._timeout_s):
+            raise sqlite3.OperationalError("timed out waiting for the pooled writer connection")
+        try:
+            yield self._writer
+        finally:
+            try:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+            finally:
+                self._writer_lock.release()
+
+    def close(self) -> None:
+        self._closed = True
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+            self._created_readers = 0
+        with self._writer_lock:
+            self._writer.close()
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: Path | None = None) -> ConnectionPool:
+    """Return the shared pool for `db_path` (defaults to the configured DB path)."""
+    key = str(Path(db_path or get_db_path()).resolve())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(Path(key))
+            _POOLS[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,276 @@
+"""Retention, downsampling and rollups for high-volume telemetry tables.
+
+`gate_snapshots` and `bot_status` grow by one row per pair per cycle and one row per
+heartbeat. Raw rows older than the retention window are folded into hourly and daily
+aggregates and then deleted in bounded batches. Every batch is rolled up and deleted
+inside one short transaction, so a crash can never double-count, and the write lock
+is released between batches so the bot and API writers are never blocked for long.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from config.settings import (
+    RETENTION_BATCH_SIZE,
+    RETENTION_HOURLY_DAYS,
+    RETENTION_INTERVAL_SEC,
+    RETENTION_RAW_DAYS,
+    RETENTION_VACUUM_PAGES,
+)
+from storage.db import connect, init_db
+
+GRANULARITY_BUCKETS: dict[str, str] = {
+    "hour": "%Y-%m-%dT%H:00:00+00:00",
+    "day": "%Y-%m-%dT00:00:00+00:00",
+}
+
+_LAST_RUN_BY_DB: dict[str, float] = {}
+
+
+@dataclass(frozen=True)
+class RetentionResult:
+    gate_snapshots_rolled: int
+    bot_status_rolled: int
+    hourly_rollups_pruned: int
+    vacuum_pages: int
+
+
+def _batch_bounds(
+    conn: sqlite3.Connection, table: str, cutoff: str, batch_size: int, extra_where: str = ""
+) -> tuple[int, int] | None:
+    row = conn.execute(
+        f"""
+        SELECT MIN(id), MAX(id) FROM (
+            SELECT id FROM {table}
+            WHERE ts_utc < ? {extra_where}
+            ORDER BY id
+            LIMIT ?
+        )
+        """,
+        (cutoff, batch_size),
+    ).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(row[0]), int(row[1])
+
+
+def _rollup_gate_batch(conn: sqlite3.Connection, lo: int, hi: int, cutoff: str) -> int:
+    for granularity, bucket_fmt in GRANULARITY_BUCKETS.items():
+        conn.execute(
+            f"""
+            INSERT INTO gate_snapshot_rollups (
+                granularity, bucket_ts_utc, pair, strategy, samples,
+                session_ok_count, spread_ok_count, news_ok_count, open_pos_ok_count,
+                daily_ok_count, enemy_ok_count, all_ok_count,
+                buy_count, sell_count, hold_count
+            )
+            SELECT
+                '{granularity}',
+                strftime('{bucket_fmt}', ts_utc),
+                pair,
+                strategy,
+                COUNT(*),
+                SUM(session_ok), SUM(spread_ok), SUM(news_ok), SUM(open_pos_ok),
+                SUM(daily_ok), SUM(enemy_ok),
+                SUM(session_ok AND spread_ok AND news_ok AND open_pos_ok AND daily_ok AND enemy_ok),
+                SUM(UPPER(final_signal) = 'BUY'),
+                SUM(UPPER(final_signal) = 'SELL'),
+                SUM(UPPER(final_signal) NOT IN ('BUY', 'SELL'))
+            FROM gate_snapshots
+            WHERE id BETWEEN ? AND ? AND ts_utc < ?
+            GROUP BY 2, 3, 4
+            ON CONFLICT(granularity, bucket_ts_utc, pair, strategy) DO UPDATE SET
+                samples = samples + excluded.samples,
+                session_ok_count = session_ok_count + excluded.session_ok_count,
+                spread_ok_count = spread_ok_count + excluded.spread_ok_count,
+                news_ok_count = news_ok_count + excluded.news_ok_count,
+                open_pos_ok_count = open_pos_ok_count + excluded.open_pos_ok_count,
+                daily_ok_count = daily_ok_count + excluded.daily_ok_count,
+                enemy_ok_count = enemy_ok_count + excluded.enemy_ok_count,
+                all_ok_count = all_ok_count + excluded.all_ok_count,
+                buy_count = buy_count + excluded.buy_count,
+                sell_count = sell_count + excluded.sell_count,
+                hold_count = hold_count + excluded.hold_count
+            """,
+            (lo, hi, cutoff),
+        )
+    cur = conn.execute("DELETE FROM gate_snapshots WHERE id BETWEEN ? AND ? AND ts_utc < ?", (lo, hi, cutoff))
+    return int(cur.rowcount)
+
+
+def _rollup_status_batch(conn: sqlite3.Connection, lo: int, hi: int, cutoff: str) -> int:
+    for granularity, bucket_fmt in GRANULARITY_BUCKETS.items():
+        conn.execute(
+            f"""
+            INSERT INTO bot_status_rollups (
+                granularity, bucket_ts_utc, mode, heartbeats, first_ts_utc, last_ts_utc, max_uptime_s
+            )
+            SELECT
+                '{granularity}',
+                strftime('{bucket_fmt}', ts_utc),
+                mode,
+                COUNT(*),
+                MIN(ts_utc),
+                MAX(ts_utc),
+                MAX(uptime_s)
+            FROM bot_status
+            WHERE id BETWEEN ? AND ? AND ts_utc < ?
+            GROUP BY 2, 3
+            ON CONFLICT(granularity, bucket_ts_utc, mode) DO UPDATE SET
+                heartbeats = heartbeats + excluded.heartbeats,
+                first_ts_utc = MIN(first_ts_utc, excluded.first_ts_utc),
+                last_ts_utc = MAX(last_ts_utc, excluded.last_ts_utc),
+                max_uptime_s = MAX(COALESCE(max_uptime_s, excluded.max_uptime_s), COALESCE(excluded.max_uptime_s, max_uptime_s))
+            """,
+            (lo, hi, cutoff),
+        )
+    cur = conn.execute("DELETE FROM bot_status WHERE id BETWEEN ? AND ? AND ts_utc < ?", (lo, hi, cutoff))
+    return int(cur.rowcount)
+
+
+def _drain(
+    conn: sqlite3.Connection,
+    table: str,
+    rollup_fn,
+    cutoff: str,
+    batch_size: int,
+    pause_s: float,
+    extra_where: str = "",
+) -> int:
+    total = 0
+    while True:
+        bounds = _batch_bounds(conn, table, cutoff, batch_size, extra_where)
+        if bounds is None:
+            return total
+        lo, hi = bounds
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            total += rollup_fn(conn, lo, hi, cutoff)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if pause_s > 0:
+            time.sleep(pause_s)
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int = RETENTION_VACUUM_PAGES) -> int:
+    """Release up to `pages` free pages back to the OS; no-op unless auto_vacuum is INCREMENTAL."""
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()
+    if mode is None or int(mode[0]) != 2:
+        return 0
+    free_before = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    # executescript steps the pragma to completion; execute() frees only one page per step.
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    free_after = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    return free_before - free_after
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """Switch an existing database to incremental auto-vacuum.
+
+    This rewrites the whole file with VACUUM, so run it once during a maintenance window.
+    """
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def run_retention(
+    conn: sqlite3.Connection,
+    *,
+    raw_max_age_days: float = RETENTION_RAW_DAYS,
+    hourly_max_age_days: float = RETENTION_HOURLY_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    vacuum_pages: int = RETENTION_VACUUM_PAGES,
+    pause_s: float = 0.0,
+    now: datetime | None = None,
+) -> RetentionResult:
+    """Roll old raw telemetry into hourly/daily aggregates, prune, then vacuum incrementally.
+
+    The newest `bot_status` row is always kept because `/status` and the command
+    loop read the current paused pairs from it.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    if raw_max_age_days < 0 or hourly_max_age_days < 0:
+        raise ValueError("retention ages must be non-negative")
+
+    ref_now = now or datetime.now(timezone.utc)
+    raw_cutoff = (ref_now - timedelta(days=raw_max_age_days)).isoformat()
+    hourly_cutoff = (ref_now - timedelta(days=hourly_max_age_days)).isoformat()
+    conn.commit()
+
+    gates_rolled = _drain(conn, "gate_snapshots", _rollup_gate_batch, raw_cutoff, batch_size, pause_s)
+    status_rolled = _drain(
+        conn,
+        "bot_status",
+        _rollup_status_batch,
+        raw_cutoff,
+        batch_size,
+        pause_s,
+        extra_where="AND id < (SELECT MAX(id) FROM bot_status)",
+    )
+
+    hourly_pruned = 0
+    for table in ("gate_snapshot_rollups", "bot_status_rollups"):
+        cur = conn.execute(
+            f"DELETE FROM {table} WHERE granularity = 'hour' AND bucket_ts_utc < ?",
+            (hourly_cutoff,),
+        )
+        hourly_pruned += int(cur.rowcount)
+    conn.commit()
+
+    return RetentionResult(
+        gate_snapshots_rolled=gates_rolled,
+        bot_status_rolled=status_rolled,
+        hourly_rollups_pruned=hourly_pruned,
+        vacuum_pages=incremental_vacuum(conn, vacuum_pages),
+    )
+
+
+def maybe_run_retention(
+    conn: sqlite3.Connection, *, interval_sec: float = RETENTION_INTERVAL_SEC
+) -> RetentionResult | None:
+    """Run retention at most once per `interval_sec` per database file in this process."""
+    db_row = conn.execute("PRAGMA database_list").fetchone()
+    key = str(db_row[2]) if db_row and db_row[2] else ":memory:"
+    now_mono = time.monotonic()
+    last = _LAST_RUN_BY_DB.get(key)
+    if last is not None and now_mono - last < interval_sec:
+        return None
+    _LAST_RUN_BY_DB[key] = now_mono
+    return run_retention(conn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Roll up and prune old gate snapshots and heartbeats")
+    parser.add_argument("--raw-days", type=float, default=RETENTION_RAW_DAYS)
+    parser.add_argument("--hourly-days", type=float, default=RETENTION_HOURLY_DAYS)
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    parser.add_argument("--enable-incremental-vacuum", action="store_true", help="One-off VACUUM to switch auto_vacuum mode")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        init_db(conn)
+        if args.enable_incremental_vacuum:
+            enable_incremental_vacuum(conn)
+        result = run_retention(
+            conn,
+            raw_max_age_days=args.raw_days,
+            hourly_max_age_days=args.hourly_days,
+            batch_size=args.batch_size,
+        )
+    finally:
+        conn.close()
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from typing import Any
 
 from storage.db import utc_now_iso
 
-PROFILES = ("conservative", "normal", "aggressive")
+PROFILES = ("conservative", "normal", "aggressive", "optimized")
 
 DEFAULT_PRESETS: dict[str, dict[str, dict[str, float]]] = {
     "ema_vwap": {
@@ -46,7 +46,7 @@ def _load(value: str) -> dict[str, float]:
     return {str(k): float(v) for k, v in raw.items()}
 
 
-def seed_defaults(conn: sqlite3.Connection, *, updated_by: str = "system") -> None:
+def seed_defaults(conn: sqlite3.Connection, *, updated_by: str = "system", commit: bool = True) -> None:
     for strategy_name, profiles in DEFAULT_PRESETS.items():
         for profile_name, params in profiles.items():
             conn.execute(
@@ -74,7 +74,8 @@ def seed_defaults(conn: sqlite3.Connection, *, updated_by: str = "system") -> No
                 "UPDATE strategy_params SET is_active = CASE WHEN profile = 'normal' THEN 1 ELSE 0 END WHERE strategy_name = ?",
                 (strategy_name,),
             )
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def list_strategy_params(conn: sqlite3.Connection, strategy_name: str) -> dict[str, Any]:
@@ -139,7 +140,7 @@ class StrategyParamsService:
         conn.row_factory = sqlite3.Row
         try:
             try:
-                seed_defaults(conn)
+                # Defaults are seeded once by storage.migrations; missing rows fall back to presets below.
                 rows = conn.execute(
                     "SELECT strategy_name, profile, params_json FROM strategy_params WHERE is_active = 1"
                 ).fetchall()
@@ -1,29 +1,40 @@
-"""Bollinger breakout strategy for GBP_USD."""
+"""Bollinger breakout strategy (default pair GBP_USD)."""
 
 from __future__ import annotations
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 from data.fetcher import get_candles
 from execution.order_manager import has_open_position
 from execution.risk_manager import is_within_daily_limit
-from filters.market_state import is_strategy_allowed
+from filters.market_state import MARKET_STATE_LOOKBACK, is_strategy_allowed
 from filters.news_filter import is_news_clear
 from filters.session_filter import is_session_active
 from filters.spread_filter import is_spread_acceptable_live
 from indicators.adx import calculate_adx
 from indicators.atr import calculate_atr
 from indicators.bollinger import calculate_bollinger
+from indicators.plan import Feature, build_plan, feature
 from storage.db import get_db_path
 from storage.strategy_params import get_strategy_params_service
 
+DEFAULT_PAIR = "GBP_USD"
+# The squeeze percentile spans the last 100 band widths; the enemy gate's ATR median spans more.
+LOOKBACK = max(100, MARKET_STATE_LOOKBACK)
+
 
 def get_effective_params() -> dict[str, float]:
     service = get_strategy_params_service(get_db_path())
     return dict(service.get("bb_breakout").params)
 
 
+def required_features(params: dict[str, float] | None = None) -> list[Feature]:
+    """Indicators `get_signal` computes."""
+    return [feature("atr"), feature("adx"), feature("bollinger", period=20, std_mult=2.0)]
+
+
 def generate_signal_from_df(df: pd.DataFrame, *, params: dict[str, float] | None = None) -> str:
     """
     Gate 7 signal logic only.
@@ -67,15 +78,55 @@ def generate_signal_from_df(df: pd.DataFrame, *, params: dict[str, float] | None
     return "HOLD"
 
 
-def get_signal(client, account_id) -> str:
-    """Full 7-gate strategy wrapper (Phase 4)."""
-    pair = "GBP_USD"
+def generate_signals(prepared: pd.DataFrame, *, params: dict[str, float] | None = None, warmup: int = 0) -> np.ndarray:
+    """`generate_signal_from_df` of every prefix ``prepared.iloc[: i + 1]`` (i >= warmup) in one pass.
 
+    Returns int8 codes: +1 BUY, -1 SELL, 0 HOLD. Squeeze thresholds are percentiles of sliding
+    100-width windows; the few bars whose window still holds NaN widths use the per-bar logic.
+    """
+    effective = params or get_effective_params()
+    n = len(prepared)
+    start = max(warmup, 24)
+    codes = np.zeros(n, dtype=np.int8)
+    if start >= n:
+        return codes
+
+    close = prepared["close"].to_numpy(dtype=np.float64)
+    width = prepared["bb_width"].to_numpy(dtype=np.float64)
+    volume_mean20 = prepared["volume"].rolling(20, min_periods=20).mean().to_numpy(dtype=np.float64)
+    volume_spike = prepared["volume"].to_numpy(dtype=np.float64) > (volume_mean20 * float(effective["volume_spike_mult"]))
+
+    # Threshold of bar i from widths i-99..i (or all widths up to i while fewer than 100).
+    threshold = np.full(n, np.nan)
+    span = min(100, n)
+    full = sliding_window_view(width, span)  # row k covers widths k..k+span-1
+    for lo in range(0, len(full), 10_000):
+        block = full[lo : lo + 10_000]
+        clean = ~np.isnan(block).any(axis=1)
+        rows = np.flatnonzero(clean)
+        if rows.size:
+            threshold[lo + rows + span - 1] = np.percentile(block[rows], float(effective["squeeze_percentile"]), axis=1)
+    pending = [i for i in range(start, n) if np.isnan(threshold[i])]
+    for i in pending:
+        codes[i] = {"BUY": 1, "SELL": -1}.get(generate_signal_from_df(prepared.iloc[max(0, i - 99) : i + 1].copy(), params=effective), 0)
+
+    prev_width = np.concatenate([[np.nan], width[:-1]])
+    squeeze_expand = (prev_width <= threshold) & (width > prev_width * float(effective["squeeze_expand_mult"]))
+    armed = volume_spike & squeeze_expand & ~np.isnan(threshold)
+    buy = armed & (close > prepared["bb_upper"].to_numpy(dtype=np.float64))
+    sell = armed & (close < prepared["bb_lower"].to_numpy(dtype=np.float64))
+    vectorized = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+    codes[start:] = np.where(np.isnan(threshold[start:]), codes[start:], vectorized[start:])
+    return codes
+
+
+def get_signal(client, account_id, pair: str = DEFAULT_PAIR, quote: tuple[float, float, str] | None = None) -> str:
+    """Full 7-gate strategy wrapper (Phase 4) for `pair`; `quote` is the cycle's batched bid/ask/time."""
     # 1) Session gate
     if not is_session_active(pair):
         return "HOLD"
     # 2) Spread gate
-    if not is_spread_acceptable_live(pair, client, account_id):
+    if not is_spread_acceptable_live(pair, client, account_id, quote=quote):
         return "HOLD"
     # 3) News gate
     if not is_news_clear(pair):
@@ -87,7 +138,7 @@ def get_signal(client, account_id) -> str:
     if not is_within_daily_limit(client, account_id):
         return "HOLD"
 
-    df = get_candles(pair, "M5", count=150)
+    df = get_candles(pair, "M5", count=build_plan(required_features(), LOOKBACK).fetch_count())
     df = calculate_atr(df)
     df = calculate_adx(df)
 
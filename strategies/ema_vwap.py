@@ -1,29 +1,40 @@
-"""EMA + VWAP strategy for EUR_USD."""
+"""EMA + VWAP strategy (default pair EUR_USD)."""
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from data.fetcher import get_candles
 from execution.order_manager import has_open_position
 from execution.risk_manager import is_within_daily_limit
-from filters.market_state import is_strategy_allowed
+from filters.market_state import MARKET_STATE_LOOKBACK, is_strategy_allowed
 from filters.news_filter import is_news_clear
 from filters.session_filter import is_session_active
 from filters.spread_filter import is_spread_acceptable_live
 from indicators.adx import calculate_adx
 from indicators.atr import calculate_atr
 from indicators.ema import calculate_ema
+from indicators.plan import Feature, build_plan, feature
 from indicators.vwap import calculate_vwap
 from storage.db import get_db_path
 from storage.strategy_params import get_strategy_params_service
 
+DEFAULT_PAIR = "EUR_USD"
+# The enemy gate's ATR median spans more rows than the signal logic's 30.
+LOOKBACK = max(30, MARKET_STATE_LOOKBACK)
+
 
 def get_effective_params() -> dict[str, float]:
     service = get_strategy_params_service(get_db_path())
     return dict(service.get("ema_vwap").params)
 
 
+def required_features(params: dict[str, float] | None = None) -> list[Feature]:
+    """Indicators `get_signal` computes."""
+    return [feature("atr"), feature("adx"), feature("ema", fast=9, slow=21), feature("vwap")]
+
+
 def generate_signal_from_df(df: pd.DataFrame, *, params: dict[str, float] | None = None) -> str:
     """
     Gate 7 signal logic only.
@@ -47,15 +58,31 @@ def generate_signal_from_df(df: pd.DataFrame, *, params: dict[str, float] | None
     return "HOLD"
 
 
-def get_signal(client, account_id) -> str:
-    """Full 7-gate strategy wrapper (Phase 4)."""
-    pair = "EUR_USD"
+def generate_signals(prepared: pd.DataFrame, *, params: dict[str, float] | None = None, warmup: int = 0) -> np.ndarray:
+    """`generate_signal_from_df` of every prefix ``prepared.iloc[: i + 1]`` (i >= warmup) in one pass.
+
+    Returns int8 codes: +1 BUY, -1 SELL, 0 HOLD.
+    """
+    effective = params or get_effective_params()
+    close = prepared["close"].to_numpy(dtype=np.float64)
+    vwap = prepared["vwap"].to_numpy(dtype=np.float64)
+    atr = prepared["atr"].to_numpy(dtype=np.float64)
+    vwap_tol = float(effective["vwap_atr_tolerance"]) * np.where(np.isnan(atr), 0.0, atr)
+
+    buy = prepared["cross_up"].to_numpy(dtype=bool) & (close > (vwap - vwap_tol))
+    sell = prepared["cross_down"].to_numpy(dtype=bool) & (close < (vwap + vwap_tol))
+    codes = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+    codes[: max(warmup, 29)] = 0
+    return codes
+
 
+def get_signal(client, account_id, pair: str = DEFAULT_PAIR, quote: tuple[float, float, str] | None = None) -> str:
+    """Full 7-gate strategy wrapper (Phase 4) for `pair`; `quote` is the cycle's batched bid/ask/time."""
     # 1) Session gate
     if not is_session_active(pair):
         return "HOLD"
     # 2) Spread gate
-    if not is_spread_acceptable_live(pair, client, account_id):
+    if not is_spread_acceptable_live(pair, client, account_id, quote=quote):
         return "HOLD"
     # 3) News gate
     if not is_news_clear(pair):
@@ -68,7 +95,7 @@ def get_signal(client, account_id) -> str:
         return "HOLD"
 
     # Fetch + indicators
-    df = get_candles(pair, "M5", count=150)
+    df = get_candles(pair, "M5", count=build_plan(required_features(), LOOKBACK).fetch_count())
     df = calculate_atr(df)
     df = calculate_adx(df)
 
@@ -13,7 +13,7 @@ def test_phase5_execute_cycle_dry_run_offline(monkeypatch, sample_ohlcv_df, caps
     monkeypatch.setattr(main, "DRY_RUN", True)
     monkeypatch.setattr(main, "can_open_new_position", lambda *args, **kwargs: True)
     monkeypatch.setattr(main, "is_within_daily_limit", lambda *args, **kwargs: True)
-    monkeypatch.setattr(main, "get_live_bid_ask", lambda pair, client, aid: (1.1000, 1.1002))
+    monkeypatch.setattr(main, "get_live_bid_ask_many", lambda pairs, client, aid: {p: (1.1000, 1.1002, "") for p in pairs})
     monkeypatch.setattr(main, "get_candles", lambda *args, **kwargs: sample_ohlcv_df.copy())
     monkeypatch.setattr(main, "calculate_atr", lambda df: df.assign(atr=0.0012))
     monkeypatch.setattr(main, "get_instrument_specs", lambda *args, **kwargs: {"min_units": 111})
@@ -27,12 +27,64 @@ def test_phase5_execute_cycle_dry_run_offline(monkeypatch, sample_ohlcv_df, caps
         main,
         "STRATEGY_FN",
         {
-            "ema_vwap": lambda c, a: "BUY",
-            "bb_breakout": lambda c, a: "HOLD",
-            "vwap_rsi": lambda c, a: "HOLD",
+            "ema_vwap": lambda c, a, **kwargs: "BUY",
+            "bb_breakout": lambda c, a, **kwargs: "HOLD",
+            "vwap_rsi": lambda c, a, **kwargs: "HOLD",
         },
     )
 
     main.execute_cycle(object(), "acct", logger)
     out = capsys.readouterr().out
     assert "DRY_RUN EUR_USD BUY" in out
+
+
+def test_main_loop_runs_retention_once_per_interval(monkeypatch, tmp_path) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    import storage.retention as retention
+    from storage.db import connect, init_db, write_gate_snapshot
+    from storage.pool import close_all_pools
+
+    db_path = tmp_path / "bot.sqlite"
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(db_path))
+    monkeypatch.setattr(retention, "_LAST_RUN_BY_DB", {})
+    conn = connect(db_path)
+    try:
+        init_db(conn)
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        for minutes in (0, 5):
+            write_gate_snapshot(
+                conn,
+                ts_utc=(old + timedelta(minutes=minutes)).isoformat(),
+                pair="EUR_USD",
+                strategy="ema_vwap",
+                session_ok=True,
+                spread_ok=True,
+                news_ok=True,
+                open_pos_ok=True,
+                daily_ok=True,
+                enemy_ok=True,
+                final_signal="HOLD",
+                reason=None,
+                details=None,
+            )
+    finally:
+        conn.close()
+
+    stream = io.StringIO()
+    logger = logging.getLogger("phase5_retention_test")
+    logger.handlers = [logging.StreamHandler(stream)]
+    logger.setLevel(logging.INFO)
+    try:
+        main.run_due_retention(logger)
+        main.run_due_retention(logger)
+    finally:
+        close_all_pools()
+
+    assert stream.getvalue().count("RETENTION") == 1
+    conn = connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM gate_snapshots").fetchone()[0] == 0
+        assert conn.execute("SELECT SUM(samples) FROM gate_snapshot_rollups WHERE granularity='day'").fetchone()[0] == 2
+    finally:
+        conn.close()
@@ -17,7 +17,7 @@ def test_phase6_guards_block_order_placement(monkeypatch, sample_ohlcv_df) -> No
     monkeypatch.setattr(main, "DRY_RUN", False)
     monkeypatch.setattr(main, "can_open_new_position", lambda *args, **kwargs: False)
     monkeypatch.setattr(main, "is_within_daily_limit", lambda *args, **kwargs: True)
-    monkeypatch.setattr(main, "get_live_bid_ask", lambda *args, **kwargs: (1.1, 1.1002))
+    monkeypatch.setattr(main, "get_live_bid_ask_many", lambda pairs, *args, **kwargs: {p: (1.1, 1.1002, "") for p in pairs})
     monkeypatch.setattr(main, "get_candles", lambda *args, **kwargs: sample_ohlcv_df.copy())
     monkeypatch.setattr(main, "calculate_atr", lambda df: df.assign(atr=0.001))
     monkeypatch.setattr(main, "get_instrument_specs", lambda *args, **kwargs: {"min_units": 111})
@@ -33,9 +33,9 @@ def test_phase6_guards_block_order_placement(monkeypatch, sample_ohlcv_df) -> No
         main,
         "STRATEGY_FN",
         {
-            "ema_vwap": lambda c, a: "BUY",
-            "bb_breakout": lambda c, a: "HOLD",
-            "vwap_rsi": lambda c, a: "HOLD",
+            "ema_vwap": lambda c, a, **kwargs: "BUY",
+            "bb_breakout": lambda c, a, **kwargs: "HOLD",
+            "vwap_rsi": lambda c, a, **kwargs: "HOLD",
         },
     )
 
@@ -47,7 +47,7 @@ def test_phase6_dry_run_prints_intended_order(monkeypatch, sample_ohlcv_df, caps
     monkeypatch.setattr(main, "DRY_RUN", True)
     monkeypatch.setattr(main, "can_open_new_position", lambda *args, **kwargs: True)
     monkeypatch.setattr(main, "is_within_daily_limit", lambda *args, **kwargs: True)
-    monkeypatch.setattr(main, "get_live_bid_ask", lambda *args, **kwargs: (1.1, 1.1002))
+    monkeypatch.setattr(main, "get_live_bid_ask_many", lambda pairs, *args, **kwargs: {p: (1.1, 1.1002, "") for p in pairs})
     monkeypatch.setattr(main, "get_candles", lambda *args, **kwargs: sample_ohlcv_df.copy())
     monkeypatch.setattr(main, "calculate_atr", lambda df: df.assign(atr=0.001))
     monkeypatch.setattr(main, "get_instrument_specs", lambda *args, **kwargs: {"min_units": 321})
@@ -60,9 +60,9 @@ def test_phase6_dry_run_prints_intended_order(monkeypatch, sample_ohlcv_df, caps
         main,
         "STRATEGY_FN",
         {
-            "ema_vwap": lambda c, a: "BUY",
-            "bb_breakout": lambda c, a: "HOLD",
-            "vwap_rsi": lambda c, a: "HOLD",
+            "ema_vwap": lambda c, a, **kwargs: "BUY",
+            "bb_breakout": lambda c, a, **kwargs: "HOLD",
+            "vwap_rsi": lambda c, a, **kwargs: "HOLD",
         },
     )
 
@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
-from data.fetcher import _normalize_oanda_candles
+import random
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.fetcher import BID_ASK_COLUMNS, _normalize_oanda_candles, has_bid_ask
 
 
 def test_normalize_filters_incomplete_and_types() -> None:
@@ -28,3 +35,93 @@ def test_normalize_filters_incomplete_and_types() -> None:
     assert df["open"].dtype == "float64"
     assert df["volume"].dtype == "int64"
     assert df.iloc[0]["close"] == 1.1005
+
+
+def _reference_normalize(candles: list[dict[str, Any]]) -> pd.DataFrame:
+    """Row-wise normalizer the columnar fast path replaced; kept as the parity oracle."""
+    records: list[dict[str, Any]] = []
+    for candle in candles:
+        if not candle.get("complete", False):
+            continue
+        mid: dict[str, str] = candle.get("mid", {})
+        records.append(
+            {
+                "time": candle.get("time"),
+                "open": float(mid.get("o", 0.0)),
+                "high": float(mid.get("h", 0.0)),
+                "low": float(mid.get("l", 0.0)),
+                "close": float(mid.get("c", 0.0)),
+                "volume": int(candle.get("volume", 0)),
+            }
+        )
+    df = pd.DataFrame(records, columns=["time", "open", "high", "low", "close", "volume"])
+    if df.empty:
+        return df
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    df = df.astype({"open": "float64", "high": "float64", "low": "float64", "close": "float64", "volume": "int64"})
+    return df.sort_values("time").reset_index(drop=True)
+
+
+def _payload(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-03-01", tz="UTC")
+    closes = 1.1 + np.cumsum(rng.normal(0, 0.0002, count))
+    return [
+        {
+            "complete": bool(rng.random() > 0.05),
+            "volume": int(rng.integers(1, 500)),
+            "time": (start + pd.Timedelta(minutes=5 * i)).strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+            "mid": {"o": f"{c:.5f}", "h": f"{c + 0.0003:.5f}", "l": f"{c - 0.0003:.5f}", "c": f"{c + 0.0001:.5f}"},
+        }
+        for i, c in enumerate(closes)
+    ]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_columnar_normalize_matches_reference(seed: int) -> None:
+    candles = _payload(5000, seed)
+    pd.testing.assert_frame_equal(_normalize_oanda_candles(candles), _reference_normalize(candles))
+
+
+def test_columnar_normalize_matches_reference_when_unsorted_or_irregular() -> None:
+    candles = _payload(200, 3)
+    random.Random(3).shuffle(candles)
+    pd.testing.assert_frame_equal(_normalize_oanda_candles(candles), _reference_normalize(candles))
+
+    candles = _payload(20, 4)
+    candles[3]["time"] = "2024-03-01T00:15:00.000000000+00:00"
+    del candles[5]["mid"]["h"]
+    for candle in candles:
+        candle["complete"] = True
+    pd.testing.assert_frame_equal(_normalize_oanda_candles(candles), _reference_normalize(candles))
+
+
+def test_columnar_normalize_empty_payload_matches_reference() -> None:
+    candles = [{"complete": False, "time": "2024-01-01T00:00:00.000000000Z", "mid": {}}]
+    pd.testing.assert_frame_equal(_normalize_oanda_candles(candles), _reference_normalize(candles))
+    pd.testing.assert_frame_equal(_normalize_oanda_candles([]), _reference_normalize([]))
+
+
+def test_bid_ask_candles_add_quote_columns_and_derive_mid() -> None:
+    candles = [
+        {
+            "time": "2024-01-01T00:00:00.000000000Z",
+            "bid": {"o": "1.0999", "h": "1.1009", "l": "1.0989", "c": "1.1004"},
+            "ask": {"o": "1.1001", "h": "1.1011", "l": "1.0991", "c": "1.1006"},
+            "mid": {"o": "1.1000", "h": "1.1010", "l": "1.0990", "c": "1.1005"},
+            "volume": 100,
+            "complete": True,
+        }
+    ]
+
+    both = _normalize_oanda_candles(candles, price="MBA")
+    quotes_only = _normalize_oanda_candles([{k: v for k, v in candles[0].items() if k != "mid"}], price="BA")
+
+    assert has_bid_ask(both) and has_bid_ask(quotes_only)
+    assert list(both.columns) == ["time", "open", "high", "low", "close", "volume", *BID_ASK_COLUMNS]
+    assert both.iloc[0]["ask_close"] - both.iloc[0]["bid_close"] == pytest.approx(0.0002)
+    pd.testing.assert_frame_equal(quotes_only, both)
+    assert not has_bid_ask(_normalize_oanda_candles(candles))
+    assert list(_normalize_oanda_candles([], price="BA").columns) == list(both.columns)
+    with pytest.raises(ValueError):
+        _normalize_oanda_candles(candles, price="B")
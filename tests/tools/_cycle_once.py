@@ -5,6 +5,7 @@ import sqlite3
 from datetime import datetime
 from typing import Callable
 
+from config.instruments import get_registry
 from config.settings import COMMAND_RUNNING_TIMEOUT_SEC
 from execution.alerting import get_alert_service_for_db
 from execution.alerts import AlertEvent
@@ -13,6 +14,7 @@ from execution.runtime_ops import maybe_backup_sqlite
 from execution.trade_store import TradeStore
 from storage.commands import fail_stale_running_commands
 from storage.db import get_db_path, mark_bot_restart, write_gate_snapshot, write_heartbeat
+from storage.retention import maybe_run_retention
 from storage.strategy_params import get_strategy_params_service
 
 
@@ -47,6 +49,7 @@ def run_cycle_once(
             {"service": "bot_worker", "handled_by": handled_by, "startup_time_utc": startup_time, "version": "phase-d7"},
         )
     maybe_backup_sqlite(get_db_path())
+    maybe_run_retention(conn)
     fail_stale_running_commands(conn, timeout_sec=COMMAND_RUNNING_TIMEOUT_SEC, handled_by=handled_by)
     db_row = conn.execute("PRAGMA database_list").fetchone()
     trade_store = TradeStore(db_row[2]) if db_row and db_row[2] else TradeStore()
@@ -82,7 +85,7 @@ def run_cycle_once(
                 strategy_eval(pair)
             strategy_name = "phase2_test"
             try:
-                strategy_name = {"EUR_USD": "ema_vwap", "USD_JPY": "vwap_rsi", "GBP_USD": "bb_breakout"}.get(pair, strategy_name)
+                strategy_name = get_registry().strategy_map().get(pair, strategy_name)
                 snapshot = params_service.get(strategy_name)
                 strategy_params_meta = {
                     "strategy_name": snapshot.strategy_name,
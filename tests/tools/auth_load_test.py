@@ -0,0 +1,86 @@
+"""Offline load test for cookie auth: requests/second with and without the session cache."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def _run(client, path: str, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        res = client.get(path)
+        if res.status_code != 200:
+            raise RuntimeError(f"{path} returned {res.status_code}")
+    return requests / (time.perf_counter() - started)
+
+
+def _run_dependency(token: str, conn, calls: int) -> float:
+    from api.auth import get_current_user_from_cookie
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        get_current_user_from_cookie(token, conn)
+    return calls / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure authenticated request throughput with/without session cache")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/bot/status")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SCALP_BOT_DB_PATH"] = str(Path(tmp) / "auth_load.sqlite")
+
+        from fastapi.testclient import TestClient
+
+        from api.app import app
+        from api.auth import ensure_user, get_session_cache
+        from config.settings import API_COOKIE_NAME
+        from storage.db import connect, init_db
+
+        conn = connect()
+        init_db(conn)
+        ensure_user(conn, username="load", password="load-pass", role="viewer")
+        conn.close()
+
+        with TestClient(app) as client:
+            client.post("/auth/login", json={"username": "load", "password": "load-pass"})
+            cache = get_session_cache()
+            max_entries = cache.max_entries
+
+            _run(client, args.path, 100)  # warm-up
+
+            cache.max_entries = 0
+            cache.clear()
+            uncached = _run(client, args.path, args.requests)
+
+            cache.max_entries = max_entries
+            cache.clear()
+            cached = _run(client, args.path, args.requests)
+            hits, misses = cache.hits, cache.misses
+
+            token = client.cookies.get(API_COOKIE_NAME)
+            conn = connect()
+            cache.max_entries = 0
+            dep_uncached = _run_dependency(token, conn, args.requests * 10)
+            cache.max_entries = max_entries
+            dep_cached = _run_dependency(token, conn, args.requests * 10)
+            conn.close()
+
+    print(f"path: {args.path} requests: {args.requests}")
+    print(f"  without session cache: {uncached:,.0f} req/s")
+    print(f"  with session cache:    {cached:,.0f} req/s (hits={hits} misses={misses})")
+    print(f"  speedup: {cached / uncached:.2f}x")
+    print("auth dependency only (get_current_user_from_cookie):")
+    print(f"  without session cache: {dep_uncached:,.0f} calls/s")
+    print(f"  with session cache:    {dep_cached:,.0f} calls/s")
+    print(f"  speedup: {dep_cached / dep_uncached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,51 @@ import importlib
 import pandas as pd
 
 from backtest.backtest import backtest_strategy
-from config.pairs import PAIR_STRATEGY_MAP
+from backtest.cache import BacktestCache
+from backtest.monte_carlo import METRICS, monte_carlo_trades
+from backtest.portfolio import backtest_portfolio
+from backtest.replay import replay_backtest
+from backtest.stream import DEFAULT_CHUNK_BARS, backtest_strategy_stream, load_stream_trades
+from backtest.walk_forward import walk_forward
+from config.instruments import get_registry
+from config.settings import BACKTEST_CACHE_DIR, HISTORY_DIR, OHLCV_DIR, TRADE_LOG_DIR
+from data.history import GRANULARITY_SECONDS, HistoryStore
+from data.intrabar import IntrabarResolver
+from data.ohlcv_store import open_ohlcv
 
 
 def _load_strategy_module(pair: str):
-    strategy_name = PAIR_STRATEGY_MAP[pair]
+    strategy_name = get_registry().strategy_map()[pair]
     return importlib.import_module(f"strategies.{strategy_name}")
 
 
+def _load_bars(args: argparse.Namespace, pair: str, fixture: pd.DataFrame | None, store: HistoryStore | None):
+    """Bars for `pair` from the selected source (DataFrame or memory-mapped arrays), None if absent."""
+    if args.ohlcv:
+        try:
+            return open_ohlcv(pair, "M5", root=args.ohlcv).slice(args.start, args.end)
+        except FileNotFoundError:
+            return None
+    if store is not None:
+        return store.load(pair, "M5", args.start, args.end)
+    return fixture.copy()
+
+
+def _load_intrabar(args: argparse.Namespace, pair: str, store: HistoryStore | None) -> IntrabarResolver | None:
+    """Lower-timeframe resolver for `pair` from the selected store, None if absent or not requested."""
+    if not args.intrabar:
+        return None
+    if args.ohlcv:
+        try:
+            return IntrabarResolver.open(pair, args.intrabar, root=args.ohlcv, start=args.start, end=args.end)
+        except FileNotFoundError:
+            return None
+    if store is not None:
+        fine = store.load(pair, args.intrabar, args.start, args.end)
+        return IntrabarResolver.from_frame(fine, bar_seconds=GRANULARITY_SECONDS["M5"]) if len(fine) else None
+    return None
+
+
 def _print_report(pair: str, mode: str, results: dict) -> None:
     train = results["train"]
     val = results["validation"]
@@ -56,30 +93,157 @@ def _print_report(pair: str, mode: str, results: dict) -> None:
         print(f"OVERFIT REASON: {reason}")
 
 
+def _print_walk_forward(pair: str, args: argparse.Namespace, bars) -> None:
+    frame = bars if isinstance(bars, pd.DataFrame) else bars.to_frame()
+    result = walk_forward(
+        frame,
+        pair,
+        _load_strategy_module(pair),
+        scheme=args.walk_forward,
+        train_bars=args.train_bars,
+        test_bars=args.test_bars,
+        step_bars=args.step_bars,
+        purge_bars=args.purge_bars,
+        mode=args.mode,
+        hold_bars=args.hold_bars,
+        min_trades=args.min_trades,
+        workers=args.workers,
+    )
+    summary = result["summary"]
+    print(f"PAIR: {pair}")
+    print(f"WALK-FORWARD: {result['scheme']} folds={summary['folds']} purge_bars={result['purge_bars']}")
+    for fold in result["folds"]:
+        bounds, test = fold["fold"], fold["test"]
+        print(
+            f"  fold {bounds['index']}: test[{bounds['test_start']}:{bounds['test_end']}] "
+            f"trades={test['total_trades']} win_rate={test['win_rate']:.4f} sharpe={test['sharpe']:.4f}"
+        )
+    for metric in ("win_rate", "profit_factor", "sharpe", "max_drawdown", "win_rate_gap"):
+        stats = summary[metric]
+        print(f"  {metric}: mean={stats['mean']:.4f} std={stats['std']:.4f} min={stats['min']:.4f} max={stats['max']:.4f}")
+    print(f"  overfit_fold_share: {summary['overfit_fold_share']:.4f}")
+
+
+def _print_monte_carlo(pair: str, trades: pd.DataFrame, resamples: int) -> None:
+    if trades.empty:
+        print("MONTE CARLO: no validation trades")
+        return
+    result = monte_carlo_trades(trades, pair, n_resamples=resamples)
+    level = int(result["confidence"] * 100)
+    print(f"MONTE CARLO (validation, {result['trades']} trades x {result['resamples']} resamples, {level}% CI):")
+    for mode in ("bootstrap", "shuffle", "slippage"):
+        for metric in METRICS:
+            stats = result[mode][metric]
+            print(
+                f"  {mode:<9} {metric:<13} point={result['point'][metric]:.4f} "
+                f"[{stats['low']:.4f}, {stats['high']:.4f}] median={stats['median']:.4f}"
+            )
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Run offline backtests from CSV fixtures")
-    parser.add_argument("--pair", choices=sorted(PAIR_STRATEGY_MAP.keys()), help="Single pair to run")
-    parser.add_argument("--csv", required=True, help="Path to fixture CSV")
+    parser = argparse.ArgumentParser(description="Run offline backtests from CSV fixtures or downloaded history")
+    parser.add_argument("--pair", choices=sorted(get_registry().strategy_map()), help="Single pair to run")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Path to fixture CSV (same bars for every pair)")
+    source.add_argument("--history", nargs="?", const=HISTORY_DIR, help="History store root (per-pair bars)")
+    source.add_argument("--ohlcv", nargs="?", const=OHLCV_DIR, help="Memory-mapped OHLCV store root (per-pair bars)")
+    parser.add_argument("--start", default=None, help="History start (UTC, inclusive)")
+    parser.add_argument("--end", default=None, help="History end (UTC, exclusive)")
     parser.add_argument("--mode", choices=["sl_tp", "time_exit"], default="sl_tp")
     parser.add_argument("--hold-bars", type=int, default=5, help="Bars to hold in time_exit mode")
     parser.add_argument("--min-trades", type=int, default=30, help="Min trades per split for overfit warning")
+    parser.add_argument("--portfolio", action="store_true", help="Run all pairs on one account with live risk limits")
+    parser.add_argument("--replay", action="store_true", help="Replay signals through PaperBroker and the paper gates")
+    parser.add_argument("--equity", type=float, default=10_000.0, help="Portfolio / replay starting equity")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for pair features / walk-forward folds")
+    parser.add_argument("--walk-forward", choices=["rolling", "anchored"], help="K-fold walk-forward instead of 70/30")
+    parser.add_argument("--train-bars", type=int, default=2000)
+    parser.add_argument("--test-bars", type=int, default=500)
+    parser.add_argument("--step-bars", type=int, default=None, help="Fold step (default: test bars)")
+    parser.add_argument("--purge-bars", type=int, default=None, help="Bars dropped between train and test (default: trade horizon)")
+    parser.add_argument("--cache", nargs="?", const=BACKTEST_CACHE_DIR, help="Reuse cached indicators/results from this dir")
+    parser.add_argument(
+        "--intrabar", nargs="?", const="M1", choices=["M1", "M2", "M4"], help="Resolve SL+TP bars from this store granularity"
+    )
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="N", help="Monte Carlo resamples of validation trades")
+    parser.add_argument("--trade-log", nargs="?", const=TRADE_LOG_DIR, help="Store each run's trades (columnar) here")
+    parser.add_argument("--stream", metavar="DIR", help="Stream bars in day-aligned chunks; write trade CSVs to DIR")
+    parser.add_argument("--chunk-bars", type=int, default=DEFAULT_CHUNK_BARS, help="Bars per streamed chunk")
     args = parser.parse_args()
 
-    df = pd.read_csv(args.csv)
-    df["time"] = pd.to_datetime(df["time"], utc=True)
+    fixture = None
+    if args.csv:
+        fixture = pd.read_csv(args.csv)
+        fixture["time"] = pd.to_datetime(fixture["time"], utc=True)
+    store = HistoryStore(args.history) if args.history else None
+    cache = BacktestCache(args.cache) if args.cache else None
+
+    pairs = [args.pair] if args.pair else list(get_registry().strategy_map())
+    if args.replay:
+        data = {pair: df for pair in pairs if (df := _load_bars(args, pair, fixture, store)) is not None and len(df)}
+        intrabar = {pair: resolver for pair in data if (resolver := _load_intrabar(args, pair, store)) is not None}
+        replayed = replay_backtest(data, workers=args.workers, initial_balance=args.equity, intrabar=intrabar)
+        print(f"REPLAY: {', '.join(data)}")
+        for key, value in replayed.metrics.items():
+            print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+        return
+    if args.portfolio:
+        data = {pair: df for pair in pairs if (df := _load_bars(args, pair, fixture, store)) is not None and len(df)}
+        result = backtest_portfolio(data, workers=args.workers, initial_equity=args.equity)
+        print(f"PORTFOLIO: {', '.join(data)}")
+        for key, value in result.metrics.items():
+            print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+        for key, value in result.skipped.items():
+            print(f"  skipped_{key}: {value}")
+        return
 
-    pairs = [args.pair] if args.pair else list(PAIR_STRATEGY_MAP.keys())
     for idx, pair in enumerate(pairs):
         module = _load_strategy_module(pair)
+        df = _load_bars(args, pair, fixture, store)
+        if df is None or len(df) == 0:
+            print(f"PAIR: {pair}\nNO DATA in {args.ohlcv or args.history or args.csv}")
+            continue
+        if args.walk_forward:
+            _print_walk_forward(pair, args, df)
+            if idx != len(pairs) - 1:
+                print()
+            continue
+        if args.stream:
+            result = backtest_strategy_stream(
+                df,
+                pair,
+                module,
+                args.stream,
+                chunk_bars=args.chunk_bars,
+                mode=args.mode,
+                hold_bars=args.hold_bars,
+                min_trades=args.min_trades,
+                intrabar=_load_intrabar(args, pair, store),
+            )
+            _print_report(pair, args.mode, result)
+            print(f"TRADES: {result['trade_files']['train']}, {result['trade_files']['validation']}")
+            if args.monte_carlo:
+                _print_monte_carlo(pair, load_stream_trades(result["trade_files"]["validation"]), args.monte_carlo)
+            if idx != len(pairs) - 1:
+                print()
+            continue
         result = backtest_strategy(
-            df.copy(),
+            df,
             pair=pair,
             strategy_module=module,
             mode=args.mode,
             hold_bars=args.hold_bars,
             min_trades=args.min_trades,
+            return_trades=bool(args.monte_carlo),
+            cache=cache,
+            intrabar=_load_intrabar(args, pair, store),
+            trade_log=args.trade_log,
         )
         _print_report(pair, args.mode, result)
+        if args.trade_log:
+            print(f"TRADE LOG: {result['trade_log']}")
+        if args.monte_carlo:
+            _print_monte_carlo(pair, result["validation_trades"], args.monte_carlo)
         if idx != len(pairs) - 1:
             print()
 
@@ -0,0 +1,65 @@
+"""Download multi-month OANDA candle history into the partitioned local store.
+
+    python -m tests.tools.download_history --pairs EUR_USD,GBP_USD --start 2022-01-01
+    python -m tests.tools.download_history --start 2022-01-01 --end 2024-01-01 --granularity M5 --workers 4
+
+Re-running the same command resumes: closed months already in the store are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from config.instruments import get_registry
+from config.settings import HISTORY_DIR, HISTORY_DOWNLOAD_WORKERS
+from data.history import GRANULARITY_SECONDS, HistoryStore, download_history
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download paginated OANDA history into a per-pair/per-month store")
+    parser.add_argument("--pairs", default="", help="Comma-separated pairs (default: every registered trading pair)")
+    parser.add_argument("--granularity", choices=sorted(GRANULARITY_SECONDS), default="M5")
+    parser.add_argument("--start", required=True, help="UTC start date, e.g. 2022-01-01")
+    parser.add_argument("--end", default=None, help="UTC end date (exclusive); default now")
+    parser.add_argument("--out", default=HISTORY_DIR, help="Store root directory")
+    parser.add_argument("--workers", type=int, default=HISTORY_DOWNLOAD_WORKERS)
+    parser.add_argument("--force", action="store_true", help="Re-download months already marked closed")
+    parser.add_argument("--price", choices=["M", "BA", "MBA"], default="M", help="Candle prices (BA adds bid/ask columns)")
+    args = parser.parse_args()
+
+    pairs = [p.strip() for p in args.pairs.split(",") if p.strip()] or list(get_registry().strategy_map())
+    store = HistoryStore(args.out)
+
+    started = time.perf_counter()
+    reports = download_history(
+        pairs,
+        args.granularity,
+        args.start,
+        args.end,
+        store=store,
+        workers=args.workers,
+        force=args.force,
+        price=args.price,
+    )
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for report in reports:
+        if report.error:
+            failed += 1
+            print(f"{report.pair:<10} ERROR {report.error}")
+            continue
+        print(
+            f"{report.pair:<10} fetched_months={report.months_fetched} skipped_months={report.months_skipped} "
+            f"rows={report.rows} gaps={len(report.gaps)}"
+        )
+        for gap in report.gaps[:5]:
+            print(f"    gap after {gap['after']} before {gap['before']} missing_bars={gap['missing_bars']}")
+    print(f"elapsed={elapsed:.1f}s store={store.root}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Offline end-to-end benchmark of the live cycle against the local OANDA stand-in.
+
+Runs `main.execute_cycle` and/or `paper_run.run_live` for 3, 30 or 300 instruments with
+injected latency/jitter/errors and reports wall time, per-endpoint request counts and
+TCP connections opened.
+
+    python -m tests.tools.oanda_cycle_bench --instruments 3,30,300 --latency-ms 20 --jitter-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+BASE_PAIRS = ["EUR_USD", "GBP_USD", "USD_JPY"]
+STRATEGY_CYCLE = ["ema_vwap", "bb_breakout", "vwap_rsi"]
+
+
+def _instrument_names(count: int) -> list[str]:
+    names = BASE_PAIRS[:count]
+    names.extend(f"SYN{i:03d}_USD" for i in range(count - len(names)))
+    return names
+
+
+def _patch_environment(stack: ExitStack, url: str, account_id: str, instruments: list[str], place_orders: bool) -> None:
+    import data.fetcher
+    import data.oanda_client
+    import main
+    from config.instruments import InstrumentRegistry, load_registry, set_registry
+    import execution.gates
+    from strategies import bb_breakout, ema_vwap, vwap_rsi
+    from tests.tools import paper_run
+
+    patch = lambda target, name, value: stack.enter_context(mock.patch.object(target, name, value))  # noqa: E731
+
+    patch(data.oanda_client, "OANDA_API_URL", url)
+    patch(data.oanda_client, "OANDA_STREAM_URL", url)
+    patch(data.fetcher, "OANDA_API_KEY", "stand-in-token")
+    patch(data.fetcher, "OANDA_ACCOUNT_ID", account_id)
+    patch(data.fetcher, "validate_settings", lambda: None)
+    patch(main, "DRY_RUN", not place_orders)
+    patch(paper_run, "OANDA_ACCOUNT_ID", account_id)
+
+    # Synthetic instruments reuse the three strategies round-robin; the registry is swapped
+    # for the duration of the run only.
+    entries = [
+        {"name": name, "strategy": STRATEGY_CYCLE[i % len(STRATEGY_CYCLE)], "max_spread_pips": 2.5}
+        for i, name in enumerate(instruments)
+        if name not in BASE_PAIRS
+    ]
+    base = load_registry(path=None)
+    keep = {name: base.get(name) for name in instruments if name in BASE_PAIRS}
+    previous = set_registry(InstrumentRegistry(keep).merged(entries))
+    stack.callback(set_registry, previous)
+
+    # Session/news gates depend on wall clock and an external calendar; open them so every
+    # instrument exercises the broker calls behind them.
+    for module in (ema_vwap, bb_breakout, vwap_rsi, execution.gates):
+        patch(module, "is_session_active", lambda *args, **kwargs: True)
+        patch(module, "is_news_clear", lambda *args, **kwargs: True)
+
+
+def _run_target(target: str, account_id: str, instruments: list[str], cycles: int) -> float:
+    import main
+    from tests.tools import paper_run
+
+    logger = logging.getLogger("oanda_cycle_bench")
+    started = time.perf_counter()
+    for _ in range(cycles):
+        if target == "execute_cycle":
+            from data.fetcher import get_oanda_client
+
+            main.execute_cycle(get_oanda_client(), account_id, logger)
+        else:
+            paper_run.run_live(instruments)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the live cycle against a local OANDA stand-in")
+    parser.add_argument("--instruments", default="3,30,300", help="Comma-separated instrument counts")
+    parser.add_argument("--cycles", type=int, default=1)
+    parser.add_argument("--target", choices=["execute_cycle", "run_live", "both"], default="both")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--place-orders", action="store_true", help="Disable DRY_RUN in execute_cycle")
+    parser.add_argument("--url", default="", help="Use an already running stand-in instead of an in-process one")
+    parser.add_argument("--account-id", default="")
+    args = parser.parse_args()
+
+    from tests.tools.paper_run import _logger as paper_logger
+
+    paper_logger().setLevel(logging.WARNING)
+    logging.getLogger("oandapyV20").setLevel(logging.CRITICAL)
+    targets = ["execute_cycle", "run_live"] if args.target == "both" else [args.target]
+
+    from data.broker_gateway import gateway_stats
+    from data.fetcher import get_oanda_client
+    from data.oanda_client import close_shared_clients
+    from tests.tools.oanda_standin import DEFAULT_ACCOUNT_ID, OandaStandIn
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SCALP_BOT_DB_PATH"] = str(Path(tmp) / "bench.sqlite")
+
+        for count in [int(raw) for raw in args.instruments.split(",") if raw.strip()]:
+            instruments = _instrument_names(count)
+            for target in targets:
+                standin = None
+                if not args.url:
+                    standin = OandaStandIn(
+                        latency_ms=args.latency_ms,
+                        jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate,
+                        seed=count,
+                    ).start()
+                url = args.url or standin.url
+                account_id = args.account_id or (standin.account_id if standin else DEFAULT_ACCOUNT_ID)
+                try:
+                    with ExitStack() as stack:
+                        _patch_environment(stack, url, account_id, instruments, args.place_orders)
+                        close_shared_clients()
+                        elapsed = _run_target(target, account_id, instruments, args.cycles)
+                        stats = gateway_stats(get_oanda_client())
+                        close_shared_clients()
+                finally:
+                    if standin is not None:
+                        standin.stop()
+
+                evaluated = count * args.cycles
+                print(f"{target:<14} instruments={count:<4} cycles={args.cycles} elapsed={elapsed:.3f}s "
+                      f"per_instrument={1000 * elapsed / evaluated:.1f}ms")
+                if stats is not None:
+                    print(f"  gateway {stats}")
+                if standin is not None:
+                    state = standin.state
+                    total = sum(state.request_counts.values())
+                    print(f"  requests={total} connections={state.connections} errors_injected={state.errors_injected}")
+                    for endpoint, n in sorted(state.request_counts.items()):
+                        print(f"    {endpoint:<20} {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+"""Local OANDA v20 stand-in (REST + pricing stream) for offline load tests.
+
+Serves the endpoints the bot uses from scripted price paths (CSV fixtures), with
+injectable latency, jitter and error rates. Run it in-process:
+
+    with OandaStandIn(latency_ms=20) as standin:
+        ...  # point OANDA_API_URL / OANDA_STREAM_URL at standin.url
+
+or as a subprocess:
+
+    python -m tests.tools.oanda_standin --port 8765 --latency-ms 20 --error-rate 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+DEFAULT_CSV = Path("tests/fixtures/sample_ohlcv.csv")
+DEFAULT_ACCOUNT_ID = "101-000-0000000-001"
+
+GRANULARITY_SECONDS: dict[str, int] = {
+    "S5": 5, "S10": 10, "S15": 15, "S30": 30,
+    "M1": 60, "M2": 120, "M4": 240, "M5": 300, "M10": 600, "M15": 900, "M30": 1800,
+    "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400, "H6": 21600, "H8": 28800, "H12": 43200,
+    "D": 86400, "W": 604800, "M": 2592000,
+}
+
+_ROUTES: list[tuple[str, re.Pattern[str], str]] = [
+    ("GET", re.compile(r"^/v3/instruments/(?P<instrument>[^/]+)/candles$"), "candles"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/pricing/stream$"), "pricing_stream"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/pricing$"), "pricing"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/summary$"), "account_summary"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/instruments$"), "account_instruments"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/openPositions$"), "open_positions"),
+    ("GET", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/positions/(?P<instrument>[^/]+)$"), "position_details"),
+    ("POST", re.compile(r"^/v3/accounts/(?P<account>[^/]+)/orders$"), "order_create"),
+]
+
+
+def _fmt_time(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+
+
+def _parse_time(raw: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(float(raw), tz=timezone.utc)
+    except ValueError:
+        pass
+    ts = pd.Timestamp(raw)
+    return (ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")).to_pydatetime()
+
+
+class PricePath:
+    """Scripted OHLCV bars for one instrument, replayed back and forth so the series never runs out."""
+
+    def __init__(self, frame: pd.DataFrame, scale: float, start: datetime) -> None:
+        cols = ["open", "high", "low", "close"]
+        self._ohlc = frame[cols].to_numpy(dtype="float64") * scale
+        self._volume = frame["volume"].to_numpy(dtype="int64")
+        self.start = start
+
+    def _row(self, index: int) -> int:
+        n = len(self._ohlc)
+        if n == 1:
+            return 0
+        period = 2 * n - 2
+        pos = index % period
+        return pos if pos < n else period - pos
+
+    def bar(self, index: int) -> tuple[float, float, float, float, int]:
+        row = self._row(index)
+        o, h, lo, c = self._ohlc[row]
+        return float(o), float(h), float(lo), float(c), int(self._volume[row])
+
+
+class StandInState:
+    """Shared market/account state behind the HTTP handler (guarded by one lock)."""
+
+    def __init__(
+        self,
+        *,
+        csv_path: Path = DEFAULT_CSV,
+        account_id: str = DEFAULT_ACCOUNT_ID,
+        balance: float = 100_000.0,
+        start_index: int = 200,
+        spread_pips: float = 0.8,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        stream_interval_s: float = 0.25,
+        stream_max_ticks: int = 0,
+        seed: int | None = None,
+    ) -> None:
+        frame = pd.read_csv(csv_path)
+        self._frame = frame
+        self._start = _parse_time(str(frame["time"].iloc[0]))
+        self.account_id = account_id
+        self.balance = balance
+        self.cursor = start_index
+        self.spread_pips = spread_pips
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stream_interval_s = stream_interval_s
+        self.stream_max_ticks = stream_max_ticks
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.paths: dict[str, PricePath] = {}
+        self.positions: dict[str, dict[str, float]] = {}
+        self.transaction_id = 1
+        self.request_counts: Counter[str] = Counter()
+        self.errors_injected = 0
+        self.connections = 0
+
+    # --- market data -------------------------------------------------------------------
+    @staticmethod
+    def pip_location(instrument: str) -> int:
+        return -2 if instrument.endswith("JPY") else -4
+
+    def path(self, instrument: str) -> PricePath:
+        path = self.paths.get(instrument)
+        if path is None:
+            if instrument.endswith("JPY"):
+                scale = 130.0
+            else:
+                # Spread synthetic instruments out a little so they are not identical series.
+                scale = 1.0 + (zlib.crc32(instrument.encode("utf-8")) % 400) / 1000.0
+            path = PricePath(self._frame, scale, self._start)
+            self.paths[instrument] = path
+        return path
+
+    def advance(self, bars: int = 1) -> None:
+        with self.lock:
+            self.cursor += bars
+
+    def quote(self, instrument: str) -> tuple[float, float, datetime]:
+        path = self.path(instrument)
+        close = path.bar(self.cursor)[3]
+        half = self.spread_pips * 10 ** self.pip_location(instrument) / 2.0
+        ts = path.start + timedelta(seconds=300 * self.cursor)
+        return close - half, close + half, ts
+
+    def candles(self, instrument: str, query: dict[str, str]) -> dict[str, Any]:
+        granularity = query.get("granularity", "S5")
+        step = GRANULARITY_SECONDS.get(granularity)
+        if step is None:
+            raise _ApiError(400, f"Invalid value specified for 'granularity': {granularity}")
+        count = int(query.get("count", 500))
+        if not 1 <= count <= 5000:
+            raise _ApiError(400, "Maximum value for 'count' exceeded")
+        components = query.get("price", "M")
+        path = self.path(instrument)
+        digits = -self.pip_location(instrument) + 1
+        half = self.spread_pips * 10 ** self.pip_location(instrument) / 2.0
+
+        last = self.cursor
+        if "to" in query:
+            to_ts = _parse_time(query["to"])
+            last = min(last, int((to_ts - path.start).total_seconds() // step) - 1)
+        first = last - count + 1
+        if "from" in query:
+            from_ts = _parse_time(query["from"])
+            first = max(0, int(-(-(from_ts - path.start).total_seconds() // step)))
+            if "to" not in query:
+                last = min(self.cursor, first + count - 1)
+        first = max(0, first)
+
+        out: list[dict[str, Any]] = []
+        for index in range(first, last + 1):
+            o, h, lo, c, vol = path.bar(index)
+            candle: dict[str, Any] = {
+                # The bar at the cursor is still forming, like the live API.
+                "complete": index < self.cursor,
+                "volume": vol,
+                "time": _fmt_time(path.start + timedelta(seconds=step * index)),
+            }
+            mid = {"o": o, "h": h, "l": lo, "c": c}
+            if "M" in components:
+                candle["mid"] = {k: f"{v:.{digits}f}" for k, v in mid.items()}
+            if "B" in components:
+                candle["bid"] = {k: f"{v - half:.{digits}f}" for k, v in mid.items()}
+            if "A" in components:
+                candle["ask"] = {k: f"{v + half:.{digits}f}" for k, v in mid.items()}
+            out.append(candle)
+        return {"instrument": instrument, "granularity": granularity, "candles": out}
+
+    def price_message(self, instrument: str) -> dict[str, Any]:
+        bid, ask, ts = self.quote(instrument)
+        digits = -self.pip_location(instrument) + 1
+        return {
+            "type": "PRICE",
+            "instrument": instrument,
+            "time": _fmt_time(ts),
+            "tradeable": True,
+            "bids": [{"price": f"{bid:.{digits}f}", "liquidity": 10_000_000}],
+            "asks": [{"price": f"{ask:.{digits}f}", "liquidity": 10_000_000}],
+            "closeoutBid": f"{bid:.{digits}f}",
+            "closeoutAsk": f"{ask:.{digits}f}",
+        }
+
+    def pricing(self, instruments: list[str]) -> dict[str, Any]:
+        if not instruments:
+            raise _ApiError(400, "Invalid value specified for 'instruments'")
+        return {
+            "prices": [self.price_message(name) for name in instruments],
+            "time": _fmt_time(self.quote(instruments[0])[2]),
+        }
+
+    # --- account -----------------------------------------------------------------------
+    def _unrealized(self) -> float:
+        total = 0.0
+        for instrument, pos in self.positions.items():
+            bid, ask, _ = self.quote(instrument)
+            units = pos["long"] + pos["short"]
+            if units > 0:
+                total += (bid - pos["avg_price"]) * units
+            elif units < 0:
+                total += (ask - pos["avg_price"]) * units
+        return total
+
+    def account_summary(self) -> dict[str, Any]:
+        unrealized = self._unrealized()
+        open_count = sum(1 for pos in self.positions.values() if pos["long"] or pos["short"])
+        return {
+            "account": {
+                "id": self.account_id,
+                "currency": "USD",
+                "balance": f"{self.balance:.4f}",
+                "NAV": f"{self.balance + unrealized:.4f}",
+                "unrealizedPL": f"{unrealized:.4f}",
+                "openPositionCount": open_count,
+                "marginRate": "0.0333",
+            },
+            "lastTransactionID": str(self.transaction_id),
+        }
+
+    def account_instruments(self, query: dict[str, str]) -> dict[str, Any]:
+        names = [name for name in query.get("instruments", "").split(",") if name]
+        return {
+            "instruments": [
+                {
+                    "name": name,
+                    "type": "CURRENCY",
+                    "displayName": name.replace("_", "/"),
+                    "pipLocation": self.pip_location(name),
+                    "displayPrecision": -self.pip_location(name) + 1,
+                    "tradeUnitsPrecision": 0,
+                    "minimumTradeSize": "1",
+                    "marginRate": "0.0333",
+                }
+                for name in names
+            ],
+            "lastTransactionID": str(self.transaction_id),
+        }
+
+    def _position_payload(self, instrument: str) -> dict[str, Any]:
+        pos = self.positions.get(instrument, {"long": 0.0, "short": 0.0, "avg_price": 0.0})
+        return {
+            "instrument": instrument,
+            "long": {"units": str(int(pos["long"])), "pl": "0.0000"},
+            "short": {"units": str(int(pos["short"])), "pl": "0.0000"},
+            "pl": "0.0000",
+            "unrealizedPL": "0.0000",
+        }
+
+    def position_details(self, instrument: str) -> dict[str, Any]:
+        return {"position": self._position_payload(instrument), "lastTransactionID": str(self.transaction_id)}
+
+    def open_positions(self) -> dict[str, Any]:
+        return {
+            "positions": [
+                self._position_payload(instrument)
+                for instrument, pos in self.positions.items()
+                if pos["long"] or pos["short"]
+            ],
+            "lastTransactionID": str(self.transaction_id),
+        }
+
+    def order_create(self, body: dict[str, Any]) -> dict[str, Any]:
+        order = body.get("order") or {}
+        instrument = str(order.get("instrument", ""))
+        try:
+            units = int(float(order.get("units", "0")))
+        except ValueError as exc:
+            raise _ApiError(400, "Invalid value specified for 'units'") from exc
+        if order.get("type") != "MARKET" or not instrument or units == 0:
+            raise _ApiError(400, "Only non-zero MARKET orders are supported by the stand-in")
+
+        bid, ask, ts = self.quote(instrument)
+        price = ask if units > 0 else bid
+        pos = self.positions.setdefault(instrument, {"long": 0.0, "short": 0.0, "avg_price": 0.0})
+        net = pos["long"] + pos["short"]
+        new_net = net + units
+        if net == 0 or (net > 0) == (units > 0):
+            pos["avg_price"] = (pos["avg_price"] * abs(net) + price * abs(units)) / abs(new_net)
+        else:
+            closed = min(abs(units), abs(net))
+            self.balance += (price - pos["avg_price"]) * closed * (1 if net > 0 else -1)
+            if new_net and (new_net > 0) != (net > 0):
+                pos["avg_price"] = price
+        pos["long"], pos["short"] = (float(new_net), 0.0) if new_net >= 0 else (0.0, float(new_net))
+
+        create_id = self.transaction_id + 1
+        fill_id = create_id + 1
+        self.transaction_id = fill_id
+        return {
+            "orderCreateTransaction": {
+                "id": str(create_id),
+                "type": "MARKET_ORDER",
+                "instrument": instrument,
+                "units": str(units),
+                "time": _fmt_time(ts),
+                "accountID": self.account_id,
+            },
+            "orderFillTransaction": {
+                "id": str(fill_id),
+                "type": "ORDER_FILL",
+                "orderID": str(create_id),
+                "instrument": instrument,
+                "units": str(units),
+                "price": f"{price:.5f}",
+                "time": _fmt_time(ts),
+                "accountBalance": f"{self.balance:.4f}",
+                "accountID": self.account_id,
+            },
+            "relatedTransactionIDs": [str(create_id), str(fill_id)],
+            "lastTransactionID": str(fill_id),
+        }
+
+
+class _ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StandInServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch("POST")
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method: str) -> None:
+        state = self.server.state
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        route = next(
+            ((name, match) for verb, pattern, name in _ROUTES if verb == method and (match := pattern.match(parts.path))),
+            None,
+        )
+        if route is None:
+            self._send_json(404, {"errorMessage": f"Unknown endpoint {method} {parts.path}"})
+            return
+        name, match = route
+        params = match.groupdict()
+
+        with state.lock:
+            state.request_counts[name] += 1
+            delay_ms = state.latency_ms + (state.rng.uniform(-state.jitter_ms, state.jitter_ms) if state.jitter_ms else 0.0)
+            inject_error = state.error_rate > 0 and state.rng.random() < state.error_rate
+            if inject_error:
+                state.errors_injected += 1
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            self._send_json(401, {"errorMessage": "Insufficient authorization to perform request."})
+            return
+        if "account" in params and params["account"] != state.account_id:
+            self._send_json(403, {"errorMessage": "The provided request was forbidden."})
+            return
+        if inject_error:
+            self._send_json(state.error_status, {"errorMessage": "Injected stand-in failure"})
+            return
+
+        if name == "pricing_stream":
+            self._stream_prices(query)
+            return
+
+        try:
+            with state.lock:
+                if name == "candles":
+                    payload = state.candles(params["instrument"], query)
+                elif name == "pricing":
+                    names = [n for n in query.get("instruments", "").split(",") if n]
+                    payload = state.pricing(names)
+                elif name == "account_summary":
+                    payload = state.account_summary()
+                elif name == "account_instruments":
+                    payload = state.account_instruments(query)
+                elif name == "open_positions":
+                    payload = state.open_positions()
+                elif name == "position_details":
+                    payload = state.position_details(params["instrument"])
+                else:
+                    payload = state.order_create(json.loads(raw_body or b"{}"))
+        except _ApiError as exc:
+            self._send_json(exc.status, {"errorMessage": exc.message})
+            return
+        self._send_json(201 if name == "order_create" else 200, payload)
+
+    def _stream_prices(self, query: dict[str, str]) -> None:
+        state = self.server.state
+        names = [n for n in query.get("instruments", "").split(",") if n]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        ticks = 0
+        try:
+            while not self.server.stopping.is_set():
+                with state.lock:
+                    lines = [state.price_message(n) for n in names]
+                    heartbeat = {"type": "HEARTBEAT", "time": _fmt_time(datetime.now(timezone.utc))}
+                for message in [*lines, heartbeat]:
+                    self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                ticks += 1
+                if state.stream_max_ticks and ticks >= state.stream_max_ticks:
+                    return
+                time.sleep(state.stream_interval_s)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: StandInState) -> None:
+        super().__init__(address, _Handler)
+        self.state = state
+        self.stopping = threading.Event()
+
+
+class OandaStandIn:
+    """In-process stand-in server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **state_kwargs: Any) -> None:
+        self.state = StandInState(**state_kwargs)
+        self._server = _StandInServer((host, port), self.state)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def account_id(self) -> str:
+        return self.state.account_id
+
+    def start(self) -> "OandaStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="oanda-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "OandaStandIn":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local OANDA v20 stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--csv", default=str(DEFAULT_CSV))
+    parser.add_argument("--account-id", default=DEFAULT_ACCOUNT_ID)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--bar-interval-s", type=float, default=0.0, help="Advance one bar every N seconds (0 = frozen)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    standin = OandaStandIn(
+        host=args.host,
+        port=args.port,
+        csv_path=Path(args.csv),
+        account_id=args.account_id,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    ).start()
+    print(f"OANDA stand-in on {standin.url} account={standin.account_id}")
+    print(f"export OANDA_API_URL={standin.url} OANDA_STREAM_URL={standin.url} OANDA_ACCOUNT_ID={standin.account_id}")
+    try:
+        while True:
+            time.sleep(args.bar_interval_s or 3600)
+            if args.bar_interval_s:
+                standin.state.advance()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
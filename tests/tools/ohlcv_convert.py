@@ -0,0 +1,56 @@
+"""Convert candles into the memory-mapped OHLCV store used by large backtests.
+
+    python -m tests.tools.ohlcv_convert --csv tests/fixtures/sample_ohlcv.csv --pair EUR_USD
+    python -m tests.tools.ohlcv_convert --history history --pairs EUR_USD,GBP_USD
+    python -m tests.tools.ohlcv_convert --fetch --pairs EUR_USD --start 2024-01-01 --dtype float32
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from config.instruments import get_registry
+from config.settings import HISTORY_DIR, OHLCV_DIR
+from data.ohlcv_store import PRICE_DTYPES, csv_to_ohlcv, fetch_to_ohlcv, history_to_ohlcv, open_ohlcv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build .npy OHLCV column stores from CSV, history or OANDA")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV with time,open,high,low,close,volume (requires a single --pair)")
+    source.add_argument("--history", nargs="?", const=HISTORY_DIR, help="History store root from download_history")
+    source.add_argument("--fetch", action="store_true", help="Page candles from OANDA directly")
+    parser.add_argument("--pair", "--pairs", dest="pairs", default="", help="Comma-separated pairs (default: registry)")
+    parser.add_argument("--granularity", default="M5")
+    parser.add_argument("--start", default=None, help="Fetch start (UTC), required with --fetch")
+    parser.add_argument("--end", default=None, help="Fetch end (UTC, exclusive); default now")
+    parser.add_argument("--dtype", choices=sorted(PRICE_DTYPES), default="float64")
+    parser.add_argument("--price", choices=["M", "BA", "MBA"], default="M", help="Candle prices for --fetch")
+    parser.add_argument("--out", default=OHLCV_DIR, help="OHLCV store root")
+    args = parser.parse_args()
+
+    pairs = [p.strip() for p in args.pairs.split(",") if p.strip()] or list(get_registry().strategy_map())
+    if args.csv and len(pairs) != 1:
+        parser.error("--csv converts one file; pass exactly one --pair")
+    if args.fetch and not args.start:
+        parser.error("--fetch requires --start")
+
+    for pair in pairs:
+        kwargs = {"root": args.out, "dtype": args.dtype}
+        if args.csv:
+            csv_to_ohlcv(args.csv, pair, args.granularity, **kwargs)
+        elif args.history:
+            history_to_ohlcv(args.history, pair, args.granularity, **kwargs)
+        else:
+            fetch_to_ohlcv(pair, args.granularity, args.start, args.end, price=args.price, **kwargs)
+        arrays = open_ohlcv(pair, args.granularity, root=args.out)
+        first = arrays.times()[0].isoformat() if len(arrays) else "-"
+        last = arrays.times()[-1].isoformat() if len(arrays) else "-"
+        print(
+            f"{pair:<10} {args.granularity} rows={len(arrays)} first={first} last={last} dtype={args.dtype} "
+            f"bid_ask={bool(arrays.bid_ask)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
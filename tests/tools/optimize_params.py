@@ -0,0 +1,81 @@
+"""Search strategy params with successive halving / Hyperband and save the winner as a profile.
+
+    python -m tests.tools.optimize_params --ohlcv --pair USD_JPY --configs 81 --workers 4
+    python -m tests.tools.optimize_params --history --pair EUR_USD --method hyperband --save
+    python -m tests.tools.optimize_params --csv tests/fixtures/sample_ohlcv.csv --pair EUR_USD --min-bars 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+
+import pandas as pd
+
+from backtest.optimize import OPTIMIZED_PROFILE, hyperband, save_profile, strategy_name, successive_halving
+from config.instruments import get_registry
+from config.settings import HISTORY_DIR, OHLCV_DIR
+from data.history import HistoryStore
+from data.ohlcv_store import open_ohlcv
+from storage.strategy_params import PROFILES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Adaptive (successive halving / Hyperband) strategy param search")
+    parser.add_argument("--pair", required=True, choices=sorted(get_registry().strategy_map()))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Path to an OHLCV CSV")
+    source.add_argument("--history", nargs="?", const=HISTORY_DIR, help="History store root")
+    source.add_argument("--ohlcv", nargs="?", const=OHLCV_DIR, help="Memory-mapped OHLCV store root")
+    parser.add_argument("--start", default=None, help="History start (UTC, inclusive)")
+    parser.add_argument("--end", default=None, help="History end (UTC, exclusive)")
+    parser.add_argument("--method", choices=["halving", "hyperband"], default="halving")
+    parser.add_argument("--configs", type=int, default=27, help="Configurations in the first rung (halving)")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta per rung; windows grow by eta")
+    parser.add_argument("--min-bars", type=int, default=2_000, help="Shortest evaluation window")
+    parser.add_argument("--metric", default="sharpe", choices=["sharpe", "avg_pips_per_trade", "profit_factor", "win_rate", "max_drawdown"])
+    parser.add_argument("--min-trades", type=int, default=30, help="Validation trades required on the full history")
+    parser.add_argument("--mode", choices=["sl_tp", "time_exit"], default="sl_tp")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=123)
+    parser.add_argument("--save", action="store_true", help="Write the winner as a strategy params profile")
+    parser.add_argument("--profile", default=OPTIMIZED_PROFILE, choices=PROFILES, help="Profile name for --save")
+    parser.add_argument("--activate", action="store_true", help="Also make the saved profile active")
+    args = parser.parse_args()
+
+    if args.csv:
+        bars = pd.read_csv(args.csv)
+    elif args.history:
+        bars = HistoryStore(args.history).load(args.pair, "M5", args.start, args.end)
+    else:
+        bars = open_ohlcv(args.pair, "M5", root=args.ohlcv).slice(args.start, args.end)
+    module = importlib.import_module(f"strategies.{get_registry().strategy_map()[args.pair]}")
+
+    kwargs = dict(
+        eta=args.eta, min_bars=args.min_bars, metric=args.metric, min_trades=args.min_trades,
+        mode=args.mode, seed=args.seed, workers=args.workers,
+    )
+    if args.method == "hyperband":
+        result = hyperband(bars, args.pair, module, **kwargs)
+    else:
+        result = successive_halving(bars, args.pair, module, n_configs=args.configs, **kwargs)
+
+    for rung in result.get("rungs", []):
+        print(f"RUNG {rung['rung']}: bars={rung['bars']} configs={len(rung['results'])} promoted={len(rung['promoted'])}")
+    for bracket in result.get("brackets", []):
+        print(f"BRACKET {bracket['bracket']}: configs={bracket['configs']} best={bracket['best']['score']:.4f}")
+    best = result["best"]
+    print(f"EVALUATIONS: {result['evaluations']} (bar-evaluations {result['bar_evaluations']})")
+    print(f"BEST {args.metric}: {best['score']:.4f}  trades={best['validation']['total_trades']}")
+    print(f"PARAMS: {best['params']}")
+    if args.save:
+        if best["score"] == float("-inf"):
+            print("NOT SAVED: no configuration reached --min-trades")
+            return
+        strategy = strategy_name(module)
+        save_profile(strategy, best["params"], profile=args.profile, activate=args.activate)
+        print(f"SAVED: {strategy}/{args.profile}{' (active)' if args.activate else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,25 +9,20 @@ from pathlib import Path
 
 import pandas as pd
 
-from config.pairs import PAIR_STRATEGY_MAP
+from config.instruments import get_registry
 from config.settings import OANDA_ACCOUNT_ID, TIMEFRAME
-from data.fetcher import get_candles, get_oanda_client
+from data.broker_gateway import begin_cycle
+from data.fetcher import get_candles, get_oanda_client, has_bid_ask
+from data.intrabar import IntrabarResolver
 from execution.paper_broker import PaperBroker
 from execution.alerting import get_alert_service
 from execution.alerts import AlertEvent
+from execution.gates import evaluate_gates
 from execution.kill_switch import close_all_positions
 from execution.risk_manager import RISK_PER_TRADE, calculate_sl_tp
 from execution.trade_store import TradeStore
-from filters.market_state import is_strategy_allowed
-from filters.news_filter import is_news_clear
-from filters.session_filter import is_session_active
-from filters.spread_filter import calculate_spread_pips, get_live_bid_ask, is_spread_acceptable
-from indicators.adx import calculate_adx
-from indicators.atr import calculate_atr
-from indicators.bollinger import calculate_bollinger
-from indicators.ema import calculate_ema
-from indicators.rsi import calculate_rsi
-from indicators.vwap import calculate_vwap
+from filters.spread_filter import calculate_spread_pips, get_live_bid_ask, get_live_bid_ask_many
+from indicators.plan import FeaturePlan, resolve_plan
 from strategies import bb_breakout, ema_vwap, vwap_rsi
 
 STRATEGIES = {
@@ -49,18 +44,9 @@ def _logger() -> logging.Logger:
     return logger
 
 
-def _prepare_df(strategy_name: str, df: pd.DataFrame) -> pd.DataFrame:
-    out = calculate_atr(df.copy())
-    out = calculate_adx(out)
-    if strategy_name == "ema_vwap":
-        out = calculate_ema(out, fast=9, slow=21)
-        out = calculate_vwap(out)
-    elif strategy_name == "bb_breakout":
-        out = calculate_bollinger(out, period=20, std_mult=2.0)
-    else:
-        out = calculate_rsi(out, period=3)
-        out = calculate_vwap(out)
-    return out
+def _feature_plan(strategy_name: str) -> FeaturePlan:
+    """Indicators and candle count the strategy declares (`indicators.plan`)."""
+    return resolve_plan(STRATEGIES[strategy_name])
 
 
 def _position_units(balance: float, entry: float, sl: float, risk_pct: float = RISK_PER_TRADE) -> int:
@@ -72,23 +58,6 @@ def _position_units(balance: float, entry: float, sl: float, risk_pct: float = R
     return units
 
 
-def _evaluate_gates(pair: str, strategy_name: str, df: pd.DataFrame, bid: float, ask: float, broker: PaperBroker, halted: bool, now_utc: datetime | None = None) -> dict[str, bool]:
-    session_gate = is_session_active(pair, now_utc=now_utc)
-    spread_gate = is_spread_acceptable(pair, bid, ask)
-    news_gate = is_news_clear(pair)
-    open_pos_gate = not broker.has_open_position(pair)
-    daily_loss_gate = not halted
-    enemy_gate = is_strategy_allowed(strategy_name, df)
-    return {
-        "session_gate": session_gate,
-        "spread_gate": spread_gate,
-        "news_gate": news_gate,
-        "open_pos_gate": open_pos_gate,
-        "daily_loss_gate": daily_loss_gate,
-        "enemy_gate": enemy_gate,
-    }
-
-
 MAX_DRAWDOWN = 0.03
 
 
@@ -107,8 +76,10 @@ def _run_pair(
     now_utc: datetime | None = None,
 ) -> float:
     logger = _logger()
-    gates = _evaluate_gates(pair, strategy_name, df, bid, ask, broker, halted, now_utc=now_utc)
-    signal = STRATEGIES[strategy_name].generate_signal_from_df(df)
+    gates = evaluate_gates(pair, strategy_name, df, bid, ask, broker, halted, now_utc=now_utc)
+    module = STRATEGIES[strategy_name]
+    # The signal logic reads only the strategy's declared trailing rows.
+    signal = module.generate_signal_from_df(df.iloc[-module.LOOKBACK :])
     decision = "EXECUTE" if all(gates.values()) and signal in {"BUY", "SELL"} else "BLOCK"
 
     logger.info("%s/%s gates=%s signal=%s decision=%s", pair, strategy_name, gates, signal, decision)
@@ -141,17 +112,22 @@ def _run_pair(
     return balance
 
 
-def run_offline(csv_path: Path, export_csv: bool = False) -> None:
+def run_offline(csv_path: Path, export_csv: bool = False, intrabar_csv: Path | None = None) -> None:
     logger = _logger()
     alert_service = get_alert_service()
     store = TradeStore()
     store.init_db()
-    broker = PaperBroker(store, export_csv=export_csv)
+    pair = "EUR_USD"
+    # Optional M1 (or tick) CSV deciding bars that reach both SL and TP.
+    intrabar = {pair: IntrabarResolver.from_frame(pd.read_csv(intrabar_csv))} if intrabar_csv else None
+    broker = PaperBroker(store, export_csv=export_csv, intrabar=intrabar)
 
     frame = pd.read_csv(csv_path)
     frame["time"] = pd.to_datetime(frame["time"], utc=True)
-    pair = "EUR_USD"
-    strategy_name = PAIR_STRATEGY_MAP[pair]
+    # Bid/ask candles (e.g. from `download_history --price BA`) give the historical per-bar spread.
+    quoted = has_bid_ask(frame)
+    bar_columns = ["high", "low"] + (["bid_high", "bid_low", "ask_high", "ask_low"] if quoted else [])
+    strategy_name = get_registry().strategy_map()[pair]
 
     today = datetime.now(timezone.utc).date().isoformat()
     stats = store.get_daily_stats(today) or {
@@ -163,14 +139,20 @@ def run_offline(csv_path: Path, export_csv: bool = False) -> None:
     balance = float(stats["current_balance"])
     store.upsert_daily_stats(today, float(stats["start_balance"]), balance, float(stats["realized_pnl"]), bool(stats["halted"]))
 
+    # Indicators are causal, so one pass over the full history gives every bar the values a
+    # per-bar recomputation would, as in `backtest_strategy` and replay.
+    prepared = _feature_plan(strategy_name).apply(frame)
     for idx in range(60, len(frame)):
-        window = frame.iloc[: idx + 1].copy()
-        calc_df = _prepare_df(strategy_name, window)
-
-        close = float(window.iloc[-1]["close"])
-        bid, ask = close - 0.00005, close + 0.00005
+        calc_df = prepared.iloc[: idx + 1]
+
+        last = frame.iloc[idx]
+        if quoted:
+            bid, ask = float(last["bid_close"]), float(last["ask_close"])
+        else:
+            close = float(last["close"])
+            bid, ask = close - 0.00005, close + 0.00005
         halted = bool((store.get_daily_stats(today) or stats).get("halted", False))
-        bar_time = window.iloc[-1]["time"].to_pydatetime()
+        bar_time = last["time"].to_pydatetime()
         balance = _run_pair(
             pair=pair,
             strategy_name=strategy_name,
@@ -184,14 +166,9 @@ def run_offline(csv_path: Path, export_csv: bool = False) -> None:
             halted=halted,
             now_utc=bar_time,
         )
-        closed = broker.update_positions_from_bar(
-            pair,
-            {
-                "high": float(window.iloc[-1]["high"]),
-                "low": float(window.iloc[-1]["low"]),
-            },
-            time_utc=str(window.iloc[-1]["time"].isoformat()),
-        )
+        bar = {column: float(last[column]) for column in bar_columns}
+        bar["time"] = last["time"]
+        closed = broker.update_positions_from_bar(pair, bar, time_utc=str(last["time"].isoformat()))
         if closed:
             realized = sum(float(t["pnl_quote"]) for t in closed)
             balance += realized
@@ -223,6 +200,7 @@ def run_live(pairs: list[str], export_csv: bool = False) -> None:
     store.init_db()
     broker = PaperBroker(store, export_csv=export_csv)
     client = get_oanda_client()
+    begin_cycle(client)
     if not OANDA_ACCOUNT_ID:
         raise ValueError("OANDA_ACCOUNT_ID required for LIVE mode")
 
@@ -236,11 +214,14 @@ def run_live(pairs: list[str], export_csv: bool = False) -> None:
 
     store.upsert_daily_stats(today, float(stats["start_balance"]), float(stats["current_balance"]), float(stats["realized_pnl"]), bool(stats["halted"]))
 
+    quotes = get_live_bid_ask_many(pairs, client, OANDA_ACCOUNT_ID)
     for pair in pairs:
-        strategy_name = PAIR_STRATEGY_MAP[pair]
-        candles = get_candles(pair, TIMEFRAME, count=150)
-        calc_df = _prepare_df(strategy_name, candles)
-        bid, ask = get_live_bid_ask(pair, client, OANDA_ACCOUNT_ID)
+        strategy_name = get_registry().strategy_map()[pair]
+        plan = _feature_plan(strategy_name)
+        candles = get_candles(pair, TIMEFRAME, count=plan.fetch_count())
+        calc_df = plan.apply(candles)
+        quote = quotes.get(pair)
+        bid, ask = quote[:2] if quote is not None else get_live_bid_ask(pair, client, OANDA_ACCOUNT_ID)
         _run_pair(
             pair=pair,
             strategy_name=strategy_name,
@@ -281,10 +262,15 @@ def main() -> None:
     parser.add_argument("--pairs", default="EUR_USD,GBP_USD")
     parser.add_argument("--csv", default="tests/fixtures/sample_ohlcv.csv")
     parser.add_argument("--export-csv", action="store_true")
+    parser.add_argument("--intrabar-csv", default=None, help="OFFLINE: M1/tick CSV resolving bars that hit SL and TP")
     args = parser.parse_args()
 
     if args.mode == "OFFLINE":
-        run_offline(Path(args.csv), export_csv=args.export_csv)
+        run_offline(
+            Path(args.csv),
+            export_csv=args.export_csv,
+            intrabar_csv=Path(args.intrabar_csv) if args.intrabar_csv else None,
+        )
     else:
         pairs = [pair.strip() for pair in args.pairs.split(",") if pair.strip()]
         run_live(pairs, export_csv=args.export_csv)
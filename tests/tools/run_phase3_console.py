@@ -7,14 +7,14 @@ from typing import Any
 
 import pandas as pd
 
-from config.pairs import PAIR_STRATEGY_MAP
+from config.instruments import get_registry
 from config.settings import COMMAND_RUNNING_TIMEOUT_SEC, OANDA_ACCOUNT_ID, OANDA_API_KEY
 from data.fetcher import get_candles, get_oanda_client
 from execution.command_executor import process_next_command
 from filters.market_state import get_market_state, is_strategy_allowed
 from filters.news_filter import fetch_forexfactory_calendar, get_blocking_news_event
-from filters.session_filter import SESSIONS, is_session_active
-from filters.spread_filter import MAX_SPREAD_PIPS, calculate_spread_pips, get_live_bid_ask, is_spread_acceptable
+from filters.session_filter import is_session_active
+from filters.spread_filter import calculate_spread_pips, get_live_bid_ask, is_spread_acceptable
 from indicators.adx import calculate_adx
 from indicators.atr import calculate_atr
 from indicators.bollinger import calculate_bollinger
@@ -78,6 +78,7 @@ def run_console() -> None:
     print("=" * 100)
 
     now = datetime.now(timezone.utc)
+    registry = get_registry()
 
     try:
         paused_pairs = _load_latest_paused_pairs(conn)
@@ -85,7 +86,7 @@ def run_console() -> None:
         paused_pairs, command_result = process_next_command(conn, paused_pairs=paused_pairs, handled_by="run_phase3_console")
         command_id = None if command_result is None else int(command_result["id"])
 
-        for pair, strategy_name in PAIR_STRATEGY_MAP.items():
+        for pair, strategy_name in registry.strategy_map().items():
             print("\n" + "-" * 100)
             print(f"PAIR: {pair} | STRATEGY: {strategy_name}")
             print(f"UTC now: {now.isoformat()}")
@@ -115,17 +116,17 @@ def run_console() -> None:
             else:
                 df = _load_offline_fixture().tail(200).reset_index(drop=True)
                 close = float(df["close"].iloc[-1])
-                pip = 0.01 if pair.endswith("JPY") else 0.0001
+                pip = registry.spec(pair).pip_size
                 bid = close - pip * 0.5
                 ask = close + pip * 0.5
 
             df = compute_indicators(df)
 
             session_ok = is_session_active(pair, now_utc=now)
-            session_window = SESSIONS.get(pair)
+            session_window = registry.spec(pair).session
 
             spread_pips = calculate_spread_pips(pair, bid, ask)
-            max_spread = MAX_SPREAD_PIPS.get(pair, 2.0)
+            max_spread = registry.spec(pair).max_spread_pips or 2.0
             spread_ok = is_spread_acceptable(pair, bid=bid, ask=ask)
 
             blocking_event = get_blocking_news_event(pair, now_utc=now, buffer_minutes=15, events=events)
@@ -193,7 +194,7 @@ def run_console() -> None:
             uptime_s=None,
             last_cycle_ts_utc=now.isoformat(),
             paused_pairs=sorted(paused_pairs),
-            meta={"tool": "tests.tools.run_phase3_console", "pairs": list(PAIR_STRATEGY_MAP.keys())},
+            meta={"tool": "tests.tools.run_phase3_console", "pairs": list(registry.strategy_map())},
         )
     finally:
         conn.close()
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from config.pairs import PAIR_STRATEGY_MAP
+from config.instruments import get_registry
 from config.settings import OANDA_ACCOUNT_ID, OANDA_API_KEY
 from data.fetcher import get_oanda_client
 from strategies import bb_breakout, ema_vwap, vwap_rsi
@@ -20,8 +20,8 @@ def run_scan() -> None:
         return
 
     client = get_oanda_client()
-    for pair, strategy_name in PAIR_STRATEGY_MAP.items():
-        signal = STRATEGY_FN[strategy_name](client, OANDA_ACCOUNT_ID)
+    for pair, strategy_name in get_registry().strategy_map().items():
+        signal = STRATEGY_FN[strategy_name](client, OANDA_ACCOUNT_ID, pair=pair)
         print(f"{pair} {strategy_name} -> {signal}")
 
 
@@ -0,0 +1,32 @@
+"""Compare backtest runs stored by `backtest_run --trade-log` without re-running them.
+
+    python -m tests.tools.trade_log_compare
+    python -m tests.tools.trade_log_compare --root trade_logs --runs EUR_USD_ema_vwap_sl_tp_20240101T000000000000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import pandas as pd
+
+from backtest.trade_log import compare_runs, list_runs
+from config.settings import TRADE_LOG_DIR
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize stored columnar trade logs side by side")
+    parser.add_argument("--root", default=TRADE_LOG_DIR, help="Trade log root")
+    parser.add_argument("--runs", default="", help="Comma-separated run ids (default: all)")
+    args = parser.parse_args()
+
+    runs = [r.strip() for r in args.runs.split(",") if r.strip()] or list_runs(args.root)
+    if not runs:
+        print(f"NO RUNS in {args.root}")
+        return
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.4f}".format):
+        print(compare_runs(args.root, runs).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -48,3 +48,50 @@ def test_export_trades_xlsx_returns_valid_workbook(client: TestClient) -> None:
     ws = wb["trades"]
     assert ws["A1"].value == "id"
     assert ws.max_row >= 2
+
+
+def _insert_trades(count: int) -> None:
+    conn = connect()
+    now = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        "INSERT INTO trades (time_open_utc,time_close_utc,pair,strategy,direction,units,entry_price,exit_price,sl_price,tp_price,result,pnl_pips,pnl_quote,meta_json) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        [
+            (now, now, "GBP_USD", "bb_breakout", "SELL", 1000, 1.2, 1.199, 1.201, 1.198, "TP", 10.0, 1.0, '{"mode":"PAPER","command_id":7}')
+            for _ in range(count)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_export_trades_xlsx_is_not_capped(client: TestClient) -> None:
+    _insert_trades(1200)
+    res = client.get("/exports/trades.xlsx")
+    assert res.status_code == 200
+
+    wb = openpyxl.load_workbook(BytesIO(res.content), read_only=True)
+    ws = wb["trades"]
+    assert sum(1 for _ in ws.iter_rows(values_only=True)) == 1 + 1201
+
+
+def test_export_trades_csv_streams_all_rows_with_filters(client: TestClient) -> None:
+    _insert_trades(2500)
+    res = client.get("/exports/trades.csv", params={"pair": "GBP_USD", "command_id": 7})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+
+    lines = res.text.strip().splitlines()
+    assert lines[0].startswith("id,opened_ts_utc,closed_ts_utc,pair,side")
+    assert len(lines) == 1 + 2500
+    assert all(",GBP_USD,SELL," in line for line in lines[1:])
+
+
+def test_export_trades_parquet_round_trips(client: TestClient) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    _insert_trades(1500)
+    res = client.get("/exports/trades.parquet", params={"limit": 1400})
+    assert res.status_code == 200
+
+    table = pq.read_table(BytesIO(res.content))
+    assert table.num_rows == 1400
+    assert table.column("pair").to_pylist()[-1] == "GBP_USD"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.auth import AuthenticatedUser, SessionCache, ensure_user, get_session_cache, update_user_role
+from storage.db import connect, init_db
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "api_session_cache.sqlite"
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(db_path))
+    conn = connect(db_path)
+    init_db(conn)
+    ensure_user(conn, username="admin", password="admin-pass", role="admin")
+    conn.close()
+    with TestClient(app) as test_client:
+        login = test_client.post("/auth/login", json={"username": "admin", "password": "admin-pass"})
+        assert login.status_code == 200
+        yield test_client
+
+
+def test_cache_expires_at_token_exp_and_evicts_lru() -> None:
+    cache = SessionCache(max_entries=2, ttl_s=60)
+    user = AuthenticatedUser(id=1, username="a", role="viewer")
+
+    cache.put("t1", user, token_exp=110, now=100)
+    assert cache.get("t1", now=105) == user
+    assert cache.get("t1", now=110) is None
+
+    cache.put("t1", user, token_exp=1_000, now=100)
+    cache.put("t2", user, token_exp=1_000, now=100)
+    cache.get("t1", now=101)
+    cache.put("t3", user, token_exp=1_000, now=101)
+    assert len(cache) == 2
+    assert cache.get("t2", now=102) is None
+    assert cache.get("t1", now=102) == user
+    assert cache.get("t1", now=200) is None
+
+
+def test_repeat_requests_hit_cache_for_viewer_and_admin_routes(client: TestClient) -> None:
+    cache = get_session_cache()
+    assert client.get("/status").status_code == 200
+    misses = cache.misses
+    assert client.get("/status").status_code == 200
+    assert client.get("/settings").status_code == 200
+    assert cache.misses == misses
+    assert cache.hits >= 2
+
+
+def test_role_change_invalidates_cached_session(client: TestClient) -> None:
+    assert client.get("/settings").status_code == 200
+
+    conn = connect()
+    try:
+        update_user_role(conn, username="admin", role="viewer")
+    finally:
+        conn.close()
+
+    assert client.get("/settings").status_code == 403
+    assert client.get("/status").status_code == 200
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+
+import backtest.backtest as bt
+from backtest.cache import BacktestCache, cache_key, frame_digest
+
+
+class _Strategy:
+    @staticmethod
+    def get_effective_params() -> dict[str, float]:
+        return {"rsi_period": 14.0}
+
+    @staticmethod
+    def generate_signal_from_df(_df: pd.DataFrame, *, params=None) -> str:
+        return "HOLD"
+
+
+def _bars() -> pd.DataFrame:
+    df = pd.read_csv("tests/fixtures/sample_ohlcv.csv")
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df
+
+
+def _counting_segment(monkeypatch) -> dict[str, int]:
+    calls = {"segments": 0, "indicators": 0}
+    prepare = bt._prepare_indicators
+
+    def _segment(*args, **kwargs) -> pd.DataFrame:
+        calls["segments"] += 1
+        return pd.DataFrame({"pnl_pips": [1.0, -0.5, 2.0]})
+
+    def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+        calls["indicators"] += 1
+        return prepare(df)
+
+    monkeypatch.setattr(bt, "_run_segment", _segment)
+    monkeypatch.setattr(bt, "_prepare_indicators", _prepare)
+    return calls
+
+
+def test_repeat_run_is_served_from_cache(tmp_path, monkeypatch) -> None:
+    calls = _counting_segment(monkeypatch)
+    cache = BacktestCache(tmp_path)
+    df = _bars()
+
+    first = bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache)
+    second = bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache)
+
+    assert first == second
+    assert calls == {"segments": 2, "indicators": 1}
+
+    # A different seed is a new result but reuses the prepared indicator frame.
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache, seed=7)
+    assert calls == {"segments": 4, "indicators": 1}
+
+
+def test_key_changes_with_data_params_and_settings(tmp_path, monkeypatch) -> None:
+    calls = _counting_segment(monkeypatch)
+    cache = BacktestCache(tmp_path)
+    df = _bars()
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache)
+
+    changed = df.copy()
+    changed.loc[len(df) - 1, "close"] += 0.0001
+    assert frame_digest(changed) != frame_digest(df)
+    bt.backtest_strategy(changed, "EUR_USD", _Strategy, cache=cache)
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache, params={"rsi_period": 7.0})
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache, mode="time_exit")
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache, lookahead=20)
+    assert calls["segments"] == 10
+    assert cache_key(a=1, b=[1, 2]) == cache_key(b=[1, 2], a=1)
+
+
+def test_return_trades_bypasses_result_cache(tmp_path, monkeypatch) -> None:
+    calls = _counting_segment(monkeypatch)
+    cache = BacktestCache(tmp_path)
+    df = _bars()
+    bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache)
+
+    result = bt.backtest_strategy(df, "EUR_USD", _Strategy, cache=cache, return_trades=True)
+    assert len(result["validation_trades"]) == 3
+    assert calls == {"segments": 4, "indicators": 1}
+
+
+def test_lru_eviction_by_size(tmp_path) -> None:
+    cache = BacktestCache(tmp_path, max_bytes=10_000)
+    frame = pd.DataFrame({"x": range(300)})  # a few KB pickled
+    for key in ("aa01", "bb02", "cc03"):
+        cache.put_frame(key, frame)
+    old = tmp_path / "frames" / "aa" / "aa01.pkl"
+    os.utime(old, (1, 1))
+    os.utime(tmp_path / "frames" / "bb" / "bb02.pkl", (2, 2))
+    assert cache.get_frame("aa01") is not None  # touch: aa01 becomes most recent
+
+    cache.max_bytes = cache.size_bytes() - 1
+    assert cache.evict() == 1
+    assert cache.get_frame("bb02") is None
+    assert cache.get_frame("aa01") is not None and cache.get_frame("cc03") is not None
+    cache.put_result("dd04", {"sharpe": float("inf")})
+    assert cache.get_result("dd04") == {"sharpe": float("inf")}
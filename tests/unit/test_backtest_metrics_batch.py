@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtest import compute_metrics, compute_metrics_batch, metrics_rows, pack_pnl
+
+
+def _reference_metrics(trades_df: pd.DataFrame) -> dict[str, float]:
+    """pandas implementation `compute_metrics` replaced; kept as the parity oracle."""
+    pnl = trades_df["pnl_pips"].astype(float)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    gross_win = float(wins.sum())
+    gross_loss = float(losses.abs().sum())
+    equity_curve = pnl.cumsum()
+    drawdowns = equity_curve.cummax() - equity_curve
+    mean = float(pnl.mean())
+    std = float(pnl.std(ddof=0))
+    return {
+        "total_trades": int(len(trades_df)),
+        "win_rate": float((pnl > 0).mean()),
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else float("inf"),
+        "gross_win_pips": gross_win,
+        "gross_loss_pips": gross_loss,
+        "max_drawdown": float(drawdowns.max()),
+        "sharpe": float(mean / std) if std > 0 else 0.0,
+        "avg_pips_per_trade": mean,
+    }
+
+
+def _ragged_sets(seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    sizes = [*range(1, 140), 1000, 9000, *rng.integers(1, 400, 100)]
+    sets = [rng.normal(0.2, 7.0, size) * rng.choice([1e-3, 1.0, 1e3]) for size in sizes]
+    sets += [np.abs(rng.normal(0, 1, 40)), -np.abs(rng.normal(0, 1, 40)), np.zeros(12)]
+    return sets
+
+
+def test_numpy_compute_metrics_matches_pandas_reference_exactly() -> None:
+    for pnl in _ragged_sets(0):
+        frame = pd.DataFrame({"pnl_pips": pnl})
+        assert compute_metrics(frame) == _reference_metrics(frame)
+
+
+def test_batch_matches_compute_metrics_for_every_set() -> None:
+    sets = _ragged_sets(1)
+    values, offsets = pack_pnl([*sets, [], pd.DataFrame(), pd.DataFrame({"pnl_pips": sets[5]})])
+    assert offsets[0] == 0 and offsets[-1] == len(values)
+
+    rows = metrics_rows(compute_metrics_batch(values, offsets))
+    for row, pnl in zip(rows, sets):
+        assert row == compute_metrics(pd.DataFrame({"pnl_pips": pnl}))
+    assert rows[-3] == rows[-2] == compute_metrics(pd.DataFrame())
+    assert rows[-1] == rows[5]
+
+
+def test_batch_of_no_sets_is_empty() -> None:
+    batch = compute_metrics_batch(*pack_pnl([]))
+    assert all(len(values) == 0 for values in batch.values())
+    assert metrics_rows(batch) == []
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import compute_metrics
+from backtest.monte_carlo import matrix_metrics, monte_carlo, monte_carlo_trades
+
+
+def test_matrix_metrics_match_compute_metrics_per_row() -> None:
+    rng = np.random.default_rng(7)
+    samples = rng.normal(0.3, 5.0, size=(6, 40))
+    samples[5] = np.abs(samples[5])  # no losing trades -> infinite profit factor
+
+    batch = matrix_metrics(samples)
+    for row in range(samples.shape[0]):
+        expected = compute_metrics(pd.DataFrame({"pnl_pips": samples[row]}))
+        for name in ("win_rate", "profit_factor", "max_drawdown", "sharpe"):
+            assert batch[name][row] == pytest.approx(expected[name])
+
+
+def test_shuffle_keeps_order_free_metrics_and_spreads_drawdown() -> None:
+    pnl = np.array([5.0] * 30 + [-4.0] * 20)  # losses clustered at the end
+    result = monte_carlo(pnl, n_resamples=500, modes=("shuffle",), seed=1, block_elements=4_000)
+
+    shuffle = result["shuffle"]
+    assert shuffle["win_rate"]["low"] == shuffle["win_rate"]["high"] == pytest.approx(0.6)
+    assert shuffle["sharpe"]["median"] == pytest.approx(result["point"]["sharpe"])
+    assert result["point"]["max_drawdown"] == pytest.approx(80.0)
+    assert shuffle["max_drawdown"]["high"] <= 80.0
+    assert shuffle["max_drawdown"]["low"] < shuffle["max_drawdown"]["high"]
+
+
+def test_bootstrap_interval_covers_point_and_is_seeded() -> None:
+    pnl = np.random.default_rng(3).normal(1.0, 8.0, size=300)
+    first = monte_carlo(pnl, n_resamples=400, modes=("bootstrap",), seed=9)
+    second = monte_carlo(pnl, n_resamples=400, modes=("bootstrap",), seed=9, block_elements=10_000)
+
+    assert first == second  # the random stream, not the block layout, determines the draws
+    for name in ("win_rate", "sharpe", "max_drawdown"):
+        stats = first["bootstrap"][name]
+        assert stats["low"] <= first["point"][name] <= stats["high"]
+
+
+def test_slippage_redraw_uses_recorded_slip_and_registry_cap() -> None:
+    trades = pd.DataFrame({"pnl_pips": [10.0, -5.0, 10.0, -5.0], "slip_pips": [0.0, 0.0, 0.0, 0.0]})
+    result = monte_carlo_trades(trades, "EUR_USD", n_resamples=200, modes=("slippage",), max_slip_pips=2.0)
+
+    # Recorded zero slippage: every redraw can only cost pips.
+    assert result["slippage"]["sharpe"]["high"] <= result["point"]["sharpe"]
+    assert result["slippage"]["profit_factor"]["high"] <= result["point"]["profit_factor"]
+    with pytest.raises(ValueError):
+        monte_carlo([], n_resamples=10)
+    with pytest.raises(ValueError):
+        monte_carlo([1.0], modes=("jackknife",))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import backtest_strategy
+from backtest.optimize import SEARCH_SPACES, hyperband, sample_configs, save_profile, successive_halving
+
+
+def _bars(count: int = 2400, seed: int = 6) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, count))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, count)))
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=count, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + wick[0],
+            "low": np.minimum(open_, close) - wick[1],
+            "close": close,
+            "volume": rng.integers(50, 500, count),
+        }
+    )
+
+
+def test_successive_halving_promotes_to_full_history_and_parallel_matches_serial(tmp_path, monkeypatch) -> None:
+    from strategies import vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(4500)
+    kwargs = dict(n_configs=9, eta=3, min_bars=500, lookahead=10, min_trades=3, metric="avg_pips_per_trade")
+
+    serial = successive_halving(df, "EUR_USD", vwap_rsi, workers=1, **kwargs)
+    parallel = successive_halving(df, "EUR_USD", vwap_rsi, workers=2, **kwargs)
+
+    assert [r["bars"] for r in serial["rungs"]] == [500, 1500, 4500]
+    assert [len(r["results"]) for r in serial["rungs"]] == [9, 3, 1]
+    assert serial["evaluations"] == 13 and serial["bar_evaluations"] == 9 * 500 + 3 * 1500 + 4500
+    first = serial["rungs"][0]
+    scores = [r["score"] for r in first["results"]]
+    assert scores == sorted(scores, reverse=True) and len(set(scores)) > 2
+    assert first["promoted"] == [r["config"] for r in first["results"][:3]]
+    assert parallel == serial
+
+    best = serial["best"]
+    direct = backtest_strategy(df, "EUR_USD", vwap_rsi, params=best["params"], lookahead=10, min_trades=3)
+    assert best["validation"] == direct["validation"]
+    assert best["score"] == direct["validation"]["avg_pips_per_trade"]
+
+
+def test_hyperband_brackets_end_on_full_history(tmp_path, monkeypatch) -> None:
+    from strategies import vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    result = hyperband(_bars(1800, 7), "EUR_USD", vwap_rsi, eta=3, min_bars=600, lookahead=15, min_trades=1, workers=1)
+
+    assert [b["configs"] for b in result["brackets"]] == [3, 2]
+    assert all(b["rungs"][-1]["bars"] == 1800 for b in result["brackets"])
+    assert result["best"]["score"] == max(b["best"]["score"] for b in result["brackets"])
+    assert set(result["best"]["params"]) == set(SEARCH_SPACES["vwap_rsi"])
+
+
+def test_rsi_period_param_reaches_the_backtest(tmp_path, monkeypatch) -> None:
+    from strategies import vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(1500, 8)
+    params = {"rsi_buy_max": 30.0, "rsi_sell_min": 70.0, "vwap_atr_tolerance": 0.2, "rsi_period": 3.0}
+    fast = backtest_strategy(df, "EUR_USD", vwap_rsi, params=params, lookahead=15, min_trades=1)
+    slow = backtest_strategy(df, "EUR_USD", vwap_rsi, params={**params, "rsi_period": 12.0}, lookahead=15, min_trades=1)
+    assert fast["train"]["total_trades"] != slow["train"]["total_trades"]
+
+
+def test_save_profile_writes_a_named_profile(tmp_path) -> None:
+    import random
+
+    from storage.db import connect
+    from storage.strategy_params import list_strategy_params
+
+    db_path = tmp_path / "bot.sqlite"
+    params = sample_configs("bb_breakout", 1, random.Random(0))[0]
+    save_profile("bb_breakout", params, db_path=db_path)
+
+    conn = connect(db_path)
+    stored = list_strategy_params(conn, "bb_breakout")
+    assert stored["profiles"]["optimized"] == pytest.approx(params)
+    assert stored["active_profile"] == "normal"
+
+    save_profile("bb_breakout", params, db_path=db_path, activate=True)
+    assert list_strategy_params(conn, "bb_breakout")["active_profile"] == "optimized"
+    with pytest.raises(ValueError):
+        save_profile("bb_breakout", {**params, "squeeze_percentile": 150.0}, db_path=db_path)
+    with pytest.raises(ValueError):
+        save_profile("bb_breakout", params, profile="nightly", db_path=db_path)
+    assert "nightly" not in list_strategy_params(conn, "bb_breakout")["profiles"]
+    conn.close()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.portfolio import PairFeatures, backtest_portfolio, position_units, simulate_portfolio
+
+START = pd.Timestamp("2024-01-02T00:00:00Z")
+
+
+def _features(pair: str, signals: list[int], *, close: float = 1.1, atr: float = 0.001, lows=None, highs=None) -> PairFeatures:
+    n = len(signals)
+    times = pd.date_range(START, periods=n, freq="5min").as_unit("ns").asi8
+    closes = np.full(n, close)
+    return PairFeatures(
+        pair=pair,
+        time=times,
+        high=np.array(highs, dtype=float) if highs is not None else closes + atr / 10,
+        low=np.array(lows, dtype=float) if lows is not None else closes - atr / 10,
+        close=closes,
+        atr=np.full(n, atr),
+        signal=np.array(signals, dtype=np.int8),
+    )
+
+
+def test_open_positions_are_capped_across_pairs() -> None:
+    pairs = ["EUR_USD", "GBP_USD", "AUD_USD", "NZD_USD"]
+    result = simulate_portfolio([_features(p, [1, 0, 0, 0]) for p in pairs], max_open_positions=3, lookahead=2)
+
+    assert result.metrics["max_concurrent_positions"] == 3
+    assert result.skipped["position_limit"] == 1
+    assert sorted(result.trades["pair"]) == sorted(pairs[:3])
+    assert set(result.trades["result"]) == {"TIMEOUT"}
+
+
+def test_stop_out_loses_the_risk_amount_and_daily_halt_blocks_entries() -> None:
+    # Each EUR_USD entry is stopped out on the next bar. Three compounding 1% losses leave the
+    # account 2.97% down, the fourth crosses 3% and halts entries until midnight UTC.
+    bars_per_day = 288
+    signals = [1, 0] * 5 + [0] * (bars_per_day - 10) + [1, 0]
+    lows = [1.1 - 0.01 if i % 2 == 1 else 1.1 for i in range(len(signals))]
+    result = simulate_portfolio([_features("EUR_USD", signals, lows=lows)], initial_equity=10_000.0)
+
+    first_day = result.trades[result.trades["entry_time"] < START + pd.Timedelta(days=1)]
+    assert list(first_day["result"]) == ["LOSS"] * 4
+    assert first_day["pnl"].iloc[0] == pytest.approx(-100.0, rel=1e-3)
+    assert result.skipped["daily_halt"] == 1
+    assert result.metrics["halted_days"] == 1
+    assert result.trades["entry_time"].iloc[-1] >= START + pd.Timedelta(days=1)
+
+
+def test_position_units_size_from_balance() -> None:
+    assert position_units(10_000.0, 1.1000, 1.0985) == 66_666
+    assert position_units(10_000.0, 1.1, 1.1) == 1
+
+
+def test_backtest_portfolio_parallel_matches_serial(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = pd.read_csv("tests/fixtures/sample_ohlcv.csv")
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    data = {"EUR_USD": df, "GBP_USD": df}
+
+    serial = backtest_portfolio(data, workers=1)
+    parallel = backtest_portfolio(data, workers=2)
+
+    pd.testing.assert_frame_equal(serial.trades, parallel.trades)
+    assert serial.metrics == parallel.metrics
+    assert len(serial.equity) == len(df)
+
+
+@pytest.mark.parametrize(
+    ("strategy", "params"),
+    [
+        ("ema_vwap", {"vwap_atr_tolerance": 0.3}),
+        ("vwap_rsi", {"rsi_buy_max": 30.0, "rsi_sell_min": 70.0, "vwap_atr_tolerance": 0.2, "rsi_period": 3.0}),
+        ("bb_breakout", {"volume_spike_mult": 1.0, "squeeze_percentile": 40.0, "squeeze_expand_mult": 1.0}),
+    ],
+)
+def test_vectorized_signals_match_per_bar_evaluation(strategy: str, params: dict[str, float]) -> None:
+    import importlib
+
+    from indicators.plan import FULL_PLAN
+
+    module = importlib.import_module(f"strategies.{strategy}")
+    rng = np.random.default_rng(11)
+    n = 1200
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, n))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, n)))
+    prepared = FULL_PLAN.apply(
+        pd.DataFrame(
+            {
+                "time": pd.date_range(START, periods=n, freq="5min"),
+                "open": open_,
+                "high": np.maximum(open_, close) + wick[0],
+                "low": np.minimum(open_, close) - wick[1],
+                "close": close,
+                "volume": rng.integers(50, 500, n),
+            }
+        )
+    )
+
+    codes = {"BUY": 1, "SELL": -1}
+    expected = [0] * 10 + [
+        codes.get(module.generate_signal_from_df(prepared.iloc[: i + 1].copy(), params=params), 0) for i in range(10, n)
+    ]
+    signals = module.generate_signals(prepared, params=params, warmup=10)
+    assert signals.dtype == np.int8
+    assert signals.tolist() == expected
+    assert np.count_nonzero(signals) > 0
@@ -91,3 +91,25 @@ def test_timeout_result() -> None:
         rng=random.Random(0),
     )
     assert result == "TIMEOUT"
+
+
+def test_bid_ask_bars_fill_at_the_quote_and_exit_on_the_closing_side() -> None:
+    # Mid reaches TP 1.1015 but the bid (where a long closes) peaks at 1.1013; the bid low hits SL.
+    future = pd.DataFrame([
+        {"high": 1.1015, "low": 1.0992, "close": 1.1000,
+         "bid_open": 1.0999, "bid_high": 1.1013, "bid_low": 1.0990, "bid_close": 1.0998,
+         "ask_open": 1.1001, "ask_high": 1.1017, "ask_low": 1.0994, "ask_close": 1.1002},
+    ])
+    result, pnl, entry = simulate_trade(
+        future_df=future,
+        direction="BUY",
+        raw_entry=1.1002,
+        sl=1.0990,
+        tp=1.1015,
+        pair="EUR_USD",
+        rng=random.Random(0),
+    )
+    slip = random.Random(0).uniform(0, 0.5) * 0.0001
+    assert result == "LOSS"
+    assert entry == 1.1002 + slip  # no synthetic spread on top of the ask
+    assert pnl == (1.0990 - entry) / 0.0001
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import _prepare_indicators, backtest_strategy
+from backtest.stream import backtest_strategy_stream, day_chunks, load_stream_trades
+from data.ohlcv_store import open_ohlcv, write_ohlcv
+
+
+def _random_walk(count: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, count))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, count)))
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01 03:00", periods=count, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + wick[0],
+            "low": np.minimum(open_, close) - wick[1],
+            "close": close,
+            "volume": rng.integers(50, 500, count),
+        }
+    )
+
+
+def test_chunked_indicators_equal_a_single_pass() -> None:
+    df = _random_walk(3000, 0)
+    time_ns = pd.DatetimeIndex(df["time"]).as_unit("ns").asi8
+    chunks = list(day_chunks(time_ns, 700))
+    assert len(chunks) > 3 and all(df["time"].iloc[lo].floor("D") == df["time"].iloc[lo] for lo, _ in chunks[1:])
+
+    state: dict[str, dict] = {}
+    streamed = pd.concat([_prepare_indicators(df.iloc[lo:hi], state) for lo, hi in chunks])
+    pd.testing.assert_frame_equal(streamed, _prepare_indicators(df), check_exact=True)
+
+
+@pytest.mark.parametrize("mode", ["sl_tp", "time_exit"])
+def test_stream_matches_in_memory_backtest(tmp_path, monkeypatch, mode: str) -> None:
+    from strategies import bb_breakout
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _random_walk(2000, 1)
+    kwargs = dict(mode=mode, lookahead=20, hold_bars=4, min_trades=5)
+
+    expected = backtest_strategy(df, "EUR_USD", bb_breakout, return_trades=True, **kwargs)
+    streamed = backtest_strategy_stream(df, "EUR_USD", bb_breakout, tmp_path / "out", chunk_bars=400, **kwargs)
+
+    assert expected["train"]["total_trades"] > 0 and expected["validation"]["total_trades"] > 0
+    for key in ("train", "validation", "gap", "overfit_warning", "overfit_reason"):
+        assert streamed[key] == expected[key]
+    for segment in ("train", "validation"):
+        trades = load_stream_trades(streamed["trade_files"][segment])
+        pd.testing.assert_frame_equal(trades, expected[f"{segment}_trades"], check_exact=True)
+
+
+def test_stream_reads_memory_mapped_arrays(tmp_path, monkeypatch) -> None:
+    from strategies import ema_vwap
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _random_walk(2500, 2)
+    write_ohlcv(df, "EUR_USD", root=tmp_path / "ohlcv")
+    arrays = open_ohlcv("EUR_USD", root=tmp_path / "ohlcv")
+
+    expected = backtest_strategy(arrays, "EUR_USD", ema_vwap, lookahead=15, min_trades=1)
+    streamed = backtest_strategy_stream(arrays, "EUR_USD", ema_vwap, tmp_path / "out", chunk_bars=400, lookahead=15, min_trades=1)
+
+    assert expected["train"]["total_trades"] > 0
+    assert streamed["train"] == expected["train"] and streamed["validation"] == expected["validation"]
+    with pytest.raises(ValueError):
+        backtest_strategy_stream(df, "EUR_USD", ema_vwap, tmp_path / "out", context_bars=60)
+    with pytest.raises(ValueError):
+        backtest_strategy_stream(df, "EUR_USD", ema_vwap, tmp_path / "rejected", context_bars=ema_vwap.LOOKBACK - 1)
+    assert not (tmp_path / "rejected").exists()
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from backtest.backtest import walk_forward_split
 
 
+def _bars(count: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, count))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, count)))
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=count, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + wick[0],
+            "low": np.minimum(open_, close) - wick[1],
+            "close": close,
+            "volume": rng.integers(50, 500, count),
+        }
+    )
+
+
 def test_walk_forward_split_returns_copies_and_isolation() -> None:
     df = pd.DataFrame({"x": list(range(10))})
     train, validation = walk_forward_split(df, train_pct=0.7)
@@ -17,3 +35,100 @@ def test_walk_forward_split_returns_copies_and_isolation() -> None:
 
     validation.loc[validation.index[0], "x"] = 777
     assert df.loc[df.index[7], "x"] == 7
+
+
+def test_make_folds_rolling_and_anchored_with_purge() -> None:
+    from backtest.walk_forward import make_folds
+
+    rolling = make_folds(1000, train_bars=300, test_bars=100, purge_bars=50, first_bar=60)
+    assert [(f.train_start, f.train_end, f.test_start, f.test_end) for f in rolling[:2]] == [
+        (60, 360, 410, 510),
+        (160, 460, 510, 610),
+    ]
+    assert rolling[-1].test_end <= 1000
+    assert all(f.test_start - f.train_end == 50 for f in rolling)
+
+    anchored = make_folds(1000, train_bars=300, test_bars=100, step_bars=200, first_bar=60, scheme="anchored")
+    assert {f.train_start for f in anchored} == {60}
+    assert [f.train_end for f in anchored] == [360, 560, 760]
+
+
+def test_walk_forward_prepares_indicators_once_and_parallel_matches_serial(tmp_path, monkeypatch) -> None:
+    import backtest.walk_forward as wf
+    from strategies import ema_vwap
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = pd.read_csv("tests/fixtures/sample_ohlcv.csv")
+    params = ema_vwap.get_effective_params()
+
+    calls = {"prepare": 0}
+    original = wf._prepare_indicators
+
+    def _counting(frame: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        calls["prepare"] += 1
+        return original(frame, **kwargs)
+
+    monkeypatch.setattr(wf, "_prepare_indicators", _counting)
+    kwargs = dict(train_bars=80, test_bars=40, purge_bars=10, lookahead=10, params=params, min_trades=1)
+
+    serial = wf.walk_forward(df, "EUR_USD", ema_vwap, workers=1, **kwargs)
+    parallel = wf.walk_forward(df, "EUR_USD", ema_vwap, workers=2, **kwargs)
+
+    assert calls["prepare"] == 2
+    assert len(serial["folds"]) == 3
+    assert serial == parallel
+    assert set(serial["summary"]["win_rate"]) == {"mean", "std", "min", "median", "max"}
+
+
+def test_fold_trades_match_a_full_series_scan(tmp_path, monkeypatch) -> None:
+    import random
+
+    import backtest.walk_forward as wf
+    from backtest.backtest import _prepare_indicators, _run_segment, compute_metrics
+    from strategies import bb_breakout
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(1800, seed=6)
+    result = wf.walk_forward(
+        df, "EUR_USD", bb_breakout, train_bars=300, test_bars=150, lookahead=15, seed=7, min_trades=1, workers=1
+    )
+
+    # Every fold scores the trades a single pass over the whole series takes in its windows.
+    prepared = _prepare_indicators(df)
+    traded = 0
+    for k, fold in enumerate(result["folds"]):
+        for part, start, end, seed in (
+            ("train", fold["fold"]["train_start"], fold["fold"]["train_end"], 7 + 2 * k),
+            ("test", fold["fold"]["test_start"], fold["fold"]["test_end"], 7 + 2 * k + 1),
+        ):
+            trades = _run_segment(prepared.iloc[:end], "EUR_USD", bb_breakout, start, 15, "sl_tp", 5, random.Random(seed))
+            assert fold[part] == compute_metrics(trades)
+            traded += len(trades)
+    assert len(result["folds"]) >= 3
+    assert traded > 0
+
+
+def test_walk_forward_prepares_indicators_for_the_given_params(tmp_path, monkeypatch) -> None:
+    import random
+
+    import backtest.walk_forward as wf
+    from backtest.backtest import _prepare_indicators, _run_segment, compute_metrics
+    from indicators.plan import resolve_plan
+    from strategies import vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(1200, seed=4)
+    params = {**vwap_rsi.get_effective_params(), "rsi_period": 10.0}
+    result = wf.walk_forward(df, "EUR_USD", vwap_rsi, train_bars=300, test_bars=150, lookahead=10, params=params, workers=1)
+
+    # The optimizer scores `params` on RSI(10); so must every fold.
+    plan = resolve_plan(vwap_rsi, params=params)
+    prepared = _prepare_indicators(df, plan=plan)
+    traded = 0
+    for k, fold in enumerate(result["folds"]):
+        start, end = fold["fold"]["test_start"], fold["fold"]["test_end"]
+        rng = random.Random(123 + 2 * k + 1)
+        trades = _run_segment(prepared.iloc[:end], "EUR_USD", vwap_rsi, start, 10, "sl_tp", 5, rng, params, context=plan.rows)
+        assert fold["test"] == compute_metrics(trades)
+        traded += len(trades)
+    assert traded > 0
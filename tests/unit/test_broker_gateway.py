@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("oandapyV20")
+
+from oandapyV20.endpoints.accounts import AccountSummary
+from oandapyV20.endpoints.orders import OrderCreate
+from oandapyV20.endpoints.pricing import PricingInfo
+
+from data.broker_gateway import BrokerGateway, TokenBucket
+from execution.order_manager import has_open_position
+
+ACCOUNT = "101-000-0000000-001"
+
+
+class _FakeClient:
+    def __init__(self, delay_s: float = 0.0, fail: bool = False) -> None:
+        self.calls: list[str] = []
+        self.delay_s = delay_s
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def request(self, endpoint):
+        with self._lock:
+            self.calls.append(str(endpoint))
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if self.fail:
+            raise ConnectionError("broker down")
+        response = {"endpoint": str(endpoint), "position": {"long": {"units": "0"}, "short": {"units": "0"}}}
+        endpoint.response = response
+        endpoint.status_code = endpoint.expected_status
+        return response
+
+
+def test_token_bucket_blocks_after_burst() -> None:
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(10, 2, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert sleeps == [pytest.approx(0.1)]
+
+
+def test_identical_in_flight_requests_share_one_call() -> None:
+    client = _FakeClient(delay_s=0.2)
+    gateway = BrokerGateway(client, rate_per_s=1000, burst=100, memo_ttl_s=0)
+    results: list[dict] = []
+
+    def worker() -> None:
+        results.append(gateway.request(PricingInfo(accountID=ACCOUNT, params={"instruments": "EUR_USD"})))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert gateway.stats.issued == 1
+    assert gateway.stats.coalesced == 7
+
+
+def test_memo_serves_repeat_reads_until_cycle_or_write() -> None:
+    client = _FakeClient()
+    gateway = BrokerGateway(client, rate_per_s=1000, burst=100, memo_ttl_s=60)
+
+    assert has_open_position("EUR_USD", gateway, ACCOUNT) is False
+    assert has_open_position("EUR_USD", gateway, ACCOUNT) is False
+    gateway.request(AccountSummary(accountID=ACCOUNT))
+    gateway.request(AccountSummary(accountID=ACCOUNT))
+    assert len(client.calls) == 2
+    assert gateway.stats.memo_hits == 2
+
+    gateway.request(OrderCreate(ACCOUNT, data={"order": {"type": "MARKET", "instrument": "EUR_USD", "units": "1"}}))
+    gateway.request(AccountSummary(accountID=ACCOUNT))
+    assert len(client.calls) == 4
+
+    gateway.new_cycle()
+    gateway.request(AccountSummary(accountID=ACCOUNT))
+    assert len(client.calls) == 5
+    assert gateway.stats.as_dict()["saved"] == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_memoized() -> None:
+    client = _FakeClient(delay_s=0.1, fail=True)
+    gateway = BrokerGateway(client, rate_per_s=1000, burst=100, memo_ttl_s=60)
+    errors: list[BaseException] = []
+
+    def worker() -> None:
+        try:
+            gateway.request(AccountSummary(accountID=ACCOUNT))
+        except ConnectionError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 4
+    assert len(client.calls) == 1
+
+    client.fail = False
+    gateway.request(AccountSummary(accountID=ACCOUNT))
+    assert len(client.calls) == 2
+
+
+def test_memo_drops_expired_entries_and_stays_bounded() -> None:
+    now = [0.0]
+    client = _FakeClient()
+    gateway = BrokerGateway(client, rate_per_s=1000, burst=1000, memo_ttl_s=1.0, memo_max_entries=50, clock=lambda: now[0])
+
+    for i in range(20):
+        gateway.request(PricingInfo(accountID=ACCOUNT, params={"instruments": f"P{i}"}))
+    assert len(gateway._memo) == 20
+
+    # Pages read long after each other (e.g. a history download) never pile up.
+    for i in range(500):
+        now[0] += 2.0
+        gateway.request(PricingInfo(accountID=ACCOUNT, params={"instruments": f"Q{i}"}))
+        assert len(gateway._memo) == 1
+
+    for i in range(200):
+        gateway.request(PricingInfo(accountID=ACCOUNT, params={"instruments": f"R{i}"}))
+    assert len(gateway._memo) == 50
+    gateway.request(PricingInfo(accountID=ACCOUNT, params={"instruments": "R199"}))
+    assert gateway.stats.memo_hits == 1
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import backtest_strategy
+from filters.market_state import MARKET_STATE_LOOKBACK, get_market_state
+from indicators.plan import FULL_PLAN, SESSION_BARS, build_plan, feature, resolve_plan
+
+
+def _bars(count: int = 3000, seed: int = 9) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, count))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, count)))
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=count, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + wick[0],
+            "low": np.minimum(open_, close) - wick[1],
+            "close": close,
+            "volume": rng.integers(50, 500, count),
+        }
+    )
+
+
+def test_strategies_declare_minimal_plans(tmp_path, monkeypatch) -> None:
+    from strategies import bb_breakout, ema_vwap, vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    assert resolve_plan(ema_vwap).names == ("atr", "adx", "ema", "vwap")
+    assert resolve_plan(bb_breakout).names == ("atr", "adx", "bollinger")
+    plan = resolve_plan(vwap_rsi, params={"rsi_period": 7.0})
+    assert plan.names == ("atr", "adx", "vwap", "rsi")
+    assert dict(plan.features[-1].params) == {"period": 7}
+    # The enemy gate's 200-bar ATR median, settled, plus a full UTC day for VWAP.
+    assert resolve_plan(ema_vwap).rows == MARKET_STATE_LOOKBACK
+    assert resolve_plan(ema_vwap).lookback == MARKET_STATE_LOOKBACK + SESSION_BARS - 1
+    assert resolve_plan(bb_breakout).lookback == MARKET_STATE_LOOKBACK + feature("adx").warmup - 1
+
+    merged = resolve_plan(ema_vwap, bb_breakout)
+    assert merged.names == ("atr", "adx", "ema", "vwap", "bollinger")
+    assert merged.lookback == max(resolve_plan(ema_vwap).lookback, resolve_plan(bb_breakout).lookback)
+    with pytest.raises(ValueError):
+        build_plan([feature("rsi", period=3), feature("rsi", period=14)])
+    with pytest.raises(ValueError):
+        feature("macd")
+
+
+def test_planned_columns_match_full_preparation_and_settle_within_lookback(tmp_path, monkeypatch) -> None:
+    from strategies import bb_breakout, ema_vwap, vwap_rsi
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(4000)
+    full = FULL_PLAN.apply(df)
+    for module in (ema_vwap, vwap_rsi, bb_breakout):
+        plan = resolve_plan(module)
+        prepared = plan.apply(df)
+        assert set(prepared.columns) < set(full.columns)
+        pd.testing.assert_frame_equal(prepared, full[prepared.columns], check_exact=True)
+
+        # What a live cycle computes from `fetch_count` candles (the one in progress at bar `end`
+        # is dropped) agrees with the full history on every row the strategy reads, at every
+        # point of the day.
+        for end in range(plan.lookback, len(df), 97):
+            count = plan.fetch_count(df["time"].iloc[end] + pd.Timedelta(minutes=2)) - 1
+            assert count <= plan.lookback
+            live = plan.apply(df.iloc[end - count : end]).tail(plan.rows)
+            history = prepared.iloc[end - plan.rows : end]
+            for column in ("atr", "adx", "ema_slow", "rsi", "bb_width"):
+                if column in prepared.columns:
+                    np.testing.assert_allclose(live[column], history[column], rtol=0.01)
+            if "vwap" in prepared.columns:
+                np.testing.assert_array_equal(live["vwap"].to_numpy(), history["vwap"].to_numpy())
+            assert get_market_state(live) == get_market_state(prepared.iloc[:end])
+
+
+def test_declared_plan_leaves_backtest_results_unchanged(tmp_path, monkeypatch) -> None:
+    from strategies import bb_breakout
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars(1500)
+    undeclared = SimpleNamespace(generate_signal_from_df=bb_breakout.generate_signal_from_df)
+    for mode in ("sl_tp", "time_exit"):
+        planned = backtest_strategy(df, "GBP_USD", bb_breakout, lookahead=15, mode=mode, min_trades=1, return_trades=True)
+        everything = backtest_strategy(df, "GBP_USD", undeclared, lookahead=15, mode=mode, min_trades=1, return_trades=True)
+        assert planned["train"]["total_trades"] > 0
+        for key in ("train", "validation"):
+            assert planned[key] == everything[key]
+            pd.testing.assert_frame_equal(planned[f"{key}_trades"], everything[f"{key}_trades"])
+
+
+def test_fetch_count_sizes_vwap_from_the_time_of_day(tmp_path, monkeypatch) -> None:
+    from strategies import bb_breakout, ema_vwap
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    day = pd.date_range("2024-01-02", periods=SESSION_BARS, freq="5min", tz="UTC") + pd.Timedelta(seconds=30)
+    plan = resolve_plan(ema_vwap)
+    counts = [plan.fetch_count(now) for now in day]
+    # Newest complete bar at 16:30: the oldest row is yesterday's 23:55, so VWAP needs a whole
+    # day (the worst case). One bar later the rows start at 00:00 and the EMA's warmup decides.
+    assert counts[MARKET_STATE_LOOKBACK - 1] == max(counts) == plan.lookback + 1
+    assert counts[MARKET_STATE_LOOKBACK] == MARKET_STATE_LOOKBACK + feature("ema").warmup
+    assert min(counts) == counts[MARKET_STATE_LOOKBACK]
+    assert plan.fetch_count(day[5].tz_convert(None)) == counts[5]
+    # Without VWAP the count does not depend on the time.
+    assert {resolve_plan(bb_breakout).fetch_count(now) for now in day} == {resolve_plan(bb_breakout).lookback + 1}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.fetcher import OHLCV_COLUMNS
+from data.history import HistoryStore, download_history, download_pair, fetch_range, find_gaps
+
+
+class _FakeBroker:
+    """`from`+`count` paging over a synthetic M5 series with weekend closes and one outage."""
+
+    def __init__(self, start: str, end: str, outage: tuple[str, str] | None = None) -> None:
+        times = pd.date_range(start, end, freq="5min", tz="UTC", inclusive="left").as_unit("ns")
+        # FX is closed from Friday 21:00 to Sunday 21:00 UTC.
+        open_mask = ~(
+            ((times.weekday == 4) & (times.hour >= 21)) | (times.weekday == 5) | ((times.weekday == 6) & (times.hour < 21))
+        )
+        if outage is not None:
+            open_mask &= ~((times >= pd.Timestamp(outage[0], tz="UTC")) & (times < pd.Timestamp(outage[1], tz="UTC")))
+        times = times[open_mask]
+        close = 1.1 + np.arange(len(times)) * 1e-6
+        self.frame = pd.DataFrame(
+            {"time": times, "open": close, "high": close + 1e-4, "low": close - 1e-4, "close": close, "volume": 1}
+        )[OHLCV_COLUMNS]
+        self.calls: list[tuple[str, pd.Timestamp]] = []
+        self.fail_after: int | None = None
+
+    def __call__(self, pair: str, granularity: str, start: pd.Timestamp, count: int) -> pd.DataFrame:
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise ConnectionError("interrupted")
+        self.calls.append((pair, start))
+        rows = self.frame[self.frame["time"] >= start].head(count)
+        return rows.reset_index(drop=True)
+
+
+def test_fetch_range_pages_with_from_and_count() -> None:
+    broker = _FakeBroker("2024-01-01", "2024-02-01")
+    df = fetch_range("EUR_USD", "M5", pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-02-01", tz="UTC"), fetch_page=broker, page_size=1000)
+
+    pd.testing.assert_frame_equal(df, broker.frame)
+    assert len(broker.calls) == -(-len(broker.frame) // 1000)
+    assert df["time"].is_monotonic_increasing and df["time"].is_unique
+
+
+def test_download_resumes_after_interruption_and_reports_gaps(tmp_path) -> None:
+    broker = _FakeBroker("2024-01-01", "2024-04-01", outage=("2024-02-14 10:00", "2024-02-14 12:00"))
+    store = HistoryStore(tmp_path)
+    now = pd.Timestamp("2024-06-01", tz="UTC")
+
+    broker.fail_after = 3  # dies while fetching February
+    with pytest.raises(ConnectionError):
+        download_pair(store, "EUR_USD", "M5", "2024-01-01", "2024-04-01", fetch_page=broker, now=now)
+    assert store.closed_months("EUR_USD", "M5") == {"2024-01"}
+
+    broker.fail_after = None
+    broker.calls.clear()
+    report = download_pair(store, "EUR_USD", "M5", "2024-01-01", "2024-04-01", fetch_page=broker, now=now)
+
+    assert report.months_skipped == 1 and report.months_fetched == 2
+    assert all(start >= pd.Timestamp("2024-02-01", tz="UTC") for _, start in broker.calls)
+    assert store.closed_months("EUR_USD", "M5") == {"2024-01", "2024-02", "2024-03"}
+    assert [gap["missing_bars"] for gap in report.gaps] == [24]
+
+    loaded = store.load("EUR_USD", "M5")
+    pd.testing.assert_frame_equal(loaded, broker.frame)
+    window = store.load("EUR_USD", "M5", "2024-02-10", "2024-03-05")
+    assert window["time"].iloc[0] >= pd.Timestamp("2024-02-10", tz="UTC")
+    assert window["time"].iloc[-1] < pd.Timestamp("2024-03-05", tz="UTC")
+
+
+def test_current_month_is_refetched_and_pairs_download_concurrently(tmp_path) -> None:
+    broker = _FakeBroker("2024-01-01", "2024-02-10")
+    store = HistoryStore(tmp_path)
+
+    reports = download_history(["EUR_USD", "GBP_USD"], "M5", "2024-01-01", "2024-02-10", store=store, workers=2, fetch_page=broker)
+
+    assert [r.error for r in reports] == [None, None]
+    assert {pair for pair, _ in broker.calls} == {"EUR_USD", "GBP_USD"}
+    # February was only requested up to the 10th, so it stays open and is fetched again.
+    assert store.closed_months("GBP_USD", "M5") == {"2024-01"}
+    again = download_pair(store, "GBP_USD", "M5", "2024-01-01", "2024-02-10", fetch_page=broker)
+    assert (again.months_skipped, again.months_fetched) == (1, 1)
+
+
+def test_find_gaps_ignores_weekend_close_and_single_missing_bars() -> None:
+    times = pd.DatetimeIndex(
+        ["2024-01-05 20:50", "2024-01-05 20:55", "2024-01-07 21:00", "2024-01-07 21:10", "2024-01-07 23:00"], tz="UTC"
+    )
+    gaps = find_gaps(pd.DataFrame({"time": times}), "M5")
+    assert gaps == [{"after": times[3].isoformat(), "before": times[4].isoformat(), "missing_bars": 21}]
@@ -0,0 +1,99 @@
+"""Unit tests for the config-driven instrument registry."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import config.instruments as instruments
+from backtest.backtest import pip_size
+from filters.news_filter import is_news_clear
+from filters.session_filter import is_session_active
+from filters.spread_filter import calculate_spread_pips, is_spread_acceptable
+from storage.db import connect, init_db
+
+
+@pytest.fixture()
+def registry_swap():
+    previous = instruments.get_registry()
+
+    def _install(registry: instruments.InstrumentRegistry) -> instruments.InstrumentRegistry:
+        instruments.set_registry(registry)
+        return registry
+
+    try:
+        yield _install
+    finally:
+        instruments.set_registry(previous)
+
+
+def test_defaults_match_previous_per_module_tables() -> None:
+    registry = instruments.load_registry(path=None)
+    assert registry.strategy_map() == {"EUR_USD": "ema_vwap", "GBP_USD": "bb_breakout", "USD_JPY": "vwap_rsi"}
+    assert registry.get("GBP_USD").session == (8, 13)
+    assert registry.get("USD_JPY").max_spread_pips == 2.0
+    assert registry.get("USD_JPY").pip_size == 0.01
+    assert registry.get("EUR_USD").price_precision == 5
+    assert registry.get("EUR_USD").spread_cost_pips == 0.3
+    with pytest.raises(KeyError):
+        registry.get("AUD_CAD")
+    assert registry.spec("AUD_CAD").pip_location == -4
+    assert registry.spec("EUR_JPY").pip_size == 0.01
+
+
+def test_file_then_db_overrides_by_name(tmp_path) -> None:
+    path = tmp_path / "instruments.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"name": "EUR_USD", "max_spread_pips": 1.0},
+                {"name": "AUD_CAD", "session": None, "max_spread_pips": 3.0, "strategy": "ema_vwap"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    conn = connect(tmp_path / "bot.sqlite")
+    init_db(conn)
+    conn.execute(
+        "INSERT INTO app_settings(key, value_json, updated_ts_utc, updated_by) VALUES (?, ?, ?, ?)",
+        (
+            instruments.SETTINGS_KEY,
+            json.dumps({"instruments": [{"name": "GBP_USD", "strategy": None}, {"name": "AUD_CAD", "max_spread_pips": 4.0}]}),
+            "2025-01-01T00:00:00Z",
+            "test",
+        ),
+    )
+    conn.commit()
+
+    registry = instruments.load_registry(path=path, conn=conn)
+    conn.close()
+
+    assert registry.get("EUR_USD").max_spread_pips == 1.0
+    assert registry.get("EUR_USD").session == (8, 17)
+    assert registry.get("AUD_CAD").max_spread_pips == 4.0
+    assert registry.get("AUD_CAD").currencies == ("AUD", "CAD")
+    assert registry.strategy_map() == {"EUR_USD": "ema_vwap", "USD_JPY": "vwap_rsi", "AUD_CAD": "ema_vwap"}
+
+
+def test_invalid_session_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        instruments.instrument_from_dict({"name": "EUR_USD", "session": [8, 25]})
+
+
+def test_gates_read_the_installed_registry(registry_swap) -> None:
+    registry_swap(
+        instruments.load_registry(path=None).merged(
+            [{"name": "XAU_USD", "pip_location": -1, "session": None, "max_spread_pips": 5.0, "strategy": "ema_vwap"}]
+        )
+    )
+    night = datetime(2024, 1, 1, 23, 0, tzinfo=timezone.utc)
+
+    assert is_session_active("XAU_USD", now_utc=night) is True
+    assert is_session_active("EUR_USD", now_utc=night) is False
+    assert calculate_spread_pips("XAU_USD", bid=2000.0, ask=2000.4) == pytest.approx(4.0)
+    assert is_spread_acceptable("XAU_USD", bid=2000.0, ask=2000.4) is True
+    xau_event = [{"impact": "High", "currency": "XAU", "time": "2024-01-01T23:05:00Z"}]
+    assert is_news_clear("XAU_USD", now_utc=night, events=xau_event) is False
+    assert pip_size("XAU_USD") == pytest.approx(0.1)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import simulate_trade
+from data.intrabar import IntrabarResolver
+from data.ohlcv_store import write_ohlcv
+from execution.alerts import AlertService
+from execution.paper_broker import PaperBroker
+from execution.trade_store import InMemoryTradeStore
+
+START = pd.Timestamp("2024-01-02T08:00:00Z")
+
+
+def _m1(lows: list[float], highs: list[float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "time": pd.date_range(START, periods=len(lows), freq="1min").as_unit("ns"),
+            "open": 1.1,
+            "high": highs,
+            "low": lows,
+            "close": 1.1,
+            "volume": 10,
+        }
+    )
+
+
+def test_tp_first_matches_a_row_by_row_scan() -> None:
+    rng = np.random.default_rng(11)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0003, 5000))
+    fine = _m1(list(close - 0.0002), list(close + 0.0002))
+    fine = fine.drop(index=range(100, 105)).reset_index(drop=True)  # the M5 bar at row 100 has no M1 data
+    resolver = IntrabarResolver.from_frame(fine)
+
+    bars = np.arange(0, 5000, 5)
+    times = (START + pd.to_timedelta(bars, unit="min")).as_unit("ns").asi8
+    direction = np.where(rng.random(len(bars)) < 0.5, 1, -1)
+    mid = close[bars]
+    sl = mid - direction * 0.0004
+    tp = mid + direction * 0.0004
+
+    got = resolver.tp_first(times, direction, sl, tp)
+
+    t, hi, lo = resolver.time, resolver.high, resolver.low
+    for k, stamp in enumerate(times):
+        expected = False
+        for j in np.flatnonzero((t >= stamp) & (t < stamp + resolver.bar_ns)):
+            sl_hit = lo[j] <= sl[k] if direction[k] > 0 else hi[j] >= sl[k]
+            tp_hit = hi[j] >= tp[k] if direction[k] > 0 else lo[j] <= tp[k]
+            if sl_hit or tp_hit:
+                expected = tp_hit and not sl_hit
+                break
+        assert got[k] == expected
+    assert not got[20]  # missing M1 data keeps the stop-first assumption
+    assert resolver.lookups == len(bars)
+
+
+def test_simulate_trade_resolves_an_ambiguous_bar_from_m1() -> None:
+    # One M5 bar spans SL 1.0990 and TP 1.1015; in M1 the high comes two minutes before the low.
+    future = pd.DataFrame([{"time": START, "high": 1.1020, "low": 1.0985, "close": 1.1000}])
+    fine = _m1([1.0998, 1.0999, 1.1000, 1.0985, 1.0995], [1.1005, 1.1020, 1.1010, 1.1002, 1.1001])
+    kwargs = dict(direction="BUY", raw_entry=1.1000, sl=1.0990, tp=1.1015, pair="EUR_USD")
+
+    assert simulate_trade(future, rng=random.Random(0), **kwargs)[0] == "LOSS"
+    result, pnl, _ = simulate_trade(future, rng=random.Random(0), intrabar=IntrabarResolver.from_frame(fine), **kwargs)
+    assert result == "WIN"
+    assert pnl > 0
+
+    ticks = pd.DataFrame({"time": [START + pd.Timedelta(seconds=s) for s in (5, 9)], "price": [1.0988, 1.1016]})
+    assert simulate_trade(future, rng=random.Random(0), intrabar=IntrabarResolver.from_frame(ticks), **kwargs)[0] == "LOSS"
+
+
+def test_paper_broker_uses_the_pair_resolver_when_the_bar_has_a_time(tmp_path) -> None:
+    fine = _m1([1.2700, 1.2675, 1.2700, 1.2700, 1.2700], [1.2702, 1.2701, 1.2715, 1.2701, 1.2701])
+    write_ohlcv(fine, "GBP_USD", "M1", root=tmp_path)
+    resolver = IntrabarResolver.open("GBP_USD", root=tmp_path)
+
+    results = []
+    for bar in ({"high": 1.2715, "low": 1.2675}, {"high": 1.2715, "low": 1.2675, "time": START.isoformat()}):
+        store = InMemoryTradeStore()
+        broker = PaperBroker(store, alert_service=AlertService([]), intrabar={"GBP_USD": resolver})
+        broker.place_market_order("GBP_USD", "bb_breakout", "SELL", 500, 1.2700, 1.2702, 1.2710, 1.2680)
+        results.append(broker.update_positions_from_bar("GBP_USD", bar)[0]["result"])
+    assert results == ["SL", "TP"]
+
+    with pytest.raises(ValueError):
+        IntrabarResolver.open("GBP_USD", "M5", bar_granularity="M5", root=tmp_path)
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from filters.market_state import get_market_state, is_strategy_allowed
+from filters.market_state import get_market_state, is_strategy_allowed, market_states
 
 
 def _build_df(adx_last: float, atr_last: float, base_atr: float = 1.0) -> pd.DataFrame:
@@ -53,3 +54,19 @@ def test_is_strategy_allowed_mapping_and_volatile_block() -> None:
 def test_missing_columns_raise_value_error() -> None:
     with pytest.raises(ValueError):
         get_market_state(pd.DataFrame({"adx": [20.0]}))
+
+
+def test_market_states_matches_get_market_state_on_every_prefix() -> None:
+    rng = np.random.default_rng(11)
+    n = 450
+    atr = rng.uniform(0.5, 1.6, n)
+    atr[:14] = np.nan
+    adx = rng.uniform(10.0, 40.0, n)
+    adx[:27] = np.nan
+    df = pd.DataFrame({"atr": atr, "adx": adx})
+
+    states = market_states(df)
+
+    assert all(state is None for state in states[:27])
+    for i in range(27, n):
+        assert states[i] == get_market_state(df.iloc[: i + 1]), i
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("oandapyV20")
+
+import config.settings as settings
+import data.fetcher as fetcher
+import data.oanda_client as oanda_client
+
+
+def _candles_payload(count: int) -> dict[str, object]:
+    return {
+        "instrument": "EUR_USD",
+        "granularity": "M5",
+        "candles": [
+            {
+                "complete": True,
+                "volume": 10 + i,
+                "time": f"2025-01-01T00:{i * 5:02d}:00.000000000Z",
+                "mid": {"o": "1.1000", "h": "1.1010", "l": "1.0990", "c": "1.1005"},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests_seen = 0
+
+    def setup(self) -> None:
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self) -> None:  # noqa: N802
+        type(self).requests_seen += 1
+        body = json.dumps(_candles_payload(10)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture()
+def stand_in(monkeypatch: pytest.MonkeyPatch):
+    _StandInHandler.connections = 0
+    _StandInHandler.requests_seen = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(oanda_client, "OANDA_API_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(settings, "OANDA_API_KEY", "stand-in-token")
+    monkeypatch.setattr(settings, "OANDA_ACCOUNT_ID", "000-000-0000000-001")
+    monkeypatch.setattr(fetcher, "OANDA_API_KEY", "stand-in-token")
+    oanda_client.close_shared_clients()
+    try:
+        yield _StandInHandler
+    finally:
+        oanda_client.close_shared_clients()
+        server.shutdown()
+        server.server_close()
+
+
+def test_candle_fetches_reuse_one_connection(stand_in) -> None:
+    first_client = fetcher.get_oanda_client()
+    for _ in range(5):
+        first_client.new_cycle()  # one fetch per cycle; repeats inside a cycle are memoized
+        df = fetcher.get_candles("EUR_USD", timeframe="M5", count=10)
+        assert len(df) == 10
+
+    assert fetcher.get_oanda_client() is first_client
+    assert stand_in.requests_seen == 5
+    assert stand_in.connections == 1
+
+
+def test_validation_runs_only_when_client_is_built(stand_in, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+    monkeypatch.setattr(fetcher, "validate_settings", lambda: calls.append(1))
+
+    for _ in range(3):
+        fetcher.get_oanda_client()
+
+    assert calls == [1]
+
+
+def test_endpoint_timeouts_follow_endpoint_kind() -> None:
+    base = "https://api-fxpractice.oanda.com/v3"
+    connect = settings.OANDA_CONNECT_TIMEOUT_S
+    assert oanda_client.endpoint_timeout(f"{base}/instruments/EUR_USD/candles?count=10") == (
+        connect,
+        settings.OANDA_CANDLES_READ_TIMEOUT_S,
+    )
+    assert oanda_client.endpoint_timeout(f"{base}/accounts/1/pricing/stream", stream=True) == (
+        connect,
+        settings.OANDA_STREAM_READ_TIMEOUT_S,
+    )
+    assert oanda_client.endpoint_timeout(f"{base}/accounts/1/orders") == (connect, settings.OANDA_READ_TIMEOUT_S)
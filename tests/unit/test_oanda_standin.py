@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("oandapyV20")
+
+import config.settings as settings
+import data.fetcher as fetcher
+import data.oanda_client as oanda_client
+from execution.order_manager import count_open_positions, has_open_position, place_market_order
+from execution.risk_manager import _INSTRUMENT_SPECS_CACHE, get_instrument_specs, is_within_daily_limit
+from filters.spread_filter import get_live_bid_ask, get_live_bid_ask_many
+from tests.tools.oanda_standin import OandaStandIn
+
+
+@pytest.fixture()
+def standin(monkeypatch: pytest.MonkeyPatch):
+    with OandaStandIn(seed=7, stream_max_ticks=2, stream_interval_s=0.01) as server:
+        monkeypatch.setattr(oanda_client, "OANDA_API_URL", server.url)
+        monkeypatch.setattr(oanda_client, "OANDA_STREAM_URL", server.url)
+        monkeypatch.setattr(settings, "OANDA_API_KEY", "stand-in-token")
+        monkeypatch.setattr(settings, "OANDA_ACCOUNT_ID", server.account_id)
+        monkeypatch.setattr(fetcher, "OANDA_API_KEY", "stand-in-token")
+        monkeypatch.setattr(fetcher, "OANDA_ACCOUNT_ID", server.account_id)
+        oanda_client.close_shared_clients()
+        try:
+            yield server
+        finally:
+            oanda_client.close_shared_clients()
+
+
+def test_market_data_endpoints_follow_the_scripted_path(standin) -> None:
+    client = fetcher.get_oanda_client()
+    df = fetcher.get_candles("EUR_USD", timeframe="M5", count=150)
+    assert len(df) == 149  # the bar at the cursor is still forming
+    assert df["time"].is_monotonic_increasing
+
+    bid, ask = get_live_bid_ask("EUR_USD", client, standin.account_id)
+    assert ask > bid
+    assert ask - bid == pytest.approx(0.00008, abs=1e-6)
+
+    jpy_bid, _ = get_live_bid_ask("USD_JPY", client, standin.account_id)
+    assert jpy_bid > 100
+
+    quotes = get_live_bid_ask_many(["EUR_USD", "GBP_USD", "USD_JPY"], client, standin.account_id)
+    assert set(quotes) == {"EUR_USD", "GBP_USD", "USD_JPY"}
+    assert quotes["EUR_USD"][:2] == (bid, ask)
+
+    standin.state.advance()
+    client.new_cycle()
+    df_next = fetcher.get_candles("EUR_USD", timeframe="M5", count=150)
+    assert df_next["time"].iloc[-1] > df["time"].iloc[-1]
+
+    tick = fetcher.stream_price_tick("GBP_USD")
+    assert tick is not None and tick["instrument"] == "GBP_USD"
+
+
+def test_orders_update_positions_and_account(standin) -> None:
+    client = fetcher.get_oanda_client()
+    account_id = standin.account_id
+    _INSTRUMENT_SPECS_CACHE.pop("USD_JPY", None)
+
+    assert get_instrument_specs("USD_JPY", client, account_id)["pip_location"] == -2
+    assert has_open_position("EUR_USD", client, account_id) is False
+    assert is_within_daily_limit(client, account_id) is True
+
+    response = place_market_order("EUR_USD", "BUY", 1000, 1.09, 1.11, client, account_id)
+    assert response["orderFillTransaction"]["units"] == "1000"
+
+    assert has_open_position("EUR_USD", client, account_id) is True
+    assert count_open_positions(client, account_id) == (1, {"EUR_USD": 1000})
+    assert standin.state.request_counts["order_create"] == 1
+
+
+def test_injected_errors_surface_as_v20_errors(standin) -> None:
+    from oandapyV20.exceptions import V20Error
+
+    standin.state.error_rate = 1.0
+    with pytest.raises(V20Error):
+        get_live_bid_ask("EUR_USD", fetcher.get_oanda_client(), standin.account_id)
+    assert standin.state.errors_injected == 1
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import backtest_strategy
+from data.ohlcv_store import csv_to_ohlcv, open_ohlcv, write_ohlcv
+from strategies import ema_vwap
+
+FIXTURE = "tests/fixtures/sample_ohlcv.csv"
+
+
+def _fixture_frame() -> pd.DataFrame:
+    df = pd.read_csv(FIXTURE)
+    df["time"] = pd.to_datetime(df["time"], utc=True).dt.as_unit("ns")
+    return df
+
+
+def test_csv_round_trip_is_exact_and_memory_mapped(tmp_path) -> None:
+    csv_to_ohlcv(FIXTURE, "EUR_USD", root=tmp_path)
+    arrays = open_ohlcv("EUR_USD", root=tmp_path)
+
+    assert isinstance(arrays.close, np.memmap)
+    assert arrays.time.dtype == np.int64
+    pd.testing.assert_frame_equal(arrays.to_frame(), _fixture_frame())
+
+
+def test_slice_is_a_zero_copy_time_range_view(tmp_path) -> None:
+    write_ohlcv(_fixture_frame(), "EUR_USD", root=tmp_path, dtype="float32")
+    arrays = open_ohlcv("EUR_USD", root=tmp_path)
+
+    window = arrays.slice("2024-01-01T01:00:00Z", "2024-01-01T02:00:00Z")
+
+    assert len(window) == 12
+    assert np.shares_memory(window.close, arrays.close)
+    assert window.close.dtype == np.float32
+    assert window.times()[0] == pd.Timestamp("2024-01-01T01:00:00Z")
+    assert len(arrays.slice(end="2023-12-31")) == 0
+
+
+def test_write_rejects_duplicate_bars_and_sorts(tmp_path) -> None:
+    df = _fixture_frame()
+    write_ohlcv(df.iloc[::-1], "EUR_USD", root=tmp_path)
+    assert open_ohlcv("EUR_USD", root=tmp_path).to_frame()["time"].is_monotonic_increasing
+
+    with pytest.raises(ValueError):
+        write_ohlcv(pd.concat([df, df.tail(1)]), "EUR_USD", root=tmp_path)
+    with pytest.raises(FileNotFoundError):
+        open_ohlcv("GBP_USD", root=tmp_path)
+
+
+def test_backtest_accepts_mapped_arrays(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    csv_to_ohlcv(FIXTURE, "EUR_USD", root=tmp_path)
+
+    from_frame = backtest_strategy(_fixture_frame(), "EUR_USD", ema_vwap, min_trades=1)
+    from_arrays = backtest_strategy(open_ohlcv("EUR_USD", root=tmp_path), "EUR_USD", ema_vwap, min_trades=1)
+
+    assert from_arrays == from_frame
+
+
+def test_bid_ask_columns_round_trip_and_slice(tmp_path) -> None:
+    df = _fixture_frame()
+    for side, shift in (("bid", -0.00005), ("ask", 0.00005)):
+        for column in ("open", "high", "low", "close"):
+            df[f"{side}_{column}"] = df[column] + shift
+    write_ohlcv(df, "EUR_USD", root=tmp_path)
+    arrays = open_ohlcv("EUR_USD", root=tmp_path)
+
+    assert isinstance(arrays.bid_ask["ask_close"], np.memmap)
+    pd.testing.assert_frame_equal(arrays.to_frame(), df)
+    window = arrays.slice("2024-01-01T01:00:00Z", "2024-01-01T02:00:00Z")
+    assert np.shares_memory(window.bid_ask["bid_low"], arrays.bid_ask["bid_low"])
+    assert len(window.bid_ask["bid_low"]) == len(window) == 12
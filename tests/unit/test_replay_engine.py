@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.replay import first_touch, replay
+from execution.alerts import AlertService
+from execution.paper_broker import PaperBroker
+from execution.trade_store import InMemoryTradeStore, TradeStore
+
+START = pd.Timestamp("2024-01-02T08:00:00Z")
+
+
+def _frame(n: int, *, start: pd.Timestamp = START, lows=None, highs=None) -> pd.DataFrame:
+    close = np.full(n, 1.1)
+    return pd.DataFrame(
+        {
+            "time": pd.date_range(start, periods=n, freq="5min").as_unit("ns"),
+            "open": close,
+            "high": np.array(highs, dtype=float) if highs is not None else close + 0.0001,
+            "low": np.array(lows, dtype=float) if lows is not None else close - 0.0001,
+            "close": close,
+            "volume": 100,
+            "atr": 0.001,
+            "adx": 22.0,  # ranging: bb_breakout is allowed by the enemy gate
+        }
+    )
+
+
+def test_position_opens_at_ask_and_closes_on_first_tp_touch() -> None:
+    highs = [1.1001] * 40
+    highs[15] = 1.104
+    frame = _frame(40, highs=highs)
+    signals = np.zeros(40, dtype=np.int8)
+    signals[10] = 1
+    signals[12] = -1  # blocked: position still open
+
+    result = replay({"EUR_USD": frame}, {"EUR_USD": signals}, {"EUR_USD": "bb_breakout"})
+
+    trade = result.trades.iloc[0]
+    assert len(result.trades) == 1
+    assert trade["entry_price"] == pytest.approx(1.1 + 0.3 * 0.0001 / 2)
+    assert trade["result"] == "TP"
+    assert trade["exit_price"] == pytest.approx(trade["tp_price"])
+    assert trade["time_close_utc"] == frame["time"].iloc[15].isoformat()
+    assert list(result.signals["decision"]) == ["EXECUTE", "BLOCK"]
+    assert result.signals["open_pos_gate"].tolist() == [1, 0]
+    assert result.metrics["final_balance"] == pytest.approx(10_000.0 + trade["pnl_quote"])
+
+
+def test_bid_ask_bars_drive_fills_exits_and_the_spread_gate() -> None:
+    frame = _frame(40)
+    spread = np.full(40, 0.00008)
+    spread[5] = 0.0005  # 5 pips: above EUR_USD's max_spread_pips
+    for column in ("open", "high", "low", "close"):
+        frame[f"bid_{column}"] = frame[column] - spread / 2
+        frame[f"ask_{column}"] = frame[column] + spread / 2
+    frame.loc[20, ["high", "ask_high"]] = [1.1041, 1.1045]  # mid and ask reach TP, the bid does not
+    signals = np.zeros(40, dtype=np.int8)
+    signals[[5, 10]] = 1
+
+    result = replay({"EUR_USD": frame}, {"EUR_USD": signals}, {"EUR_USD": "bb_breakout"})
+
+    assert list(result.signals["decision"]) == ["BLOCK", "EXECUTE"]
+    assert result.signals["spread_gate"].tolist() == [0, 1]
+    trade = result.trades.iloc[0]
+    assert trade["entry_price"] == pytest.approx(frame["ask_close"].iloc[10])
+    assert trade["result"] == "END_OF_DATA"
+    assert trade["exit_price"] == pytest.approx(frame["bid_close"].iloc[-1])
+
+
+def test_daily_loss_halt_blocks_entries_until_next_utc_day() -> None:
+    # A BUY every other bar, stopped out on the next bar: the 4th compounding 1% loss crosses 3%.
+    n = 40
+    lows = [1.1 - 0.01 if i % 2 == 1 else 1.0999 for i in range(n)]
+    signals = np.zeros(n, dtype=np.int8)
+    signals[0:12:2] = 1
+    day_one = _frame(n, lows=lows)
+    next_day = _frame(n, start=START + pd.Timedelta(days=1))
+    frame = pd.concat([day_one, next_day], ignore_index=True)
+    all_signals = np.concatenate([signals, np.eye(1, n, 0, dtype=np.int8)[0]])
+
+    result = replay({"EUR_USD": frame}, {"EUR_USD": all_signals}, {"EUR_USD": "bb_breakout"})
+
+    first_day = result.signals[result.signals["time_utc"] < next_day["time"].iloc[0].isoformat()]
+    assert list(first_day["decision"]) == ["EXECUTE"] * 4 + ["BLOCK"] * 2
+    assert first_day["daily_loss_gate"].tolist()[-2:] == [0, 0]
+    assert result.metrics["halted_days"] == 1
+    assert result.daily["halted"].tolist() == [True, False]
+    assert result.signals["decision"].iloc[-1] == "EXECUTE"
+
+
+def test_first_touch_matches_a_bar_by_bar_scan() -> None:
+    rng = np.random.default_rng(5)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, 3000))
+    high, low = close + 0.0003, close - 0.0003
+    for start in (0, 17, 900, 2990):
+        for direction, sl, tp in ((1, close[start] - 0.004, close[start] + 0.008), (-1, close[start] + 0.004, close[start] - 0.008)):
+            expected = -1
+            for j in range(start, len(close)):
+                hit = (low[j] <= sl or high[j] >= tp) if direction > 0 else (high[j] >= sl or low[j] <= tp)
+                if hit:
+                    expected = j
+                    break
+            assert first_touch(high, low, start, direction, sl, tp, chunk=8) == expected
+
+
+def test_in_memory_store_matches_sqlite_store(tmp_path) -> None:
+    stores = [TradeStore(db_path=tmp_path / "paper.db"), InMemoryTradeStore()]
+    for store in stores:
+        store.init_db()
+        broker = PaperBroker(store, alert_service=AlertService([]))
+        broker.place_market_order("EUR_USD", "ema_vwap", "BUY", 1000, 1.1000, 1.1002, 1.0990, 1.1010, time_utc="t0")
+        broker.place_market_order("GBP_USD", "bb_breakout", "SELL", 500, 1.2700, 1.2702, 1.2710, 1.2680, time_utc="t1")
+        broker.update_positions_from_bar("EUR_USD", {"high": 1.1011, "low": 1.0995}, time_utc="t2")
+        assert [p["pair"] for p in store.list_open_positions()] == ["GBP_USD"]
+        broker.close_all_positions({"GBP_USD": 1.2690}, reason="KILL_SWITCH", time_utc="t3")
+        assert store.get_open_position("GBP_USD") is None
+
+    conn = sqlite3.connect(tmp_path / "paper.db")
+    conn.row_factory = sqlite3.Row
+    columns = ["time_open_utc", "time_close_utc", "pair", "direction", "units", "entry_price", "exit_price", "result", "pnl_pips", "pnl_quote"]
+    sqlite_rows = [{c: row[c] for c in columns} for row in conn.execute("SELECT * FROM trades ORDER BY id")]
+    conn.close()
+    memory_rows = [{c: row[c] for c in columns} for row in stores[1].trades]
+    assert memory_rows == sqlite_rows
@@ -24,3 +24,34 @@ def test_is_spread_acceptable_uses_default_and_override() -> None:
     assert is_spread_acceptable("EUR_USD", bid=1.1000, ask=1.1001) is True
     assert is_spread_acceptable("EUR_USD", bid=1.1000, ask=1.1003) is False
     assert is_spread_acceptable("EUR_USD", bid=1.1000, ask=1.1003, max_spread_override=3.5) is True
+
+
+class _PricingClient:
+    def __init__(self, prices: list[dict]) -> None:
+        self.prices = prices
+        self.params: list[dict] = []
+
+    def request(self, endpoint):
+        self.params.append(dict(endpoint.params))
+        return {"prices": self.prices}
+
+
+def test_get_live_bid_ask_many_uses_one_request() -> None:
+    pytest.importorskip("oandapyV20")
+    from filters.spread_filter import get_live_bid_ask_many, is_spread_acceptable_live
+
+    client = _PricingClient(
+        [
+            {"instrument": "EUR_USD", "time": "t1", "bids": [{"price": "1.1000"}], "asks": [{"price": "1.1001"}]},
+            {"instrument": "USD_JPY", "time": "t2", "bids": [{"price": "150.00"}], "asks": [{"price": "150.01"}]},
+            {"instrument": "GBP_USD", "time": "t3", "bids": [], "asks": []},
+        ]
+    )
+
+    quotes = get_live_bid_ask_many(["EUR_USD", "USD_JPY", "GBP_USD", "EUR_USD"], client, "acct")
+
+    assert client.params == [{"instruments": "EUR_USD,USD_JPY,GBP_USD"}]
+    assert quotes == {"EUR_USD": (1.1, 1.1001, "t1"), "USD_JPY": (150.0, 150.01, "t2")}
+    assert is_spread_acceptable_live("EUR_USD", client, "acct", quote=quotes["EUR_USD"]) is True
+    assert is_spread_acceptable_live("USD_JPY", client, "acct", quote=quotes["USD_JPY"]) is True
+    assert len(client.params) == 1
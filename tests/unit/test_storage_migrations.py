@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from execution.trade_store import TradeStore
+from storage.db import connect, init_db
+from storage.migrations import LATEST_VERSION, get_schema_version
+
+
+def test_fresh_db_migrates_to_latest_and_warm_start_is_noop(tmp_path) -> None:
+    conn = connect(tmp_path / "fresh.sqlite")
+    try:
+        init_db(conn)
+        assert get_schema_version(conn) == LATEST_VERSION
+        seeded = conn.execute("SELECT COUNT(*) FROM strategy_params").fetchone()[0]
+
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        init_db(conn)
+        conn.set_trace_callback(None)
+    finally:
+        conn.close()
+
+    assert seeded == 9
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_legacy_positions_shapes_are_unified(tmp_path) -> None:
+    db_path = tmp_path / "legacy_positions.sqlite"
+    raw = sqlite3.connect(db_path)
+    raw.executescript(
+        """
+        CREATE TABLE positions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pair TEXT NOT NULL,
+            strategy TEXT,
+            direction TEXT,
+            units REAL,
+            entry_price REAL,
+            sl_price REAL,
+            tp_price REAL,
+            time_open_utc TEXT,
+            is_open INTEGER NOT NULL DEFAULT 1,
+            meta_json TEXT
+        );
+        INSERT INTO positions (pair, strategy, direction, units, entry_price, sl_price, tp_price, time_open_utc)
+        VALUES ('EUR_USD', 'ema_vwap', 'BUY', 1000, 1.1, 1.09, 1.12, '2025-01-01T00:00:00+00:00');
+        INSERT INTO positions (pair, strategy, direction, units, entry_price, sl_price, tp_price, time_open_utc)
+        VALUES ('EUR_USD', 'ema_vwap', 'SELL', 2000, 1.2, 1.21, 1.18, '2025-01-02T00:00:00+00:00');
+        """
+    )
+    raw.close()
+
+    store = TradeStore(db_path)
+    store.init_db()
+    positions = store.list_open_positions()
+    assert len(positions) == 1
+    assert positions[0]["direction"] == "SELL"
+
+    store.open_position(
+        pair="EUR_USD",
+        strategy="ema_vwap",
+        direction="BUY",
+        units=500,
+        entry_price=1.15,
+        sl_price=1.14,
+        tp_price=1.17,
+    )
+    positions = store.list_open_positions()
+    assert len(positions) == 1
+    assert positions[0]["units"] == 500
+
+
+def test_legacy_dashboard_trades_shape_is_converted(tmp_path) -> None:
+    db_path = tmp_path / "legacy_trades.sqlite"
+    raw = sqlite3.connect(db_path)
+    raw.executescript(
+        """
+        CREATE TABLE trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts_utc TEXT NOT NULL,
+            pair TEXT NOT NULL,
+            side TEXT,
+            units REAL,
+            price REAL,
+            mode TEXT,
+            position_id INTEGER,
+            command_id INTEGER,
+            meta_json TEXT
+        );
+        INSERT INTO trades (ts_utc, pair, side, units, price, mode, command_id)
+        VALUES ('2025-01-01T00:00:00+00:00', 'GBP_USD', 'buy', 1000, 1.25, 'PAPER', 42);
+        """
+    )
+    raw.close()
+
+    conn = connect(db_path)
+    try:
+        init_db(conn)
+        row = conn.execute("SELECT time_open_utc, direction, entry_price, meta_json FROM trades").fetchone()
+    finally:
+        conn.close()
+
+    assert row[0] == "2025-01-01T00:00:00+00:00"
+    assert row[1] == "BUY"
+    assert row[2] == 1.25
+    assert json.loads(row[3])["command_id"] == 42
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from storage.db import init_db
+from storage.pool import ConnectionPool, close_all_pools, get_pool
+
+
+def test_readers_are_reused_and_read_only(tmp_path) -> None:
+    pool = ConnectionPool(tmp_path / "pool.sqlite", max_readers=2)
+    try:
+        with pool.writer() as conn:
+            init_db(conn)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        with pool.reader() as first:
+            first_id = id(first)
+            with pytest.raises(sqlite3.OperationalError):
+                first.execute("DELETE FROM strategy_params")
+        with pool.reader() as second:
+            assert id(second) == first_id
+            assert second.execute("SELECT COUNT(*) FROM strategy_params").fetchone()[0] > 0
+    finally:
+        pool.close()
+
+
+def test_writer_rolls_back_uncommitted_work_and_serializes(tmp_path) -> None:
+    pool = ConnectionPool(tmp_path / "pool.sqlite", max_readers=1)
+    try:
+        with pool.writer() as conn:
+            init_db(conn)
+            conn.execute("INSERT INTO app_settings (key, value_json, updated_ts_utc, updated_by) VALUES ('x', '1', 'now', 'test')")
+
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM app_settings WHERE key = 'x'").fetchone()[0] == 0
+
+        order: list[str] = []
+        with pool.writer():
+            worker = threading.Thread(target=lambda: _write_once(pool, order))
+            worker.start()
+            worker.join(timeout=0.1)
+            order.append("first")
+        worker.join(timeout=5)
+        assert order == ["first", "second"]
+    finally:
+        pool.close()
+
+
+def _write_once(pool: ConnectionPool, order: list[str]) -> None:
+    with pool.writer():
+        order.append("second")
+
+
+def test_get_pool_is_shared_per_path(tmp_path) -> None:
+    try:
+        assert get_pool(tmp_path / "a.sqlite") is get_pool(tmp_path / "a.sqlite")
+        assert get_pool(tmp_path / "a.sqlite") is not get_pool(tmp_path / "b.sqlite")
+    finally:
+        close_all_pools()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from storage.db import connect, init_db, write_gate_snapshot, write_heartbeat
+from storage.retention import run_retention
+
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _snapshot(conn, ts: datetime, pair: str, signal: str, spread_ok: bool = True) -> None:
+    write_gate_snapshot(
+        conn,
+        ts_utc=ts.isoformat(),
+        pair=pair,
+        strategy="ema_vwap",
+        session_ok=True,
+        spread_ok=spread_ok,
+        news_ok=True,
+        open_pos_ok=True,
+        daily_ok=True,
+        enemy_ok=True,
+        final_signal=signal,
+        reason=None,
+        details=None,
+    )
+
+
+def test_old_gate_snapshots_roll_up_and_recent_rows_survive(tmp_path) -> None:
+    conn = connect(tmp_path / "retention.sqlite")
+    try:
+        init_db(conn)
+        old = NOW - timedelta(days=10)
+        _snapshot(conn, old.replace(minute=5), "EUR_USD", "BUY")
+        _snapshot(conn, old.replace(minute=10), "EUR_USD", "HOLD", spread_ok=False)
+        _snapshot(conn, old.replace(hour=old.hour + 1), "EUR_USD", "SELL")
+        _snapshot(conn, NOW - timedelta(hours=1), "EUR_USD", "BUY")
+
+        result = run_retention(conn, raw_max_age_days=7, batch_size=1, now=NOW)
+
+        remaining = conn.execute("SELECT COUNT(*) FROM gate_snapshots").fetchone()[0]
+        hourly = conn.execute(
+            "SELECT samples, spread_ok_count, all_ok_count, buy_count, sell_count, hold_count "
+            "FROM gate_snapshot_rollups WHERE granularity='hour' ORDER BY bucket_ts_utc"
+        ).fetchall()
+        daily = conn.execute(
+            "SELECT bucket_ts_utc, samples, buy_count, sell_count, hold_count "
+            "FROM gate_snapshot_rollups WHERE granularity='day'"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    assert result.gate_snapshots_rolled == 3
+    assert remaining == 1
+    assert [tuple(row) for row in hourly] == [(2, 1, 1, 1, 0, 1), (1, 1, 1, 0, 1, 0)]
+    assert [tuple(row) for row in daily] == [("2025-02-19T00:00:00+00:00", 3, 1, 1, 1)]
+
+
+def test_retention_is_idempotent_and_keeps_latest_heartbeat(tmp_path) -> None:
+    conn = connect(tmp_path / "retention_status.sqlite")
+    try:
+        init_db(conn)
+        for _ in range(3):
+            write_heartbeat(
+                conn,
+                mode="OFFLINE",
+                version=None,
+                uptime_s=10,
+                last_cycle_ts_utc=None,
+                paused_pairs=["EUR_USD"],
+                meta=None,
+            )
+        # Every heartbeat is older than the cutoff, but the newest row must survive.
+        future = datetime.now(timezone.utc) + timedelta(days=30)
+        run_retention(conn, raw_max_age_days=7, now=future)
+        second = run_retention(conn, raw_max_age_days=7, now=future)
+
+        remaining = conn.execute("SELECT paused_pairs_json FROM bot_status").fetchall()
+        heartbeats = conn.execute(
+            "SELECT SUM(heartbeats) FROM bot_status_rollups WHERE granularity='day'"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    assert second.bot_status_rolled == 0
+    assert [row[0] for row in remaining] == ['["EUR_USD"]']
+    assert heartbeats == 2
+
+
+def test_incremental_vacuum_releases_free_pages(tmp_path) -> None:
+    conn = connect(tmp_path / "retention_vacuum.sqlite")
+    try:
+        init_db(conn)
+        old = NOW - timedelta(days=30)
+        for minute in range(0, 60 * 24, 5):
+            _snapshot(conn, old + timedelta(minutes=minute), "GBP_USD", "HOLD")
+        result = run_retention(conn, raw_max_age_days=7, batch_size=100, now=NOW)
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+
+    assert result.gate_snapshots_rolled == 288
+    assert result.vacuum_pages > 0
+    assert free_pages == 0
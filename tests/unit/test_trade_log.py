@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest import backtest_strategy
+from backtest.trade_log import TRADE_LOG_COLUMNS, compare_runs, list_runs, load_runs, load_trade_log, read_meta
+
+
+def _bars(count: int = 1500, seed: int = 4) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, count))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    wick = np.abs(rng.normal(0, 0.0003, (2, count)))
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=count, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + wick[0],
+            "low": np.minimum(open_, close) - wick[1],
+            "close": close,
+            "volume": rng.integers(50, 500, count),
+        }
+    )
+
+
+def test_trade_log_records_exits_and_excursions(tmp_path, monkeypatch) -> None:
+    from strategies import ema_vwap
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    df = _bars()
+    result = backtest_strategy(df, "EUR_USD", ema_vwap, lookahead=15, return_trades=True, trade_log=tmp_path / "logs", run_id="a")
+
+    trades = result["validation_trades"]
+    assert list(trades.columns) == TRADE_LOG_COLUMNS and len(trades) > 0
+    assert set(trades["exit_reason"]) <= {"TP", "SL", "TIMEOUT"}
+    closed = trades[trades["exit_reason"] != "TIMEOUT"]
+    assert (closed["exit_reason"].map({"TP": "WIN", "SL": "LOSS"}) == closed["result"]).all()
+    assert (trades["bars_held"] == trades["exit_idx"] - trades["entry_idx"]).all()
+    assert (trades["bars_held"].between(1, 15)).all()
+
+    split = int(len(df) * 0.7)
+    validation = df.iloc[split:].reset_index(drop=True)
+    for trade in trades.itertuples():
+        window = validation.iloc[trade.idx + 1 : trade.exit_idx + 1]
+        if trade.direction == "BUY":
+            mae, mfe = trade.entry - window["low"].min(), window["high"].max() - trade.entry
+        else:
+            mae, mfe = window["high"].max() - trade.entry, trade.entry - window["low"].min()
+        assert trade.mae_pips == pytest.approx(max(mae, 0.0) / 0.0001)
+        assert trade.mfe_pips == pytest.approx(max(mfe, 0.0) / 0.0001)
+        assert trade.exit_time == validation["time"].iloc[trade.exit_idx]
+
+    stored = load_trade_log(result["trade_log"])
+    expected = pd.concat(
+        [result["train_trades"].assign(segment="train"), result["validation_trades"].assign(segment="validation")],
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+    assert read_meta(result["trade_log"])["metrics"]["validation"]["total_trades"] == len(trades)
+
+
+def test_runs_load_and_compare_without_rerunning(tmp_path, monkeypatch) -> None:
+    from strategies import ema_vwap
+
+    monkeypatch.setenv("SCALP_BOT_DB_PATH", str(tmp_path / "bot.sqlite"))
+    root = tmp_path / "logs"
+    df = _bars(seed=5)
+    sl_tp = backtest_strategy(df, "EUR_USD", ema_vwap, lookahead=15, trade_log=root, run_id="sl_tp")
+    timed = backtest_strategy(df, "EUR_USD", ema_vwap, mode="time_exit", hold_bars=3, trade_log=root, run_id="timed")
+
+    assert list_runs(root) == ["sl_tp", "timed"]
+    both = load_runs(root, columns=["segment", "pnl_pips", "bars_held", "exit_reason"])
+    assert list(both.columns) == ["run", "segment", "pnl_pips", "bars_held", "exit_reason"]
+    assert set(both.loc[both["run"] == "timed", "exit_reason"]) == {"TIME_EXIT"}
+    assert (both.loc[both["run"] == "timed", "bars_held"] == 3).all()
+
+    summary = compare_runs(root).set_index(["run", "segment"])
+    for run, result in (("sl_tp", sl_tp), ("timed", timed)):
+        for segment in ("train", "validation"):
+            metrics = result[segment]
+            if not metrics["total_trades"]:
+                continue
+            row = summary.loc[(run, segment)]
+            assert row["trades"] == metrics["total_trades"]
+            assert row["win_rate"] == pytest.approx(metrics["win_rate"])
+            assert row["mean_pips"] == pytest.approx(metrics["avg_pips_per_trade"])